@@ -0,0 +1,88 @@
+"""
+Benchmark: audit logging cost on the caller (event loop) thread.
+
+Compares the historical synchronous path (sanitize + ``json.dumps`` +
+``FileHandler`` write in the caller) with the queued pipeline, using
+``log_ssh_connect(..., reused=True)``: the event logged on every pooled
+connection hit. Also reports how many lines reach the file when those
+events are rolled up (60 s windows, 20 hosts).
+
+Usage:
+    python benchmarks/bench_audit.py [--events 100000]
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from mcp_linux_infra.audit import AuditLogger, EventType, Status
+
+
+def ssh_connect_details() -> dict:
+    return {"host": "web-01", "username": "mcp-reader", "reused": True, "error": None}
+
+
+def file_logger(name: str, path: Path, rollup_interval: float = 0) -> AuditLogger:
+    audit = AuditLogger(name=name, queue_size=10**9, rollup_interval=rollup_interval)
+    audit.logger.handlers.clear()
+    audit.logger.propagate = False
+    audit.logger.setLevel(logging.INFO)
+    audit.logger.addHandler(logging.FileHandler(path))
+    return audit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Ancien chemin: tout dans l'appelant
+        sync = file_logger("bench.audit.sync", Path(tmp) / "sync.json")
+        start = time.perf_counter()
+        for _ in range(args.events):
+            event = {
+                "timestamp": datetime.now().isoformat(),
+                "event_type": EventType.SSH_CONNECT.value,
+                "status": Status.SUCCESS.value,
+                "details": sync._sanitize(ssh_connect_details()),
+            }
+            sync.logger.info(json.dumps(event))
+        sync_us = (time.perf_counter() - start) / args.events * 1e6
+        sync.close()
+
+        queued = file_logger("bench.audit.queued", Path(tmp) / "queued.json")
+        start = time.perf_counter()
+        for _ in range(args.events):
+            queued.log_event(EventType.SSH_CONNECT, Status.SUCCESS, ssh_connect_details())
+        queued_us = (time.perf_counter() - start) / args.events * 1e6
+
+        start = time.perf_counter()
+        queued.close()
+        drain_ms = (time.perf_counter() - start) * 1000
+
+        written = sum(1 for _ in open(Path(tmp) / "queued.json"))
+        assert written == args.events, written
+
+        print(f"\n{args.events} ssh_connect(reused=True) events")
+        print(f"  synchronous            {sync_us:10.2f} µs/event")
+        print(f"  queued (caller)        {queued_us:10.2f} µs/event")
+        print(f"  drain on close         {drain_ms:10.1f} ms")
+        print(f"  speedup                {sync_us / queued_us:10.1f} x")
+
+        rolled = file_logger("bench.audit.rollup", Path(tmp) / "rollup.json", rollup_interval=60)
+        for i in range(args.events):
+            details = ssh_connect_details()
+            details["host"] = f"web-{i % 20:02d}"
+            rolled.log_event(EventType.SSH_CONNECT, Status.SUCCESS, details)
+        rolled.close()
+        lines = sum(1 for _ in open(Path(tmp) / "rollup.json"))
+        print(f"  lines with rollups     {lines:10d}  (of {args.events} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: AuthorizationEngine.check_command latency vs whitelist size.
+
+Compares the historical linear ``re.match`` scan with the compiled,
+token-indexed RuleMatcher on synthetic whitelists of 1k and 10k rules
+(~2% of them generic fallback patterns such as ``.*rm\\s+-rf``).
+
+Usage:
+    python benchmarks/bench_authorization.py [--checks 20000] [--linear-checks 50]
+
+The linear scan is measured on fewer commands: past the ``re`` module
+cache size (512 patterns) every check recompiles the whole whitelist.
+"""
+
+import argparse
+import random
+import re
+import time
+
+from mcp_linux_infra.authorization import AuthLevel, AuthorizationEngine, CommandRule
+
+TOOLS = 200  # Nombre de commandes de tête distinctes
+
+
+def make_rules(count: int, rng: random.Random) -> list[CommandRule]:
+    rules = []
+    for i in range(count):
+        if i % 50 == 49:
+            pattern = rf".*dangerous{i}\s+-rf"
+            level = AuthLevel.BLOCKED
+        else:
+            pattern = rf"^tool{i % TOOLS} sub{i // TOOLS}\s+"
+            level = rng.choice([AuthLevel.AUTO, AuthLevel.MANUAL])
+        rules.append(CommandRule(
+            pattern=pattern,
+            auth_level=level,
+            description=f"rule {i}",
+            ssh_user="mcp-reader",
+            rationale="benchmark",
+        ))
+    return rules
+
+
+def make_commands(count: int, rules: int, rng: random.Random) -> list[str]:
+    # Commandes couvertes par une règle indexée (le cas courant)
+    commands = []
+    for _ in range(count):
+        i = rng.randrange(rules)
+        commands.append(f"tool{i % TOOLS} sub{i // TOOLS} --flag value")
+    return commands
+
+
+def linear_check(rules: list[CommandRule], command: str) -> CommandRule | None:
+    for rule in rules:
+        if re.match(rule.pattern, command):
+            return rule
+    return None
+
+
+def bench(label: str, fn, commands: list[str]) -> float:
+    start = time.perf_counter()
+    for command in commands:
+        fn(command)
+    per_check = (time.perf_counter() - start) / len(commands) * 1e6
+    print(f"  {label:<22} {per_check:10.2f} µs/check")
+    return per_check
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=20_000)
+    parser.add_argument("--linear-checks", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for size in (1_000, 10_000):
+        rules = make_rules(size, rng)
+        commands = make_commands(args.checks, size, rng)
+        linear_commands = commands[: args.linear_checks]
+
+        start = time.perf_counter()
+        engine = AuthorizationEngine(rules)
+        build_ms = (time.perf_counter() - start) * 1000
+        matcher = engine._matcher
+
+        print(f"\n{size} rules  (index build {build_ms:.1f} ms, {matcher.stats()})")
+        linear = bench("linear re.match", lambda c, rules=rules: linear_check(rules, c), linear_commands)
+        indexed = bench("indexed matcher", matcher.match, commands)
+        bench("check_command", lambda c, engine=engine: engine.check_command("bench", c), commands)
+        print(f"  speedup                {linear / indexed:10.1f} x")
+
+        for command in linear_commands:
+            assert matcher.match(command) is linear_check(rules, command)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: AutoLearningEngine persistence cost for 100k blocked attempts.
+
+Compares the historical full ``json.dump(indent=2)`` rewrite after every
+attempt with the append-only event log (batched by the flusher thread,
+compacted into the snapshot), over ~1k distinct commands, then times
+top-N, suggestion and summary queries.
+
+Usage:
+    python benchmarks/bench_auto_learning.py [--records 100000] [--commands 1000] [--legacy-records 200]
+                                             [--backend json|sqlite]
+
+The legacy rewrite is measured on fewer attempts (with the full set of
+commands already known) and extrapolated.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from mcp_linux_infra.analysis.auto_learning import AutoLearningEngine
+
+
+def make_attempts(count: int, commands: int, rng: random.Random) -> list[tuple[str, str, str]]:
+    return [
+        (f"tool{rng.randrange(commands)} --flag", f"user{rng.randrange(20)}", f"host{rng.randrange(50)}")
+        for _ in range(count)
+    ]
+
+
+def legacy_per_record(engine: AutoLearningEngine, attempts) -> float:
+    """Seconds per attempt when the whole stats file is rewritten each time."""
+    start = time.perf_counter()
+    for _ in attempts:
+        with open(engine.stats_file, 'w') as f:
+            json.dump(engine.stats, f, indent=2)
+    return (time.perf_counter() - start) / len(attempts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--commands", type=int, default=1_000)
+    parser.add_argument("--legacy-records", type=int, default=200)
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    attempts = make_attempts(args.records, args.commands, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_file = Path(tmp) / "command_stats.json"
+        engine = AutoLearningEngine(stats_file=stats_file, backend=args.backend)
+
+        start = time.perf_counter()
+        for command, user, host in attempts:
+            engine.record_blocked_command(command, user=user, host=host)
+        record_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.close()
+        close_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        reloaded = AutoLearningEngine(stats_file=stats_file, backend=args.backend)
+        load_ms = (time.perf_counter() - start) * 1000
+        summary = reloaded.get_stats_summary()
+        store_kib = Path(summary['stats_file']).stat().st_size // 1024
+        assert summary['total_block_attempts'] == args.records
+
+        queries = {
+            "top 10": lambda: reloaded.get_top_blocked_commands(limit=10),
+            "suggestions filter": lambda: reloaded.get_learning_suggestions(min_count=10**9),
+            "summary": reloaded.get_stats_summary,
+        }
+        query_us = {}
+        for label, query in queries.items():
+            start = time.perf_counter()
+            for _ in range(100):
+                query()
+            query_us[label] = (time.perf_counter() - start) / 100 * 1e6
+
+        reloaded.stats = {s.command: asdict(s) for s in reloaded.get_all_stats()}
+        legacy = legacy_per_record(reloaded, attempts[: args.legacy_records])
+        reloaded.close()
+
+        print(f"\n{args.records} attempts over {summary['total_unique_commands']} commands ({args.backend})")
+        print(f"  append-only            {record_s / args.records * 1e6:10.2f} µs/record  ({record_s:.2f} s total)")
+        print(f"  final flush+compact    {close_ms:10.1f} ms")
+        print(f"  startup load           {load_ms:10.1f} ms  (store {store_kib} KiB)")
+        print(f"  legacy full rewrite    {legacy * 1e6:10.2f} µs/record  (~{legacy * args.records:.0f} s total)")
+        print(f"  speedup                {legacy / (record_s / args.records):10.1f} x")
+        for label, us in query_us.items():
+            print(f"  query {label:<16} {us:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: approval state store with 10k pending items.
+
+Measures inserts, compare-and-set transitions (single thread, then
+threads racing for the same records), listings against a scan of the
+historical in-process dict (all pending on one host; then the few
+still open among 10k mostly executed records), and an expiry sweep.
+
+Usage:
+    python benchmarks/bench_state_store.py [--items 10000] [--threads 4]
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from mcp_linux_infra.state_store import StateStore
+
+HOSTS = 50
+
+
+def record(i: int) -> dict:
+    return {
+        "id": f"cmd_{i:08x}",
+        "host": f"web-{i % HOSTS:02d}",
+        "command": f"systemctl restart app-{i}",
+        "ssh_user": "exec-runner",
+        "status": "pending",
+    }
+
+
+def timed(label: str, n: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:32s} {elapsed * 1000:9.1f} ms  ({elapsed / n * 1e6:8.1f} µs/op)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    n = args.items
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        print(f"\n{n} approvals, {HOSTS} hosts")
+
+        timed("insert", n, lambda: [store.put("approval", record(i), ttl=3600) for i in range(n)])
+
+        # Ancien registre: dict en mémoire parcouru en entier
+        legacy = {r["id"]: r for r in map(record, range(n))}
+        queries = 100
+        timed("list host (dict scan)", queries, lambda: [
+            [r for r in legacy.values() if r["host"] == "web-07" and r["status"] == "pending"]
+            for _ in range(queries)
+        ])
+        timed("list host (indexed)", queries, lambda: [
+            store.select("approval", statuses=["pending"], host="web-07") for _ in range(queries)
+        ])
+        timed("list all pending (indexed)", 1, lambda: store.select("approval", statuses=["pending"]))
+
+        timed("approve (CAS)", n, lambda: [
+            store.transition("approval", f"cmd_{i:08x}", "pending", "approved") for i in range(n)
+        ])
+
+        # Plusieurs exécuteurs se disputent chaque enregistrement: un seul gagne
+        wins = [0] * args.threads
+
+        def claim(worker: int):
+            for i in range(n):
+                if store.transition("approval", f"cmd_{i:08x}", "approved", "executing"):
+                    wins[worker] += 1
+
+        def race():
+            threads = [threading.Thread(target=claim, args=(w,)) for w in range(args.threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        timed(f"claim race ({args.threads} threads)", n * args.threads, race)
+        assert sum(wins) == n, wins
+        print(f"  {'claims won':32s} {sum(wins):9d}  (of {n}, {wins})")
+
+        # Historique: 99% exécutés, 1% encore ouverts
+        def complete():
+            for i in range(n):
+                if i % 100:
+                    store.transition("approval", f"cmd_{i:08x}", "executing", "executed")
+                    legacy[f"cmd_{i:08x}"]["status"] = "executed"
+
+        timed("complete (CAS)", n, complete)
+        open_statuses = ("pending", "approved", "executing")
+        timed("list open (dict scan)", queries, lambda: [
+            [r for r in legacy.values() if r["status"] in open_statuses] for _ in range(queries)
+        ])
+        timed("list open (indexed)", queries, lambda: [
+            store.select("approval", statuses=open_statuses) for _ in range(queries)
+        ])
+
+        timed("sweep (all expired)", n, lambda: store.sweep(now=time.time() + 7200))
+        assert store.counts("approval") == {}
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ from .command_analysis import (
     assess_command_risk,
     RiskLevel,
     CommandAnalysis,
+    get_analysis_cache,
+    invalidate_analysis_cache,
 )
 
 from .auto_learning import (
@@ -15,14 +17,19 @@ from .auto_learning import (
     get_learning_suggestions,
 )
 
+from .learning_store import SQLiteLearningStore
+
 __all__ = [
     "analyze_command_safety",
     "find_similar_commands",
     "assess_command_risk",
     "RiskLevel",
     "CommandAnalysis",
+    "get_analysis_cache",
+    "invalidate_analysis_cache",
     "AutoLearningEngine",
     "CommandStats",
     "record_blocked_command",
     "get_learning_suggestions",
+    "SQLiteLearningStore",
 ]
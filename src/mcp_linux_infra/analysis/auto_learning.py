@@ -1,7 +1,29 @@
-"""Auto-learning system for command authorization."""
-
+"""
+Auto-learning system for command authorization.
+
+Persistence is append-only: every blocked attempt becomes one JSON line
+in ``command_stats.jsonl``, written in batches by a background thread
+(at most ``learning_flush_interval`` seconds later). Once the log holds
+``learning_compact_events`` events it is compacted into the
+``command_stats.json`` snapshot. Startup loads the snapshot, then
+replays the tail of the log.
+
+Events and snapshot carry a sequence number: events already folded into
+the snapshot are skipped on replay, so an interrupted compaction never
+counts an attempt twice.
+
+With ``learning_backend="sqlite"`` the same batched events are applied
+to an indexed SQLite database (``command_stats.db``, see
+``learning_store``) and queries run in SQL instead of scanning the dict.
+"""
+
+import atexit
+import heapq
 import json
+import logging
 import os
+import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -10,6 +32,11 @@ from collections import defaultdict
 
 from ..config import get_settings
 from .command_analysis import analyze_command_safety, RiskLevel
+from .learning_store import SQLiteLearningStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
 
 
 @dataclass
@@ -24,6 +51,11 @@ class CommandStats:
     risk_level: str
     category: str
 
+    @classmethod
+    def from_record(cls, data: dict) -> "CommandStats":
+        """Build from an engine record (users/hosts stored as sets)."""
+        return cls(**{**data, 'users': sorted(data['users']), 'hosts': sorted(data['hosts'])})
+
 
 class AutoLearningEngine:
     """
@@ -31,12 +63,25 @@ class AutoLearningEngine:
     additions to the whitelist.
     """
 
-    def __init__(self, stats_file: Optional[Path] = None):
+    def __init__(
+        self,
+        stats_file: Optional[Path] = None,
+        flush_interval: Optional[float] = None,
+        flush_batch: Optional[int] = None,
+        compact_events: Optional[int] = None,
+        backend: Optional[str] = None,
+    ):
         """
         Initialize auto-learning engine.
 
         Args:
-            stats_file: Path to stats file (default: logs/command_stats.json)
+            stats_file: Path to stats snapshot (default: logs/command_stats.json);
+                the event log is the same path with a ``.jsonl`` suffix
+            flush_interval: Max seconds before pending events are written
+            flush_batch: Pending events that trigger an early flush
+            compact_events: Logged events that trigger a snapshot rewrite
+            backend: "json" (snapshot + event log) or "sqlite"
+                (default: ``learning_backend`` setting)
         """
         settings = get_settings()
 
@@ -46,27 +91,241 @@ class AutoLearningEngine:
             stats_file = log_dir / "command_stats.json"
 
         self.stats_file = stats_file
-        self.stats: dict[str, dict] = self._load_stats()
+        self.log_file = stats_file.with_suffix(".jsonl")
+        self.flush_interval = flush_interval if flush_interval is not None else settings.learning_flush_interval
+        self.flush_batch = flush_batch if flush_batch is not None else settings.learning_flush_batch
+        self.compact_events = compact_events if compact_events is not None else settings.learning_compact_events
+
+        self._lock = threading.Lock()       # stats, pending, compteurs
+        self._io_lock = threading.Lock()    # écritures fichier
+        self._pending: list[dict] = []
+        self._seq = 0                       # dernier numéro d'événement
+        self._logged_events = 0             # événements dans le log depuis le snapshot
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.backend = backend or settings.learning_backend
+        self.db: Optional[SQLiteLearningStore] = None
+
+        if self.backend == "sqlite":
+            db_file = stats_file.with_suffix(".db")
+            migrate = not db_file.exists() and (self.stats_file.exists() or self.log_file.exists())
+            self.db = SQLiteLearningStore(db_file)
+            if migrate:
+                self.db.import_stats(self._load_stats())
+            self.stats: dict[str, dict] = {}  # Les données restent dans la base
+            self._known = self.db.known_commands()
+        else:
+            self.stats = self._load_stats()
+            self._known = self.stats.keys()
+
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
 
     def _load_stats(self) -> dict:
-        """Load stats from file."""
-        if not self.stats_file.exists():
-            return {}
-
-        try:
-            with open(self.stats_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
-
-    def _save_stats(self):
-        """Save stats to file."""
-        try:
-            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
-        except IOError as e:
-            print(f"Warning: Could not save stats: {e}")
+        """Load the snapshot, then replay the event log tail."""
+        stats: dict[str, dict] = {}
+
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, 'r') as f:
+                    data = json.load(f)
+                if data.get('format') == SNAPSHOT_FORMAT:
+                    stats, self._seq = data['stats'], data['seq']
+                else:
+                    stats = data  # Ancien format: dict command -> stats
+                for entry in stats.values():
+                    entry['users'] = set(entry['users'])
+                    entry['hosts'] = set(entry['hosts'])
+            except (json.JSONDecodeError, IOError, AttributeError, KeyError, TypeError):
+                stats = {}
+
+        if self.log_file.exists():
+            try:
+                with open(self.log_file, 'r') as f:
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Dernière ligne tronquée (arrêt brutal)
+                        if event.get('n', 0) <= self._seq:
+                            continue  # Déjà dans le snapshot
+                        self._apply(stats, event)
+                        self._seq = event['n']
+                        self._logged_events += 1
+            except IOError as e:
+                logger.warning(f"Could not read stats log: {e}")
+
+        return stats
+
+    @staticmethod
+    def _apply(stats: dict[str, dict], event: dict):
+        """Apply one event to a stats dict (used live and on replay)."""
+        op = event.get('op')
+
+        if op == 'clear':
+            if 'command' in event:
+                stats.pop(event['command'], None)
+            else:
+                stats.clear()
+            return
+
+        command = event['command']
+        entry = stats.get(command)
+        if entry is None:
+            entry = stats[command] = {
+                'command': command,
+                'count': 0,
+                'first_seen': event['at'],
+                'last_seen': event['at'],
+                'users': set(),
+                'hosts': set(),
+                'risk_level': event['risk_level'],
+                'category': event['category'],
+            }
+
+        entry['count'] += 1
+        entry['last_seen'] = event['at']
+        entry['users'].add(event['user'])
+        entry['hosts'].add(event['host'])
+
+    def _log_event(self, event: dict):
+        """Apply an event in memory and queue it for the log (or database)."""
+        with self._lock:
+            self._seq += 1
+            event['n'] = self._seq
+            if self.db is None:
+                self._apply(self.stats, event)
+            elif event.get('op') != 'clear':
+                self._known.add(event['command'])
+            elif 'command' in event:
+                self._known.discard(event['command'])
+            else:
+                self._known.clear()
+            self._pending.append(event)
+            pending = len(self._pending)
+
+        if self._closed:
+            self.flush()
+            return
+
+        if self._flusher is None:
+            self._start_flusher()
+        if pending >= self.flush_batch:
+            self._wakeup.set()
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="learning-flush", daemon=True
+            )
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:  # Le thread ne doit jamais mourir
+                logger.warning(f"Could not flush stats: {e}")
+
+    def flush(self, compact: Optional[bool] = None):
+        """
+        Write pending events (blocking file I/O: called from the flusher thread).
+
+        Args:
+            compact: Force (True) or prevent (False) a snapshot rewrite;
+                by default compact once the log reaches ``compact_events``.
+                Ignored by the SQLite backend.
+        """
+        if self.db is not None:
+            self._flush_db()
+            return
+
+        with self._io_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+                if compact is None:
+                    compact = self._logged_events + len(events) >= self.compact_events
+                if compact:
+                    # Le snapshot contient aussi les événements en attente
+                    snapshot = json.dumps(
+                        {'format': SNAPSHOT_FORMAT, 'seq': self._seq, 'stats': self.stats},
+                        separators=(',', ':'),
+                        default=sorted,  # users/hosts: set -> liste
+                    )
+                    logged = self._logged_events
+                    self._logged_events = 0
+                elif events:
+                    self._logged_events += len(events)
+
+            try:
+                self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+                if compact:
+                    self._write_snapshot(snapshot)
+                elif events:
+                    with open(self.log_file, 'a') as f:
+                        f.write(''.join(json.dumps(e, separators=(',', ':')) + '\n' for e in events))
+            except IOError as e:
+                logger.warning(f"Could not save stats: {e}")
+                with self._lock:
+                    if compact:
+                        self._logged_events += logged
+                    else:
+                        self._logged_events -= len(events)
+                    self._pending[:0] = events
+
+    def _flush_db(self):
+        """Apply pending events to the SQLite store in one transaction."""
+        with self._io_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if not events:
+                return
+            try:
+                self.db.apply(events)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not save stats: {e}")
+                with self._lock:
+                    self._pending[:0] = events
+
+    def _write_snapshot(self, snapshot: str):
+        """Atomically replace the snapshot, then truncate the log."""
+        tmp_file = self.stats_file.with_name(self.stats_file.name + '.tmp')
+        with open(tmp_file, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_file, self.stats_file)
+
+        # Un arrêt ici laisse des événements déjà compactés: ignorés au chargement (seq)
+        if self.log_file.exists():
+            self.log_file.unlink()
+
+    def close(self):
+        """Stop the flusher and compact new events (if any) into the snapshot."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        with self._lock:
+            # Rien d'enregistré: ne pas réécrire un snapshot identique
+            dirty = bool(self._logged_events or self._pending)
+        self.flush(compact=dirty)
+        if self.db is not None:
+            self.db.close()
+        atexit.unregister(self.close)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
 
     def record_blocked_command(
         self,
@@ -77,40 +336,32 @@ class AutoLearningEngine:
         """
         Record a blocked command execution attempt.
 
+        Only updates memory and queues an event: no file I/O in the caller.
+
         Args:
             command: The blocked command
             user: User who attempted the command
             host: Host where command was attempted
         """
-        now = datetime.now().isoformat()
+        event = {
+            'command': command,
+            'user': user,
+            'host': host,
+            'at': datetime.now().isoformat(),
+        }
 
-        if command not in self.stats:
-            # New command - analyze it
+        if command not in self._known:
+            # New command - analyze it (kept in the event for replay)
             analysis = analyze_command_safety(command)
+            event['risk_level'] = analysis.risk_level.value
+            event['category'] = analysis.category
 
-            self.stats[command] = {
-                'command': command,
-                'count': 0,
-                'first_seen': now,
-                'last_seen': now,
-                'users': [],
-                'hosts': [],
-                'risk_level': analysis.risk_level.value,
-                'category': analysis.category,
-            }
-
-        # Update stats
-        stats_entry = self.stats[command]
-        stats_entry['count'] += 1
-        stats_entry['last_seen'] = now
-
-        if user not in stats_entry['users']:
-            stats_entry['users'].append(user)
-
-        if host not in stats_entry['hosts']:
-            stats_entry['hosts'].append(host)
+        self._log_event(event)
 
-        self._save_stats()
+    def _query_db(self) -> SQLiteLearningStore:
+        """SQLite store, with pending events applied first (read your writes)."""
+        self._flush_db()
+        return self.db
 
     def get_command_stats(self, command: str) -> Optional[CommandStats]:
         """
@@ -122,11 +373,12 @@ class AutoLearningEngine:
         Returns:
             CommandStats if found, None otherwise
         """
-        if command not in self.stats:
-            return None
+        if self.db is not None:
+            data = self._query_db().get(command)
+        else:
+            data = self.stats.get(command)
 
-        data = self.stats[command]
-        return CommandStats(**data)
+        return CommandStats.from_record(data) if data else None
 
     def get_all_stats(self) -> list[CommandStats]:
         """
@@ -135,7 +387,8 @@ class AutoLearningEngine:
         Returns:
             List of CommandStats
         """
-        return [CommandStats(**data) for data in self.stats.values()]
+        records = self._query_db().all() if self.db is not None else self.stats.values()
+        return [CommandStats.from_record(data) for data in records]
 
     def get_learning_suggestions(
         self,
@@ -154,36 +407,39 @@ class AutoLearningEngine:
         Returns:
             List of suggestions with command details
         """
-        suggestions = []
         now = datetime.now()
+        # Timestamps ISO du même format: comparables en tant que chaînes
+        seen_before = (now - timedelta(hours=min_age_hours)).isoformat()
+        # Only suggest LOW risk commands by default
+        risk_filter = RiskLevel.LOW.value if max_risk == RiskLevel.LOW else None
 
-        for command, data in self.stats.items():
-            # Check criteria
-            if data['count'] < min_count:
-                continue
-
-            first_seen = datetime.fromisoformat(data['first_seen'])
-            age_hours = (now - first_seen).total_seconds() / 3600
-
-            if age_hours < min_age_hours:
-                continue
-
-            risk_level = RiskLevel(data['risk_level'])
-
-            # Only suggest LOW risk commands by default
-            if max_risk == RiskLevel.LOW and risk_level != RiskLevel.LOW:
-                continue
+        if self.db is not None:
+            candidates = self._query_db().candidates(min_count, seen_before, risk_filter)
+        else:
+            candidates = sorted(
+                (
+                    data for data in self.stats.values()
+                    if data['count'] >= min_count
+                    and data['first_seen'] <= seen_before
+                    and (risk_filter is None or data['risk_level'] == risk_filter)
+                ),
+                key=lambda data: data['count'],
+                reverse=True,
+            )
 
+        suggestions = []
+        for data in candidates:
             # Analyze command for detailed suggestion
-            analysis = analyze_command_safety(command)
+            analysis = analyze_command_safety(data['command'])
+            age_hours = (now - datetime.fromisoformat(data['first_seen'])).total_seconds() / 3600
 
             suggestions.append({
-                'command': command,
+                'command': data['command'],
                 'count': data['count'],
-                'users': data['users'],
-                'hosts': data['hosts'],
+                'users': sorted(data['users']),
+                'hosts': sorted(data['hosts']),
                 'age_hours': int(age_hours),
-                'risk_level': risk_level.value,
+                'risk_level': RiskLevel(data['risk_level']).value,
                 'category': data['category'],
                 'suggested_level': analysis.suggested_level.value if analysis.suggested_level else None,
                 'suggested_ssh_user': analysis.suggested_ssh_user,
@@ -192,9 +448,6 @@ class AutoLearningEngine:
                 'recommended_action': analysis.recommended_action,
             })
 
-        # Sort by count (most requested first)
-        suggestions.sort(key=lambda x: x['count'], reverse=True)
-
         return suggestions
 
     def get_top_blocked_commands(self, limit: int = 10) -> list[CommandStats]:
@@ -207,9 +460,11 @@ class AutoLearningEngine:
         Returns:
             List of CommandStats sorted by count
         """
-        all_stats = self.get_all_stats()
-        all_stats.sort(key=lambda x: x.count, reverse=True)
-        return all_stats[:limit]
+        if self.db is not None:
+            top = self._query_db().top(limit)
+        else:
+            top = heapq.nlargest(limit, self.stats.values(), key=lambda data: data['count'])
+        return [CommandStats.from_record(data) for data in top]
 
     def clear_stats(self, command: Optional[str] = None):
         """
@@ -219,12 +474,10 @@ class AutoLearningEngine:
             command: Specific command to clear, or None to clear all
         """
         if command:
-            if command in self.stats:
-                del self.stats[command]
+            if command in self._known:
+                self._log_event({'op': 'clear', 'command': command})
         else:
-            self.stats = {}
-
-        self._save_stats()
+            self._log_event({'op': 'clear'})
 
     def get_stats_summary(self) -> dict:
         """
@@ -233,6 +486,17 @@ class AutoLearningEngine:
         Returns:
             Dict with summary information
         """
+        if self.db is not None:
+            db = self._query_db()
+            total_commands, total_blocks = db.totals()
+            return {
+                'total_unique_commands': total_commands,
+                'total_block_attempts': total_blocks,
+                'risk_breakdown': db.breakdown('risk_level'),
+                'category_breakdown': db.breakdown('category'),
+                'stats_file': str(db.db_file),
+            }
+
         total_commands = len(self.stats)
         total_blocks = sum(data['count'] for data in self.stats.values())
 
@@ -1,12 +1,17 @@
 """Command safety analysis and risk assessment."""
 
 import re
+import threading
+from collections import OrderedDict
 from enum import Enum
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
+from ..authorization.matcher import PatternSet
 from ..authorization.models import AuthLevel
 from ..authorization.whitelist import COMMAND_WHITELIST
+from ..config import CONFIG
+from ..utils.metrics import REGISTRY, Counter, Gauge, snapshot
 
 
 class RiskLevel(str, Enum):
@@ -226,6 +231,41 @@ READONLY_PATTERNS = [
 ]
 
 
+# Les trois tables en une seule alternation, dans l'ordre de décision
+# (dangereux, puis risque moyen, puis lecture seule)
+RISK_TIERS = PatternSet(
+    [pattern for pattern, _ in DANGEROUS_PATTERNS]
+    + [pattern for pattern, _ in MEDIUM_RISK_PATTERNS]
+    + READONLY_PATTERNS,
+    flags=[re.IGNORECASE] * (len(DANGEROUS_PATTERNS) + len(MEDIUM_RISK_PATTERNS))
+    + [0] * len(READONLY_PATTERNS),
+)
+
+
+def match_risk_pattern(command: str) -> Optional[tuple[RiskLevel, str, Optional[str]]]:
+    """
+    Classify a command against the pattern tiers in a single scan.
+
+    Returns:
+        (risk, pattern that fired, reason) or None if no pattern matches.
+        Risk is CRITICAL, MEDIUM or LOW; reason is None for read-only patterns.
+    """
+    index = RISK_TIERS.first_match(command)
+    if index is None:
+        return None
+
+    if index < len(DANGEROUS_PATTERNS):
+        pattern, reason = DANGEROUS_PATTERNS[index]
+        return RiskLevel.CRITICAL, pattern, reason
+
+    index -= len(DANGEROUS_PATTERNS)
+    if index < len(MEDIUM_RISK_PATTERNS):
+        pattern, reason = MEDIUM_RISK_PATTERNS[index]
+        return RiskLevel.MEDIUM, pattern, reason
+
+    return RiskLevel.LOW, READONLY_PATTERNS[index - len(MEDIUM_RISK_PATTERNS)], None
+
+
 def assess_command_risk(command: str) -> dict:
     """
     Assess the risk level of a command.
@@ -257,41 +297,43 @@ def assess_command_risk(command: str) -> dict:
             'examples': spec.examples or [],
         }
 
-    # Check dangerous patterns first
-    for pattern, reason in DANGEROUS_PATTERNS:
-        if re.match(pattern, command, re.IGNORECASE):
+    # Dangerous, then medium risk, then read-only patterns (one scan)
+    matched = match_risk_pattern(command)
+
+    if matched:
+        risk, pattern, reason = matched
+
+        if risk == RiskLevel.CRITICAL:
             return {
                 'risk': RiskLevel.CRITICAL,
                 'category': 'destructive',
                 'is_readonly': False,
                 'suggestion': AuthLevel.BLOCKED,
                 'reason': reason,
-                'recommended_action': 'BLOCK_PERMANENTLY'
+                'recommended_action': 'BLOCK_PERMANENTLY',
+                'pattern': pattern,
             }
 
-    # Check medium risk patterns
-    for pattern, reason in MEDIUM_RISK_PATTERNS:
-        if re.match(pattern, command, re.IGNORECASE):
+        if risk == RiskLevel.MEDIUM:
             return {
                 'risk': RiskLevel.MEDIUM,
                 'category': 'system_modification',
                 'is_readonly': False,
                 'suggestion': AuthLevel.MANUAL,
                 'reason': reason,
-                'recommended_action': 'ADD_MANUAL'
+                'recommended_action': 'ADD_MANUAL',
+                'pattern': pattern,
             }
 
-    # Check read-only patterns
-    for pattern in READONLY_PATTERNS:
-        if re.match(pattern, command):
-            return {
-                'risk': RiskLevel.LOW,
-                'category': 'monitoring',
-                'is_readonly': True,
-                'suggestion': AuthLevel.AUTO,
-                'reason': 'Read-only operation',
-                'recommended_action': 'ADD_AUTO'
-            }
+        return {
+            'risk': RiskLevel.LOW,
+            'category': 'monitoring',
+            'is_readonly': True,
+            'suggestion': AuthLevel.AUTO,
+            'reason': 'Read-only operation',
+            'recommended_action': 'ADD_AUTO',
+            'pattern': pattern,
+        }
 
     # Unknown command
     return {
@@ -334,16 +376,125 @@ def find_similar_commands(command: str) -> list[str]:
     return similar[:5]  # Limit to 5 most relevant
 
 
+def normalize_command(command: str) -> str:
+    """Cache key for a command: surrounding and repeated whitespace collapsed."""
+    return " ".join(command.split())
+
+
+class AnalysisCache:
+    """
+    Bounded LRU of CommandAnalysis results keyed by normalized command.
+
+    Every entry carries the version stamp it was computed under; the
+    version is bumped (and the cache emptied) when the plugin registry or
+    the whitelist changes, so stale analyses are never served.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else CONFIG.analysis_cache_max_entries
+        self.version = 0
+        self._entries: OrderedDict[str, tuple[int, CommandAnalysis]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistiques
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CommandAnalysis]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, analysis: CommandAnalysis, version: int) -> None:
+        with self._lock:
+            if version != self.version:
+                return  # Calculé avant une invalidation
+            self._entries[key] = (version, analysis)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> int:
+        """Bump the version stamp and drop every entry. Returns the new version."""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._entries.clear()
+            return self.version
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_analysis_cache = AnalysisCache()
+
+
+@REGISTRY.register_collector
+def _analysis_cache_metrics():
+    stats = _analysis_cache.stats()
+    return [
+        snapshot(Counter, "mcp_analysis_cache_hits_total", "Command analysis cache hits", stats["hits"]),
+        snapshot(Counter, "mcp_analysis_cache_misses_total", "Command analysis cache misses", stats["misses"]),
+        snapshot(Gauge, "mcp_analysis_cache_hit_ratio", "Command analysis cache hit ratio", stats["hit_rate"]),
+        snapshot(Gauge, "mcp_analysis_cache_entries", "Memoized command analyses", stats["entries"]),
+    ]
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get the global analysis cache."""
+    return _analysis_cache
+
+
+def invalidate_analysis_cache() -> None:
+    """Plugin registry or whitelist changed: forget every memoized analysis."""
+    _analysis_cache.invalidate()
+
+
 def analyze_command_safety(command: str) -> CommandAnalysis:
     """
     Perform comprehensive safety analysis of a command.
 
+    Results are memoized per normalized command (see AnalysisCache).
+
     Args:
         command: The command to analyze
 
     Returns:
         CommandAnalysis with full details
     """
+    key = normalize_command(command)
+    cache = get_analysis_cache()
+
+    analysis = cache.get(key)
+    if analysis is None:
+        version = cache.version
+        analysis = _analyze_command_safety(key)
+        cache.put(key, analysis, version)
+
+    # Copie: l'appelant peut modifier son résultat sans toucher au cache
+    return replace(analysis, command=command, similar_commands=list(analysis.similar_commands))
+
+
+def _analyze_command_safety(command: str) -> CommandAnalysis:
+    """Uncached analysis (see analyze_command_safety)."""
 
     # Check plugin system first
     try:
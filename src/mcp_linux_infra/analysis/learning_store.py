@@ -0,0 +1,281 @@
+"""
+SQLite backend for the auto-learning engine.
+
+Blocked-command statistics live in indexed tables instead of one JSON
+dict, so suggestions, top-N and risk/category breakdowns are SQL queries
+rather than full scans:
+
+- ``commands``: one row per command (count, first/last seen, risk, category)
+- ``command_users`` / ``command_hosts``: distinct users and hosts per command
+- ``command_buckets``: attempts per command and per hour
+
+Events come from ``AutoLearningEngine`` (same shape as its event log) and
+are applied in one transaction per flush.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commands (
+    command     TEXT PRIMARY KEY,
+    count       INTEGER NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    risk_level  TEXT NOT NULL,
+    category    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_commands_count ON commands(count DESC);
+CREATE INDEX IF NOT EXISTS idx_commands_first_seen ON commands(first_seen);
+CREATE INDEX IF NOT EXISTS idx_commands_risk ON commands(risk_level, count DESC);
+CREATE INDEX IF NOT EXISTS idx_commands_category ON commands(category);
+
+CREATE TABLE IF NOT EXISTS command_users (
+    command TEXT NOT NULL REFERENCES commands(command) ON DELETE CASCADE,
+    user    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (command, user)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS command_hosts (
+    command TEXT NOT NULL REFERENCES commands(command) ON DELETE CASCADE,
+    host    TEXT NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (command, host)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS command_buckets (
+    command TEXT NOT NULL REFERENCES commands(command) ON DELETE CASCADE,
+    bucket  TEXT NOT NULL,  -- heure ISO: 2024-01-31T14
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (command, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_COMMAND = """
+INSERT INTO commands (command, count, first_seen, last_seen, risk_level, category)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(command) DO UPDATE SET
+    count = count + excluded.count,
+    last_seen = max(last_seen, excluded.last_seen)
+"""
+
+_UPSERT_MEMBER = """
+INSERT INTO command_{table} (command, {column}, count) VALUES (?, ?, ?)
+ON CONFLICT(command, {column}) DO UPDATE SET count = count + excluded.count
+"""
+
+_MEMBER_TABLES = (('users', 'user'), ('hosts', 'host'), ('buckets', 'bucket'))
+
+_COLUMNS = "command, count, first_seen, last_seen, risk_level, category"
+
+
+class SQLiteLearningStore:
+    """Blocked-command statistics stored in an indexed SQLite database."""
+
+    def __init__(self, db_file: Path):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            db_file: Path to the SQLite file
+        """
+        self.db_file = db_file
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # Écritures depuis le thread de flush, lectures depuis la boucle asyncio
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def apply(self, events: Iterable[dict]):
+        """
+        Apply engine events (blocked attempts and clears) in one transaction.
+
+        Attempts are aggregated per command (and per user, host, hour)
+        before the upserts: a batch costs one statement per distinct row,
+        not per attempt.
+
+        Raises:
+            sqlite3.Error: The transaction is rolled back
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                commands: dict[str, list] = {}
+                members: dict[tuple, int] = {}
+                for event in events:
+                    if event.get('op') == 'clear':
+                        # Les tentatives précédentes doivent être écrites avant
+                        self._write_aggregates(cursor, commands, members)
+                        commands, members = {}, {}
+                        if 'command' in event:
+                            cursor.execute("DELETE FROM commands WHERE command = ?", (event['command'],))
+                        else:
+                            cursor.execute("DELETE FROM commands")
+                        continue
+
+                    command, at = event['command'], event['at']
+                    row = commands.get(command)
+                    if row is None:
+                        commands[command] = [
+                            command, 1, at, at,
+                            event.get('risk_level', 'unknown'), event.get('category', 'unknown'),
+                        ]
+                    else:
+                        row[1] += 1
+                        row[3] = at
+                    for key in (('users', command, event['user']),
+                                ('hosts', command, event['host']),
+                                ('buckets', command, at[:13])):
+                        members[key] = members.get(key, 0) + 1
+
+                self._write_aggregates(cursor, commands, members)
+                cursor.execute("COMMIT")
+            except sqlite3.Error:
+                cursor.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _write_aggregates(cursor: sqlite3.Cursor, commands: dict[str, list], members: dict[tuple, int]):
+        cursor.executemany(_UPSERT_COMMAND, commands.values())
+        for table, column in _MEMBER_TABLES:
+            cursor.executemany(
+                _UPSERT_MEMBER.format(table=table, column=column),
+                [(command, member, count) for (t, command, member), count in members.items() if t == table],
+            )
+
+    def import_stats(self, stats: dict[str, dict]):
+        """Load stats from the JSON backend (counts per user/host are unknown: set to 1)."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO commands ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (d['command'], d['count'], d['first_seen'], d['last_seen'], d['risk_level'], d['category'])
+                        for d in stats.values()
+                    ],
+                )
+                for table, column, key in (('users', 'user', 'users'), ('hosts', 'host', 'hosts')):
+                    self._conn.executemany(
+                        f"INSERT OR IGNORE INTO command_{table} (command, {column}, count) VALUES (?, ?, 1)",
+                        [(d['command'], member) for d in stats.values() for member in d[key]],
+                    )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _with_members(self, rows: list[sqlite3.Row]) -> list[dict]:
+        """Command rows as stats dicts, with their user and host sets."""
+        records = {row['command']: {**dict(row), 'users': set(), 'hosts': set()} for row in rows}
+        if not records:
+            return []
+
+        # Une requête par table, quelle que soit la taille du résultat
+        commands = list(records)
+        for table, column, key in (('users', 'user', 'users'), ('hosts', 'host', 'hosts')):
+            for start in range(0, len(commands), 500):
+                chunk = commands[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for row in self._query(
+                    f"SELECT command, {column} FROM command_{table} WHERE command IN ({placeholders})",
+                    chunk,
+                ):
+                    records[row[0]][key].add(row[1])
+
+        return [records[row['command']] for row in rows]
+
+    def known_commands(self) -> set[str]:
+        """All tracked commands."""
+        return {row[0] for row in self._query("SELECT command FROM commands")}
+
+    def get(self, command: str) -> Optional[dict]:
+        """Stats dict for one command, or None."""
+        rows = self._query(f"SELECT {_COLUMNS} FROM commands WHERE command = ?", (command,))
+        records = self._with_members(rows)
+        return records[0] if records else None
+
+    def all(self) -> list[dict]:
+        """Stats dicts for every command."""
+        return self._with_members(self._query(f"SELECT {_COLUMNS} FROM commands"))
+
+    def top(self, limit: int) -> list[dict]:
+        """Most blocked commands (uses the count index)."""
+        return self._with_members(self._query(
+            f"SELECT {_COLUMNS} FROM commands ORDER BY count DESC LIMIT ?", (limit,)
+        ))
+
+    def candidates(self, min_count: int, seen_before: str, risk_level: Optional[str] = None) -> list[dict]:
+        """
+        Commands blocked at least ``min_count`` times and first seen before
+        ``seen_before`` (ISO timestamp), most blocked first.
+        """
+        sql = f"SELECT {_COLUMNS} FROM commands WHERE count >= ? AND first_seen <= ?"
+        params: list = [min_count, seen_before]
+        if risk_level is not None:
+            sql += " AND risk_level = ?"
+            params.append(risk_level)
+        return self._with_members(self._query(sql + " ORDER BY count DESC", params))
+
+    def totals(self) -> tuple[int, int]:
+        """(distinct commands, total blocked attempts)."""
+        row = self._query("SELECT COUNT(*), COALESCE(SUM(count), 0) FROM commands")[0]
+        return row[0], row[1]
+
+    def breakdown(self, column: str) -> dict[str, int]:
+        """Number of commands per ``risk_level`` or ``category``."""
+        if column not in ('risk_level', 'category'):
+            raise ValueError(f"Cannot break down by {column!r}")
+        return {
+            row[0]: row[1]
+            for row in self._query(f"SELECT {column}, COUNT(*) FROM commands GROUP BY {column}")
+        }
+
+    def timeline(self, command: str) -> dict[str, int]:
+        """Attempts per hour bucket for one command, oldest first."""
+        return {
+            row[0]: row[1]
+            for row in self._query(
+                "SELECT bucket, count FROM command_buckets WHERE command = ? ORDER BY bucket", (command,)
+            )
+        }
+
+    def member_counts(self, command: str, member: str) -> dict[str, int]:
+        """Attempts per ``user`` or ``host`` for one command."""
+        if member not in ('user', 'host'):
+            raise ValueError(f"Unknown member {member!r}")
+        return {
+            row[0]: row[1]
+            for row in self._query(
+                f"SELECT {member}, count FROM command_{member}s WHERE command = ? ORDER BY count DESC",
+                (command,),
+            )
+        }
@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Optional, Dict, List
 import re
 
@@ -22,9 +23,14 @@ class CommandSpec:
     examples: Optional[List[str]] = None
     flags: Optional[List[str]] = None  # Common flags
 
+    @cached_property
+    def regex(self) -> re.Pattern:
+        """Compiled pattern (compiled on first use)."""
+        return re.compile(self.pattern)
+
     def matches(self, command: str) -> bool:
         """Check if command matches this spec."""
-        return bool(re.match(self.pattern, command))
+        return bool(self.regex.match(command))
 
     def to_dict(self) -> dict:
         """Convert to dictionary for analysis."""
@@ -74,6 +80,9 @@ class CommandPlugin(ABC):
 
         Key: command name (e.g., 'htop')
         Value: CommandSpec
+
+        Implementations should build it once (``functools.cached_property``):
+        the registry indexes it at load time.
         """
         pass
 
@@ -87,15 +96,16 @@ class CommandPlugin(ABC):
         Returns:
             CommandSpec if matched, None otherwise
         """
+        commands = self.commands
+
         # Try exact command name match first
-        base_cmd = command.split()[0] if command else ""
-        if base_cmd in self.commands:
-            spec = self.commands[base_cmd]
-            if spec.matches(command):
-                return spec
+        base_cmd = command.split()[0] if command.strip() else ""
+        spec = commands.get(base_cmd)
+        if spec is not None and spec.matches(command):
+            return spec
 
         # Try pattern matching all commands
-        for cmd_name, spec in self.commands.items():
+        for spec in commands.values():
             if spec.matches(command):
                 return spec
 
@@ -1,5 +1,7 @@
 """Container commands plugin - Podman and Docker."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class ContainersPlugin(CommandPlugin):
     def description(self) -> str:
         return "Podman and Docker container management"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             # Podman read-only
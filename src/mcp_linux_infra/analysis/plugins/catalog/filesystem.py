@@ -1,5 +1,7 @@
 """Filesystem commands plugin - file operations, search, viewing."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class FilesystemPlugin(CommandPlugin):
     def description(self) -> str:
         return "File viewing, search, and listing tools (read-only)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'ls': CommandSpec(
@@ -1,5 +1,7 @@
 """Monitoring commands plugin - process, CPU, memory, I/O monitoring."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class MonitoringPlugin(CommandPlugin):
     def description(self) -> str:
         return "Process, CPU, memory, and I/O monitoring tools (read-only)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'htop': CommandSpec(
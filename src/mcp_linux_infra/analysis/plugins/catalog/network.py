@@ -1,5 +1,7 @@
 """Network commands plugin - connectivity, routing, DNS."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class NetworkPlugin(CommandPlugin):
     def description(self) -> str:
         return "Network connectivity, routing, and diagnostic tools (read-only)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'ping': CommandSpec(
@@ -1,5 +1,7 @@
 """POSIX process management commands."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -22,7 +24,7 @@ class PosixProcessPlugin(CommandPlugin):
     def description(self) -> str:
         return "POSIX process management (ps, kill, jobs, etc.)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'ps': CommandSpec(
@@ -1,5 +1,7 @@
 """POSIX system commands plugin - standard Unix utilities."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class PosixSystemPlugin(CommandPlugin):
     def description(self) -> str:
         return "POSIX standard system utilities (uname, uptime, hostname, etc.)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'uname': CommandSpec(
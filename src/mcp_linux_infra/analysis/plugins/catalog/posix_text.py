@@ -1,5 +1,7 @@
 """POSIX text processing commands."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -22,7 +24,7 @@ class PosixTextPlugin(CommandPlugin):
     def description(self) -> str:
         return "POSIX text processing (sed, awk, cut, sort, etc.)"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'sed': CommandSpec(
@@ -1,5 +1,7 @@
 """Systemd commands plugin - service management, logs."""
 
+from functools import cached_property
+
 from ..base import CommandPlugin, CommandSpec
 from ...command_analysis import RiskLevel
 from ....authorization.models import AuthLevel
@@ -24,7 +26,7 @@ class SystemdPlugin(CommandPlugin):
     def description(self) -> str:
         return "Systemd service management and journal logs"
 
-    @property
+    @cached_property
     def commands(self) -> dict[str, CommandSpec]:
         return {
             'systemctl status': CommandSpec(
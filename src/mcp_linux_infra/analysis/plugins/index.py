@@ -0,0 +1,118 @@
+"""Precompiled, registry-wide command index."""
+
+import re
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+from typing import NamedTuple
+
+from ...authorization.matcher import literal_prefix
+from .base import CommandPlugin, CommandSpec
+
+
+class IndexEntry(NamedTuple):
+    """One command spec, with its position in registry order."""
+
+    order: int
+    plugin_index: int
+    name: str
+    regex: re.Pattern
+    plugin: CommandPlugin
+    spec: CommandSpec
+    haystack: tuple[str, str, str]  # name, description, rationale (lowercased)
+
+
+class CommandIndex:
+    """
+    Immutable lookup structure built once from the registered plugins.
+
+    - hash map: literal pattern prefix (``systemctl``, ``htop``...) -> specs
+    - fallback list: specs whose pattern has no literal prefix
+
+    ``find`` returns exactly what scanning ``plugin.get_command_spec`` over
+    the plugins in registration order would return.
+    """
+
+    def __init__(self, plugins: list[CommandPlugin]):
+        entries: list[IndexEntry] = []
+        by_prefix: dict[str, list[IndexEntry]] = {}
+        fallback: list[IndexEntry] = []
+        by_category: dict[str, dict[str, CommandSpec]] = {}
+
+        for plugin_index, plugin in enumerate(plugins):
+            commands = plugin.commands
+            by_category.setdefault(plugin.category, {}).update(commands)
+
+            for name, spec in commands.items():
+                entry = IndexEntry(
+                    order=len(entries),
+                    plugin_index=plugin_index,
+                    name=name,
+                    regex=spec.regex,
+                    plugin=plugin,
+                    spec=spec,
+                    haystack=(name.lower(), spec.description.lower(), spec.rationale.lower()),
+                )
+                entries.append(entry)
+
+                prefix = literal_prefix(spec.pattern)
+                if prefix:
+                    by_prefix.setdefault(prefix, []).append(entry)
+                else:
+                    fallback.append(entry)
+
+        self.entries: tuple[IndexEntry, ...] = tuple(entries)
+        self._by_prefix = {prefix: tuple(bucket) for prefix, bucket in by_prefix.items()}
+        self._prefix_lengths = sorted({len(prefix) for prefix in by_prefix})
+        self._fallback = tuple(fallback)
+        self._by_category = {
+            category: MappingProxyType(commands) for category, commands in by_category.items()
+        }
+
+    def candidates(self, command: str) -> Sequence[IndexEntry]:
+        """Entries whose pattern may match ``command``, in registry order."""
+        parts = command.split(None, 1)
+        if not parts:
+            return self._fallback
+
+        token = parts[0]
+        buckets = [self._fallback] if self._fallback else []
+        for length in self._prefix_lengths:
+            if length > len(token):
+                break
+            bucket = self._by_prefix.get(token[:length])
+            if bucket:
+                buckets.append(bucket)
+
+        if len(buckets) == 1:
+            return buckets[0]
+        return sorted((entry for bucket in buckets for entry in bucket), key=lambda e: e.order)
+
+    def find(self, command: str) -> tuple[CommandPlugin, CommandSpec] | None:
+        """First plugin with a matching spec; its exact base-command spec wins."""
+        parts = command.split(None, 1)
+        base_cmd = parts[0] if parts else ""
+
+        best: IndexEntry | None = None
+        for entry in self.candidates(command):
+            if best is not None and entry.plugin_index != best.plugin_index:
+                break
+            if entry.regex.match(command):
+                if entry.name == base_cmd:
+                    return (entry.plugin, entry.spec)
+                if best is None:
+                    best = entry
+
+        return (best.plugin, best.spec) if best else None
+
+    def search(self, query: str) -> list[tuple[str, CommandPlugin, CommandSpec]]:
+        """Case-insensitive substring search over name, description and rationale."""
+        query_lower = query.lower()
+        return [
+            (entry.name, entry.plugin, entry.spec)
+            for entry in self.entries
+            if any(query_lower in text for text in entry.haystack)
+        ]
+
+    def by_category(self, category: str) -> Mapping[str, CommandSpec]:
+        """Read-only view of the commands in a category."""
+        return self._by_category.get(category, MappingProxyType({}))
@@ -6,6 +6,8 @@ import pkgutil
 from pathlib import Path
 
 from .base import CommandPlugin, CommandSpec
+from .index import CommandIndex
+from ..command_analysis import invalidate_analysis_cache
 
 
 class PluginRegistry:
@@ -17,6 +19,7 @@ class PluginRegistry:
         """Initialize empty registry."""
         self._plugins: Dict[str, CommandPlugin] = {}
         self._loaded = False
+        self._index: Optional[CommandIndex] = None
 
     def register(self, plugin: CommandPlugin):
         """
@@ -29,6 +32,8 @@ class PluginRegistry:
             raise ValueError(f"Plugin '{plugin.name}' already registered")
 
         self._plugins[plugin.name] = plugin
+        self._index = None
+        invalidate_analysis_cache()
 
     def unregister(self, plugin_name: str):
         """
@@ -39,6 +44,15 @@ class PluginRegistry:
         """
         if plugin_name in self._plugins:
             del self._plugins[plugin_name]
+            self._index = None
+            invalidate_analysis_cache()
+
+    @property
+    def index(self) -> CommandIndex:
+        """Precompiled command index (rebuilt after register/unregister)."""
+        if self._index is None:
+            self._index = CommandIndex(list(self._plugins.values()))
+        return self._index
 
     def get_plugin(self, plugin_name: str) -> Optional[CommandPlugin]:
         """
@@ -70,12 +84,7 @@ class PluginRegistry:
         Returns:
             Tuple of (plugin, spec) if found, None otherwise
         """
-        for plugin in self._plugins.values():
-            spec = plugin.get_command_spec(command)
-            if spec:
-                return (plugin, spec)
-
-        return None
+        return self.index.find(command)
 
     def get_commands_by_category(self, category: str) -> Dict[str, CommandSpec]:
         """
@@ -87,12 +96,7 @@ class PluginRegistry:
         Returns:
             Dict of command name -> CommandSpec
         """
-        commands = {}
-        for plugin in self._plugins.values():
-            if plugin.category == category:
-                commands.update(plugin.commands)
-
-        return commands
+        return dict(self.index.by_category(category))
 
     def get_all_categories(self) -> List[str]:
         """Get list of all unique categories."""
@@ -108,17 +112,7 @@ class PluginRegistry:
         Returns:
             List of tuples (command_name, plugin, spec)
         """
-        results = []
-        query_lower = query.lower()
-
-        for plugin in self._plugins.values():
-            for cmd_name, spec in plugin.commands.items():
-                if (query_lower in cmd_name.lower() or
-                    query_lower in spec.description.lower() or
-                    query_lower in spec.rationale.lower()):
-                    results.append((cmd_name, plugin, spec))
-
-        return results
+        return self.index.search(query)
 
     def get_summary(self) -> dict:
         """Get summary of entire registry."""
@@ -181,6 +175,9 @@ class PluginRegistry:
 
         self._loaded = True
 
+        # Index matérialisé une fois, au chargement
+        self._index = CommandIndex(list(self._plugins.values()))
+
     def get_usage_guide(self, plugin_name: Optional[str] = None) -> str:
         """
         Get formatted usage guide.
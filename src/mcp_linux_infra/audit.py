@@ -1,13 +1,38 @@
-"""Audit logging structuré pour traçabilité complète."""
-
+"""
+Audit logging structuré pour traçabilité complète.
+
+The hot path (``AuditLogger.log_event``) only puts a tuple on a bounded
+queue; sanitizing, ``json.dumps`` and handler I/O happen in a
+``QueueListener`` writer thread. When the queue is full, routine events
+(SSH connect/reuse, commands, tool calls) are dropped and counted, while
+security and remote execution events are always kept. The queue is
+drained on ``flush()`` / ``close()`` (registered with ``atexit``).
+
+High-frequency, low-value events (pooled connection reuse, successful
+commands) can be rolled up by the writer: the first occurrence per key
+(user, host...) is written verbatim, the following ones within
+``audit_rollup_interval`` seconds are counted and written as one
+``rollup`` event when the window closes. Security and remote execution
+events are never rolled up.
+"""
+
+import atexit
 import json
 import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from logging.handlers import QueueListener
 from pathlib import Path
 from typing import Any
 
+from .audit_segments import AuditFileHandler
 from .config import CONFIG
+from .utils.metrics import REGISTRY, Counter, Gauge, snapshot
 
 
 class LogLevel(str, Enum):
@@ -46,14 +71,148 @@ class Status(str, Enum):
     DENIED = "denied"
 
 
+# Jamais abandonnés quand la file est pleine
+CRITICAL_EVENTS = frozenset({
+    EventType.SECURITY_VIOLATION,
+    EventType.PRA_PROPOSED,
+    EventType.PRA_APPROVED,
+    EventType.PRA_REJECTED,
+    EventType.PRA_EXECUTED,
+    EventType.PRA_FAILED,
+})
+
+_LEVELS = {level: getattr(logging, level.value) for level in LogLevel}
+
+
+# ============================================================================
+# Rollups
+# ============================================================================
+
+RollupKey = Callable[[Status, dict[str, Any]], tuple | None]
+
+
+def _reused_connection_key(status: Status, details: dict[str, Any]) -> tuple | None:
+    if status == Status.SUCCESS and details.get("reused"):
+        return (details.get("username"), details.get("host"))
+    return None  # Nouvelles connexions et échecs: toujours écrits
+
+
+def _successful_command_key(status: Status, details: dict[str, Any]) -> tuple | None:
+    if status == Status.SUCCESS and "job_id" not in details:  # Jobs: un événement chacun
+        return (details.get("username"), details.get("host"), details.get("command"), details.get("returncode"))
+    return None
+
+
+# Types d'événements agrégeables: clé de regroupement (None = écrire tel quel)
+ROLLUP_KEYS: dict[EventType, RollupKey] = {
+    EventType.SSH_CONNECT: _reused_connection_key,
+    EventType.SSH_COMMAND: _successful_command_key,
+}
+
+
+@dataclass
+class _RollupWindow:
+    start: float
+    status: Status
+    details: dict[str, Any]
+    levelno: int
+    count: int = 0
+    first: float | None = None
+    last: float | None = None
+
+
+def rollup_policies(event_types: Iterable[str], interval: float) -> dict[EventType, float]:
+    """
+    Validate rollup settings.
+
+    Raises:
+        ValueError: Unknown event type, or one that must always be written verbatim
+    """
+    if interval <= 0:
+        return {}
+    policies = {}
+    for name in event_types:
+        event_type = EventType(name)
+        if event_type in CRITICAL_EVENTS or event_type not in ROLLUP_KEYS:
+            raise ValueError(f"Audit events of type {name!r} cannot be rolled up")
+        policies[event_type] = interval
+    return policies
+
+
+_TICK = object()  # Réveil périodique du writer (fermeture des fenêtres)
+
+
+class _AuditListener(QueueListener):
+    """Writer thread: turns queued events into records for the audit logger."""
+
+    def __init__(self, event_queue: queue.SimpleQueue, audit_logger: "AuditLogger"):
+        super().__init__(event_queue)
+        self.audit_logger = audit_logger
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get(block, timeout=1.0)
+        except queue.Empty:
+            return _TICK
+
+    def handle(self, item):
+        if item is _TICK:
+            self.audit_logger._close_rollups(time.time())
+        elif isinstance(item, threading.Event):
+            self.audit_logger._close_rollups(None)
+            item.set()  # Marqueur de flush()
+        else:
+            try:
+                self.audit_logger._emit(*item)
+            except Exception as e:
+                # Un événement invalide ne doit pas arrêter le thread d'écriture
+                self.audit_logger.failed += 1
+                self.audit_logger.logger.error(f"Audit event {item[1].value} could not be written: {e!r}")
+
+
 class AuditLogger:
     """Logger structuré pour audit trail."""
 
-    def __init__(self):
-        """Initialize audit logger."""
-        self.logger = logging.getLogger("mcp_linux_infra.audit")
+    def __init__(
+        self,
+        name: str = "mcp_linux_infra.audit",
+        queue_size: int | None = None,
+        rollup_interval: float | None = None,
+        rollup_events: Iterable[str] | None = None,
+    ):
+        """
+        Initialize audit logger and start its writer thread.
+
+        Args:
+            name: Logger name
+            queue_size: Max buffered events, 0 = unbounded
+                (default: ``audit_queue_size`` setting)
+            rollup_interval: Rollup window in seconds, 0 disables
+                (default: ``audit_rollup_interval`` setting)
+            rollup_events: Event types to roll up (default: ``audit_rollup_events`` setting)
+        """
+        self.logger = logging.getLogger(name)
         self._setup_handlers()
 
+        if rollup_events is None:
+            rollup_events = [e.strip() for e in CONFIG.audit_rollup_events.split(",") if e.strip()]
+        self.rollups = rollup_policies(
+            rollup_events,
+            rollup_interval if rollup_interval is not None else CONFIG.audit_rollup_interval,
+        )
+        self.suppressed = 0
+        self._windows: dict[tuple, _RollupWindow] = {}
+        self._next_rollup_check = 0.0
+
+        self.queue_size = queue_size if queue_size is not None else CONFIG.audit_queue_size
+        self.dropped = 0
+        self._reported_dropped = 0
+        self.failed = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: _AuditListener | None = _AuditListener(self._queue, self)
+        self._listener.start()
+        atexit.register(self.close)
+
     def _setup_handlers(self):
         """Configure log handlers."""
         self.logger.setLevel(getattr(logging, CONFIG.log_level))
@@ -67,12 +226,14 @@ class AuditLogger:
         console_handler.setFormatter(console_formatter)
         self.logger.addHandler(console_handler)
 
-        # File handler (structured JSON)
+        # File handler (structured JSON, daily/size rotation, gzip, retention)
         if CONFIG.log_dir:
-            CONFIG.log_dir.mkdir(parents=True, exist_ok=True)
-            log_file = CONFIG.log_dir / f"mcp-audit-{datetime.now():%Y%m%d}.json"
-
-            file_handler = logging.FileHandler(log_file)
+            file_handler = AuditFileHandler(
+                CONFIG.log_dir,
+                max_bytes=CONFIG.audit_max_bytes,
+                retention_days=CONFIG.log_retention_days,
+                compress=CONFIG.audit_compress,
+            )
             file_handler.setLevel(logging.DEBUG)
             self.logger.addHandler(file_handler)
 
@@ -83,16 +244,152 @@ class AuditLogger:
         details: dict[str, Any],
         level: LogLevel = LogLevel.INFO,
     ):
-        """Log structured audit event."""
+        """
+        Log structured audit event (queued: ``details`` must not be mutated afterwards).
+        """
+        levelno = _LEVELS[level]
+        if not self.logger.isEnabledFor(levelno):
+            return
+
+        item = (time.time(), event_type, status, details, levelno)
+        if self._listener is None:
+            self._write(*item)  # Après close(): écriture synchrone, sans agrégation
+        elif (
+            self.queue_size <= 0  # 0: file non bornée
+            or self._queue.qsize() < self.queue_size
+            or event_type in CRITICAL_EVENTS
+        ):
+            self._queue.put(item)
+        else:
+            self.dropped += 1
+
+    def _emit(
+        self,
+        created: float,
+        event_type: EventType,
+        status: Status,
+        details: dict[str, Any],
+        levelno: int,
+    ):
+        """Roll up or write one event (writer thread)."""
+        if self.dropped != self._reported_dropped:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            self.logger.warning(f"Audit queue full: {dropped} routine events dropped")
+
+        interval = self.rollups.get(event_type)
+        group = ROLLUP_KEYS[event_type](status, details) if interval else None
+        if group is not None:
+            key = (event_type, group)
+            window = self._windows.get(key)
+            if window is not None and created - window.start < interval:
+                window.count += 1
+                window.first = window.first or created
+                window.last = created
+                self.suppressed += 1
+                return
+            if window is not None:
+                self._write_rollup(key, window, created)
+            # Premier de la fenêtre: écrit tel quel
+            self._windows[key] = _RollupWindow(created, status, details, levelno)
+
+        self._write(created, event_type, status, details, levelno)
+
+        if created >= self._next_rollup_check:
+            self._close_rollups(created)
+
+    def _close_rollups(self, now: float | None):
+        """Write the windows older than their interval (all of them if ``now`` is None)."""
+        if not self._windows:
+            return
+        for key, window in list(self._windows.items()):
+            if now is None or now - window.start >= self.rollups[key[0]]:
+                del self._windows[key]
+                self._write_rollup(key, window, now or time.time())
+        self._next_rollup_check = (now or time.time()) + 1.0
+
+    def _write_rollup(self, key: tuple, window: _RollupWindow, now: float):
+        if not window.count:
+            return  # Un seul événement, déjà écrit
+        event_type = key[0]
+        details = {
+            **window.details,
+            "rollup": {
+                "count": window.count,
+                "first": datetime.fromtimestamp(window.first).isoformat(),
+                "last": datetime.fromtimestamp(window.last).isoformat(),
+                "window_seconds": self.rollups[event_type],
+            },
+        }
+        self._write(now, event_type, window.status, details, window.levelno)
+
+    def _write(
+        self,
+        created: float,
+        event_type: EventType,
+        status: Status,
+        details: dict[str, Any],
+        levelno: int,
+    ):
+        """Format and dispatch one record."""
         event = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(created).isoformat(),
             "event_type": event_type.value,
             "status": status.value,
             "details": self._sanitize(details),
         }
 
-        log_method = getattr(self.logger, level.value.lower())
-        log_method(json.dumps(event))
+        record = self.logger.makeRecord(
+            self.logger.name, levelno, "(audit)", 0, json.dumps(event, default=str), None, None
+        )
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        record.audit_event = event  # Index des segments (AuditFileHandler)
+        self.logger.handle(record)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every queued event has been written.
+
+        Returns:
+            False if the writer did not catch up within ``timeout`` seconds
+        """
+        if self._listener is not None:
+            done = threading.Event()
+            self._queue.put(done)
+            if not done.wait(timeout):
+                return False
+
+        self._flush_handlers()
+        return True
+
+    def close(self):
+        """Drain the queue, stop the writer thread (later events are written synchronously)."""
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        listener.stop()  # Traite tout ce qui est en file avant de s'arrêter
+        self._close_rollups(None)
+        self._flush_handlers()
+        atexit.unregister(self.close)
+
+    def _flush_handlers(self):
+        for handler in self.logger.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                pass  # Flux déjà fermé à l'arrêt (comme logging.shutdown)
+
+    def stats(self) -> dict[str, int]:
+        """Queue depth and dropped events."""
+        return {
+            "queued": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "rollup_windows": len(self._windows),
+            "rolled_up": self.suppressed,
+        }
 
     def _sanitize(self, data: dict[str, Any]) -> dict[str, Any]:
         """Remove sensitive information from logs."""
@@ -108,6 +405,7 @@ class AuditLogger:
 
         sanitized = {}
         for key, value in data.items():
+            key = str(key)  # Clés JSON: chaînes uniquement
             if any(sensitive in key.lower() for sensitive in SENSITIVE_KEYS):
                 sanitized[key] = "***REDACTED***"
             elif isinstance(value, dict):
@@ -122,6 +420,18 @@ class AuditLogger:
 audit = AuditLogger()
 
 
+@REGISTRY.register_collector
+def _audit_metrics():
+    stats = audit.stats()
+    return [
+        snapshot(Gauge, "mcp_audit_queue_depth", "Audit events waiting for the writer thread", stats["queued"]),
+        snapshot(Gauge, "mcp_audit_queue_capacity", "Audit queue bound (0 = unbounded)", stats["queue_size"]),
+        snapshot(Counter, "mcp_audit_dropped_events_total", "Routine audit events dropped on overflow", stats["dropped"]),
+        snapshot(Counter, "mcp_audit_failed_events_total", "Audit events that could not be written", stats["failed"]),
+        snapshot(Counter, "mcp_audit_rolled_up_events_total", "Audit events folded into rollups", stats["rolled_up"]),
+    ]
+
+
 # Convenience functions
 def log_ssh_connect(
     host: str, username: str, status: Status, reused: bool = False, error: str | None = None
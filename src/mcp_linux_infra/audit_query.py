@@ -0,0 +1,296 @@
+"""
+Indexed search over the JSON audit trail.
+
+``AuditTrail`` answers queries such as "commands run on host X in the
+last hour" without reading every segment:
+
+1. Segment pruning: each file is described by its side index (time range,
+   event types, statuses, hosts). Closed segments use the
+   ``.index.json`` written at rotation; files without one (the active
+   file, legacy daily files) are indexed on first use and the cache is
+   extended incrementally as the active file grows.
+2. Plain segments are read through ``mmap``: a binary search on the
+   timestamps skips to ``since``, and each line is prefiltered with a
+   byte search before being decoded. Compressed segments are streamed.
+3. Matching events are yielded lazily, oldest first.
+"""
+
+import gzip
+import json
+import mmap
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+from .audit_segments import PREFIX, SegmentStats, index_path
+
+_FILE = re.compile(rf"^{PREFIX}-(\d{{8}})(?:\.(\d{{3}}))?\.json(\.gz)?$")
+
+# Décalage lors de la recherche dichotomique: événements légèrement désordonnés
+_SEEK_SLACK = 1.0
+_TIMESTAMP_PREFIX = b'{"timestamp": "'
+
+
+@dataclass
+class AuditFilter:
+    """Query filters (None = no constraint)."""
+
+    since: float | None = None
+    until: float | None = None
+    host: str | None = None
+    event_type: str | None = None
+    status: str | None = None
+    contains: str | None = None
+
+    def skips(self, index: dict[str, Any]) -> bool:
+        """True if a segment cannot contain a match, judging from its index alone."""
+        first, last = index.get("first_ts"), index.get("last_ts")
+        if first is None:
+            return index.get("events", 0) == 0
+        if self.since is not None and last < self.since:
+            return True
+        if self.until is not None and first > self.until:
+            return True
+        if self.event_type is not None and self.event_type not in index.get("event_types", {}):
+            return True
+        if self.status is not None and self.status not in index.get("statuses", {}):
+            return True
+        if self.host is not None and self.host not in index.get("hosts", ()):
+            return True
+        return False
+
+    def needles(self) -> list[bytes]:
+        """Byte strings every matching line contains (``json.dumps`` default separators)."""
+        needles = []
+        if self.event_type is not None:
+            needles.append(b'"event_type": ' + json.dumps(self.event_type).encode())
+        if self.status is not None:
+            needles.append(b'"status": ' + json.dumps(self.status).encode())
+        if self.host is not None:
+            needles.append(b'"host": ' + json.dumps(self.host).encode())
+        return needles
+
+    def matches(self, event: dict[str, Any], created: float) -> bool:
+        if self.since is not None and created < self.since:
+            return False
+        if self.until is not None and created > self.until:
+            return False
+        if self.event_type is not None and event.get("event_type") != self.event_type:
+            return False
+        if self.status is not None and event.get("status") != self.status:
+            return False
+        details = event.get("details") or {}
+        if self.host is not None and details.get("host") != self.host:
+            return False
+        if self.contains is not None and self.contains not in json.dumps(details):
+            return False
+        return True
+
+
+def _parse(line: bytes) -> tuple[dict[str, Any], float] | None:
+    try:
+        event = json.loads(line)
+        return event, datetime.fromisoformat(event["timestamp"]).timestamp()
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError, ValueError):
+        return None  # Message texte, ligne tronquée
+
+
+def _line_time(mm: mmap.mmap, start: int) -> float | None:
+    """Timestamp of the JSON line starting at ``start``, read in place."""
+    if mm[start:start + len(_TIMESTAMP_PREFIX)] != _TIMESTAMP_PREFIX:
+        return None
+    begin = start + len(_TIMESTAMP_PREFIX)
+    end = mm.find(b'"', begin, begin + 40)
+    if end < 0:
+        return None
+    try:
+        return datetime.fromisoformat(mm[begin:end].decode()).timestamp()
+    except ValueError:
+        return None
+
+
+def _seek(mm: mmap.mmap, since: float, end: int) -> int:
+    """Offset of a line at or before the first event at ``since`` (lines sorted by time)."""
+    lo, hi = 0, end
+    while hi - lo > 4096:
+        mid = (lo + hi) // 2
+        start = mm.rfind(b"\n", lo, mid) + 1 or lo
+        created = None
+        while created is None and start < hi:
+            created = _line_time(mm, start)
+            if created is None:
+                start = mm.find(b"\n", start, hi) + 1 or hi
+        if created is None or created >= since:
+            hi = mid
+        elif start == lo:
+            break  # Une seule ligne couvre l'intervalle
+        else:
+            lo = start
+    return lo
+
+
+class AuditTrail:
+    """Query engine over an audit log directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        # Index calculés pour les fichiers sans .index.json: path -> (octets lus, inode, stats)
+        self._computed: dict[Path, tuple[int, int, SegmentStats]] = {}
+
+    # ------------------------------------------------------------------
+    # Side index
+    # ------------------------------------------------------------------
+
+    def files(self) -> list[Path]:
+        """Audit files, oldest first (closed segments of a day before its active file)."""
+        found = []
+        for path in self.directory.glob(f"{PREFIX}-*.json*"):
+            match = _FILE.match(path.name)
+            if match:
+                found.append(((match.group(1), int(match.group(2) or 1000)), path))
+        # Un segment compressé remplace sa version non compressée
+        names = {path.name for _, path in found}
+        return [
+            path for _, path in sorted(found)
+            if not (path.suffix == ".json" and path.name + ".gz" in names)
+        ]
+
+    def index(self, path: Path) -> dict[str, Any]:
+        """Side index of one file: stored for closed segments, computed (and cached) otherwise."""
+        if _FILE.match(path.name).group(2):
+            try:
+                return json.loads(index_path(path).read_text())
+            except (OSError, json.JSONDecodeError):
+                pass  # Pas encore indexé: calculé ci-dessous
+
+        stat = path.stat()
+        with self._lock:
+            cached = self._computed.get(path)
+            if cached and cached[1] == stat.st_ino and cached[0] == stat.st_size:
+                consumed, stats = cached[0], cached[2]
+            elif cached and cached[1] == stat.st_ino and cached[0] < stat.st_size and path.suffix == ".json":
+                # Fichier actif: seule la partie ajoutée est lue
+                stats = cached[2]
+                consumed = self._scan_into(stats, path, cached[0], stat.st_size)
+            elif path.suffix == ".gz":
+                consumed, stats = stat.st_size, SegmentStats.scan(path)
+            else:
+                stats = SegmentStats()
+                consumed = self._scan_into(stats, path, 0, stat.st_size)
+            self._computed[path] = (consumed, stat.st_ino, stats)
+        return stats.to_index(path.name, stat.st_size)
+
+    @staticmethod
+    def _scan_into(stats: SegmentStats, path: Path, start: int, end: int) -> int:
+        """Add the complete lines of ``path[start:end]`` to ``stats``; return the offset reached."""
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        complete = data.rfind(b"\n") + 1  # Dernière ligne peut-être en cours d'écriture
+        for line in data[:complete].splitlines():
+            parsed = _parse(line)
+            if parsed:
+                stats.add(parsed[1], parsed[0])
+        return start + complete
+
+    def segments(self, query: AuditFilter | None = None) -> list[tuple[Path, dict[str, Any]]]:
+        """Files that may hold matches, with their index."""
+        selected = []
+        for path in self.files():
+            try:
+                index = self.index(path)
+            except OSError:
+                continue  # Supprimé entre-temps (rétention)
+            if query is None or not query.skips(index):
+                selected.append((path, index))
+        return selected
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, query: AuditFilter) -> Iterator[dict[str, Any]]:
+        """Matching events, oldest first, read lazily."""
+        needles = query.needles()
+        for path, _ in self.segments(query):
+            try:
+                if path.suffix == ".gz":
+                    yield from self._query_gzip(path, query, needles)
+                else:
+                    yield from self._query_plain(path, query, needles)
+            except OSError:
+                continue
+
+    def _query_gzip(self, path: Path, query: AuditFilter, needles: list[bytes]) -> Iterator[dict]:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if all(needle in line for needle in needles):
+                    parsed = _parse(line)
+                    if parsed and query.matches(*parsed):
+                        yield parsed[0]
+
+    def _query_plain(self, path: Path, query: AuditFilter, needles: list[bytes]) -> Iterator[dict]:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                pos = _seek(mm, query.since - _SEEK_SLACK, size) if query.since is not None else 0
+                while pos < size:
+                    end = mm.find(b"\n", pos)
+                    if end < 0:
+                        break  # Ligne en cours d'écriture
+                    line = mm[pos:end]
+                    pos = end + 1
+                    if not all(needle in line for needle in needles):
+                        continue
+                    parsed = _parse(line)
+                    if parsed is None:
+                        continue
+                    event, created = parsed
+                    if query.until is not None and created > query.until + _SEEK_SLACK:
+                        return  # Lignes triées: rien après
+                    if query.matches(event, created):
+                        yield event
+
+
+def since_minutes(minutes: float | None) -> float | None:
+    """Epoch timestamp ``minutes`` ago (None = no lower bound)."""
+    if minutes is None:
+        return None
+    return (datetime.now() - timedelta(minutes=minutes)).timestamp()
+
+
+def summarize(event: dict[str, Any]) -> dict[str, Any]:
+    """Compact record for display: what happened, where, with which outcome."""
+    details = event.get("details") or {}
+    summary = next(
+        (details[key] for key in ("command", "tool", "action", "violation_type") if details.get(key)),
+        "",
+    )
+    if details.get("error"):
+        summary = f"{summary} (error: {details['error']})" if summary else f"error: {details['error']}"
+    return {
+        "timestamp": event.get("timestamp"),
+        "event_type": event.get("event_type"),
+        "status": event.get("status"),
+        "host": details.get("host"),
+        "summary": summary,
+    }
+
+
+# Global instance (index cache shared across queries)
+_trail: AuditTrail | None = None
+
+
+def get_audit_trail(directory: Path) -> AuditTrail:
+    """Get or create the query engine for ``directory``."""
+    global _trail
+    if _trail is None or _trail.directory != Path(directory):
+        _trail = AuditTrail(directory)
+    return _trail
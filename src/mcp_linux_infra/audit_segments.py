@@ -0,0 +1,283 @@
+"""
+Rotating, compressed audit log segments.
+
+The audit file handler writes JSON lines to ``mcp-audit-YYYYMMDD.json``
+and rotates it when the day changes or when it reaches
+``audit_max_bytes``. A closed segment is renamed
+``mcp-audit-YYYYMMDD.NNN.json``, gzip-compressed in the background
+(``.json.gz``), and described by ``mcp-audit-YYYYMMDD.NNN.index.json``:
+
+    {"segment": "mcp-audit-20240131.001.json.gz", "first_ts": ..., "last_ts": ...,
+     "events": 1234, "event_types": {"ssh_command": 1000, ...},
+     "statuses": {...}, "hosts": [...], "bytes": 524288}
+
+Readers can skip segments from the index alone (time range, event type,
+host). Segments older than ``log_retention_days`` are deleted.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from logging.handlers import BaseRotatingHandler
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "mcp-audit"
+
+_ACTIVE = re.compile(rf"^{PREFIX}-(\d{{8}})\.json$")
+_SEGMENT = re.compile(rf"^{PREFIX}-(\d{{8}})\.(\d{{3}})\.json(\.gz)?$")
+_INDEX = re.compile(rf"^{PREFIX}-(\d{{8}})\.(\d{{3}})\.index\.json$")
+
+
+class SegmentStats:
+    """Time range and event counts of one segment."""
+
+    def __init__(self):
+        self.first_ts: float | None = None
+        self.last_ts: float | None = None
+        self.events = 0
+        self.event_types: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.hosts: set[str] = set()
+
+    def add(self, created: float, event: dict[str, Any] | None):
+        """Account for one written line (``event`` is None for plain messages)."""
+        if self.first_ts is None:
+            self.first_ts = created
+        self.last_ts = created
+        self.events += 1
+        if event is None:
+            return
+        self.event_types[event.get("event_type")] += 1
+        self.statuses[event.get("status")] += 1
+        host = (event.get("details") or {}).get("host")
+        if isinstance(host, str):
+            self.hosts.add(host)
+
+    @classmethod
+    def scan(cls, path: Path) -> "SegmentStats":
+        """Rebuild stats from an existing (plain or gzip) segment."""
+        stats = cls()
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    created = datetime.fromisoformat(event["timestamp"]).timestamp()
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    continue  # Message texte (ex: pertes de la file d'audit)
+                stats.add(created, event)
+        return stats
+
+    def to_index(self, segment: str, size: int) -> dict[str, Any]:
+        return {
+            "segment": segment,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "first": datetime.fromtimestamp(self.first_ts).isoformat() if self.first_ts else None,
+            "last": datetime.fromtimestamp(self.last_ts).isoformat() if self.last_ts else None,
+            "events": self.events,
+            "event_types": dict(self.event_types),
+            "statuses": dict(self.statuses),
+            "hosts": sorted(self.hosts),
+            "bytes": size,
+        }
+
+
+def index_path(segment: Path) -> Path:
+    """``mcp-audit-YYYYMMDD.NNN.index.json`` for a plain or compressed segment."""
+    stem = segment.name.removesuffix(".gz").removesuffix(".json")
+    return segment.with_name(f"{stem}.index.json")
+
+
+def write_index(segment: Path, stats: SegmentStats, size: int):
+    """Write a segment index atomically."""
+    path = index_path(segment)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(stats.to_index(segment.name, size), separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def read_indexes(directory: Path) -> list[dict[str, Any]]:
+    """Indexes of the closed segments, oldest first."""
+    indexes = []
+    for path in sorted(directory.glob(f"{PREFIX}-*.index.json")):
+        try:
+            indexes.append(json.loads(path.read_text()))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return indexes
+
+
+def iter_segments(directory: Path) -> Iterator[tuple[str, int, Path]]:
+    """(day, sequence, path) of closed segments, oldest first (``.gz`` preferred)."""
+    found: dict[tuple[str, int], Path] = {}
+    for path in directory.glob(f"{PREFIX}-*.json*"):
+        match = _SEGMENT.match(path.name)
+        if match:
+            key = (match.group(1), int(match.group(2)))
+            if key not in found or path.suffix == ".gz":
+                found[key] = path
+    for key in sorted(found):
+        yield key[0], key[1], found[key]
+
+
+class AuditFileHandler(BaseRotatingHandler):
+    """
+    Daily and size-based rotation of the JSON audit log.
+
+    Records carrying an ``audit_event`` attribute (set by ``AuditLogger``)
+    feed the per-segment index; other records are written and counted.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 0,
+        retention_days: int = 0,
+        compress: bool = True,
+    ):
+        """
+        Args:
+            directory: Log directory
+            max_bytes: Rotate once the active file reaches this size (0 = daily only)
+            retention_days: Delete segments older than this (0 = keep everything)
+            compress: gzip closed segments
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.compress = compress
+        self._compressors: list[threading.Thread] = []
+
+        self.day = self._next_day = f"{date.today():%Y%m%d}"
+        self._recover()
+        super().__init__(str(self._active_path(self.day)), mode="a", encoding="utf-8")
+
+        active = Path(self.baseFilename)
+        self.segment = SegmentStats.scan(active) if active.stat().st_size else SegmentStats()
+        self.prune()
+
+    def _active_path(self, day: str) -> Path:
+        return self.directory / f"{PREFIX}-{day}.json"
+
+    def _next_segment(self, day: str) -> Path:
+        sequences = [seq for seg_day, seq, _ in iter_segments(self.directory) if seg_day == day]
+        return self.directory / f"{PREFIX}-{day}.{max(sequences, default=0) + 1:03d}.json"
+
+    def _recover(self):
+        """Close files left by a previous run: stale active files, unindexed or uncompressed segments."""
+        for path in sorted(self.directory.glob(f"{PREFIX}-*.json")):
+            match = _ACTIVE.match(path.name)
+            if match and match.group(1) != self.day:
+                self._close_segment(path, match.group(1), SegmentStats.scan(path), compress=False)
+
+        for path in self.directory.glob(f"{PREFIX}-*.json"):
+            if _SEGMENT.match(path.name) and path.with_name(path.name + ".gz").exists():
+                path.unlink()  # Compression terminée, suppression interrompue
+
+        for _, _, path in list(iter_segments(self.directory)):
+            if not index_path(path).exists():
+                write_index(path, SegmentStats.scan(path), path.stat().st_size)
+            if self.compress and path.suffix == ".json":
+                self._start_compression(path)
+
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            logging.FileHandler.emit(self, record)
+            self.segment.add(record.created, getattr(record, "audit_event", None))
+        except Exception:
+            self.handleError(record)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        # Un événement mis en file avant minuit reste dans le segment de la veille
+        record_day = f"{datetime.fromtimestamp(record.created):%Y%m%d}"
+        if record_day > self.day:
+            self._next_day = record_day
+            return True
+        if self.max_bytes and self.stream is not None and self.segment.events:
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        """Close the active file as a segment and open the file for today."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        active = Path(self.baseFilename)
+        if active.exists() and active.stat().st_size:
+            self._close_segment(active, self.day, self.segment)
+        self.segment = SegmentStats()
+
+        self.day = max(self._next_day, f"{date.today():%Y%m%d}")
+        self.baseFilename = str(self._active_path(self.day))
+        self.stream = self._open()
+        self.prune()
+
+    def _close_segment(self, active: Path, day: str, stats: SegmentStats, compress: bool = True):
+        segment = self._next_segment(day)
+        os.replace(active, segment)
+        write_index(segment, stats, segment.stat().st_size)
+        if compress and self.compress:
+            self._start_compression(segment)
+
+    def _start_compression(self, segment: Path):
+        thread = threading.Thread(
+            target=self._compress, args=(segment,), name="audit-compress", daemon=True
+        )
+        self._compressors = [t for t in self._compressors if t.is_alive()] + [thread]
+        thread.start()
+
+    @staticmethod
+    def _compress(segment: Path):
+        """gzip a closed segment, then point its index at the ``.gz`` file."""
+        target = segment.with_name(segment.name + ".gz")
+        tmp = target.with_name(target.name + ".tmp")
+        try:
+            with open(segment, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp, target)
+
+            index = index_path(segment)
+            data = json.loads(index.read_text())
+            data["segment"] = target.name
+            data["compressed_bytes"] = target.stat().st_size
+            index.write_text(json.dumps(data, separators=(",", ":")))
+            segment.unlink()
+        except (OSError, json.JSONDecodeError) as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning(f"Could not compress audit segment {segment.name}: {e}")
+
+    def prune(self, now: float | None = None):
+        """Delete segments (and their indexes) older than ``retention_days``."""
+        if not self.retention_days:
+            return
+        cutoff = f"{datetime.fromtimestamp(now or time.time()) - timedelta(days=self.retention_days):%Y%m%d}"
+        for path in self.directory.glob(f"{PREFIX}-*.json*"):
+            match = _SEGMENT.match(path.name) or _INDEX.match(path.name)
+            if match and match.group(1) < cutoff:
+                path.unlink(missing_ok=True)
+
+    def close(self):
+        """Close the active file and wait for pending compressions."""
+        for thread in self._compressors:
+            thread.join(timeout=60)
+        self._compressors = []
+        super().close()
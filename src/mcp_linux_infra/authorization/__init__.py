@@ -7,11 +7,12 @@ This module provides a whitelist-based authorization system with three levels:
 - BLOCKED: Refuse execution (dangerous commands)
 """
 
-from .models import AuthLevel, CommandRule, CommandAuthorization
+from .models import ApprovalStatus, AuthLevel, CommandRule, CommandAuthorization
 from .whitelist import COMMAND_WHITELIST, load_whitelist_from_yaml
 from .engine import AuthorizationEngine
 
 __all__ = [
+    "ApprovalStatus",
     "AuthLevel",
     "CommandRule",
     "CommandAuthorization",
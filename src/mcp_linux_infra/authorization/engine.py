@@ -4,11 +4,15 @@ Authorization engine for command execution
 Checks commands against whitelist and manages approval workflow.
 """
 
-import re
+import time
 from typing import Dict, List, Optional
-from datetime import datetime
 
+from ..config import CONFIG
+from ..state_store import StateStore, get_state_store
+from ..utils.metrics import AUTHORIZATION_CHECK_DURATION
+from .matcher import RuleMatcher
 from .models import (
+    ApprovalStatus,
     AuthLevel,
     CommandRule,
     CommandAuthorization,
@@ -23,17 +27,52 @@ class AuthorizationEngine:
     Matches commands against whitelist rules and manages approval workflow.
     """
 
-    def __init__(self, whitelist: List[CommandRule]):
+    KIND = "approval"
+
+    def __init__(self, whitelist: List[CommandRule], store: Optional[StateStore] = None):
         """
         Initialize authorization engine
 
         Args:
             whitelist: List of CommandRule objects defining allowed commands
+            store: Where pending approvals are kept (default: the shared state store,
+                opened on first MANUAL command)
+
+        Raises:
+            re.error: If a rule pattern is not a valid regex
         """
         self.whitelist = whitelist
-        self.pending_approvals: Dict[str, PendingCommand] = {}
+        self._store = store
+
+    @property
+    def store(self) -> StateStore:
+        if self._store is None:
+            self._store = get_state_store()
+        return self._store
+
+    @property
+    def whitelist(self) -> List[CommandRule]:
+        return self._matcher.rules
+
+    @whitelist.setter
+    def whitelist(self, rules: List[CommandRule]):
+        # Patterns compilés et indexés une seule fois, au chargement
+        self._matcher = RuleMatcher(rules)
+
+        # Les analyses mémorisées dépendent de la whitelist
+        try:
+            from ..analysis.command_analysis import invalidate_analysis_cache
+            invalidate_analysis_cache()
+        except Exception:
+            pass  # Don't fail if analysis module has issues
 
-    def check_command(self, host: str, command: str, user: str = "unknown") -> CommandAuthorization:
+    def check_command(
+        self,
+        host: str,
+        command: str,
+        user: str = "unknown",
+        create_approval: bool = True,
+    ) -> CommandAuthorization:
         """
         Check if a command is authorized for execution
 
@@ -41,15 +80,26 @@ class AuthorizationEngine:
             host: Target host
             command: Command to check
             user: User attempting to execute (for learning stats)
+            create_approval: Store a pending approval for MANUAL commands
+                (False: report MANUAL without approval_id)
 
         Returns:
             CommandAuthorization with decision and metadata
         """
+        start = time.perf_counter()
+        authorization = self._check(host, command, user, create_approval)
+        AUTHORIZATION_CHECK_DURATION.observe(
+            time.perf_counter() - start, decision=authorization.auth_level.value
+        )
+        return authorization
 
+    def _check(
+        self, host: str, command: str, user: str, create_approval: bool = True
+    ) -> CommandAuthorization:
         # Check against whitelist (first match wins)
-        for rule in self.whitelist:
-            if re.match(rule.pattern, command):
-                return self._process_rule_match(host, command, rule)
+        rule = self._matcher.match(command)
+        if rule is not None:
+            return self._process_rule_match(host, command, rule, create_approval)
 
         # No match = default BLOCK
         # Record for auto-learning
@@ -69,7 +119,8 @@ class AuthorizationEngine:
         self,
         host: str,
         command: str,
-        rule: CommandRule
+        rule: CommandRule,
+        create_approval: bool = True
     ) -> CommandAuthorization:
         """Process a matched rule"""
 
@@ -95,13 +146,23 @@ class AuthorizationEngine:
 
         # MANUAL - create approval request
         elif rule.auth_level == AuthLevel.MANUAL:
+            if not create_approval:
+                return CommandAuthorization(
+                    allowed=False,
+                    auth_level=AuthLevel.MANUAL,
+                    ssh_user=rule.ssh_user,
+                    needs_approval=True,
+                    reason=f"Approval required: {rule.description}",
+                    rule=rule
+                )
+
             pending = PendingCommand.create(
                 host=host,
                 command=command,
                 ssh_user=rule.ssh_user,
                 rule=rule
             )
-            self.pending_approvals[pending.id] = pending
+            self.store.put(self.KIND, pending.to_record(), ttl=CONFIG.approval_ttl_hours * 3600)
 
             return CommandAuthorization(
                 allowed=False,
@@ -113,6 +174,16 @@ class AuthorizationEngine:
                 rule=rule
             )
 
+    def _transition(
+        self, approval_id: str, expected, status: ApprovalStatus
+    ) -> Optional[PendingCommand]:
+        if isinstance(expected, ApprovalStatus):
+            expected = [expected]
+        record = self.store.transition(
+            self.KIND, approval_id, [s.value for s in expected], status.value
+        )
+        return PendingCommand.from_record(record) if record else None
+
     def approve_command(self, approval_id: str) -> Optional[PendingCommand]:
         """
         Approve a pending command
@@ -121,18 +192,34 @@ class AuthorizationEngine:
             approval_id: Approval request ID
 
         Returns:
-            PendingCommand if found and approved, None otherwise
+            PendingCommand if found and approved (or already approved), None otherwise
+        """
+        pending = self._transition(approval_id, ApprovalStatus.PENDING, ApprovalStatus.APPROVED)
+        if pending:
+            return pending
+
+        pending = self.get_pending(approval_id)
+        if pending and pending.status == ApprovalStatus.APPROVED:
+            return pending
+        return None  # Unknown, running or already executed
+
+    def claim_execution(self, approval_id: str) -> Optional[PendingCommand]:
         """
-        pending = self.pending_approvals.get(approval_id)
+        Atomically move an approved command to EXECUTING
 
-        if not pending:
-            return None
+        Only one caller wins: concurrent approvals of the same ID cannot
+        run the command twice.
 
-        if pending.executed:
-            return None  # Already executed
+        Returns:
+            PendingCommand if claimed, None otherwise
+        """
+        return self._transition(approval_id, ApprovalStatus.APPROVED, ApprovalStatus.EXECUTING)
 
-        pending.approved = True
-        return pending
+    def release_execution(self, approval_id: str) -> bool:
+        """Execution failed: back to APPROVED so it can be retried"""
+        return self._transition(
+            approval_id, ApprovalStatus.EXECUTING, ApprovalStatus.APPROVED
+        ) is not None
 
     def mark_executed(self, approval_id: str) -> bool:
         """
@@ -142,44 +229,42 @@ class AuthorizationEngine:
             approval_id: Approval request ID
 
         Returns:
-            True if marked, False if not found
+            True if marked, False if not found (or already executed)
         """
-        pending = self.pending_approvals.get(approval_id)
-
-        if not pending:
-            return False
-
-        pending.executed = True
-        return True
+        return self._transition(
+            approval_id,
+            [ApprovalStatus.APPROVED, ApprovalStatus.EXECUTING],
+            ApprovalStatus.EXECUTED,
+        ) is not None
 
     def get_pending(self, approval_id: str) -> Optional[PendingCommand]:
         """Get a pending command by ID"""
-        return self.pending_approvals.get(approval_id)
-
-    def get_all_pending(self) -> List[PendingCommand]:
-        """Get all pending commands that haven't been executed"""
-        return [
-            p for p in self.pending_approvals.values()
-            if not p.executed
-        ]
+        record = self.store.get(self.KIND, approval_id)
+        return PendingCommand.from_record(record) if record else None
+
+    def get_all_pending(self, host: Optional[str] = None) -> List[PendingCommand]:
+        """Get all pending commands that haven't been executed (oldest first)"""
+        records = self.store.select(
+            self.KIND,
+            statuses=[s.value for s in ApprovalStatus if s != ApprovalStatus.EXECUTED],
+            host=host,
+        )
+        return [PendingCommand.from_record(r) for r in records]
 
-    def cleanup_old_approvals(self, max_age_hours: int = 24):
+    def cleanup_old_approvals(self, max_age_hours: int = 24) -> int:
         """
         Remove old approval requests
 
+        Expired approvals are also removed by the state store sweeper
+        (``approval_ttl_hours``).
+
         Args:
             max_age_hours: Maximum age in hours to keep approvals
-        """
-        now = datetime.now()
-        to_remove = []
-
-        for approval_id, pending in self.pending_approvals.items():
-            age_hours = (now - pending.created_at).total_seconds() / 3600
-            if age_hours > max_age_hours:
-                to_remove.append(approval_id)
 
-        for approval_id in to_remove:
-            del self.pending_approvals[approval_id]
+        Returns:
+            Number of approvals removed
+        """
+        return self.store.delete_older_than(self.KIND, max_age_hours * 3600)
 
     def get_whitelist_summary(self) -> Dict[str, List[CommandRule]]:
         """
@@ -0,0 +1,249 @@
+"""
+Compiled, indexed whitelist matcher.
+
+Rules are compiled once and bucketed by the literal leading token of
+their pattern (``^systemctl status\\s+`` → ``systemctl``). A check only
+runs the rules of the command's first token, plus the fallback bucket
+of patterns without an indexable token (``.*rm\\s+-rf``, alternations,
+inline flags...). Each rule keeps its whitelist position so that the
+first matching rule still wins, exactly like a linear ``re.match`` scan.
+
+``PatternSet`` compiles an ordered pattern list into a single alternation
+(one named group per pattern): one ``match`` call tells which pattern
+fires first. It is used for the fallback bucket and for the risk tiers
+of ``analysis.command_analysis``.
+"""
+
+import re
+from collections.abc import Sequence
+
+from .models import CommandRule
+
+_META = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = ("*", "+", "?", "{")
+
+Entry = tuple[int, re.Pattern, CommandRule]
+
+# Drapeaux pouvant être limités à une branche: (?i:...)
+_SCOPED_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x", re.ASCII: "a"}
+# Références à un groupe: la renumérotation des groupes les casserait
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+class PatternSet:
+    """
+    Ordered patterns matched with ``re.match`` semantics, first match wins.
+
+    The patterns are combined into ``(?P<_0>p0)|(?P<_1>p1)|...``: the regex
+    engine tries the branches left to right at position 0, which is the
+    order of a ``for pattern in patterns: re.match(...)`` loop. Patterns
+    that cannot be combined (back-references, global inline flags) make
+    the set fall back to that loop.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int | Sequence[int] = 0):
+        """
+        Args:
+            patterns: Regexes, in priority order
+            flags: Flags for all patterns, or one value per pattern
+
+        Raises:
+            re.error: If a pattern is not a valid regex
+        """
+        self.patterns = tuple(patterns)
+        per_pattern = [flags] * len(self.patterns) if isinstance(flags, int) else list(flags)
+        if len(per_pattern) != len(self.patterns):
+            raise ValueError("flags must match the number of patterns")
+
+        self._compiled = [re.compile(p, f) for p, f in zip(self.patterns, per_pattern, strict=True)]
+        self._combined = self._combine(per_pattern)
+
+    @property
+    def combined(self) -> bool:
+        """True if matching is done in a single regex call."""
+        return self._combined is not None
+
+    def first_match(self, text: str) -> int | None:
+        """Index of the first pattern matching at the start of ``text``."""
+        if self._combined is not None:
+            match = self._combined.match(text)
+            # Le groupe englobant se ferme en dernier: c'est lastgroup
+            return int(match.lastgroup[1:]) if match else None
+
+        for index, regex in enumerate(self._compiled):
+            if regex.match(text):
+                return index
+        return None
+
+    def _combine(self, flags: list[int]) -> re.Pattern | None:
+        if not self.patterns:
+            return None
+
+        branches = []
+        for index, (pattern, pattern_flags) in enumerate(zip(self.patterns, flags, strict=True)):
+            if _BACKREFERENCE.search(pattern) or pattern_flags & ~sum(_SCOPED_FLAGS):
+                return None
+            scoped = "".join(letter for flag, letter in _SCOPED_FLAGS.items() if pattern_flags & flag)
+            body = f"(?{scoped}:{pattern})" if scoped else pattern
+            branches.append(f"(?P<_{index}>{body})")
+
+        try:
+            return re.compile("|".join(branches))
+        except re.error:
+            return None  # Drapeaux globaux en ligne, noms de groupes en double...
+
+
+def leading_token(pattern: str) -> str | None:
+    """
+    Literal first token that every command matched by ``pattern`` starts with.
+
+    Returns None when the pattern cannot be indexed safely: no literal
+    prefix, alternation at top level, inline flags, quantified prefix, or
+    a prefix that is not followed by whitespace / end of string (``^uptime``
+    also matches ``uptimes``).
+    """
+    if pattern.startswith("(?") or has_top_level_branch(pattern):
+        return None
+
+    i = 1 if pattern.startswith("^") else 0
+    token: list[str] = []
+
+    while i < len(pattern):
+        char = pattern[i]
+
+        escaped = pattern[i + 1:i + 2] if char == "\\" else ""
+        if escaped == "s" or escaped.isspace() or char == "$" or char.isspace():
+            # Fin du token, à condition qu'elle ne soit pas optionnelle
+            end = i + (2 if escaped else 1)
+            if pattern[end:end + 1] in ("*", "?") or pattern[end:end + 2] == "{0":
+                return None
+            return "".join(token) or None
+
+        if char == "\\":
+            if not escaped or escaped.isalnum():
+                return None  # Classe (\d, \w...) ou référence
+            literal, i = escaped, i + 2
+        elif char in _META:
+            return None
+        else:
+            literal, i = char, i + 1
+
+        if pattern[i:i + 1] in _QUANTIFIERS:
+            return None
+        token.append(literal)
+
+    return None
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Literal characters every match of ``pattern`` starts with, up to the
+    first whitespace or regex construct ("" if there is none).
+    """
+    if pattern.startswith("(?") or has_top_level_branch(pattern):
+        return ""
+
+    i = 1 if pattern.startswith("^") else 0
+    prefix: list[str] = []
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or escaped.isalnum() or escaped.isspace():
+                break
+            literal, end = escaped, i + 2
+        elif char in _META or char.isspace():
+            break
+        else:
+            literal, end = char, i + 1
+
+        if pattern[end:end + 1] in _QUANTIFIERS:
+            break
+        prefix.append(literal)
+        i = end
+
+    return "".join(prefix)
+
+
+def has_top_level_branch(pattern: str) -> bool:
+    """True if ``|`` appears outside any group or character class."""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            # Sauter la classe ("[]...]" et "[^]...]" incluent le ']')
+            i += 1
+            if pattern[i:i + 1] == "^":
+                i += 1
+            if pattern[i:i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+class RuleMatcher:
+    """First-match-wins lookup over precompiled, token-indexed rules."""
+
+    def __init__(self, rules: list[CommandRule]):
+        """
+        Compile and index rules
+
+        Raises:
+            re.error: If a rule pattern is not a valid regex
+        """
+        self.rules = list(rules)
+        self._by_token: dict[str, list[Entry]] = {}
+        self._fallback: list[Entry] = []
+
+        for position, rule in enumerate(self.rules):
+            entry = (position, re.compile(rule.pattern), rule)
+            token = leading_token(rule.pattern)
+            if token is None:
+                self._fallback.append(entry)
+            else:
+                self._by_token.setdefault(token, []).append(entry)
+
+        self._fallback_set = PatternSet([rule.pattern for _, _, rule in self._fallback])
+
+    def match(self, command: str) -> CommandRule | None:
+        """Return the first rule (in whitelist order) whose pattern matches."""
+        parts = command.split(None, 1)
+        indexed = self._by_token.get(parts[0], ()) if parts else ()
+
+        found: Entry | None = None
+        for entry in indexed:
+            if entry[1].match(command):
+                found = entry
+                break
+
+        # Une règle générique placée avant garde la priorité
+        index = self._fallback_set.first_match(command)
+        if index is not None:
+            position, _, rule = self._fallback[index]
+            if found is None or position < found[0]:
+                return rule
+
+        return found[2] if found else None
+
+    def stats(self) -> dict[str, int]:
+        """Index shape (for diagnostics)"""
+        return {
+            "rules": len(self.rules),
+            "tokens": len(self._by_token),
+            "fallback": len(self._fallback),
+            "fallback_combined": int(self._fallback_set.combined),
+            "largest_bucket": max((len(b) for b in self._by_token.values()), default=0),
+        }
@@ -16,6 +16,14 @@ class AuthLevel(Enum):
     BLOCKED = "blocked"     # Refuse execution
 
 
+class ApprovalStatus(Enum):
+    """Lifecycle of a MANUAL command approval"""
+    PENDING = "pending"         # Waiting for a human
+    APPROVED = "approved"       # Approved, not yet running
+    EXECUTING = "executing"     # Claimed by one executor
+    EXECUTED = "executed"       # Done
+
+
 @dataclass
 class CommandRule:
     """Rule for command authorization"""
@@ -52,8 +60,15 @@ class PendingCommand:
     ssh_user: str                           # SSH user
     rule: CommandRule                       # Matching rule
     created_at: datetime = field(default_factory=datetime.now)
-    approved: bool = False
-    executed: bool = False
+    status: ApprovalStatus = ApprovalStatus.PENDING
+
+    @property
+    def approved(self) -> bool:
+        return self.status != ApprovalStatus.PENDING
+
+    @property
+    def executed(self) -> bool:
+        return self.status == ApprovalStatus.EXECUTED
 
     @classmethod
     def create(cls, host: str, command: str, ssh_user: str, rule: CommandRule) -> "PendingCommand":
@@ -65,3 +80,33 @@ class PendingCommand:
             ssh_user=ssh_user,
             rule=rule
         )
+
+    def to_record(self) -> dict:
+        """JSON-serializable form for the state store"""
+        return {
+            "id": self.id,
+            "host": self.host,
+            "command": self.command,
+            "ssh_user": self.ssh_user,
+            "rule": {
+                "pattern": self.rule.pattern,
+                "auth_level": self.rule.auth_level.value,
+                "description": self.rule.description,
+                "ssh_user": self.rule.ssh_user,
+                "rationale": self.rule.rationale,
+            },
+            "created_at": self.created_at.isoformat(),
+            "status": self.status.value,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "PendingCommand":
+        return cls(
+            id=record["id"],
+            host=record["host"],
+            command=record["command"],
+            ssh_user=record["ssh_user"],
+            rule=CommandRule(**record["rule"]),
+            created_at=datetime.fromisoformat(record["created_at"]),
+            status=ApprovalStatus(record["status"]),
+        )
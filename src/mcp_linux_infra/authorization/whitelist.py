@@ -11,6 +11,20 @@ from pathlib import Path
 from .models import AuthLevel, CommandRule
 
 
+# ansible-playbook tel que construit par ansible_wrapper (répertoire infra, callback JSON).
+_ANSIBLE_PLAYBOOK = (
+    r"^(?:cd[ \t]+/opt/infra[ \t]+&&[ \t]+)?(?:ANSIBLE_STDOUT_CALLBACK=json[ \t]+)?ansible-playbook"
+)
+# Un argument = caractères sans signification pour le shell, ou segments entre
+# apostrophes (shlex.quote) ; séparés par espaces/tabulations uniquement.
+# Tout le reste (;, |, &, `, $, <, >, saut de ligne...) ne correspond pas.
+_ARG = r"(?:[\w./=:@,+-]|'[^']*')+"
+_CHECK_FLAG = r"[ \t]+--check(?=[ \t]|\Z)"
+_ANSIBLE_CHECK = rf"{_ANSIBLE_PLAYBOOK}(?:[ \t]+{_ARG})*?{_CHECK_FLAG}(?:[ \t]+{_ARG})*[ \t]*\Z"
+_ANSIBLE_RUN = (
+    rf"{_ANSIBLE_PLAYBOOK}(?!(?:[ \t]+{_ARG})*?{_CHECK_FLAG})(?:[ \t]+{_ARG})*[ \t]*\Z"
+)
+
 # Default command whitelist
 COMMAND_WHITELIST: List[CommandRule] = [
     # ═══════════════════════════════════════════════════
@@ -87,7 +101,7 @@ COMMAND_WHITELIST: List[CommandRule] = [
         rationale="Read-only container info"
     ),
     CommandRule(
-        pattern=r"^ansible-playbook\s+.*--check",
+        pattern=_ANSIBLE_CHECK,
         auth_level=AuthLevel.AUTO,
         ssh_user="mcp-reader",
         description="Ansible dry-run (check mode)",
@@ -147,7 +161,7 @@ COMMAND_WHITELIST: List[CommandRule] = [
         rationale="System state change"
     ),
     CommandRule(
-        pattern=r"^ansible-playbook\s+(?!.*--check)",
+        pattern=_ANSIBLE_RUN,
         auth_level=AuthLevel.MANUAL,
         ssh_user="exec-runner",
         description="Execute Ansible playbook",
@@ -62,6 +62,89 @@ class Config(BaseSettings):
     ssh_max_connections: int = Field(
         default=10, description="Maximum concurrent SSH connections"
     )
+    ssh_pool_min_per_host: int = Field(
+        default=1, description="Idle connections kept open per user@host"
+    )
+    ssh_pool_max_per_host: int = Field(
+        default=3, description="Maximum SSH connections per user@host"
+    )
+    ssh_max_sessions_per_connection: int = Field(
+        default=8, description="Maximum concurrent channels per SSH connection (sshd MaxSessions)"
+    )
+    ssh_pool_idle_timeout: int = Field(
+        default=300, description="Close pooled connections idle for this many seconds (0 = never)"
+    )
+    ssh_batch_probes: bool = Field(
+        default=True,
+        description="Send grouped read-only probes in one SSH round-trip (mcp-wrapper 'batch' verb)",
+    )
+
+    # Result cache (read-only diagnostics)
+    result_cache_enabled: bool = Field(
+        default=True, description="Cache read-only diagnostic results (per-command TTLs)"
+    )
+    result_cache_max_bytes: int = Field(
+        default=16 * 1024 * 1024, description="Maximum size of cached diagnostic output in bytes"
+    )
+
+    # Ansible playbook / inventory catalog
+    ansible_catalog_ttl: int = Field(
+        default=300, description="Seconds a host's playbook catalog is served without re-listing (0 = always re-list)"
+    )
+
+    # Command analysis memoization
+    analysis_cache_max_entries: int = Field(
+        default=4096, description="Maximum number of memoized command analyses (LRU)"
+    )
+
+    # Streaming output (logs and other unbounded commands)
+    stream_max_bytes: int = Field(
+        default=1024 * 1024, description="Stop a streamed command after this many output bytes"
+    )
+    stream_max_lines: int = Field(
+        default=5000, description="Stop a streamed command after this many output lines"
+    )
+
+    # Background jobs (long-running commands and playbooks)
+    job_buffer_lines: int = Field(
+        default=5000, description="Output lines kept per background job (oldest dropped first)"
+    )
+    job_buffer_bytes: int = Field(
+        default=1024 * 1024, description="Output bytes kept per background job (oldest dropped first)"
+    )
+    job_max_retained: int = Field(
+        default=50, description="Finished background jobs kept for polling before the oldest is forgotten"
+    )
+
+    # Tool response limits (head/tail truncation)
+    tool_output_max_bytes: int = Field(
+        default=64 * 1024, description="Maximum size of a tool response in bytes"
+    )
+    tool_output_max_lines: int = Field(
+        default=1000, description="Maximum number of lines in a tool response"
+    )
+
+    # Fleet fan-out
+    fleet_max_concurrency: int = Field(
+        default=20, description="Maximum hosts queried concurrently by fleet tools"
+    )
+    fleet_host_timeout: int = Field(
+        default=60, description="Per-host timeout in seconds for fleet tools (0 = none)"
+    )
+
+    # Auto-learning persistence (append-only event log + snapshot)
+    learning_flush_interval: float = Field(
+        default=1.0, description="Maximum delay in seconds before blocked-command events are written"
+    )
+    learning_flush_batch: int = Field(
+        default=500, description="Flush early once this many events are pending"
+    )
+    learning_compact_events: int = Field(
+        default=10000, description="Rewrite the stats snapshot after this many logged events"
+    )
+    learning_backend: Literal["json", "sqlite"] = Field(
+        default="json", description="Learning store: JSON snapshot + event log, or indexed SQLite database"
+    )
 
     # Logging
     log_dir: Path | None = Field(default=None, description="Directory for log files")
@@ -69,6 +152,45 @@ class Config(BaseSettings):
     log_retention_days: int = Field(
         default=30, description="Log file retention period"
     )
+    audit_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Rotate the audit log once it reaches this size (0 = daily only)"
+    )
+    audit_compress: bool = Field(
+        default=True, description="gzip closed audit log segments"
+    )
+    audit_rollup_interval: float = Field(
+        default=60.0, description="Roll up repeated routine audit events over this many seconds (0 = off)"
+    )
+    audit_rollup_events: str = Field(
+        default="ssh_connect,ssh_command",
+        description="Event types rolled up (comma-separated): reused connections, successful commands",
+    )
+    audit_queue_size: int = Field(
+        default=10000,
+        description=(
+            "Audit events buffered for the writer thread (routine events are dropped when full, "
+            "0 = unbounded)"
+        ),
+    )
+
+    # Workflow state (approvals, remote executions)
+    state_db: Path | None = Field(
+        default=None, description="SQLite file for pending approvals and remote executions (default: <log_dir>/mcp-state.db)"
+    )
+    approval_ttl_hours: float = Field(
+        default=24.0, description="Delete approvals and remote executions older than this"
+    )
+    state_sweep_interval: float = Field(
+        default=60.0, description="Seconds between sweeps of expired workflow records"
+    )
+
+    # Metrics
+    metrics_port: int = Field(
+        default=0, description="Serve Prometheus metrics on this local HTTP port (0 = disabled)"
+    )
+    metrics_host: str = Field(
+        default="127.0.0.1", description="Bind address of the metrics endpoint"
+    )
 
     # Security
     allowed_log_paths: str | None = Field(
@@ -99,7 +221,7 @@ class Config(BaseSettings):
         default=120, description="Default command timeout in seconds"
     )
 
-    @field_validator("ssh_key_path", "exec_key_path", "pra_key_path", "log_dir")
+    @field_validator("ssh_key_path", "exec_key_path", "pra_key_path", "log_dir", "state_db")
     @classmethod
     def expand_path(cls, v: Path | None) -> Path | None:
         """Expand ~ and environment variables in paths."""
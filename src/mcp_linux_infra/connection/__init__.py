@@ -6,10 +6,34 @@ from .smart_ssh import (
     SSHAuthMode,
     SmartSSHManager,
     execute_command,
+    execute_commands,
     execute_remote_execution,
     get_current_auth_mode,
     get_smart_ssh_manager,
 )
+from .result_cache import (
+    ResultCache,
+    cached_execute_command,
+    cached_execute_commands,
+    get_result_cache,
+)
+from .streaming import (
+    CommandStream,
+    RunningProcess,
+    StreamedOutput,
+    local_process,
+    read_command_output,
+    stream_command,
+)
+from .fanout import (
+    HostResult,
+    current_progress,
+    fan_out,
+    fan_out_command,
+    gather_hosts,
+    report_progress_to,
+    resolve_hosts,
+)
 
 __all__ = [
     "SmartSSHManager",
@@ -18,5 +42,23 @@ __all__ = [
     "get_smart_ssh_manager",
     "get_current_auth_mode",
     "execute_command",
+    "execute_commands",
     "execute_remote_execution",
+    "ResultCache",
+    "cached_execute_command",
+    "cached_execute_commands",
+    "get_result_cache",
+    "CommandStream",
+    "RunningProcess",
+    "StreamedOutput",
+    "local_process",
+    "read_command_output",
+    "stream_command",
+    "HostResult",
+    "current_progress",
+    "fan_out",
+    "fan_out_command",
+    "gather_hosts",
+    "report_progress_to",
+    "resolve_hosts",
 ]
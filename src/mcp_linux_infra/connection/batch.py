@@ -0,0 +1,89 @@
+"""
+Batching de probes read-only en un seul aller-retour SSH.
+
+Le client envoie ``batch <nonce>`` (verbe du wrapper ``mcp-wrapper``) avec
+une commande par ligne sur stdin. Le wrapper revalide chaque commande contre
+sa whitelist et renvoie les sorties encadrées par des marqueurs propres au
+nonce, que ``decode_batch`` redécoupe en ``(returncode, stdout, stderr)``.
+"""
+
+import re
+import secrets
+
+MAX_BATCH_PROBES = 32  # Doit rester <= BATCH_MAX_PROBES dans mcp-wrapper
+
+_HEADER = re.compile(r"(OUT|ERR):(\d+)|RC:(\d+):(-?\d+)|END:(\d+)")
+
+
+class BatchProtocolError(Exception):
+    """Réponse batch absente ou illisible (wrapper sans verbe ``batch``, coupure...)."""
+
+    pass
+
+
+def make_nonce() -> str:
+    """Nonce aléatoire: une sortie de probe ne peut pas forger un marqueur."""
+    return secrets.token_hex(16)
+
+
+def encode_batch(commands: list[list[str]], nonce: str) -> tuple[str, str]:
+    """
+    Construire la requête batch.
+
+    Returns:
+        (commande SSH, stdin)
+
+    Raises:
+        BatchProtocolError: commande non représentable sur une seule ligne
+    """
+    if len(commands) > MAX_BATCH_PROBES:
+        raise BatchProtocolError(f"Too many probes in one batch ({len(commands)})")
+
+    lines = []
+    for command in commands:
+        line = " ".join(command)
+        if not line or "\n" in line or "\r" in line:
+            raise BatchProtocolError(f"Probe cannot be batched: {line!r}")
+        lines.append(line)
+
+    return f"batch {nonce}", "".join(f"{line}\n" for line in lines)
+
+
+def decode_batch(output: str, nonce: str, count: int) -> list[tuple[int, str, str]]:
+    """
+    Démultiplexer la sortie du wrapper.
+
+    Chaque marqueur est précédé d'un saut de ligne ajouté par le wrapper,
+    donc le contenu entre deux marqueurs est exactement la sortie du probe.
+
+    Raises:
+        BatchProtocolError: marqueur de fin absent ou probe manquant
+    """
+    stdout: dict[int, str] = {}
+    stderr: dict[int, str] = {}
+    returncodes: dict[int, int] = {}
+    ended = False
+
+    for chunk in output.split(f"\n@@MCP:{nonce}:")[1:]:
+        header, _, body = chunk.partition("\n")
+        match = _HEADER.fullmatch(header)
+        if match is None:
+            raise BatchProtocolError(f"Malformed batch frame: {header!r}")
+
+        kind, index, rc_index, rc, end_count = match.groups()
+        if kind == "OUT":
+            stdout[int(index)] = body
+        elif kind == "ERR":
+            stderr[int(index)] = body
+        elif rc_index is not None:
+            returncodes[int(rc_index)] = int(rc)
+        else:
+            ended = int(end_count) == count
+
+    if not ended:
+        raise BatchProtocolError("Batch output incomplete or not understood by remote wrapper")
+
+    try:
+        return [(returncodes[i], stdout[i], stderr[i]) for i in range(count)]
+    except KeyError as e:
+        raise BatchProtocolError(f"Probe {e} missing from batch output") from e
@@ -0,0 +1,192 @@
+"""
+Fan-out d'une même opération sur plusieurs hôtes.
+
+Concurrence bornée par sémaphore, timeout par hôte, et résultats
+restitués au fil de l'eau (dans l'ordre de complétion).
+"""
+
+import asyncio
+import fnmatch
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import CONFIG
+from .smart_ssh import execute_command
+
+GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class HostResult:
+    """Résultat d'une opération sur un hôte."""
+
+    host: str
+    ok: bool
+    value: Any = None
+    error: str | None = None
+    timed_out: bool = False
+    duration_ms: float = 0.0
+
+    @property
+    def status(self) -> str:
+        if self.timed_out:
+            return "timeout"
+        return "ok" if self.ok else "error"
+
+
+ProgressCallback = Callable[[HostResult, int, int], Awaitable[None]]
+
+# Positionné par la couche MCP pour remonter la progression hôte par hôte
+_progress: ContextVar[ProgressCallback | None] = ContextVar("fleet_progress", default=None)
+
+
+@contextmanager
+def report_progress_to(ctx: Any) -> Iterator[None]:
+    """
+    Forward per-host completion to an MCP ``Context`` as progress notifications.
+
+    No-op when ``ctx`` is None; ``Context.report_progress`` itself ignores
+    clients that did not send a progress token.
+    """
+    if ctx is None:
+        yield
+        return
+
+    async def notify(result: HostResult, done: int, total: int) -> None:
+        try:
+            await ctx.report_progress(done, total, message=f"{result.host}: {result.status}")
+        except Exception:
+            pass  # Progress is best-effort, never fail the tool for it
+
+    token = _progress.set(notify)
+    try:
+        yield
+    finally:
+        _progress.reset(token)
+
+
+def current_progress() -> ProgressCallback | None:
+    """Progress callback installed by report_progress_to, if any."""
+    return _progress.get()
+
+
+def resolve_hosts(hosts: list[str] | str) -> list[str]:
+    """
+    Expand a host list into concrete host names.
+
+    Accepts a list or a comma-separated string. Entries containing glob
+    characters (``*``, ``?``, ``[``) are expanded against
+    ``CONFIG.allowed_hosts``; order is preserved and duplicates removed.
+
+    Raises:
+        ValueError: glob used without an allowed-hosts whitelist, or no host matched
+    """
+    if isinstance(hosts, str):
+        hosts = hosts.split(",")
+
+    resolved: list[str] = []
+    for entry in (h.strip() for h in hosts):
+        if not entry:
+            continue
+
+        if GLOB_CHARS & set(entry):
+            if CONFIG.allowed_hosts is None:
+                raise ValueError(
+                    f"Host pattern '{entry}' requires LINUX_MCP_ALLOWED_HOSTS to be set"
+                )
+            matches = fnmatch.filter(CONFIG.allowed_hosts, entry)
+        else:
+            matches = [entry]
+
+        for host in matches:
+            if host not in resolved:
+                resolved.append(host)
+
+    if not resolved:
+        raise ValueError("No host matched")
+
+    return resolved
+
+
+async def fan_out(
+    hosts: list[str],
+    operation: Callable[[str], Awaitable[Any]],
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> AsyncIterator[HostResult]:
+    """
+    Run ``operation(host)`` on every host, yielding results as they complete.
+
+    Args:
+        hosts: Concrete host names (see resolve_hosts)
+        operation: Coroutine function called with each host
+        concurrency: Max hosts in flight (default: CONFIG.fleet_max_concurrency)
+        timeout: Per-host timeout in seconds (default: CONFIG.fleet_host_timeout)
+    """
+    semaphore = asyncio.Semaphore(concurrency or CONFIG.fleet_max_concurrency)
+    timeout = timeout if timeout is not None else CONFIG.fleet_host_timeout
+
+    async def run(host: str) -> HostResult:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                value = await asyncio.wait_for(operation(host), timeout or None)
+                result = HostResult(host=host, ok=True, value=value)
+            except TimeoutError:
+                result = HostResult(
+                    host=host, ok=False, error=f"timed out after {timeout}s", timed_out=True
+                )
+            except Exception as e:
+                result = HostResult(host=host, ok=False, error=str(e))
+            result.duration_ms = (time.perf_counter() - started) * 1000
+            return result
+
+    tasks = [asyncio.create_task(run(host)) for host in hosts]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def gather_hosts(
+    hosts: list[str],
+    operation: Callable[[str], Awaitable[Any]],
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    on_result: ProgressCallback | None = None,
+) -> list[HostResult]:
+    """
+    Fan out and collect every result, returned in ``hosts`` order.
+
+    ``on_result(result, done, total)`` is awaited as each host completes
+    (default: the callback installed by report_progress_to).
+    """
+    on_result = on_result or _progress.get()
+    results: dict[str, HostResult] = {}
+    async for result in fan_out(hosts, operation, concurrency, timeout):
+        results[result.host] = result
+        if on_result is not None:
+            await on_result(result, len(results), len(hosts))
+    return [results[host] for host in hosts]
+
+
+async def fan_out_command(
+    command: list[str],
+    hosts: list[str],
+    username: str | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> AsyncIterator[HostResult]:
+    """Fan ``execute_command`` out; each value is ``(returncode, stdout, stderr)``."""
+
+    async def run(host: str) -> tuple[int, str, str]:
+        return await execute_command(command, host, username)
+
+    async for result in fan_out(hosts, run, concurrency, timeout):
+        yield result
@@ -0,0 +1,309 @@
+"""
+Pool de connexions SSH par hôte avec multiplexage de canaux.
+
+Chaque clé ``user@host`` possède son propre ``HostPool`` (verrou dédié,
+lock striping): un hôte lent ou injoignable ne bloque plus l'établissement
+des connexions vers les autres hôtes.
+
+- min/max connexions par hôte (les ``min`` plus récentes survivent à l'idle reaping)
+- plafond de sessions concurrentes (canaux) par connexion
+- plafond global ``CONFIG.ssh_max_connections`` partagé entre tous les pools
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from asyncssh import SSHClientConnection
+
+from ..utils.metrics import SSH_POOL_WAIT
+
+ConnectFactory = Callable[[], Awaitable[SSHClientConnection]]
+
+
+class PoolExhaustedError(Exception):
+    """Plus aucune connexion disponible dans le délai imparti."""
+
+    pass
+
+
+@dataclass(eq=False)
+class PooledConnection:
+    """Connexion SSH suivie par le pool."""
+
+    conn: SSHClientConnection
+    in_use: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_closed(self) -> bool:
+        return self.conn.is_closed()
+
+
+class ConnectionBudget:
+    """Plafond global de connexions ouvertes, tous hôtes confondus."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.opened = 0
+        self._released = asyncio.Event()
+
+    def try_acquire(self) -> bool:
+        """Réserver une connexion sans attendre."""
+        if self.opened >= self.limit:
+            return False
+        self.opened += 1
+        return True
+
+    async def acquire(self, timeout: float) -> None:
+        """Réserver une connexion en attendant au plus ``timeout`` secondes."""
+        deadline = time.monotonic() + timeout
+        while not self.try_acquire():
+            self._released.clear()
+            remaining = deadline - time.monotonic()
+            try:
+                await asyncio.wait_for(self._released.wait(), max(0.0, remaining))
+            except TimeoutError as e:
+                raise PoolExhaustedError(
+                    f"SSH connection limit reached ({self.limit} connections)"
+                ) from e
+
+    def release(self) -> None:
+        self.opened -= 1
+        self._released.set()
+
+
+class HostPool:
+    """Connexions vers une seule clé ``user@host``."""
+
+    def __init__(
+        self,
+        key: str,
+        connect: ConnectFactory,
+        budget: ConnectionBudget,
+        *,
+        min_size: int = 1,
+        max_size: int = 3,
+        max_sessions: int = 8,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+        on_exhausted: Callable[[str], bool] | None = None,
+    ):
+        self.key = key
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+
+        self._connect = connect
+        self._budget = budget
+        self._on_exhausted = on_exhausted
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_size * self.max_sessions)
+        self._connections: list[PooledConnection] = []
+
+        # Statistiques
+        self.waiting = 0
+        self.total_wait_seconds = 0.0
+        self.connects = 0
+        self.reuses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
+    @property
+    def in_use(self) -> int:
+        return sum(c.in_use for c in self._connections)
+
+    async def acquire(self) -> tuple[PooledConnection, bool]:
+        """
+        Réserver une session sur une connexion du pool.
+
+        Returns:
+            (connexion, reused) - reused=False si la connexion vient d'être ouverte
+        """
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+            except TimeoutError as e:
+                raise PoolExhaustedError(
+                    f"All {self.max_size * self.max_sessions} SSH sessions busy for {self.key}"
+                ) from e
+
+            try:
+                async with self._lock:
+                    return await self._checkout()
+            except BaseException:
+                self._slots.release()
+                raise
+        finally:
+            self.waiting -= 1
+            waited = time.monotonic() - started
+            self.total_wait_seconds += waited
+            SSH_POOL_WAIT.observe(waited, pool=self.key)
+
+    def release(self, pooled: PooledConnection) -> None:
+        """Libérer une session réservée par ``acquire``."""
+        pooled.in_use -= 1
+        pooled.last_used = time.monotonic()
+        if pooled.is_closed() and pooled in self._connections:
+            self._discard(pooled)
+        self._slots.release()
+
+    async def _checkout(self) -> tuple[PooledConnection, bool]:
+        self._prune()
+
+        # Multiplexage: la connexion la moins chargée qui a encore un canal libre
+        candidates = [c for c in self._connections if c.in_use < self.max_sessions]
+        if candidates:
+            pooled = min(candidates, key=lambda c: c.in_use)
+            pooled.in_use += 1
+            pooled.last_used = time.monotonic()
+            self.reuses += 1
+            return pooled, True
+
+        # Toutes saturées: ouvrir une connexion supplémentaire
+        if not self._budget.try_acquire():
+            if not (self._on_exhausted and self._on_exhausted(self.key)
+                    and self._budget.try_acquire()):
+                await self._budget.acquire(self.acquire_timeout)
+
+        try:
+            conn = await self._connect()
+        except BaseException:
+            self._budget.release()
+            raise
+
+        pooled = PooledConnection(conn=conn, in_use=1)
+        self._connections.append(pooled)
+        self.connects += 1
+        return pooled, False
+
+    def _prune(self) -> None:
+        """Retirer les connexions fermées et celles inactives au-delà de ``min_size``."""
+        for pooled in [c for c in self._connections if c.is_closed()]:
+            self._discard(pooled)
+
+        if self.idle_timeout <= 0:
+            return
+
+        now = time.monotonic()
+        idle = sorted(
+            (c for c in self._connections
+             if c.in_use == 0 and now - c.last_used > self.idle_timeout),
+            key=lambda c: c.last_used,
+        )
+        excess = len(self._connections) - self.min_size
+        for pooled in idle[:max(0, excess)]:
+            pooled.conn.close()
+            self._discard(pooled)
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        self._connections.remove(pooled)
+        self._budget.release()
+
+    def evict_idle(self) -> bool:
+        """Fermer une connexion inactive (appelé quand le budget global est épuisé)."""
+        for pooled in sorted(self._connections, key=lambda c: c.last_used):
+            if pooled.in_use == 0:
+                pooled.conn.close()
+                self._discard(pooled)
+                return True
+        return False
+
+    def close(self) -> None:
+        for pooled in list(self._connections):
+            if not pooled.is_closed():
+                pooled.conn.close()
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.size,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "max_connections": self.max_size,
+            "max_sessions": self.max_sessions,
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "total_wait_seconds": round(self.total_wait_seconds, 6),
+        }
+
+
+class SSHConnectionPool:
+    """
+    Ensemble de ``HostPool`` partageant un budget global de connexions.
+
+    Les clés sont libres (ex: ``read:mcp-reader@host``): les connexions
+    read-only et exec ne sont jamais partagées.
+
+    Usage:
+        async with pool.session(key, connect) as (conn, reused):
+            await conn.run(...)
+    """
+
+    def __init__(
+        self,
+        budget: ConnectionBudget,
+        *,
+        min_size: int = 1,
+        max_size: int = 3,
+        max_sessions: int = 8,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+    ):
+        self._budget = budget
+        self._options = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "max_sessions": max_sessions,
+            "idle_timeout": idle_timeout,
+            "acquire_timeout": acquire_timeout,
+        }
+        self._pools: dict[str, HostPool] = {}
+
+    def host_pool(self, key: str, connect: ConnectFactory) -> HostPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = HostPool(
+                key,
+                connect,
+                self._budget,
+                on_exhausted=self._evict_idle_elsewhere,
+                **self._options,
+            )
+            self._pools[key] = pool
+        return pool
+
+    @asynccontextmanager
+    async def session(
+        self, key: str, connect: ConnectFactory
+    ) -> AsyncIterator[tuple[SSHClientConnection, bool]]:
+        """Réserver un canal sur une connexion de ``key`` le temps du bloc."""
+        pool = self.host_pool(key, connect)
+        pooled, reused = await pool.acquire()
+        try:
+            yield pooled.conn, reused
+        finally:
+            pool.release(pooled)
+
+    def _evict_idle_elsewhere(self, requester: str) -> bool:
+        """Libérer une place dans le budget en fermant une connexion inactive d'un autre hôte."""
+        for key, pool in self._pools.items():
+            if key != requester and pool.evict_idle():
+                return True
+        return False
+
+    def close_all(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+    def stats(self) -> dict[str, dict]:
+        return {key: pool.stats() for key, pool in self._pools.items()}
@@ -0,0 +1,252 @@
+"""
+Cache TTL des résultats de diagnostics read-only.
+
+Clé: (hôte, utilisateur, argv). La durée de vie dépend de la commande
+(``/etc/os-release`` change rarement, ``/proc/loadavg`` en permanence);
+les commandes sans politique ne sont jamais mises en cache.
+
+- LRU borné en octets (stdout + stderr)
+- single-flight: les requêtes identiques concurrentes partagent une exécution
+- invalidation des entrées d'un hôte après une exécution distante
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from ..config import CONFIG
+from ..utils.metrics import REGISTRY, Counter, Gauge, snapshot
+from .singleflight import SingleFlight
+from .smart_ssh import execute_commands
+
+CommandResult = tuple[int, str, str]
+CacheKey = tuple[str, str, tuple[str, ...]]
+
+# Préfixe d'argv -> TTL en secondes (le préfixe le plus long l'emporte)
+DEFAULT_TTLS: dict[tuple[str, ...], float] = {
+    # Quasi statique
+    ("cat", "/etc/os-release"): 3600,
+    ("cat", "/proc/cpuinfo"): 3600,
+    ("lscpu",): 3600,
+    ("uname",): 3600,
+    ("hostname",): 3600,
+    ("lsblk",): 300,
+    ("cat", "/etc/resolv.conf"): 300,
+    # Configuration réseau / services
+    ("ip",): 30,
+    ("resolvectl",): 30,
+    ("systemctl", "list-units"): 10,
+    ("systemctl", "show"): 5,
+    ("systemctl", "status"): 5,
+    ("df",): 30,
+    # Métriques volatiles
+    ("free",): 5,
+    ("cat", "/proc/meminfo"): 5,
+    ("ss",): 5,
+    ("uptime",): 2,
+    ("cat", "/proc/loadavg"): 2,
+}
+
+
+@dataclass
+class CacheEntry:
+    """Résultat en cache."""
+
+    result: CommandResult
+    expires_at: float
+    size: int
+
+
+class ResultCache:
+    """LRU borné en octets avec expiration par entrée."""
+
+    def __init__(self, max_bytes: int, ttls: dict[tuple[str, ...], float] | None = None):
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.inflight = SingleFlight()
+
+        # Statistiques
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(command: list[str], host: str | None, username: str | None) -> CacheKey:
+        return (host or "local", username or CONFIG.user, tuple(command))
+
+    def ttl_for(self, command: list[str]) -> float:
+        """TTL de la politique la plus spécifique (0 = pas de cache)."""
+        for length in range(len(command), 0, -1):
+            ttl = self.ttls.get(tuple(command[:length]))
+            if ttl is not None:
+                return ttl
+        return 0
+
+    def get(self, key: CacheKey) -> CommandResult | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.result
+
+    def put(self, key: CacheKey, result: CommandResult, ttl: float) -> None:
+        _, stdout, stderr = result
+        size = len(stdout.encode()) + len(stderr.encode())
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CacheEntry(result, time.monotonic() + ttl, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_host(self, host: str | None) -> int:
+        """Oublier les résultats d'un hôte (son état a pu changer)."""
+        host = host or "local"
+        stale = [key for key in self._entries if key[0] == host]
+        for key in stale:
+            self._remove(key)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "coalesced": self.inflight.shared,
+            "evictions": self.evictions,
+        }
+
+
+# Global singleton
+_result_cache: ResultCache | None = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get result cache singleton."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(CONFIG.result_cache_max_bytes)
+    return _result_cache
+
+
+@REGISTRY.register_collector
+def _result_cache_metrics():
+    if _result_cache is None:
+        return []
+    stats = _result_cache.stats()
+    return [
+        snapshot(Counter, "mcp_result_cache_hits_total", "Diagnostics result cache hits", stats["hits"]),
+        snapshot(Counter, "mcp_result_cache_misses_total", "Diagnostics result cache misses", stats["misses"]),
+        snapshot(Gauge, "mcp_result_cache_hit_ratio", "Diagnostics result cache hit ratio", stats["hit_rate"]),
+        snapshot(Gauge, "mcp_result_cache_bytes", "Cached diagnostic output size", stats["bytes"]),
+        snapshot(Counter, "mcp_result_cache_coalesced_total", "Lookups that joined an in-flight execution", stats["coalesced"]),
+        snapshot(Counter, "mcp_result_cache_evictions_total", "Entries evicted to stay under the byte bound", stats["evictions"]),
+    ]
+
+
+async def cached_execute_commands(
+    commands: list[list[str]],
+    host: str | None = None,
+    username: str | None = None,
+    bypass_cache: bool = False,
+) -> list[CommandResult]:
+    """
+    ``execute_commands`` derrière le cache.
+
+    Les commandes absentes du cache partent ensemble dans un seul batch;
+    celles déjà en cours d'exécution par un autre appel sont attendues.
+
+    Args:
+        bypass_cache: Ignorer les résultats en cache (le résultat frais est mémorisé)
+    """
+    if not CONFIG.result_cache_enabled:
+        return await execute_commands(commands, host, username)
+
+    cache = get_result_cache()
+    results: list[CommandResult | None] = [None] * len(commands)
+    pending: dict[int, asyncio.Future] = {}
+    to_run: list[int] = []
+
+    for i, command in enumerate(commands):
+        key = cache.make_key(command, host, username)
+        if not bypass_cache and cache.ttl_for(command) > 0:
+            results[i] = cache.get(key)
+            if results[i] is not None:
+                continue
+            future = cache.inflight.join(key)
+            if future is not None:
+                pending[i] = future
+                continue
+        to_run.append(i)
+
+    if to_run:
+        batch = asyncio.ensure_future(
+            execute_commands([commands[i] for i in to_run], host, username)
+        )
+        for position, i in enumerate(to_run):
+            command = commands[i]
+            pending[i] = cache.inflight.start(
+                cache.make_key(command, host, username),
+                _store(cache, batch, position, command, host, username),
+            )
+
+    # Attendre toutes les futures (même après un échec), sinon leurs exceptions
+    # ne sont jamais récupérées
+    outcomes = await asyncio.gather(
+        *(asyncio.shield(future) for future in pending.values()), return_exceptions=True
+    )
+    for i, outcome in zip(pending, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            raise outcome
+        results[i] = outcome
+
+    return results  # type: ignore[return-value]
+
+
+async def cached_execute_command(
+    command: list[str],
+    host: str | None = None,
+    username: str | None = None,
+    bypass_cache: bool = False,
+) -> CommandResult:
+    """``execute_command`` derrière le cache."""
+    (result,) = await cached_execute_commands([command], host, username, bypass_cache)
+    return result
+
+
+async def _store(
+    cache: ResultCache,
+    batch: asyncio.Future,
+    position: int,
+    command: list[str],
+    host: str | None,
+    username: str | None,
+) -> CommandResult:
+    result = (await asyncio.shield(batch))[position]
+    cache.put(cache.make_key(command, host, username), result, cache.ttl_for(command))
+    return result
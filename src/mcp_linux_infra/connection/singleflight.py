@@ -0,0 +1,65 @@
+"""
+Single-flight: regroupement des appels concurrents identiques.
+
+Tant qu'un appel pour une clé est en cours, les appels suivants avec la
+même clé attendent son résultat au lieu de relancer le travail.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Table des appels en cours, indexés par clé."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+        # Statistiques
+        self.executions = 0
+        self.shared = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def start(self, key: Hashable, work: Awaitable[Any]) -> asyncio.Future:
+        """Enregistrer ``work`` comme l'appel en cours pour ``key``."""
+        future = asyncio.ensure_future(work)
+        self._calls[key] = future
+        self.executions += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, done: asyncio.Future) -> None:
+        # Un appel plus récent (ex: bypass du cache) a pu remplacer celui-ci
+        if self._calls.get(key) is done:
+            del self._calls[key]
+
+    def join(self, key: Hashable) -> asyncio.Future | None:
+        """Appel en cours pour ``key`` (compté comme partagé), ou None."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+        return future
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Exécuter ``fn`` une seule fois pour tous les appelants concurrents de ``key``.
+
+        L'annulation d'un appelant n'annule pas le travail partagé (shield).
+
+        Returns:
+            (résultat, shared) - shared=True si le résultat vient d'un autre appel
+        """
+        future = self.join(key)
+        shared = future is not None
+        if future is None:
+            future = self.start(key, fn())
+        return await asyncio.shield(future), shared
@@ -9,6 +9,8 @@ Hiérarchie de sécurité:
 
 import asyncio
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from enum import Enum
 from pathlib import Path
 
@@ -17,6 +19,18 @@ from asyncssh import SSHClientConnection
 
 from ..audit import EventType, LogLevel, Status, audit, log_ssh_connect
 from ..config import CONFIG
+from ..utils.metrics import (
+    REGISTRY,
+    SSH_CONNECT_DURATION,
+    SSH_EXEC_DURATION,
+    Counter,
+    Gauge,
+    snapshot,
+)
+from .batch import BatchProtocolError, decode_batch, encode_batch, make_nonce
+from .pool import ConnectionBudget, PoolExhaustedError, SSHConnectionPool
+from .singleflight import SingleFlight
+from .streaming import CommandStream, RunningProcess
 
 
 class SSHAuthMode(str, Enum):
@@ -38,7 +52,6 @@ class SmartSSHManager:
     """
 
     _instance: "SmartSSHManager | None" = None
-    _lock = asyncio.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -50,8 +63,21 @@ class SmartSSHManager:
         if self._initialized:
             return
 
-        self._read_connections: dict[str, SSHClientConnection] = {}
-        self._exec_connections: dict[str, SSHClientConnection] = {}
+        # Pool par clé user@host (verrou par hôte, plafond global partagé)
+        self._pool = SSHConnectionPool(
+            ConnectionBudget(CONFIG.ssh_max_connections),
+            min_size=CONFIG.ssh_pool_min_per_host,
+            max_size=CONFIG.ssh_pool_max_per_host,
+            max_sessions=CONFIG.ssh_max_sessions_per_connection,
+            idle_timeout=CONFIG.ssh_pool_idle_timeout,
+            acquire_timeout=CONFIG.ssh_connection_timeout,
+        )
+
+        # Commandes read-only identiques en cours: une seule exécution partagée
+        self._inflight = SingleFlight()
+
+        # Hôtes dont le wrapper ne connaît pas le verbe "batch"
+        self._batch_unsupported: set[str] = set()
 
         # Détection méthode d'authentification
         self._auth_mode = self._detect_auth_mode()
@@ -197,149 +223,190 @@ class SmartSSHManager:
         """Retourner le mode d'authentification actuel."""
         return self._auth_mode
 
+    def _pool_key(self, kind: str, host: str, username: str) -> str:
+        return f"{kind}:{username}@{host}"
+
     async def get_read_connection(
         self, host: str, username: str | None = None
     ) -> SSHClientConnection:
-        """Get read-only SSH connection (diagnostics)."""
-        username = username or CONFIG.user
-        key = f"{username}@{host}"
-
-        async with self._lock:
-            # Reuse existing
-            if key in self._read_connections:
-                conn = self._read_connections[key]
-                if not conn.is_closed():
-                    log_ssh_connect(host, username, Status.SUCCESS, reused=True)
-                    return conn
-
-            # Create new connection
-            try:
-                if self._auth_mode == SSHAuthMode.AGENT:
-                    # Via SSH Agent (préféré)
-                    conn = await asyncssh.connect(
-                        host=host,
-                        username=username,
-                        agent_path=os.environ.get("SSH_AUTH_SOCK"),
-                        client_keys=None,  # Agent only
-                        known_hosts=None,
-                        connect_timeout=CONFIG.ssh_connection_timeout,
-                        keepalive_interval=CONFIG.ssh_keepalive_interval,
-                    )
-
-                elif self._auth_mode == SSHAuthMode.DIRECT:
-                    # Fallback: clés directes
-                    conn = await asyncssh.connect(
-                        host=host,
-                        username=username,
-                        client_keys=[self._reader_key] if self._reader_key else None,
-                        passphrase=CONFIG.key_passphrase,
-                        known_hosts=None,
-                        connect_timeout=CONFIG.ssh_connection_timeout,
-                        keepalive_interval=CONFIG.ssh_keepalive_interval,
-                    )
-
-                else:
-                    raise SSHConnectionError("No authentication method available")
-
-                self._read_connections[key] = conn
-                log_ssh_connect(host, username, Status.SUCCESS, reused=False)
-                return conn
-
-            except asyncssh.misc.ChannelOpenError as e:
-                if "agent" in str(e).lower() and self._auth_mode == SSHAuthMode.AGENT:
-                    # Agent configuré mais clé manquante
-                    audit.log_event(
-                        EventType.SECURITY_VIOLATION,
-                        Status.FAILURE,
-                        {
-                            "error": "ssh_agent_key_missing",
-                            "host": host,
-                            "username": username,
-                            "solution": f"Load key with: ssh-add {CONFIG.ssh_key_path or '/path/to/mcp-reader.key'}",
-                        },
-                        level=LogLevel.ERROR,
-                    )
-                    raise SSHConnectionError(
-                        f"SSH Agent active but mcp-reader key not loaded.\n"
-                        f"Fix: ssh-add {CONFIG.ssh_key_path or '/path/to/mcp-reader.key'}"
-                    )
-                raise
+        """
+        Get read-only SSH connection (diagnostics).
 
-            except Exception as e:
-                log_ssh_connect(host, username, Status.FAILURE, error=str(e))
-                raise SSHConnectionError(f"Failed to connect to {host}: {e}")
+        Le canal n'est pas réservé: préférer ``read_session`` pour que le
+        plafond de sessions par connexion s'applique.
+        """
+        async with self.read_session(host, username) as conn:
+            return conn
 
     async def get_exec_connection(
         self, host: str, username: str | None = None
     ) -> SSHClientConnection:
         """Get exec SSH connection (remote executions)."""
+        async with self.exec_session(host, username) as conn:
+            return conn
+
+    @asynccontextmanager
+    async def read_session(
+        self, host: str, username: str | None = None
+    ) -> AsyncIterator[SSHClientConnection]:
+        """Réserver un canal read-only sur la connexion poolée de ``username@host``."""
+        username = username or CONFIG.user
+        key = self._pool_key("read", host, username)
+
+        async with self._session(
+            key, host, username, lambda: self._open_read_connection(host, username)
+        ) as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def exec_session(
+        self, host: str, username: str | None = None
+    ) -> AsyncIterator[SSHClientConnection]:
+        """Réserver un canal exec sur la connexion poolée de ``username@host``."""
         username = username or CONFIG.exec_user
-        key = f"{username}@{host}"
+        key = self._pool_key("exec", host, username)
 
-        async with self._lock:
-            # Reuse existing
-            if key in self._exec_connections:
-                conn = self._exec_connections[key]
-                if not conn.is_closed():
-                    log_ssh_connect(host, username, Status.SUCCESS, reused=True)
-                    return conn
+        async with self._session(
+            key, host, username, lambda: self._open_exec_connection(host, username)
+        ) as conn:
+            yield conn
 
-            # Create new connection
-            try:
-                if self._auth_mode == SSHAuthMode.AGENT:
-                    conn = await asyncssh.connect(
-                        host=host,
-                        username=username,
-                        agent_path=os.environ.get("SSH_AUTH_SOCK"),
-                        client_keys=None,
-                        known_hosts=None,
-                        connect_timeout=CONFIG.ssh_connection_timeout,
-                        keepalive_interval=CONFIG.ssh_keepalive_interval,
-                    )
+    @asynccontextmanager
+    async def _session(
+        self, key: str, host: str, username: str, connect
+    ) -> AsyncIterator[SSHClientConnection]:
+        kind = key.split(":", 1)[0]
 
-                elif self._auth_mode == SSHAuthMode.DIRECT:
-                    conn = await asyncssh.connect(
-                        host=host,
-                        username=username,
-                        client_keys=[self._exec_key] if self._exec_key else None,
-                        passphrase=CONFIG.exec_key_passphrase,
-                        known_hosts=None,
-                        connect_timeout=CONFIG.ssh_connection_timeout,
-                        keepalive_interval=CONFIG.ssh_keepalive_interval,
-                    )
+        async def timed_connect() -> SSHClientConnection:
+            with SSH_CONNECT_DURATION.time(kind=kind, host=host):
+                return await connect()
 
-                else:
-                    raise SSHConnectionError("No authentication method available")
+        try:
+            async with self._pool.session(key, timed_connect) as (conn, reused):
+                if reused:
+                    log_ssh_connect(host, username, Status.SUCCESS, reused=True)
+                yield conn
+        except PoolExhaustedError as e:
+            log_ssh_connect(host, username, Status.FAILURE, error=str(e))
+            raise SSHConnectionError(str(e)) from e
 
-                self._exec_connections[key] = conn
-                log_ssh_connect(host, username, Status.SUCCESS, reused=False)
-                return conn
+    async def _open_read_connection(self, host: str, username: str) -> SSHClientConnection:
+        """Ouvrir une nouvelle connexion read-only (appelé par le pool)."""
+        try:
+            if self._auth_mode == SSHAuthMode.AGENT:
+                # Via SSH Agent (préféré)
+                conn = await asyncssh.connect(
+                    host=host,
+                    username=username,
+                    agent_path=os.environ.get("SSH_AUTH_SOCK"),
+                    client_keys=None,  # Agent only
+                    known_hosts=None,
+                    connect_timeout=CONFIG.ssh_connection_timeout,
+                    keepalive_interval=CONFIG.ssh_keepalive_interval,
+                )
+
+            elif self._auth_mode == SSHAuthMode.DIRECT:
+                # Fallback: clés directes
+                conn = await asyncssh.connect(
+                    host=host,
+                    username=username,
+                    client_keys=[self._reader_key] if self._reader_key else None,
+                    passphrase=CONFIG.key_passphrase,
+                    known_hosts=None,
+                    connect_timeout=CONFIG.ssh_connection_timeout,
+                    keepalive_interval=CONFIG.ssh_keepalive_interval,
+                )
+
+            else:
+                raise SSHConnectionError("No authentication method available")
+
+            log_ssh_connect(host, username, Status.SUCCESS, reused=False)
+            return conn
+
+        except asyncssh.misc.ChannelOpenError as e:
+            if "agent" in str(e).lower() and self._auth_mode == SSHAuthMode.AGENT:
+                # Agent configuré mais clé manquante
+                audit.log_event(
+                    EventType.SECURITY_VIOLATION,
+                    Status.FAILURE,
+                    {
+                        "error": "ssh_agent_key_missing",
+                        "host": host,
+                        "username": username,
+                        "solution": f"Load key with: ssh-add {CONFIG.ssh_key_path or '/path/to/mcp-reader.key'}",
+                    },
+                    level=LogLevel.ERROR,
+                )
+                raise SSHConnectionError(
+                    f"SSH Agent active but mcp-reader key not loaded.\n"
+                    f"Fix: ssh-add {CONFIG.ssh_key_path or '/path/to/mcp-reader.key'}"
+                )
+            raise
 
-            except asyncssh.misc.ChannelOpenError as e:
-                if "agent" in str(e).lower() and self._auth_mode == SSHAuthMode.AGENT:
-                    audit.log_event(
-                        EventType.SECURITY_VIOLATION,
-                        Status.FAILURE,
-                        {
-                            "error": "ssh_agent_pra_key_missing",
-                            "host": host,
-                            "username": username,
-                            "solution": f"Load Remote Execution key with: ssh-add {CONFIG.exec_key_path or '/path/to/exec-runner.key'}",
-                        },
-                        level=LogLevel.ERROR,
-                    )
-                    raise SSHConnectionError(
-                        f"SSH Agent active but exec-runner key not loaded.\n"
-                        f"Fix: ssh-add {CONFIG.exec_key_path or '/path/to/exec-runner.key'}"
-                    )
-                raise
+        except Exception as e:
+            log_ssh_connect(host, username, Status.FAILURE, error=str(e))
+            raise SSHConnectionError(f"Failed to connect to {host}: {e}")
 
-            except Exception as e:
-                log_ssh_connect(host, username, Status.FAILURE, error=str(e))
-                raise SSHConnectionError(f"Failed to connect to {host} for Remote Execution: {e}")
+    async def _open_exec_connection(self, host: str, username: str) -> SSHClientConnection:
+        """Ouvrir une nouvelle connexion exec (appelé par le pool)."""
+        try:
+            if self._auth_mode == SSHAuthMode.AGENT:
+                conn = await asyncssh.connect(
+                    host=host,
+                    username=username,
+                    agent_path=os.environ.get("SSH_AUTH_SOCK"),
+                    client_keys=None,
+                    known_hosts=None,
+                    connect_timeout=CONFIG.ssh_connection_timeout,
+                    keepalive_interval=CONFIG.ssh_keepalive_interval,
+                )
+
+            elif self._auth_mode == SSHAuthMode.DIRECT:
+                conn = await asyncssh.connect(
+                    host=host,
+                    username=username,
+                    client_keys=[self._exec_key] if self._exec_key else None,
+                    passphrase=CONFIG.exec_key_passphrase,
+                    known_hosts=None,
+                    connect_timeout=CONFIG.ssh_connection_timeout,
+                    keepalive_interval=CONFIG.ssh_keepalive_interval,
+                )
+
+            else:
+                raise SSHConnectionError("No authentication method available")
+
+            log_ssh_connect(host, username, Status.SUCCESS, reused=False)
+            return conn
+
+        except asyncssh.misc.ChannelOpenError as e:
+            if "agent" in str(e).lower() and self._auth_mode == SSHAuthMode.AGENT:
+                audit.log_event(
+                    EventType.SECURITY_VIOLATION,
+                    Status.FAILURE,
+                    {
+                        "error": "ssh_agent_pra_key_missing",
+                        "host": host,
+                        "username": username,
+                        "solution": f"Load Remote Execution key with: ssh-add {CONFIG.exec_key_path or '/path/to/exec-runner.key'}",
+                    },
+                    level=LogLevel.ERROR,
+                )
+                raise SSHConnectionError(
+                    f"SSH Agent active but exec-runner key not loaded.\n"
+                    f"Fix: ssh-add {CONFIG.exec_key_path or '/path/to/exec-runner.key'}"
+                )
+            raise
+
+        except Exception as e:
+            log_ssh_connect(host, username, Status.FAILURE, error=str(e))
+            raise SSHConnectionError(f"Failed to connect to {host} for Remote Execution: {e}")
 
     async def execute_read_command(
-        self, host: str, command: list[str], username: str | None = None
+        self,
+        host: str,
+        command: list[str],
+        username: str | None = None,
+        input: str | None = None,
     ) -> tuple[int, str, str]:
         """Execute read-only command."""
         username = username or CONFIG.user
@@ -353,17 +420,167 @@ class SmartSSHManager:
             )
             raise SSHConnectionError(f"Host {host} not in allowed list")
 
-        conn = await self.get_read_connection(host, username)
+        # Les appels concurrents identiques attendent la même exécution
+        # (clé exacte: les espaces comptent à l'intérieur d'un argument cité)
+        result, _ = await self._inflight.do(
+            (host, username, tuple(command), input),
+            lambda: self._run_read_command(host, command, username, input),
+        )
+        return result
 
-        try:
-            result = await conn.run(" ".join(command), check=False)
-            returncode = result.exit_status or 0
-            stdout = result.stdout or ""
-            stderr = result.stderr or ""
-            return returncode, stdout, stderr
+    async def _run_read_command(
+        self, host: str, command: list[str], username: str, input: str | None
+    ) -> tuple[int, str, str]:
+        async with self.read_session(host, username) as conn:
+            try:
+                with SSH_EXEC_DURATION.time(kind="read", host=host):
+                    result = await conn.run(" ".join(command), input=input, check=False)
+                returncode = result.exit_status or 0
+                stdout = result.stdout or ""
+                stderr = result.stderr or ""
+                return returncode, stdout, stderr
 
-        except Exception as e:
-            raise SSHConnectionError(f"Command execution failed on {host}: {e}")
+            except Exception as e:
+                raise SSHConnectionError(f"Command execution failed on {host}: {e}")
+
+    @asynccontextmanager
+    async def stream_read_command(
+        self,
+        host: str,
+        command: list[str],
+        username: str | None = None,
+        max_bytes: int | None = None,
+        max_lines: int | None = None,
+    ) -> AsyncIterator[CommandStream]:
+        """
+        Stream a read-only command's stdout line by line.
+
+        The channel stays reserved while the caller iterates; SSH flow
+        control slows the remote process down when the caller does not
+        read. The channel is closed (remote process interrupted) once the
+        byte/line budget is exhausted or the block exits early.
+        """
+        username = username or CONFIG.user
+
+        if not CONFIG.is_host_allowed(host):
+            audit.log_event(
+                EventType.SECURITY_VIOLATION,
+                Status.DENIED,
+                {"error": "host_not_allowed", "host": host, "command": " ".join(command)},
+                level=LogLevel.WARNING,
+            )
+            raise SSHConnectionError(f"Host {host} not in allowed list")
+
+        async with self.read_session(host, username) as conn:
+            try:
+                process = await conn.create_process(" ".join(command), encoding=None)
+            except Exception as e:
+                raise SSHConnectionError(f"Command execution failed on {host}: {e}")
+
+            async def wait() -> int | None:
+                await process.wait_closed()
+                return process.exit_status
+
+            stream = CommandStream(
+                process.stdout, process.stderr, process.close, wait, max_bytes, max_lines
+            )
+            try:
+                yield stream
+            finally:
+                await stream.aclose()
+
+    @asynccontextmanager
+    async def open_process(
+        self, host: str, command: str, username: str | None = None, exec: bool = False
+    ) -> AsyncIterator[RunningProcess]:
+        """
+        Start a command without waiting for it (background jobs).
+
+        No output budget: the caller drains stdout/stderr as they arrive.
+        The channel is closed when the block exits, interrupting the remote
+        process if it is still running.
+
+        Args:
+            command: Shell command (read user) or action (exec user)
+            exec: Run as the exec user (remote execution) instead of read-only
+        """
+        username = username or (CONFIG.exec_user if exec else CONFIG.user)
+
+        if not CONFIG.is_host_allowed(host):
+            audit.log_event(
+                EventType.SECURITY_VIOLATION,
+                Status.DENIED,
+                {"error": "host_not_allowed", "host": host, "command": command},
+                level=LogLevel.WARNING,
+            )
+            raise SSHConnectionError(f"Host {host} not in allowed list")
+
+        session = self.exec_session if exec else self.read_session
+        remote = command if exec else " ".join(["/bin/sh", "-c", command])
+        async with session(host, username) as conn:
+            try:
+                process = await conn.create_process(remote, encoding=None)
+            except Exception as e:
+                raise SSHConnectionError(f"Command execution failed on {host}: {e}")
+
+            async def wait() -> int | None:
+                await process.wait_closed()
+                return process.exit_status
+
+            try:
+                yield RunningProcess(process.stdout, process.stderr, process.close, wait)
+            finally:
+                process.close()
+                if exec:
+                    from .result_cache import get_result_cache
+
+                    get_result_cache().invalidate_host(host)
+
+    async def execute_read_batch(
+        self, host: str, commands: list[list[str]], username: str | None = None
+    ) -> list[tuple[int, str, str]]:
+        """
+        Execute several read-only commands in one SSH round-trip.
+
+        Uses the ``batch`` verb of mcp-wrapper, which re-checks every probe
+        against its whitelist. Falls back to concurrent channels on the pooled
+        connection when the remote wrapper does not support batching; after a
+        failed batch round-trip the host only gets single calls.
+        """
+        username = username or CONFIG.user
+        key = self._pool_key("read", host, username)
+
+        if CONFIG.ssh_batch_probes and len(commands) > 1 and key not in self._batch_unsupported:
+            nonce = make_nonce()
+            try:
+                request, stdin = encode_batch(commands, nonce)
+            except BatchProtocolError:
+                pass  # Sonde non groupable: exécution séparée, le batch reste possible
+            else:
+                returncode, stdout, stderr = await self.execute_read_command(
+                    host, [request], username, input=stdin
+                )
+                try:
+                    if returncode != 0:
+                        raise BatchProtocolError(
+                            f"Batch exited with {returncode}: {stderr.strip()[:200]}"
+                        )
+                    return decode_batch(stdout, nonce, len(commands))
+                except BatchProtocolError as e:
+                    # Wrapper ancien ou réponse inexploitable: ne plus retenter le batch sur cet hôte
+                    self._batch_unsupported.add(key)
+                    audit.log_event(
+                        EventType.TOOL_CALL,
+                        Status.FAILURE,
+                        {"component": "probe_batch", "host": host, "fallback": "sequential", "error": str(e)},
+                        level=LogLevel.DEBUG,
+                    )
+
+        return list(
+            await asyncio.gather(
+                *(self.execute_read_command(host, command, username) for command in commands)
+            )
+        )
 
     async def execute_exec_command(
         self, host: str, action: str, username: str | None = None
@@ -380,30 +597,39 @@ class SmartSSHManager:
             )
             raise SSHConnectionError(f"Host {host} not in allowed list")
 
-        conn = await self.get_exec_connection(host, username)
+        from .result_cache import get_result_cache
 
-        try:
-            result = await conn.run(action, check=False)
-            returncode = result.exit_status or 0
-            stdout = result.stdout or ""
-            stderr = result.stderr or ""
-            return returncode, stdout, stderr
+        async with self.exec_session(host, username) as conn:
+            try:
+                with SSH_EXEC_DURATION.time(kind="exec", host=host):
+                    result = await conn.run(action, check=False)
+                returncode = result.exit_status or 0
+                stdout = result.stdout or ""
+                stderr = result.stderr or ""
+                return returncode, stdout, stderr
 
-        except Exception as e:
-            raise SSHConnectionError(f"remote execution '{action}' failed on {host}: {e}")
+            except Exception as e:
+                raise SSHConnectionError(f"remote execution '{action}' failed on {host}: {e}")
+
+            finally:
+                # L'action a pu changer l'état observé par les diagnostics en cache
+                get_result_cache().invalidate_host(host)
+
+    def get_pool_stats(self) -> dict[str, dict]:
+        """Statistiques du pool par clé ``kind:user@host``."""
+        return self._pool.stats()
+
+    def get_coalescing_stats(self) -> dict[str, int]:
+        """Exécutions read-only lancées, économisées (partagées) et en cours."""
+        return {
+            "executions": self._inflight.executions,
+            "saved_executions": self._inflight.shared,
+            "in_flight": self._inflight.in_flight,
+        }
 
     async def close_all(self):
         """Close all connections."""
-        async with self._lock:
-            for conn in list(self._read_connections.values()):
-                if not conn.is_closed():
-                    conn.close()
-            self._read_connections.clear()
-
-            for conn in list(self._exec_connections.values()):
-                if not conn.is_closed():
-                    conn.close()
-            self._exec_connections.clear()
+        self._pool.close_all()
 
 
 class SSHConnectionError(Exception):
@@ -416,6 +642,29 @@ class SSHConnectionError(Exception):
 _smart_manager: SmartSSHManager | None = None
 
 
+@REGISTRY.register_collector
+def _ssh_metrics():
+    if _smart_manager is None:
+        return []
+    pools = _smart_manager.get_pool_stats()
+    coalescing = _smart_manager.get_coalescing_stats()
+
+    def per_pool(field: str) -> dict[tuple[str, ...], float]:
+        return {(key,): stats[field] for key, stats in pools.items()}
+
+    return [
+        snapshot(Gauge, "mcp_ssh_pool_connections", "Open pooled SSH connections", per_pool("connections"), ("pool",)),
+        snapshot(Gauge, "mcp_ssh_pool_in_use", "SSH sessions (channels) in use", per_pool("in_use"), ("pool",)),
+        snapshot(Gauge, "mcp_ssh_pool_waiting", "Callers waiting for an SSH session", per_pool("waiting"), ("pool",)),
+        snapshot(Gauge, "mcp_ssh_pool_max_connections", "Connection cap per pool", per_pool("max_connections"), ("pool",)),
+        snapshot(Counter, "mcp_ssh_pool_connects_total", "SSH connections opened", per_pool("connects"), ("pool",)),
+        snapshot(Counter, "mcp_ssh_pool_reuses_total", "Sessions served by an existing connection", per_pool("reuses"), ("pool",)),
+        snapshot(Counter, "mcp_ssh_executions_total", "Read-only remote executions started", coalescing["executions"]),
+        snapshot(Counter, "mcp_ssh_coalesced_executions_total", "Read-only executions saved by coalescing", coalescing["saved_executions"]),
+        snapshot(Gauge, "mcp_ssh_executions_in_flight", "Read-only executions in flight", coalescing["in_flight"]),
+    ]
+
+
 def get_smart_ssh_manager() -> SmartSSHManager:
     """Get smart SSH manager singleton."""
     global _smart_manager
@@ -449,6 +698,27 @@ async def execute_command(
         return await manager.execute_read_command(host, command, username)
 
 
+async def execute_commands(
+    commands: list[list[str]],
+    host: str | None = None,
+    username: str | None = None,
+) -> list[tuple[int, str, str]]:
+    """
+    Execute several read-only commands, batched into one round-trip when remote.
+
+    Results are returned in ``commands`` order.
+    """
+    if not commands:
+        return []
+
+    if host is None:
+        # Local: pas de round-trip à économiser, exécution concurrente
+        return list(await asyncio.gather(*(execute_command(c, None, username) for c in commands)))
+
+    manager = get_smart_ssh_manager()
+    return await manager.execute_read_batch(host, commands, username)
+
+
 async def execute_remote_execution(
     action: str,
     host: str,
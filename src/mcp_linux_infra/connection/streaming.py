@@ -0,0 +1,282 @@
+"""
+Lecture en flux de la sortie d'une commande, avec budget.
+
+Au lieu de tout bufferiser (``conn.run``), la sortie est lue par blocs
+au rythme du consommateur: tant qu'on ne lit pas, le pipe local ou la
+fenêtre SSH se remplit et le processus distant est ralenti (backpressure).
+Quand le budget en octets ou en lignes est épuisé, le processus est
+interrompu au lieu de produire des centaines de Mo pour rien.
+
+Usage:
+    async with stream_command(["journalctl", "--no-pager"], host, max_lines=500) as stream:
+        async for line in stream:
+            ...
+    stream.truncated, stream.returncode, stream.stderr
+"""
+
+import asyncio
+import os
+import signal
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Protocol
+
+from ..config import CONFIG
+from ..utils.output import OutputLimiter
+
+CHUNK_SIZE = 64 * 1024
+STDERR_LIMIT = 64 * 1024
+STOP_TIMEOUT = 5.0
+
+TRUNCATION_MARKER = "[... output truncated after {lines} lines / {bytes} bytes ...]"
+
+
+class ByteReader(Protocol):
+    """asyncio.StreamReader ou SSHReader ouvert avec ``encoding=None``."""
+
+    async def read(self, n: int = -1) -> bytes: ...
+
+
+class CommandStream:
+    """Itérateur asynchrone sur les lignes de stdout d'une commande en cours."""
+
+    def __init__(
+        self,
+        stdout: ByteReader,
+        stderr: ByteReader,
+        stop: Callable[[], None],
+        wait: Callable[[], Awaitable[int | None]],
+        max_bytes: int | None = None,
+        max_lines: int | None = None,
+    ):
+        self.max_bytes = max_bytes if max_bytes is not None else CONFIG.stream_max_bytes
+        self.max_lines = max_lines if max_lines is not None else CONFIG.stream_max_lines
+
+        self._stdout = stdout
+        self._stop = stop
+        self._wait = wait
+        self._buffer = b""
+        self._finished = False
+        self._stderr_chunks: list[bytes] = []
+        self._stderr_task = asyncio.ensure_future(self._drain_stderr(stderr))
+
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.truncated = False
+        self.returncode: int | None = None
+
+    @property
+    def stderr(self) -> str:
+        return b"".join(self._stderr_chunks).decode("utf-8", errors="replace")
+
+    def marker(self) -> str:
+        """Marqueur de troncature (chaîne vide si la sortie est complète)."""
+        if not self.truncated:
+            return ""
+        return TRUNCATION_MARKER.format(lines=self.lines_read, bytes=self.bytes_read)
+
+    def __aiter__(self) -> "CommandStream":
+        return self
+
+    async def __anext__(self) -> str:
+        if self._finished:
+            raise StopAsyncIteration
+
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline >= 0:
+                line, self._buffer = self._buffer[: newline + 1], self._buffer[newline + 1 :]
+                break
+
+            if len(self._buffer) > self.max_bytes - self.bytes_read:
+                # Ligne sans fin qui dépasse déjà le budget
+                await self._finish(truncated=True, stop=True)
+                raise StopAsyncIteration
+
+            chunk = await self._stdout.read(CHUNK_SIZE)
+            if not chunk:
+                line, self._buffer = self._buffer, b""
+                if not line:
+                    await self._finish(truncated=False, stop=False)
+                    raise StopAsyncIteration
+                break
+            self._buffer += chunk
+
+        if self.lines_read >= self.max_lines or self.bytes_read + len(line) > self.max_bytes:
+            await self._finish(truncated=True, stop=True)
+            raise StopAsyncIteration
+
+        self.lines_read += 1
+        self.bytes_read += len(line)
+        return line.decode("utf-8", errors="replace")
+
+    async def read_all(self) -> str:
+        """Consommer le reste du flux (dans la limite du budget)."""
+        return "".join([line async for line in self])
+
+    async def aclose(self) -> None:
+        """Arrêter le processus s'il tourne encore et libérer les ressources."""
+        if not self._finished:
+            await self._finish(truncated=self.truncated, stop=True)
+
+    async def _finish(self, truncated: bool, stop: bool) -> None:
+        self._finished = True
+        self.truncated = truncated
+        self._buffer = b""
+
+        if stop:
+            try:
+                self._stop()
+            except (ProcessLookupError, OSError):
+                pass  # Déjà terminé
+
+        try:
+            self.returncode = await asyncio.wait_for(self._wait(), STOP_TIMEOUT)
+        except TimeoutError:
+            self.returncode = None
+
+        # stderr se termine avec le processus (wait_for annule si bloqué)
+        try:
+            await asyncio.wait_for(self._stderr_task, STOP_TIMEOUT)
+        except (TimeoutError, asyncio.CancelledError):
+            pass
+
+    async def _drain_stderr(self, stderr: ByteReader) -> None:
+        # Toujours vider stderr (sinon le processus peut bloquer), garder le début
+        kept = 0
+        try:
+            while chunk := await stderr.read(CHUNK_SIZE):
+                if kept < STDERR_LIMIT:
+                    self._stderr_chunks.append(chunk[: STDERR_LIMIT - kept])
+                    kept += len(chunk)
+        except Exception:
+            pass  # Canal fermé après interruption du processus
+
+
+@dataclass
+class StreamedOutput:
+    """Sortie collectée d'une commande lue en flux."""
+
+    returncode: int | None
+    stdout: str
+    stderr: str
+    truncated: bool
+    marker: str = ""
+
+    @property
+    def ok(self) -> bool:
+        # Une sortie coupée par le budget n'est pas un échec de la commande
+        return self.truncated or self.returncode == 0
+
+    def text(self) -> str:
+        """stdout suivi du marqueur de troncature éventuel."""
+        if not self.marker:
+            return self.stdout
+        return self.stdout.rstrip("\n") + f"\n{self.marker}\n"
+
+
+@dataclass
+class RunningProcess:
+    """Processus lancé sans budget ni attente (jobs en arrière-plan)."""
+
+    stdout: ByteReader
+    stderr: ByteReader
+    stop: Callable[[], None]
+    wait: Callable[[], Awaitable[int | None]]
+
+
+def _local_stop(proc: asyncio.subprocess.Process) -> Callable[[], None]:
+    def stop() -> None:
+        # Tout le groupe: les sous-processus d'un pipeline gardent sinon les pipes ouverts
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()  # Windows
+
+    return stop
+
+
+@asynccontextmanager
+async def local_process(command: list[str]) -> AsyncIterator[RunningProcess]:
+    """Lancer une commande locale; elle est tuée si elle tourne encore à la sortie du bloc."""
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        yield RunningProcess(proc.stdout, proc.stderr, _local_stop(proc), proc.wait)
+    finally:
+        if proc.returncode is None:
+            try:
+                _local_stop(proc)()
+            except (ProcessLookupError, OSError):
+                pass  # Déjà terminé
+            await proc.wait()
+
+
+@asynccontextmanager
+async def stream_local_command(
+    command: list[str],
+    max_bytes: int | None = None,
+    max_lines: int | None = None,
+) -> AsyncIterator[CommandStream]:
+    """Lancer une commande locale et itérer sur sa sortie."""
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+
+    stream = CommandStream(proc.stdout, proc.stderr, _local_stop(proc), proc.wait, max_bytes, max_lines)
+    try:
+        yield stream
+    finally:
+        await stream.aclose()
+
+
+@asynccontextmanager
+async def stream_command(
+    command: list[str],
+    host: str | None = None,
+    username: str | None = None,
+    max_bytes: int | None = None,
+    max_lines: int | None = None,
+) -> AsyncIterator[CommandStream]:
+    """Stream a read-only command, locally or over the pooled SSH connection."""
+    if host is None:
+        async with stream_local_command(command, max_bytes, max_lines) as stream:
+            yield stream
+    else:
+        from .smart_ssh import get_smart_ssh_manager
+
+        manager = get_smart_ssh_manager()
+        async with manager.stream_read_command(
+            host, command, username, max_bytes, max_lines
+        ) as stream:
+            yield stream
+
+
+async def read_command_output(
+    command: list[str],
+    host: str | None = None,
+    username: str | None = None,
+    max_bytes: int | None = None,
+    max_lines: int | None = None,
+) -> StreamedOutput:
+    """
+    Collect a streamed command's output within the budget.
+
+    Lines go through an ``OutputLimiter`` as they arrive: only the head and
+    tail that fit in a tool response are kept in memory.
+    """
+    limiter = OutputLimiter()
+    async with stream_command(command, host, username, max_bytes, max_lines) as stream:
+        async for line in stream:
+            limiter.feed(line)
+    return StreamedOutput(
+        stream.returncode, limiter.result(), stream.stderr, stream.truncated, stream.marker()
+    )
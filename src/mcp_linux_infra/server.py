@@ -1,110 +1,216 @@
 """MCP Linux Infra Server - Production-Ready Infrastructure Management."""
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
+from .connection import get_result_cache, report_progress_to
 from .tools.diagnostics import logs, network, services, system
 from .tools.remote_exec import actions
 from .tools.execution import ssh_executor
+from .utils.metrics import instrument_tool
+from .utils.output import limited
 
 # Initialize MCP server with FastMCP
 mcp = FastMCP("mcp-linux-infra")
 
 
+def tool(limit: bool = True):
+    """
+    Register an MCP tool: timed and audited, response through the output size limiter.
+
+    Args:
+        limit: False for responses that must stay verbatim (Prometheus exposition text)
+    """
+
+    def decorator(fn):
+        return mcp.tool()(instrument_tool(limited(fn) if limit else fn))
+
+    return decorator
+
+
 # ============================================================================
 # DIAGNOSTIC TOOLS (Read-Only via SSH mcp-reader)
 # ============================================================================
 
-@mcp.tool()
-async def get_system_info(host: str | None = None) -> str:
-    """Get comprehensive system information (read-only)."""
-    return await system.get_system_info(host)
+@tool()
+async def get_system_info(
+    host: str | None = None,
+    hosts: list[str] | None = None,
+    bypass_cache: bool = False,
+    *,
+    ctx: Context,
+) -> str:
+    """Get comprehensive system information (read-only). Use hosts=[...] (globs allowed) for a fleet. Cached briefly; bypass_cache=True to refresh."""
+    with report_progress_to(ctx):
+        return await system.get_system_info(host, hosts, bypass_cache)
 
 
-@mcp.tool()
-async def get_cpu_info(host: str | None = None) -> str:
-    """Get CPU information (read-only)."""
-    return await system.get_cpu_info(host)
+@tool()
+async def get_cpu_info(host: str | None = None, bypass_cache: bool = False) -> str:
+    """Get CPU information (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await system.get_cpu_info(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
-async def get_memory_info(host: str | None = None) -> str:
-    """Get memory information (read-only)."""
-    return await system.get_memory_info(host)
+@tool()
+async def get_memory_info(
+    host: str | None = None,
+    hosts: list[str] | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    *,
+    ctx: Context,
+) -> str:
+    """Get memory information (read-only). Use hosts=[...] (globs allowed) for a fleet. format="json" returns compact records (bytes); fields=[...] keeps only those keys. Cached briefly; bypass_cache=True to refresh."""
+    with report_progress_to(ctx):
+        return await system.get_memory_info(host, hosts, bypass_cache, format, fields)
 
 
-@mcp.tool()
-async def get_disk_usage(host: str | None = None) -> str:
-    """Get disk usage information (read-only)."""
-    return await system.get_disk_usage(host)
+@tool()
+async def get_disk_usage(
+    host: str | None = None,
+    hosts: list[str] | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    *,
+    ctx: Context,
+) -> str:
+    """Get disk usage information (read-only). Use hosts=[...] (globs allowed) for a fleet. format="json" returns compact records (bytes); fields=[...] keeps only those keys. Cached briefly; bypass_cache=True to refresh."""
+    with report_progress_to(ctx):
+        return await system.get_disk_usage(host, hosts, bypass_cache, format, fields)
 
 
-@mcp.tool()
-async def get_block_devices(host: str | None = None) -> str:
-    """List block devices (read-only)."""
-    return await system.get_block_devices(host)
+@tool()
+async def get_block_devices(host: str | None = None, bypass_cache: bool = False) -> str:
+    """List block devices (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await system.get_block_devices(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
-async def list_services(host: str | None = None) -> str:
-    """List all systemd services (read-only)."""
-    return await services.list_services(host)
+@tool()
+async def list_services(host: str | None = None, bypass_cache: bool = False) -> str:
+    """List all systemd services (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await services.list_services(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
-async def get_service_status(service_name: str, host: str | None = None) -> str:
-    """Get detailed status of a systemd service (read-only)."""
-    return await services.get_service_status(service_name, host)
+@tool()
+async def get_service_status(
+    service_name: str,
+    host: str | None = None,
+    hosts: list[str] | None = None,
+    bypass_cache: bool = False,
+    *,
+    ctx: Context,
+) -> str:
+    """Get detailed status of a systemd service (read-only). Use hosts=[...] for a fleet. Cached briefly; bypass_cache=True to refresh."""
+    with report_progress_to(ctx):
+        return await services.get_service_status(service_name, host, hosts, bypass_cache)
 
 
-@mcp.tool()
+@tool()
 async def get_service_logs(service_name: str, lines: int = 50, host: str | None = None) -> str:
     """Get recent logs for a systemd service (read-only)."""
     return await services.get_service_logs(service_name, lines, host)
 
 
-@mcp.tool()
-async def check_service_health(service_name: str, host: str | None = None) -> str:
-    """Comprehensive health check for a service (read-only)."""
-    return await services.check_service_health(service_name, host)
+@tool()
+async def check_service_health(
+    service_name: str,
+    host: str | None = None,
+    hosts: list[str] | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+    *,
+    ctx: Context,
+) -> str:
+    """Comprehensive health check for a service (read-only). Use hosts=[...] for a fleet. format="json" returns a compact record; fields=[...] keeps only those keys. Cached briefly; bypass_cache=True to refresh."""
+    with report_progress_to(ctx):
+        return await services.check_service_health(
+            service_name, host, hosts, bypass_cache, format, fields
+        )
 
 
-@mcp.tool()
-async def get_network_interfaces(host: str | None = None) -> str:
-    """Get network interfaces configuration (read-only)."""
-    return await network.get_network_interfaces(host)
+@tool()
+async def get_network_interfaces(host: str | None = None, bypass_cache: bool = False) -> str:
+    """Get network interfaces configuration (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await network.get_network_interfaces(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
-async def get_routing_table(host: str | None = None) -> str:
-    """Get routing table (read-only)."""
-    return await network.get_routing_table(host)
+@tool()
+async def get_routing_table(
+    host: str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+) -> str:
+    """Get routing table (read-only). format="json" returns compact records; fields=[...] keeps only those keys. Cached briefly; bypass_cache=True to refresh."""
+    return await network.get_routing_table(host, bypass_cache, format, fields)
 
 
-@mcp.tool()
-async def get_listening_ports(host: str | None = None) -> str:
-    """Get listening TCP/UDP ports (read-only)."""
-    return await network.get_listening_ports(host)
+@tool()
+async def get_listening_ports(
+    host: str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+) -> str:
+    """Get listening TCP/UDP ports (read-only). format="json" returns compact records; fields=[...] keeps only those keys. Cached briefly; bypass_cache=True to refresh."""
+    return await network.get_listening_ports(host, bypass_cache, format, fields)
 
 
-@mcp.tool()
-async def get_active_connections(host: str | None = None) -> str:
-    """Get active network connections (read-only)."""
-    return await network.get_active_connections(host)
+@tool()
+async def get_active_connections(host: str | None = None, bypass_cache: bool = False) -> str:
+    """Get active network connections (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await network.get_active_connections(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
-async def get_dns_config(host: str | None = None) -> str:
-    """Get DNS configuration (read-only)."""
-    return await network.get_dns_config(host)
+@tool()
+async def get_dns_config(host: str | None = None, bypass_cache: bool = False) -> str:
+    """Get DNS configuration (read-only). Cached briefly; bypass_cache=True to refresh."""
+    return await network.get_dns_config(host, bypass_cache=bypass_cache)
 
 
-@mcp.tool()
+@tool()
 async def test_connectivity(target: str, count: int = 4, host: str | None = None) -> str:
     """Test network connectivity to a target (read-only)."""
     return await network.test_connectivity(target, count, host)
 
 
-@mcp.tool()
+@tool()
+async def get_result_cache_stats() -> str:
+    """Show diagnostics result cache statistics (hits, misses, coalesced, size)."""
+    stats = get_result_cache().stats()
+    lines = ["## Diagnostics Result Cache", ""]
+    lines += [f"- **{name}**: {value}" for name, value in stats.items()]
+    return "\n".join(lines)
+
+
+@tool()
+async def get_ssh_stats() -> str:
+    """Show SSH connection pool usage and coalesced (saved) remote executions."""
+    from .connection import SSHConnectionError, get_smart_ssh_manager
+
+    try:
+        manager = get_smart_ssh_manager()
+    except SSHConnectionError as e:
+        return f"❌ SSH manager unavailable: {e}"
+
+    lines = ["## Remote Command Coalescing", ""]
+    lines += [f"- **{name}**: {value}" for name, value in manager.get_coalescing_stats().items()]
+
+    lines += ["", "## Connection Pool", ""]
+    pools = manager.get_pool_stats()
+    if not pools:
+        lines.append("No open connections.")
+    for key, stats in pools.items():
+        lines.append(
+            f"- **{key}**: {stats['connections']} connections, {stats['in_use']} sessions in use, "
+            f"{stats['waiting']} waiting, {stats['connects']} connects / {stats['reuses']} reuses"
+        )
+    return "\n".join(lines)
+
+
+@tool()
 async def get_journal_logs(
     lines: int = 100,
     priority: str | None = None,
@@ -116,13 +222,13 @@ async def get_journal_logs(
     return await logs.get_journal_logs(lines, priority, since, unit, host)
 
 
-@mcp.tool()
+@tool()
 async def read_log_file(path: str, lines: int = 100, host: str | None = None) -> str:
     """Read a specific log file (read-only)."""
     return await logs.read_log_file(path, lines, host)
 
 
-@mcp.tool()
+@tool()
 async def search_logs(
     pattern: str,
     log_path: str | None = None,
@@ -134,7 +240,7 @@ async def search_logs(
     return await logs.search_logs(pattern, log_path, lines, context, host)
 
 
-@mcp.tool()
+@tool()
 async def analyze_errors(
     service: str | None = None, since: str = "1h", host: str | None = None
 ) -> str:
@@ -146,7 +252,7 @@ async def analyze_errors(
 # Remote Execution ACTIONS (Exec via SSH exec-runner, requires human validation)
 # ============================================================================
 
-@mcp.tool()
+@tool()
 async def propose_remote_execution(
     action: str, host: str, rationale: str, auto_approve: bool = False
 ) -> str:
@@ -158,7 +264,7 @@ async def propose_remote_execution(
     return await actions.propose_remote_execution(action, host, rationale, auto_approve)
 
 
-@mcp.tool()
+@tool()
 async def approve_remote_execution(action_id: str, approved: bool, approver: str = "human") -> str:
     """
     Approve or reject a proposed remote execution.
@@ -168,7 +274,7 @@ async def approve_remote_execution(action_id: str, approved: bool, approver: str
     return await actions.approve_remote_execution(action_id, approved, approver)
 
 
-@mcp.tool()
+@tool()
 async def execute_remote_execution(action_id: str) -> str:
     """
     Execute an approved remote execution.
@@ -178,18 +284,82 @@ async def execute_remote_execution(action_id: str) -> str:
     return await actions.execute_remote_execution(action_id)
 
 
-@mcp.tool()
+@tool()
 async def list_pending_actions() -> str:
     """List all pending remote executions awaiting approval."""
     return await actions.list_pending_actions()
 
 
+@tool()
+async def propose_rollout(
+    action: str,
+    hosts: list[str],
+    rationale: str,
+    wave_size: int = 5,
+    max_parallel: int | None = None,
+    max_failures: int = 0,
+    health_service: str | None = None,
+) -> str:
+    """
+    Propose one remote execution across many hosts, run in waves.
+
+    A single human approval covers every host. Between waves the action's
+    service is health-checked; the rollout halts once more than
+    ``max_failures`` hosts failed.
+
+    Args:
+        action: Action name from the remote execution catalog
+        hosts: Host names or globs over allowed hosts (e.g. ["dns-*"])
+        rationale: Why this action is needed
+        wave_size: Hosts per wave
+        max_parallel: Hosts in flight within a wave (default: wave_size)
+        max_failures: Failed hosts tolerated before halting
+        health_service: Service checked after each wave (default: the action's service)
+    """
+    from .tools.remote_exec import rollout
+
+    return await rollout.propose_rollout(
+        action, hosts, rationale, wave_size, max_parallel, max_failures, health_service
+    )
+
+
+@tool()
+async def approve_rollout(rollout_id: str, approved: bool, approver: str = "human") -> str:
+    """Approve or reject a proposed rollout (one approval for every host)."""
+    from .tools.remote_exec import rollout
+
+    return await rollout.approve_rollout(rollout_id, approved, approver)
+
+
+@tool()
+async def execute_rollout(rollout_id: str, *, ctx: Context) -> str:
+    """
+    Execute an approved rollout wave by wave, halting on failures.
+
+    Per-host progress is reported as it completes and saved for get_rollout_status.
+    """
+    from .tools.remote_exec import rollout
+
+    with report_progress_to(ctx):
+        return await rollout.execute_rollout(rollout_id)
+
+
+@tool()
+async def get_rollout_status(rollout_id: str, format: str = "markdown") -> str:
+    """Show a rollout's plan and per-host progress ("markdown" or "json")."""
+    from .tools.remote_exec import rollout
+
+    return await rollout.get_rollout_status(rollout_id, format)
+
+
 # ============================================================================
 # SSH COMMAND EXECUTION (with Authorization)
 # ============================================================================
 
-@mcp.tool()
-async def execute_ssh_command(host: str, command: str, auto_approve: bool = False) -> str:
+@tool()
+async def execute_ssh_command(
+    host: str, command: str, auto_approve: bool = False, background: bool = False
+) -> str:
     """
     Execute SSH command with authorization check.
 
@@ -202,51 +372,146 @@ async def execute_ssh_command(host: str, command: str, auto_approve: bool = Fals
         host: Target host (e.g., "coreos-11")
         command: Command to execute
         auto_approve: Skip approval for MANUAL commands (DANGEROUS!)
+        background: Start as a job and return its ID (streamed output, see poll_job)
 
     Returns:
-        Command output or approval request
+        Command output, job ID or approval request
     """
-    return await ssh_executor.execute_ssh_command(host, command, auto_approve)
+    return await ssh_executor.execute_ssh_command(host, command, auto_approve, background)
 
 
-@mcp.tool()
-async def approve_command(approval_id: str) -> str:
+@tool()
+async def execute_fleet_command(
+    hosts: list[str],
+    command: str,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    *,
+    ctx: Context,
+) -> str:
+    """
+    Execute an auto-approved (read-only) command on several hosts concurrently.
+
+    Args:
+        hosts: Host names or globs over allowed hosts (e.g. ["dns-*"])
+        command: Command to execute (must be AUTO in the whitelist)
+        concurrency: Max hosts in flight (default: LINUX_MCP_FLEET_MAX_CONCURRENCY)
+        timeout: Per-host timeout in seconds (default: LINUX_MCP_FLEET_HOST_TIMEOUT)
+
+    Returns:
+        Merged per-host result table and outputs
+    """
+    with report_progress_to(ctx):
+        return await ssh_executor.execute_fleet_command(hosts, command, concurrency, timeout)
+
+
+@tool()
+async def approve_command(approval_id: str, background: bool = False) -> str:
     """
     Approve and execute a pending command.
 
     Args:
         approval_id: Approval request ID from execute_ssh_command
+        background: Start as a job and return its ID (streamed output, see poll_job)
 
     Returns:
-        Execution result
+        Execution result or job ID
     """
-    return await ssh_executor.approve_command(approval_id)
+    return await ssh_executor.approve_command(approval_id, background)
 
 
-@mcp.tool()
+@tool()
 async def list_pending_approvals() -> str:
     """List all pending command approvals."""
     return await ssh_executor.list_pending_approvals()
 
 
-@mcp.tool()
+@tool()
 async def show_command_whitelist() -> str:
     """Show all authorized commands and their authorization levels."""
     return await ssh_executor.show_command_whitelist()
 
 
+# ============================================================================
+# BACKGROUND JOBS (long-running commands and playbooks)
+# ============================================================================
+
+@tool()
+async def poll_job(job_id: str, since: int = 0, limit: int = 200, wait: float = 0.0) -> str:
+    """
+    Read a background job's output from a cursor.
+
+    Args:
+        job_id: Job ID returned by a background=True call
+        since: First line number to return (the previous call's "next" cursor)
+        limit: Maximum lines returned
+        wait: Seconds to wait for new output if there is none yet
+
+    Returns:
+        Job status, output lines and the next cursor
+    """
+    from .tools.execution import jobs
+    return await jobs.poll_job(job_id, since, limit, wait)
+
+
+@tool()
+async def tail_job(job_id: str, lines: int = 50) -> str:
+    """Show the last output lines of a background job."""
+    from .tools.execution import jobs
+    return await jobs.tail_job(job_id, lines)
+
+
+@tool()
+async def wait_job(job_id: str, timeout: float = 60.0, *, ctx: Context) -> str:
+    """
+    Wait for a background job to finish, with progress notifications.
+
+    Args:
+        job_id: Job ID
+        timeout: Seconds to wait before returning (the job keeps running)
+
+    Returns:
+        Job status and last output lines
+    """
+    from .tools.execution import jobs
+
+    async def notify(progress: float, total: float | None, message: str) -> None:
+        try:
+            await ctx.report_progress(progress, total, message=message)
+        except Exception:
+            pass  # Progress is best-effort, never fail the tool for it
+
+    return await jobs.wait_job(job_id, timeout, notify)
+
+
+@tool()
+async def cancel_job(job_id: str) -> str:
+    """Cancel a running background job (interrupts the remote process)."""
+    from .tools.execution import jobs
+    return await jobs.cancel_job(job_id)
+
+
+@tool()
+async def list_jobs() -> str:
+    """List running and recently finished background jobs."""
+    from .tools.execution import jobs
+    return await jobs.list_jobs()
+
+
 # ============================================================================
 # ANSIBLE EXECUTION (High-Level Wrappers)
 # ============================================================================
 
-@mcp.tool()
+@tool()
 async def run_ansible_playbook(
     host: str,
     playbook_path: str,
     inventory: str = "localhost,",
     check_mode: bool = True,
     extra_vars: dict | None = None,
-    auto_approve: bool = False
+    auto_approve: bool = False,
+    background: bool = False,
+    format: str = "text"
 ) -> str:
     """
     Execute Ansible playbook on remote host.
@@ -258,22 +523,26 @@ async def run_ansible_playbook(
         check_mode: Run in dry-run mode (default: True for safety)
         extra_vars: Extra variables for Ansible (dict)
         auto_approve: Skip approval for non-check mode execution (DANGEROUS!)
+        background: Start as a job and return its ID (streamed output, see poll_job)
+        format: "text" (Ansible output), or "markdown"/"json" for a compact summary:
+            per-host stats, slowest tasks, changed tasks, output (tail) of failed tasks only
 
     Returns:
-        Ansible output or approval request
+        Ansible output or summary, job ID or approval request
     """
     from .tools.execution import ansible_wrapper
     return await ansible_wrapper.run_ansible_playbook(
-        host, playbook_path, inventory, check_mode, extra_vars, auto_approve
+        host, playbook_path, inventory, check_mode, extra_vars, auto_approve, background, format
     )
 
 
-@mcp.tool()
+@tool()
 async def check_ansible_playbook(
     host: str,
     playbook_path: str,
     inventory: str = "localhost,",
-    extra_vars: dict | None = None
+    extra_vars: dict | None = None,
+    format: str = "text"
 ) -> str:
     """
     Run Ansible playbook in check mode (dry-run, always auto-approved).
@@ -283,51 +552,87 @@ async def check_ansible_playbook(
         playbook_path: Path to playbook on remote host
         inventory: Ansible inventory
         extra_vars: Extra variables
+        format: "text", or "markdown"/"json" for a compact summary
 
     Returns:
-        Ansible check mode output
+        Ansible check mode output or summary
     """
     from .tools.execution import ansible_wrapper
-    return await ansible_wrapper.check_ansible_playbook(host, playbook_path, inventory, extra_vars)
+    return await ansible_wrapper.check_ansible_playbook(host, playbook_path, inventory, extra_vars, format)
 
 
-@mcp.tool()
-async def list_ansible_playbooks(host: str, playbooks_dir: str = "/opt/infra/playbooks") -> str:
+@tool()
+async def list_ansible_playbooks(
+    host: str,
+    playbooks_dir: str = "/opt/infra/playbooks",
+    refresh: bool = False,
+    target: str | None = None,
+    format: str = "markdown",
+) -> str:
     """
     List available Ansible playbooks on remote host.
 
+    Served from a cached catalog (size, mtime, hash, play targets); only
+    new or modified files are fetched again when it is refreshed.
+
     Args:
         host: Target host
         playbooks_dir: Directory containing playbooks
+        refresh: Re-list the directory now instead of serving the cache
+        target: Only playbooks with a play targeting this host/group (or "all")
+        format: "markdown" or "json"
 
     Returns:
-        List of playbook files
+        Playbook catalog
     """
     from .tools.execution import ansible_wrapper
-    return await ansible_wrapper.list_ansible_playbooks(host, playbooks_dir)
+    return await ansible_wrapper.list_ansible_playbooks(host, playbooks_dir, refresh, target, format)
 
 
-@mcp.tool()
-async def show_ansible_inventory(host: str, inventory_path: str = "/opt/infra/inventory") -> str:
+@tool()
+async def show_ansible_inventory(
+    host: str,
+    inventory_path: str = "/opt/infra/inventory",
+    refresh: bool = False,
+    format: str = "markdown",
+) -> str:
     """
     Show Ansible inventory on remote host.
 
     Args:
         host: Target host
         inventory_path: Path to inventory directory or file
+        refresh: Check the file now instead of serving the cache
+        format: "markdown" or "json"
+
+    Returns:
+        Inventory groups and hosts
+    """
+    from .tools.execution import ansible_wrapper
+    return await ansible_wrapper.show_ansible_inventory(host, inventory_path, refresh, format)
+
+
+@tool()
+async def invalidate_ansible_catalog(host: str | None = None, path: str | None = None) -> str:
+    """
+    Forget cached playbooks/inventories so the next listing fetches them again.
+
+    Args:
+        host: Only this host (default: all hosts)
+        path: Only this playbook file, playbooks directory or inventory path
 
     Returns:
-        Inventory contents
+        Number of entries dropped
     """
     from .tools.execution import ansible_wrapper
-    return await ansible_wrapper.show_ansible_inventory(host, inventory_path)
+    return await ansible_wrapper.invalidate_ansible_catalog(host, path)
 
 
 # ============================================================================
 # COMMAND ANALYSIS & LEARNING (Smart Whitelist Management)
 # ============================================================================
 
-@mcp.tool()
+@tool()
 async def analyze_command(command: str, host: str = "localhost") -> str:
     """
     Analyze a command and provide safety recommendations.
@@ -456,7 +761,7 @@ You can execute it directly using:
     return output
 
 
-@mcp.tool()
+@tool()
 async def get_learning_suggestions(
     min_count: int = 5,
     min_age_hours: int = 24
@@ -545,7 +850,7 @@ Criteria:
     return output
 
 
-@mcp.tool()
+@tool()
 async def get_learning_stats() -> str:
     """
     Get statistics about auto-learning system.
@@ -609,11 +914,22 @@ Category Breakdown:
     return output
 
 
+@tool()
+async def get_analysis_cache_stats() -> str:
+    """Show command analysis memo cache statistics (hits, misses, evictions, version stamp)."""
+    from .analysis.command_analysis import get_analysis_cache
+
+    stats = get_analysis_cache().stats()
+    lines = ["## Command Analysis Cache", ""]
+    lines += [f"- **{name}**: {value}" for name, value in stats.items()]
+    return "\n".join(lines)
+
+
 # ============================================================================
 # PLUGIN SYSTEM (Command Family Catalog)
 # ============================================================================
 
-@mcp.tool()
+@tool()
 async def list_command_plugins() -> str:
     """
     List all available command plugins and their commands.
@@ -674,7 +990,7 @@ Plugins by Category:
     return output
 
 
-@mcp.tool()
+@tool()
 async def get_plugin_details(plugin_name: str) -> str:
     """
     Get detailed information about a specific command plugin.
@@ -703,7 +1019,7 @@ Use list_command_plugins() to see all plugins.
     return plugin.get_usage_guide()
 
 
-@mcp.tool()
+@tool()
 async def search_commands(query: str) -> str:
     """
     Search for commands across all plugins.
@@ -761,6 +1077,106 @@ Found {len(results)} matching command(s):
     return output
 
 
+# ============================================================================
+# AUDIT TRAIL (Indexed queries over mcp-audit-*.json)
+# ============================================================================
+
+@tool()
+async def query_audit_log(
+    host: str | None = None,
+    event_type: str | None = None,
+    status: str | None = None,
+    contains: str | None = None,
+    since_minutes: float | None = 60,
+    limit: int = 50,
+    format: str = "markdown",
+) -> str:
+    """
+    Search the audit trail (SSH commands, connections, tool calls, remote executions).
+
+    Segments are skipped using their side index (time range, hosts, event
+    types, statuses); the latest `limit` matching events are returned.
+    event_type: ssh_command, ssh_connect, tool_success, pra_executed, security_violation...
+    since_minutes=None searches the whole retention period. format="json" returns compact records.
+    """
+    import asyncio
+    from collections import deque
+
+    from .audit_query import AuditFilter, get_audit_trail, summarize
+    from .audit_query import since_minutes as minutes_ago
+    from .config import CONFIG
+    from .tools.diagnostics.parsers import check_format, markdown_table, to_json
+    from .utils.output import limit_json
+
+    if error := check_format(format):
+        return error
+    if not CONFIG.log_dir:
+        return "Error: audit log directory not configured (set LINUX_MCP_LOG_DIR)"
+
+    trail = get_audit_trail(CONFIG.log_dir)
+    query = AuditFilter(
+        since=minutes_ago(since_minutes),
+        host=host,
+        event_type=event_type,
+        status=status,
+        contains=contains,
+    )
+
+    def run():
+        segments = trail.segments(query)
+        matches = deque((summarize(e) for e in trail.query(query)), maxlen=max(limit, 1))
+        return len(segments), list(matches)
+
+    # Lecture de fichiers: hors de la boucle d'événements
+    scanned, records = await asyncio.to_thread(run)
+
+    if format == "json":
+        # Trop volumineux: garder les événements les plus récents (fin de liste)
+        return limit_json(to_json(records), keep_last=True)
+    return (
+        f"## Audit Trail ({len(records)} events, {scanned} segments scanned)\n\n"
+        f"{markdown_table(records)}\n"
+    )
+
+
+# ============================================================================
+# METRICS (Prometheus text exposition)
+# ============================================================================
+
+@tool(limit=False)
+async def get_metrics(match: str | None = None) -> str:
+    """
+    Prometheus metrics: tool latency, SSH connect/exec time per host, pool usage and wait,
+    cache hit ratios, authorization check time, audit queue depth.
+
+    match keeps only metric families whose name contains it (e.g. "mcp_ssh_", "cache").
+    Also served on http://127.0.0.1:<port>/metrics when LINUX_MCP_METRICS_PORT is set.
+    """
+    from .utils.metrics import REGISTRY
+
+    return REGISTRY.render(match)
+
+
+def _start_metrics_endpoint():
+    import logging
+
+    from .config import CONFIG
+    from .utils.metrics import start_http_server
+
+    if not CONFIG.metrics_port:
+        return
+    try:
+        start_http_server(CONFIG.metrics_port, CONFIG.metrics_host)
+    except OSError as e:
+        # Pas de print(): stdout est le flux JSON-RPC du transport stdio
+        logging.getLogger(__name__).warning(
+            f"Could not start metrics endpoint on {CONFIG.metrics_host}:{CONFIG.metrics_port}: {e}"
+        )
+
+
+_start_metrics_endpoint()
+
+
 # ============================================================================
 # Server Entry Point
 # ============================================================================
@@ -0,0 +1,257 @@
+"""
+Durable state for approval workflows.
+
+Pending command approvals and remote executions used to live in
+in-process dicts: lost on restart, never cleaned up, scanned in full to
+list what is pending. They are now rows of one SQLite table:
+
+    records(kind, id, host, status, created_at, updated_at, expires_at, data)
+
+- ``kind`` separates workflows ("approval", "remote_execution");
+  ``data`` is the JSON record, ``status`` and ``host`` are copied out of
+  it so listings are index lookups (by status, host, age);
+- ``transition`` is a compare-and-set: the status only changes if it
+  still is one of the expected states, inside a ``BEGIN IMMEDIATE``
+  transaction. Two concurrent tool calls (or two server processes) can
+  not both approve or execute the same record;
+- a daemon thread deletes records past ``expires_at``, except those
+  still executing: their outcome must be recorded.
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Jamais supprimés par le sweeper (l'exécution en cours doit pouvoir se conclure)
+ACTIVE_STATUSES = ("executing",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    kind        TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    host        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_records_status ON records(kind, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_records_host ON records(kind, host, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_records_expires ON records(expires_at);
+"""
+
+
+class StateStore:
+    """Workflow records in an indexed SQLite database, with atomic status transitions."""
+
+    def __init__(self, db_file: Path | str, sweep_interval: float = 0.0):
+        """
+        Open (and create if needed) the database.
+
+        Args:
+            db_file: Path to the SQLite file (":memory:" for a private store)
+            sweep_interval: Seconds between expiry sweeps in a background thread (0 = no thread)
+        """
+        self.db_file = db_file
+        if db_file != ":memory:":
+            Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+
+        # Appels depuis la boucle asyncio et le thread de purge
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")  # Autre processus serveur
+            self._conn.executescript(SCHEMA)
+
+        self.swept = 0
+        self._stop = threading.Event()
+        self._sweeper: threading.Thread | None = None
+        if sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval,), name="state-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def close(self):
+        """Stop the sweeper and close the database."""
+        self._stop.set()
+        if self._sweeper is not None and self._sweeper is not threading.current_thread():
+            self._sweeper.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, kind: str, record: dict[str, Any], ttl: float) -> None:
+        """
+        Insert a new record.
+
+        Args:
+            kind: Workflow name
+            record: JSON-serializable dict with at least ``id``, ``host`` and ``status``
+            ttl: Seconds before the sweeper deletes it
+
+        Raises:
+            sqlite3.IntegrityError: A record with this id already exists
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, record["id"], record["host"], record["status"], now, now, now + ttl,
+                 json.dumps(record)),
+            )
+
+    def transition(
+        self,
+        kind: str,
+        record_id: str,
+        expected: str | Iterable[str],
+        status: str,
+        **changes: Any,
+    ) -> dict[str, Any] | None:
+        """
+        Move a record to ``status`` if its current status is ``expected`` (compare-and-set).
+
+        Args:
+            expected: Status, or statuses, the record must be in
+            status: New status
+            **changes: Other fields to update in the record
+
+        Returns:
+            The updated record, or None if it does not exist or is in another state
+        """
+        expected = {expected} if isinstance(expected, str) else set(expected)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")  # Verrou d'écriture avant la lecture
+            try:
+                row = cursor.execute(
+                    "SELECT status, data FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+                ).fetchone()
+                if row is None or row[0] not in expected:
+                    cursor.execute("ROLLBACK")
+                    return None
+                record = json.loads(row[1])
+                record.update(changes, status=status)
+                cursor.execute(
+                    "UPDATE records SET status = ?, updated_at = ?, data = ? WHERE kind = ? AND id = ?",
+                    (status, time.time(), json.dumps(record), kind, record_id),
+                )
+                cursor.execute("COMMIT")
+                return record
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+            )
+            return cursor.rowcount > 0
+
+    def delete_older_than(self, kind: str, max_age: float) -> int:
+        """Delete records of ``kind`` created more than ``max_age`` seconds ago."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM records WHERE kind = ? AND created_at < ?", (kind, time.time() - max_age)
+            )
+            return cursor.rowcount
+
+    def sweep(self, now: float | None = None) -> int:
+        """Delete expired records that are not executing; returns how many."""
+        placeholders = ", ".join("?" * len(ACTIVE_STATUSES))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM records WHERE expires_at < ? AND status NOT IN ({placeholders})",
+                (now or time.time(), *ACTIVE_STATUSES),
+            )
+            self.swept += cursor.rowcount
+            return cursor.rowcount
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not sweep expired workflow records: {e}")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, kind: str, record_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def select(
+        self,
+        kind: str,
+        statuses: Iterable[str] | None = None,
+        host: str | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Records of ``kind``, oldest first, optionally filtered by status and host."""
+        # Sans statistiques, SQLite préfère l'index par statut même pour un seul hôte
+        index = "idx_records_host" if host is not None else "idx_records_status"
+        sql = f"SELECT data FROM records INDEXED BY {index} WHERE kind = ?"
+        params: list[Any] = [kind]
+        if statuses is not None:
+            statuses = list(statuses)
+            sql += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params += statuses
+        if host is not None:
+            sql += " AND host = ?"
+            params.append(host)
+        sql += " ORDER BY created_at, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def counts(self, kind: str) -> dict[str, int]:
+        """Records of ``kind`` per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM records WHERE kind = ? GROUP BY status", (kind,)
+            ).fetchall()
+        return dict(rows)
+
+
+# Global instance
+_store: StateStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    """Get or create the state store (``state_db``, default ``<log_dir>/mcp-state.db``)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            db_file = CONFIG.state_db
+            if db_file is None:
+                db_file = (Path(CONFIG.log_dir) if CONFIG.log_dir else Path("logs")) / "mcp-state.db"
+            _store = StateStore(db_file, sweep_interval=CONFIG.state_sweep_interval)
+            atexit.register(_store.close)
+        return _store
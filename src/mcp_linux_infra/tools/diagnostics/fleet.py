@@ -0,0 +1,111 @@
+"""Diagnostic tools: fleet fan-out (same diagnostic on many hosts)."""
+
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
+from typing import Any
+
+from ...connection.fanout import HostResult, gather_hosts, resolve_hosts
+from .parsers import render_error, to_json
+
+# Rapports d'erreur renvoyés (sans exception) par les diagnostics mono-hôte
+ERROR_PREFIXES = ("Error", "❌")
+
+
+async def run_on_fleet(
+    title: str,
+    hosts: list[str] | str,
+    operation: Callable[[str], Awaitable[str]],
+    format: str = "markdown",
+) -> str:
+    """
+    Run a single-host diagnostic on several hosts and merge the reports.
+
+    Args:
+        title: Report title
+        hosts: Host list, comma-separated string or globs over allowed hosts
+        operation: Coroutine returning the report of one host
+        format: "markdown" (summary table + reports) or "json" (one object per host)
+    """
+    try:
+        targets = resolve_hosts(hosts)
+    except ValueError as e:
+        return render_error(f"Error resolving hosts: {e}", format)
+
+    results = [_classify(result) for result in await gather_hosts(targets, operation)]
+    if format == "json":
+        return format_fleet_json(results)
+    return format_fleet_report(title, results)
+
+
+def format_fleet_json(results: list[HostResult]) -> str:
+    """Merge per-host JSON reports into ``{"hosts": {host: report}}``."""
+    merged: dict[str, Any] = {}
+    for result in results:
+        if not result.ok:
+            merged[result.host] = {"error": result.error}
+            continue
+        try:
+            merged[result.host] = json.loads(result.value)
+        except (TypeError, ValueError):
+            merged[result.host] = {"error": str(result.value)}
+    return to_json({"hosts": merged})
+
+
+def format_fleet_table(results: list[HostResult]) -> str:
+    """Merged per-host result table (markdown)."""
+    lines = [
+        "| Host | Status | Duration | Summary |",
+        "|------|--------|----------|---------|",
+    ]
+    for result in results:
+        summary = _summarize(result.value if result.ok else result.error or "")
+        lines.append(
+            f"| {result.host} | {result.status} | {result.duration_ms:.0f} ms | "
+            f"{summary.replace('|', '/')} |"
+        )
+    return "\n".join(lines)
+
+
+def format_fleet_report(title: str, results: list[HostResult]) -> str:
+    """Summary table followed by each host's report."""
+    failed = sum(1 for r in results if not r.ok)
+
+    output = f"""## {title} ({len(results)} hosts, {len(results) - failed} ok, {failed} failed)
+
+{format_fleet_table(results)}
+"""
+
+    for result in results:
+        if result.ok:
+            body = _demote_headings(str(result.value))
+        elif (result.error or "").startswith(ERROR_PREFIXES):
+            body = result.error
+        else:
+            body = f"Error: {result.error}"
+        output += f"\n### {result.host}\n\n{body.strip()}\n"
+
+    return output
+
+
+def _classify(result: HostResult) -> HostResult:
+    """Count an ``Error ...`` report as a failed host."""
+    if result.ok and isinstance(result.value, str) and result.value.startswith(ERROR_PREFIXES):
+        return replace(result, ok=False, value=None, error=result.value)
+    return result
+
+
+def _summarize(value: Any, width: int = 80) -> str:
+    """First meaningful line of a host report."""
+    for line in str(value).splitlines():
+        line = line.strip()
+        if line and not line.startswith("#") and not line.startswith("```"):
+            return line if len(line) <= width else line[: width - 1] + "…"
+    return ""
+
+
+def _demote_headings(markdown: str) -> str:
+    """Nest a host report under its ``###`` section."""
+    return "\n".join(
+        f"##{line}" if line.startswith("#") else line for line in markdown.splitlines()
+    )
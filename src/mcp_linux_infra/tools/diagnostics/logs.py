@@ -1,6 +1,15 @@
-"""Diagnostic tools: Log analysis (read-only)."""
+"""Diagnostic tools: Log analysis (read-only).
 
-from ...connection import execute_command
+Logs can be arbitrarily large: commands are streamed with a byte/line
+budget and the remote process is cut off once it is exhausted.
+"""
+
+from collections import deque
+
+from ...connection import read_command_output, stream_command
+
+# Lignes d'erreurs affichées par analyze_errors (les plus récentes)
+ANALYZE_DISPLAY_LINES = 100
 
 
 async def get_journal_logs(
@@ -33,10 +42,10 @@ async def get_journal_logs(
     if unit:
         cmd.extend(["-u", unit])
 
-    returncode, stdout, stderr = await execute_command(cmd, host)
+    output = await read_command_output(cmd, host, max_lines=lines)
 
-    if returncode != 0:
-        return f"Error reading journal logs: {stderr}"
+    if not output.ok:
+        return f"Error reading journal logs: {output.stderr}"
 
     filters = []
     if priority:
@@ -50,7 +59,7 @@ async def get_journal_logs(
 
     return f"""## Journal Logs{filter_str}
 
-{stdout}
+{output.text()}
 """
 
 
@@ -71,16 +80,14 @@ async def read_log_file(
         lines: Number of lines to read from end
         host: Target host
     """
-    returncode, stdout, stderr = await execute_command(
-        ["tail", "-n", str(lines), path], host
-    )
+    output = await read_command_output(["tail", "-n", str(lines), path], host, max_lines=lines)
 
-    if returncode != 0:
-        return f"Error reading log file {path}: {stderr}"
+    if not output.ok:
+        return f"Error reading log file {path}: {output.stderr}"
 
     return f"""## Log File: {path} (last {lines} lines)
 
-{stdout}
+{output.text()}
 """
 
 
@@ -106,38 +113,39 @@ async def search_logs(
     if log_path:
         # Search in file
         cmd = ["grep", "-E", "-n", "-i", f"-C{context}", pattern, log_path]
-        returncode, stdout, stderr = await execute_command(cmd, host)
+        # Chaque match: lui-même, son contexte et le séparateur "--"
+        output = await read_command_output(cmd, host, max_lines=lines * (2 * context + 2))
 
-        if returncode == 0:
+        if output.ok:
             # grep found matches
             return f"""## Search Results in {log_path}
 
 Pattern: `{pattern}`
 Context: ±{context} lines
 
-{stdout}
+{output.text()}
 """
-        elif returncode == 1:
+        elif output.returncode == 1:
             # No matches found
             return f"No matches found for pattern '{pattern}' in {log_path}"
         else:
             # Error
-            return f"Error searching {log_path}: {stderr}"
+            return f"Error searching {log_path}: {output.stderr}"
 
     else:
         # Search in journal
         cmd = ["journalctl", "-g", pattern, "-n", str(lines), "--no-pager"]
-        returncode, stdout, stderr = await execute_command(cmd, host)
+        output = await read_command_output(cmd, host, max_lines=lines)
 
-        if returncode != 0:
-            return f"Error searching journal: {stderr}"
+        if not output.ok:
+            return f"Error searching journal: {output.stderr}"
 
         return f"""## Journal Search Results
 
 Pattern: `{pattern}`
 Max results: {lines}
 
-{stdout}
+{output.text()}
 """
 
 
@@ -165,22 +173,34 @@ async def analyze_errors(
             service = f"{service}.service"
         cmd.extend(["-u", service])
 
-    returncode, stdout, stderr = await execute_command(cmd, host)
+    # Count incrementally, only the most recent lines are kept in memory
+    error_count = 0
+    recent: deque[str] = deque(maxlen=ANALYZE_DISPLAY_LINES)
 
-    if returncode != 0:
-        return f"Error analyzing errors: {stderr}"
+    async with stream_command(cmd, host) as stream:
+        async for line in stream:
+            if line.strip():
+                error_count += 1
+                recent.append(line)
 
-    # Count lines
-    error_lines = stdout.strip().split("\n")
-    error_count = len([line for line in error_lines if line.strip()])
+    if not stream.truncated and stream.returncode != 0:
+        return f"Error analyzing errors: {stream.stderr}"
 
     scope = f"service {service}" if service else "system-wide"
+    total = f"{error_count}+ (stopped at output budget)" if stream.truncated else str(error_count)
+
+    if error_count == 0:
+        errors = "No errors found in this time window."
+    elif error_count > len(recent):
+        errors = f"(last {len(recent)} of {total})\n" + "".join(recent)
+    else:
+        errors = "".join(recent)
 
     return f"""## Error Analysis ({scope})
 
 **Time Window:** {since}
-**Total Errors:** {error_count}
+**Total Errors:** {total}
 
 ### Recent Errors
-{stdout if error_count > 0 else "No errors found in this time window."}
+{errors}
 """
@@ -2,19 +2,22 @@
 
 
 
-from ...connection import execute_command
+from ...connection import cached_execute_command, execute_command
+from .parsers import check_format, parse_ip_route, parse_ss, render, render_error
+from .probes import ProbePlan
 
 
 async def get_network_interfaces(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get network interfaces configuration.
 
     **Read-only operation** via SSH mcp-reader.
     """
-    returncode, stdout, stderr = await execute_command(
-        ["ip", "addr", "show"], host
+    returncode, stdout, stderr = await cached_execute_command(
+        ["ip", "addr", "show"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
@@ -28,56 +31,75 @@ async def get_network_interfaces(
 
 async def get_routing_table(
     host: str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
 ) -> str:
     """
-    Get routing table.
+    Get routing table (``ip -j route show``).
 
     **Read-only operation** via SSH mcp-reader.
+
+    Args:
+        host: Target host
+        bypass_cache: Re-run the command instead of using the cached result
+        format: "markdown" or "json"
+        fields: Only return these fields (e.g. ["dst", "gateway", "dev"])
     """
-    returncode, stdout, stderr = await execute_command(
-        ["ip", "route", "show"], host
+    if error := check_format(format):
+        return error
+
+    returncode, stdout, stderr = await cached_execute_command(
+        ["ip", "-j", "route", "show"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
-        return f"Error reading routing table: {stderr}"
+        return render_error(f"Error reading routing table: {stderr}", format)
 
-    return f"""## Routing Table
-
-{stdout}
-"""
+    return render(parse_ip_route, stdout, "Routing Table", format, fields)
 
 
 async def get_listening_ports(
     host: str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
 ) -> str:
     """
-    Get listening TCP/UDP ports with associated processes.
+    Get listening TCP/UDP ports with associated processes (``ss -H -lntup``).
 
     **Read-only operation** via SSH mcp-reader.
+
+    Args:
+        host: Target host
+        bypass_cache: Re-run the command instead of using the cached result
+        format: "markdown" or "json"
+        fields: Only return these fields (e.g. ["proto", "port"])
     """
-    returncode, stdout, stderr = await execute_command(
-        ["ss", "-lntup"], host
+    if error := check_format(format):
+        return error
+
+    returncode, stdout, stderr = await cached_execute_command(
+        ["ss", "-H", "-lntup"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
-        return f"Error reading listening ports: {stderr}"
-
-    return f"""## Listening Ports
+        return render_error(f"Error reading listening ports: {stderr}", format)
 
-{stdout}
-"""
+    return render(parse_ss, stdout, "Listening Ports", format, fields)
 
 
 async def get_active_connections(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get active network connections.
 
     **Read-only operation** via SSH mcp-reader.
     """
-    returncode, stdout, stderr = await execute_command(
-        ["ss", "-antup"], host
+    returncode, stdout, stderr = await cached_execute_command(
+        ["ss", "-antup"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
@@ -91,29 +113,30 @@ async def get_active_connections(
 
 async def get_dns_config(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get DNS configuration.
 
     **Read-only operation** via SSH mcp-reader.
     """
-    # Read resolv.conf
-    resolv_rc, resolv_out, _ = await execute_command(
-        ["cat", "/etc/resolv.conf"], host
-    )
-
-    # Try to get systemd-resolved status
-    resolved_rc, resolved_out, _ = await execute_command(
-        ["resolvectl", "status"], host
+    result = await (
+        ProbePlan()
+        .add("resolv", ["cat", "/etc/resolv.conf"])
+        .add("resolved", ["resolvectl", "status"])
+        .run(host, bypass_cache)
     )
+    resolv, resolved = result["resolv"], result["resolved"]
 
     output = f"""## DNS Configuration
 
 ### /etc/resolv.conf
-{resolv_out if resolv_rc == 0 else "Unable to read"}
+{resolv.stdout if resolv.ok else "Unable to read"}
 
 ### systemd-resolved Status
-{resolved_out if resolved_rc == 0 else "systemd-resolved not available or not running"}
+{resolved.stdout if resolved.ok else "systemd-resolved not available or not running"}
+
+{result.timing()}
 """
 
     return output
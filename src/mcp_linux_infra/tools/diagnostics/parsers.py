@@ -0,0 +1,266 @@
+"""
+Structured parsers for core diagnostic commands.
+
+Turn the raw output of ``/proc/meminfo``, ``df -P``, ``ss -H``,
+``ip -j route`` and ``systemctl show`` into compact records (sizes in
+bytes, ports and PIDs as integers) that tools can return as JSON, or
+render as short markdown tables instead of echoing the raw text.
+
+Records are plain dicts/lists: stable keys make them easy to cache,
+diff and filter with ``select_fields``.
+"""
+
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+OUTPUT_FORMATS = ("markdown", "json")
+
+# Champs exprimés en octets (affichés en unités lisibles en markdown)
+BYTE_FIELDS = frozenset({
+    "total", "available", "used", "free", "buffers", "cached", "shared",
+    "swap_total", "swap_used", "swap_free", "size", "memory",
+})
+
+Record = dict[str, Any]
+
+
+class ParseError(ValueError):
+    """Command output does not have the expected shape."""
+
+
+# ============================================================================
+# PARSERS
+# ============================================================================
+
+def parse_meminfo(text: str) -> Record:
+    """Parse ``/proc/meminfo`` into a memory summary (bytes)."""
+    values: dict[str, int] = {}
+    for line in text.splitlines():
+        key, sep, rest = line.partition(":")
+        parts = rest.split()
+        if not sep or not parts or not parts[0].isdigit():
+            continue
+        value = int(parts[0])
+        values[key.strip()] = value * 1024 if parts[1:] == ["kB"] else value
+
+    if "MemTotal" not in values:
+        raise ParseError("MemTotal missing from /proc/meminfo")
+
+    total = values["MemTotal"]
+    free = values.get("MemFree", 0)
+    buffers = values.get("Buffers", 0)
+    cached = values.get("Cached", 0) + values.get("SReclaimable", 0)
+    # MemAvailable n'existe qu'à partir de Linux 3.14
+    available = values.get("MemAvailable", free + buffers + cached)
+    swap_total = values.get("SwapTotal", 0)
+    swap_free = values.get("SwapFree", 0)
+
+    return {
+        "total": total,
+        "available": available,
+        "used": total - available,
+        "free": free,
+        "buffers": buffers,
+        "cached": cached,
+        "shared": values.get("Shmem", 0),
+        "swap_total": swap_total,
+        "swap_used": swap_total - swap_free,
+        "swap_free": swap_free,
+    }
+
+
+def parse_df(text: str) -> list[Record]:
+    """Parse POSIX ``df -P`` output (one filesystem per line)."""
+    lines = text.splitlines()
+    if not lines or not lines[0].startswith("Filesystem"):
+        raise ParseError("missing df -P header")
+
+    match = re.search(r"(\d+)-blocks", lines[0])
+    block_size = int(match.group(1)) if match else 1024
+
+    records = []
+    for line in lines[1:]:
+        parts = line.split(None, 5)
+        if len(parts) < 6:
+            continue
+        filesystem, blocks, used, available, capacity, mount = parts
+        try:
+            records.append({
+                "filesystem": filesystem,
+                "mount": mount,
+                "size": int(blocks) * block_size,
+                "used": int(used) * block_size,
+                "available": int(available) * block_size,
+                "use_percent": int(capacity.rstrip("%")) if capacity != "-" else None,
+            })
+        except ValueError as e:
+            raise ParseError(f"unexpected df line: {line!r}") from e
+    return records
+
+
+_SS_PROCESS = re.compile(r'\("((?:[^"\\]|\\.)*)",pid=(\d+)')
+
+
+def parse_ss(text: str) -> list[Record]:
+    """Parse ``ss -H -lntup`` (no header) into listening sockets."""
+    records = []
+    for line in text.splitlines():
+        parts = line.split(None, 6)
+        if len(parts) < 6:
+            continue
+        proto, state, _recv_q, _send_q, local, _peer = parts[:6]
+        address, _, port = local.rpartition(":")
+        records.append({
+            "proto": proto,
+            "state": state,
+            "address": address.strip("[]"),
+            "port": int(port) if port.isdigit() else None,
+            "processes": [
+                {"name": name, "pid": int(pid)}
+                for name, pid in _SS_PROCESS.findall(parts[6] if len(parts) > 6 else "")
+            ],
+        })
+    return records
+
+
+ROUTE_FIELDS = ("dst", "gateway", "dev", "protocol", "scope", "prefsrc", "metric")
+
+
+def parse_ip_route(text: str) -> list[Record]:
+    """Parse ``ip -j route show`` keeping only the useful route attributes."""
+    try:
+        routes = json.loads(text or "[]")
+    except json.JSONDecodeError as e:
+        raise ParseError(f"invalid ip -j output: {e}") from e
+    if not isinstance(routes, list):
+        raise ParseError("ip -j output is not a list")
+
+    return [
+        {key: route[key] for key in ROUTE_FIELDS if key in route}
+        for route in routes
+        if isinstance(route, dict)
+    ]
+
+
+def parse_systemctl_show(text: str) -> dict[str, str]:
+    """Parse ``systemctl show`` ``Key=Value`` lines."""
+    return dict(line.split("=", 1) for line in text.splitlines() if "=" in line)
+
+
+def service_state(properties: dict[str, str]) -> Record:
+    """Compact service state from ``systemctl show`` properties."""
+    pid = properties.get("ExecMainPID", "")
+    memory = properties.get("MemoryCurrent", "")
+    return {
+        "load_state": properties.get("LoadState", "unknown"),
+        "active_state": properties.get("ActiveState", "unknown"),
+        "sub_state": properties.get("SubState", "unknown"),
+        "pid": int(pid) if pid.isdigit() and pid != "0" else None,
+        # "[not set]" ou UINT64_MAX quand la comptabilité mémoire est désactivée
+        "memory": int(memory) if memory.isdigit() and int(memory) < 2**64 - 1 else None,
+    }
+
+
+# ============================================================================
+# FIELD SELECTION & RENDERING
+# ============================================================================
+
+def select_fields(data: Record | list[Record], fields: list[str] | None) -> Any:
+    """Keep only ``fields`` in a record or list of records (unknown fields are an error)."""
+    if not fields:
+        return data
+
+    records = data if isinstance(data, list) else [data]
+    known = set().union(*(record.keys() for record in records)) if records else set(fields)
+    unknown = [field for field in fields if field not in known]
+    if unknown:
+        raise ParseError(f"unknown fields {unknown}, available: {sorted(known)}")
+
+    selected = [{field: record.get(field) for field in fields} for record in records]
+    return selected if isinstance(data, list) else selected[0]
+
+
+def to_json(data: Any) -> str:
+    """Compact JSON (no whitespace)."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def format_bytes(value: int | None) -> str:
+    """Human readable size (binary units)."""
+    if value is None:
+        return "N/A"
+    size = float(value)
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(size) < 1024 or unit == "TiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{value} B"  # pragma: no cover
+
+
+def _format_value(key: str, value: Any) -> str:
+    if key in BYTE_FIELDS:
+        return format_bytes(value)
+    if key == "use_percent" and value is not None:
+        return f"{value}%"
+    if key == "processes":
+        return ", ".join(f"{p['name']}({p['pid']})" for p in value) or "-"
+    if value is None:
+        return "-"
+    return str(value).replace("|", "/")
+
+
+def markdown_table(records: list[Record]) -> str:
+    """Render records as a markdown table (columns from the first record)."""
+    if not records:
+        return "_(none)_"
+    columns = list(records[0])
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join("---" for _ in columns) + "|",
+    ]
+    for record in records:
+        lines.append("| " + " | ".join(_format_value(c, record.get(c)) for c in columns) + " |")
+    return "\n".join(lines)
+
+
+def markdown_fields(record: Record) -> str:
+    """Render a single record as a markdown bullet list."""
+    return "\n".join(f"- {key}: {_format_value(key, value)}" for key, value in record.items())
+
+
+def check_format(format: str) -> str | None:
+    """Error message for an unsupported output format, None if valid."""
+    if format in OUTPUT_FORMATS:
+        return None
+    return f"Error: unknown format {format!r} (expected one of {', '.join(OUTPUT_FORMATS)})"
+
+
+def render_error(message: str, format: str) -> str:
+    """Error in the requested format."""
+    return to_json({"error": message}) if format == "json" else message
+
+
+def render(
+    parse: Callable[[str], Any],
+    text: str,
+    title: str,
+    format: str = "markdown",
+    fields: list[str] | None = None,
+) -> str:
+    """
+    Parse command output and render it as compact JSON or a markdown table.
+
+    Parse errors and unknown fields are reported in the requested format.
+    """
+    try:
+        data = select_fields(parse(text), fields)
+    except ParseError as e:
+        return render_error(f"Error parsing {title.lower()}: {e}", format)
+
+    if format == "json":
+        return to_json(data)
+
+    body = markdown_table(data) if isinstance(data, list) else markdown_fields(data)
+    return f"## {title}\n\n{body}\n"
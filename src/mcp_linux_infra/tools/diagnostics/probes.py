@@ -0,0 +1,161 @@
+"""
+Diagnostic tools: probe plans.
+
+A plan declares the probes a diagnostic needs and their dependencies.
+Independent probes run together in one wave (one batched SSH round-trip,
+or concurrent channels on the pooled connection); probes that depend on
+another probe's output run in a later wave.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from ...connection import cached_execute_commands
+
+ProbeCommand = list[str] | Callable[[dict[str, "ProbeResult"]], list[str] | None]
+
+
+@dataclass
+class Probe:
+    """
+    A read-only command in a plan.
+
+    ``command`` may be a callable receiving the results of the dependencies
+    and returning the command to run (or None to skip the probe).
+    """
+
+    name: str
+    command: ProbeCommand
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one probe."""
+
+    name: str
+    returncode: int = -1
+    stdout: str = ""
+    stderr: str = ""
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.skipped and self.returncode == 0
+
+
+@dataclass
+class PlanResult:
+    """Results of a plan run, indexed by probe name."""
+
+    results: dict[str, ProbeResult] = field(default_factory=dict)
+    waves: int = 0
+    elapsed_ms: float = 0.0
+
+    def __getitem__(self, name: str) -> ProbeResult:
+        return self.results[name]
+
+    def timing(self) -> str:
+        """One-line timing summary for tool output."""
+        ran = sum(1 for r in self.results.values() if not r.skipped)
+        return f"_{ran} probes in {self.waves} wave(s), {self.elapsed_ms:.0f} ms_"
+
+
+class ProbePlan:
+    """
+    Probes with dependencies, executed wave by wave.
+
+    Usage:
+        plan = ProbePlan()
+        plan.add("os", ["cat", "/etc/os-release"])
+        plan.add("kernel", ["uname", "-a"])
+        result = await plan.run(host)
+        result["os"].stdout
+    """
+
+    def __init__(self, probes: list[Probe] | None = None):
+        self.probes: dict[str, Probe] = {}
+        for probe in probes or []:
+            self._register(probe)
+
+    def add(
+        self, name: str, command: ProbeCommand, depends_on: tuple[str, ...] = ()
+    ) -> "ProbePlan":
+        self._register(Probe(name, command, tuple(depends_on)))
+        return self
+
+    def _register(self, probe: Probe) -> None:
+        if probe.name in self.probes:
+            raise ValueError(f"Duplicate probe: {probe.name}")
+        self.probes[probe.name] = probe
+
+    def waves(self) -> list[list[Probe]]:
+        """
+        Topological layering of the plan.
+
+        Raises:
+            ValueError: unknown dependency or dependency cycle
+        """
+        for probe in self.probes.values():
+            for dep in probe.depends_on:
+                if dep not in self.probes:
+                    raise ValueError(f"Probe '{probe.name}' depends on unknown probe '{dep}'")
+
+        done: set[str] = set()
+        pending = list(self.probes.values())
+        layers: list[list[Probe]] = []
+
+        while pending:
+            ready = [p for p in pending if all(dep in done for dep in p.depends_on)]
+            if not ready:
+                raise ValueError(
+                    f"Dependency cycle between probes: {', '.join(p.name for p in pending)}"
+                )
+            layers.append(ready)
+            done.update(p.name for p in ready)
+            pending = [p for p in pending if p.name not in done]
+
+        return layers
+
+    async def run(self, host: str | None = None, bypass_cache: bool = False) -> PlanResult:
+        """
+        Execute the plan on ``host`` (None = local).
+
+        Probe results go through the diagnostics result cache unless
+        ``bypass_cache`` is set.
+        """
+        started = time.perf_counter()
+        plan = PlanResult()
+
+        for wave in self.waves():
+            to_run: list[tuple[Probe, list[str]]] = []
+
+            for probe in wave:
+                command = self._resolve(probe, plan.results)
+                if command is None:
+                    plan.results[probe.name] = ProbeResult(probe.name, skipped=True)
+                else:
+                    to_run.append((probe, command))
+
+            if not to_run:
+                continue
+
+            outputs = await cached_execute_commands(
+                [command for _, command in to_run], host, bypass_cache=bypass_cache
+            )
+            for (probe, _), (returncode, stdout, stderr) in zip(to_run, outputs, strict=True):
+                plan.results[probe.name] = ProbeResult(probe.name, returncode, stdout, stderr)
+            plan.waves += 1
+
+        plan.elapsed_ms = (time.perf_counter() - started) * 1000
+        return plan
+
+    @staticmethod
+    def _resolve(probe: Probe, results: dict[str, ProbeResult]) -> list[str] | None:
+        # Une dépendance en échec ou sautée fait sauter le probe
+        if any(not results[dep].ok for dep in probe.depends_on):
+            return None
+        if callable(probe.command):
+            return probe.command({dep: results[dep] for dep in probe.depends_on})
+        return probe.command
@@ -1,18 +1,31 @@
 """Diagnostic tools: Systemd services (read-only)."""
 
-from ...connection import execute_command
+from ...connection import cached_execute_command, execute_command
+from .fleet import run_on_fleet
+from .parsers import (
+    ParseError,
+    check_format,
+    format_bytes,
+    parse_systemctl_show,
+    render_error,
+    select_fields,
+    service_state,
+    to_json,
+)
+from .probes import ProbePlan
 
 
 async def list_services(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     List all systemd services with their status.
 
     **Read-only operation** via SSH mcp-reader.
     """
-    returncode, stdout, stderr = await execute_command(
-        ["systemctl", "list-units", "--type=service", "--all", "--no-pager"], host
+    returncode, stdout, stderr = await cached_execute_command(
+        ["systemctl", "list-units", "--type=service", "--all", "--no-pager"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
@@ -27,6 +40,8 @@ async def list_services(
 async def get_service_status(
     service_name: str,
     host: str | None = None,
+    hosts: list[str] | str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get detailed status of a specific systemd service.
@@ -36,13 +51,22 @@ async def get_service_status(
     Args:
         service_name: Name of the service (with or without .service suffix)
         host: Target host
+        hosts: Run on several hosts instead (list, comma-separated or glob)
+        bypass_cache: Re-run the probes instead of using cached results
     """
+    if hosts is not None:
+        return await run_on_fleet(
+            f"Service Status: {service_name}",
+            hosts,
+            lambda h: get_service_status(service_name, h, bypass_cache=bypass_cache),
+        )
+
     # Ensure .service suffix
     if not service_name.endswith(".service"):
         service_name = f"{service_name}.service"
 
-    returncode, stdout, stderr = await execute_command(
-        ["systemctl", "status", service_name, "--no-pager", "-l"], host
+    returncode, stdout, stderr = await cached_execute_command(
+        ["systemctl", "status", service_name, "--no-pager", "-l"], host, bypass_cache=bypass_cache
     )
 
     # Note: systemctl status returns non-zero for inactive services
@@ -89,59 +113,89 @@ async def get_service_logs(
 async def check_service_health(
     service_name: str,
     host: str | None = None,
+    hosts: list[str] | str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
 ) -> str:
     """
     Comprehensive health check for a service.
 
     **Read-only operation** via SSH mcp-reader.
 
+    Args:
+        service_name: Name of the service
+        host: Target host
+        hosts: Run on several hosts instead (list, comma-separated or glob)
+        bypass_cache: Re-run the probes instead of using cached results
+        format: "markdown" or "json"
+        fields: Only return these fields (JSON, e.g. ["healthy", "active_state"])
+
     Returns:
     - Service status (active/inactive/failed)
     - Uptime
     - Recent errors in logs
     - Memory usage
     """
+    if error := check_format(format):
+        return error
+
+    if hosts is not None:
+        return await run_on_fleet(
+            f"Health Check: {service_name}",
+            hosts,
+            lambda h: check_service_health(
+                service_name, h, bypass_cache=bypass_cache, format=format, fields=fields
+            ),
+            format,
+        )
+
     if not service_name.endswith(".service"):
         service_name = f"{service_name}.service"
 
-    # Get status
-    status_rc, status_out, _ = await execute_command(
-        ["systemctl", "show", service_name, "--property=ActiveState,SubState,ExecMainPID,MemoryCurrent,LoadState"], host
-    )
-
-    # Parse status
-    status_lines = status_out.split("\n")
-    status_dict = dict(line.split("=", 1) for line in status_lines if "=" in line)
-
-    active_state = status_dict.get("ActiveState", "unknown")
-    sub_state = status_dict.get("SubState", "unknown")
-    pid = status_dict.get("ExecMainPID", "N/A")
-    memory = status_dict.get("MemoryCurrent", "N/A")
-    load_state = status_dict.get("LoadState", "unknown")
-
-    # Get recent errors
-    log_rc, log_out, _ = await execute_command(
-        ["journalctl", "-u", service_name, "-p", "err", "-n", "20", "--no-pager"], host
+    result = await (
+        ProbePlan()
+        .add("status", ["systemctl", "show", service_name, "--property=ActiveState,SubState,ExecMainPID,MemoryCurrent,LoadState"])
+        .add("errors", ["journalctl", "-u", service_name, "-p", "err", "-n", "20", "--no-pager"])
+        .run(host, bypass_cache)
     )
 
-    errors = log_out if log_rc == 0 else "Unable to fetch errors"
+    state = service_state(parse_systemctl_show(result["status"].stdout))
+    healthy = state["active_state"] == "active"
+    errors = result["errors"]
+
+    if format == "json":
+        record = {
+            "service": service_name,
+            "healthy": healthy,
+            **state,
+            "errors": errors.stdout.splitlines() if errors.ok else None,
+        }
+        try:
+            return to_json(select_fields(record, fields))
+        except ParseError as e:
+            return render_error(f"Error: {e}", format)
 
     # Format health report
-    health_status = "🟢 HEALTHY" if active_state == "active" else "🔴 UNHEALTHY"
+    health_status = "🟢 HEALTHY" if healthy else "🔴 UNHEALTHY"
+    pid = state["pid"] if state["pid"] is not None else "N/A"
+    memory = format_bytes(state["memory"])
 
     return f"""## Health Check: {service_name}
 
 **Status:** {health_status}
 
 **Details:**
-- Load State: {load_state}
-- Active State: {active_state}
-- Sub State: {sub_state}
+- Load State: {state["load_state"]}
+- Active State: {state["active_state"]}
+- Sub State: {state["sub_state"]}
 - PID: {pid}
 - Memory: {memory}
 
 **Recent Errors (last 20):**
 ```
-{errors}
+{errors.stdout if errors.ok else "Unable to fetch errors"}
 ```
+
+{result.timing()}
 """
@@ -2,17 +2,27 @@
 
 
 
-from ...connection import execute_command
+from ...connection import cached_execute_command
+from .fleet import run_on_fleet
+from .parsers import check_format, parse_df, parse_meminfo, render, render_error
+from .probes import ProbePlan
 
 
 async def get_system_info(
     host: str | None = None,
+    hosts: list[str] | str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get comprehensive system information.
 
     **Read-only operation** via SSH mcp-reader.
 
+    Args:
+        host: Target host
+        hosts: Run on several hosts instead (list, comma-separated or glob)
+        bypass_cache: Re-run the probes instead of using cached results
+
     Returns:
     - OS and distribution
     - Kernel version
@@ -20,29 +30,36 @@ async def get_system_info(
     - Load averages
     - Architecture
     """
-    commands = [
-        ("OS", ["cat", "/etc/os-release"]),
-        ("Kernel", ["uname", "-a"]),
-        ("Uptime", ["uptime"]),
-        ("Load", ["cat", "/proc/loadavg"]),
-        ("Hostname", ["hostname", "-f"]),
-    ]
+    if hosts is not None:
+        return await run_on_fleet(
+            "System Information", hosts, lambda h: get_system_info(h, bypass_cache=bypass_cache)
+        )
+
+    plan = (
+        ProbePlan()
+        .add("OS", ["cat", "/etc/os-release"])
+        .add("Kernel", ["uname", "-a"])
+        .add("Uptime", ["uptime"])
+        .add("Load", ["cat", "/proc/loadavg"])
+        .add("Hostname", ["hostname", "-f"])
+    )
+    result = await plan.run(host, bypass_cache)
 
     output_parts = []
 
-    for label, cmd in commands:
-        returncode, stdout, stderr = await execute_command(cmd, host)
-
-        if returncode == 0:
-            output_parts.append(f"## {label}\n{stdout.strip()}\n")
+    for label, probe in result.results.items():
+        if probe.ok:
+            output_parts.append(f"## {label}\n{probe.stdout.strip()}\n")
         else:
-            output_parts.append(f"## {label}\nError: {stderr.strip()}\n")
+            output_parts.append(f"## {label}\nError: {probe.stderr.strip()}\n")
 
+    output_parts.append(result.timing())
     return "\n".join(output_parts)
 
 
 async def get_cpu_info(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     Get CPU information.
@@ -55,21 +72,24 @@ async def get_cpu_info(
     - CPU frequencies
     - CPU usage
     """
-    returncode, stdout, stderr = await execute_command(
-        ["cat", "/proc/cpuinfo"], host
+    result = await (
+        ProbePlan()
+        .add("cpuinfo", ["cat", "/proc/cpuinfo"])
+        .add("loadavg", ["cat", "/proc/loadavg"])
+        .run(host, bypass_cache)
     )
+    cpuinfo, loadavg = result["cpuinfo"], result["loadavg"]
 
-    if returncode != 0:
-        return f"Error reading CPU info: {stderr}"
+    if not cpuinfo.ok:
+        return f"Error reading CPU info: {cpuinfo.stderr}"
 
     # Parse relevant fields
+    stdout = cpuinfo.stdout
     lines = stdout.split("\n")
     cpu_model = next((line.split(":", 1)[1].strip() for line in lines if line.startswith("model name")), "Unknown")
     cpu_count = len([line for line in lines if line.startswith("processor")])
 
-    # Get load average
-    load_rc, load_out, _ = await execute_command(["cat", "/proc/loadavg"], host)
-    load_avg = load_out.strip() if load_rc == 0 else "Unknown"
+    load_avg = loadavg.stdout.strip() if loadavg.ok else "Unknown"
 
     return f"""## CPU Information
 
@@ -79,70 +99,101 @@ Load Average: {load_avg}
 
 ## Full Details
 {stdout}
+{result.timing()}
 """
 
 
 async def get_memory_info(
     host: str | None = None,
+    hosts: list[str] | str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
 ) -> str:
     """
-    Get memory information (RAM + Swap).
+    Get memory information (RAM + Swap), parsed from /proc/meminfo.
 
     **Read-only operation** via SSH mcp-reader.
+
+    Args:
+        host: Target host
+        hosts: Run on several hosts instead (list, comma-separated or glob)
+        bypass_cache: Re-run the probes instead of using cached results
+        format: "markdown" or "json" (sizes in bytes)
+        fields: Only return these fields (e.g. ["available", "swap_used"])
     """
-    returncode, stdout, stderr = await execute_command(
-        ["free", "-h"], host
+    if error := check_format(format):
+        return error
+
+    if hosts is not None:
+        return await run_on_fleet(
+            "Memory Information",
+            hosts,
+            lambda h: get_memory_info(h, bypass_cache=bypass_cache, format=format, fields=fields),
+            format,
+        )
+
+    returncode, stdout, stderr = await cached_execute_command(
+        ["cat", "/proc/meminfo"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
-        return f"Error reading memory info: {stderr}"
-
-    return f"""## Memory Information
+        return render_error(f"Error reading memory info: {stderr}", format)
 
-{stdout}
-
-## Detailed Meminfo
-"""
-
-    # Also get detailed meminfo
-    mem_rc, mem_out, _ = await execute_command(["cat", "/proc/meminfo"], host)
-    if mem_rc == 0:
-        return f"{stdout}\n\n## Detailed Meminfo\n{mem_out}"
-
-    return stdout
+    return render(parse_meminfo, stdout, "Memory Information", format, fields)
 
 
 async def get_disk_usage(
     host: str | None = None,
+    hosts: list[str] | str | None = None,
+    bypass_cache: bool = False,
+    format: str = "markdown",
+    fields: list[str] | None = None,
 ) -> str:
     """
-    Get disk usage information for all mount points.
+    Get disk usage information for all mount points (POSIX ``df -P``).
 
     **Read-only operation** via SSH mcp-reader.
+
+    Args:
+        host: Target host
+        hosts: Run on several hosts instead (list, comma-separated or glob)
+        bypass_cache: Re-run the probes instead of using cached results
+        format: "markdown" or "json" (sizes in bytes)
+        fields: Only return these fields (e.g. ["mount", "use_percent"])
     """
-    returncode, stdout, stderr = await execute_command(
-        ["df", "-h", "-x", "tmpfs", "-x", "devtmpfs"], host
+    if error := check_format(format):
+        return error
+
+    if hosts is not None:
+        return await run_on_fleet(
+            "Disk Usage",
+            hosts,
+            lambda h: get_disk_usage(h, bypass_cache=bypass_cache, format=format, fields=fields),
+            format,
+        )
+
+    returncode, stdout, stderr = await cached_execute_command(
+        ["df", "-P", "-x", "tmpfs", "-x", "devtmpfs"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
-        return f"Error reading disk usage: {stderr}"
+        return render_error(f"Error reading disk usage: {stderr}", format)
 
-    return f"""## Disk Usage
-
-{stdout}
-"""
+    return render(parse_df, stdout, "Disk Usage", format, fields)
 
 
 async def get_block_devices(
     host: str | None = None,
+    bypass_cache: bool = False,
 ) -> str:
     """
     List block devices with size and mount points.
 
     **Read-only operation** via SSH mcp-reader.
     """
-    returncode, stdout, stderr = await execute_command(
-        ["lsblk", "-o", "NAME,SIZE,TYPE,MOUNTPOINT,FSTYPE"], host
+    returncode, stdout, stderr = await cached_execute_command(
+        ["lsblk", "-o", "NAME,SIZE,TYPE,MOUNTPOINT,FSTYPE"], host, bypass_cache=bypass_cache
     )
 
     if returncode != 0:
@@ -2,16 +2,24 @@
 SSH command execution tools with authorization
 """
 
-from .ssh_executor import execute_ssh_command, approve_command, list_pending_approvals, show_command_whitelist
+from .ssh_executor import (
+    execute_ssh_command,
+    execute_fleet_command,
+    approve_command,
+    list_pending_approvals,
+    show_command_whitelist,
+)
 from .ansible_wrapper import (
     run_ansible_playbook,
     check_ansible_playbook,
     list_ansible_playbooks,
     show_ansible_inventory,
+    invalidate_ansible_catalog,
 )
 
 __all__ = [
     "execute_ssh_command",
+    "execute_fleet_command",
     "approve_command",
     "list_pending_approvals",
     "show_command_whitelist",
@@ -19,4 +27,5 @@ __all__ = [
     "check_ansible_playbook",
     "list_ansible_playbooks",
     "show_ansible_inventory",
+    "invalidate_ansible_catalog",
 ]
@@ -0,0 +1,419 @@
+"""
+Catalog of remote Ansible playbooks and inventories.
+
+``list_ansible_playbooks`` used to run ``ls`` and ``show_ansible_inventory``
+``cat`` over SSH on every call, returning raw text. The catalog keeps,
+per host and directory, one entry per playbook: size, mtime, SHA-256 and
+the parsed plays (name, ``hosts:`` targets, imported playbooks).
+
+- Within ``ansible_catalog_ttl`` seconds, queries are served from memory
+  without any SSH round-trip.
+- A refresh lists the directory (``ls -ln --time-style=+%s``, one
+  round-trip) and only fetches the files whose mtime or size changed,
+  in one batched round-trip. Deleted files are dropped.
+- ``invalidate`` forgets a host (or one file) so that it is fetched again.
+
+Inventories are cataloged the same way, parsed into groups and hosts
+(INI or YAML).
+"""
+
+import hashlib
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+import yaml
+
+from ...config import CONFIG
+from ...connection import execute_command, execute_commands
+from ...connection.singleflight import SingleFlight
+from ...utils.metrics import REGISTRY, Counter, Gauge, snapshot
+from ..diagnostics.parsers import ParseError, markdown_table, to_json
+
+PLAYBOOK_SUFFIXES = (".yml", ".yaml")
+
+
+class _PlaybookLoader(yaml.SafeLoader):
+    """SafeLoader tolérant les tags Ansible (!vault, !unsafe...)."""
+
+
+_PlaybookLoader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+
+@dataclass
+class CatalogEntry:
+    """Un fichier catalogué (playbook ou inventaire)."""
+
+    path: str
+    size: int
+    mtime: int
+    sha256: str
+    plays: list[dict[str, Any]] = field(default_factory=list)  # Playbook: {"name", "hosts"}
+    imports: list[str] = field(default_factory=list)  # Playbook: import_playbook
+    groups: dict[str, list[str]] = field(default_factory=dict)  # Inventaire: groupe -> hôtes
+    error: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def targets(self) -> list[str]:
+        return sorted({target for play in self.plays for target in play["hosts"]})
+
+
+@dataclass
+class _Directory:
+    entries: dict[str, CatalogEntry] = field(default_factory=dict)  # chemin -> entrée
+    listed_at: float = 0.0  # time.monotonic() du dernier listing
+    refreshed_at: datetime | None = None
+
+
+# ============================================================================
+# PARSERS
+# ============================================================================
+
+def parse_ls(text: str) -> dict[str, tuple[int, int]]:
+    """
+    Regular files of ``ls -ln --time-style=+%s`` output.
+
+    Returns:
+        {name: (size, mtime)}
+    """
+    files = {}
+    for line in text.splitlines():
+        parts = line.split(maxsplit=6)
+        if len(parts) < 7 or not parts[0].startswith("-"):
+            continue  # "total N", répertoires, liens
+        try:
+            files[parts[6]] = (int(parts[4]), int(parts[5]))
+        except ValueError:
+            continue
+    return files
+
+
+def parse_playbook(text: str) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    Plays and imported playbooks of a playbook file.
+
+    Raises:
+        ParseError: Invalid YAML or not a list of plays
+    """
+    try:
+        data = yaml.load(text, Loader=_PlaybookLoader)
+    except yaml.YAMLError as e:
+        raise ParseError(f"invalid YAML: {e}") from e
+    if not isinstance(data, list):
+        raise ParseError("not a playbook (expected a list of plays)")
+
+    plays, imports = [], []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        imported = item.get("import_playbook") or item.get("ansible.builtin.import_playbook")
+        if imported:
+            imports.append(str(imported))
+            continue
+        hosts = item.get("hosts")
+        if isinstance(hosts, str):
+            hosts = [h.strip() for h in hosts.split(",") if h.strip()]
+        plays.append({"name": item.get("name"), "hosts": [str(h) for h in hosts or []]})
+    return plays, imports
+
+
+def _expand(groups: dict[str, set[str]], children: dict[str, set[str]]) -> dict[str, list[str]]:
+    def members(group: str, seen: set[str]) -> set[str]:
+        if group in seen:
+            return set()  # Cycle
+        seen.add(group)
+        hosts = set(groups.get(group, ()))
+        for child in children.get(group, ()):
+            hosts |= members(child, seen)
+        return hosts
+
+    names = set(groups) | set(children)
+    return {group: sorted(members(group, set())) for group in sorted(names)}
+
+
+def _parse_yaml_inventory(data: dict) -> dict[str, list[str]]:
+    groups: dict[str, set[str]] = {}
+    children: dict[str, set[str]] = {}
+
+    def walk(name: str, node: Any):
+        node = node if isinstance(node, dict) else {}
+        groups.setdefault(name, set()).update((node.get("hosts") or {}).keys())
+        for child, child_node in (node.get("children") or {}).items():
+            children.setdefault(name, set()).add(child)
+            walk(child, child_node)
+
+    for name, node in data.items():
+        walk(name, node)
+    return _expand(groups, children)
+
+
+def parse_inventory(text: str) -> dict[str, list[str]]:
+    """
+    Groups and their hosts (children expanded) of an INI or YAML inventory.
+
+    Raises:
+        ParseError: Not an inventory
+    """
+    try:
+        data = yaml.load(text, Loader=_PlaybookLoader)
+    except yaml.YAMLError:
+        data = None
+    if isinstance(data, dict) and all(isinstance(v, (dict, type(None))) for v in data.values()):
+        return _parse_yaml_inventory(data)
+
+    groups: dict[str, set[str]] = {"ungrouped": set()}
+    children: dict[str, set[str]] = {}
+    group, section = "ungrouped", "hosts"
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            group, _, section = line[1:-1].partition(":")
+            section = section or "hosts"
+            if section == "hosts":
+                groups.setdefault(group, set())
+            continue
+        if section == "hosts":
+            groups[group].add(line.split()[0])
+        elif section == "children":
+            children.setdefault(group, set()).add(line.split()[0])
+    if not any(groups.values()) and not children:
+        raise ParseError("no hosts or groups found")
+    if not groups["ungrouped"]:
+        del groups["ungrouped"]
+    return _expand(groups, children)
+
+
+# ============================================================================
+# CATALOG
+# ============================================================================
+
+class AnsibleCatalog:
+    """Playbooks et inventaires connus, par hôte et répertoire."""
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl if ttl is not None else CONFIG.ansible_catalog_ttl
+        self._dirs: dict[tuple[str | None, str], _Directory] = {}
+        self._inflight = SingleFlight()
+        self.listings = 0  # Round-trips de listing
+        self.fetched = 0  # Fichiers (re)lus
+        self.unchanged = 0  # Fichiers gardés grâce à mtime/taille
+        self.hits = 0  # Requêtes servies sans SSH
+
+    async def playbooks(
+        self, host: str | None, directory: str, refresh: bool = False
+    ) -> tuple[list[CatalogEntry], datetime | None]:
+        """Playbooks of ``directory``, refreshed if stale or ``refresh``."""
+        state = await self._fresh(("playbooks", host, directory), refresh, self._refresh_playbooks)
+        return sorted(state.entries.values(), key=lambda e: e.path), state.refreshed_at
+
+    async def inventory(
+        self, host: str | None, path: str, refresh: bool = False
+    ) -> tuple[CatalogEntry | None, datetime | None]:
+        """Inventory at ``path`` (``<path>/hosts`` for a directory)."""
+        state = await self._fresh(("inventory", host, path), refresh, self._refresh_inventory)
+        entry = next(iter(state.entries.values()), None)
+        return entry, state.refreshed_at
+
+    def invalidate(self, host: str | None = None, path: str | None = None) -> int:
+        """
+        Forget cataloged files so that the next query fetches them again.
+
+        Args:
+            host: Only this host (default: all hosts)
+            path: Only this file or directory
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = 0
+        for (kind, key_host, directory), state in list(self._dirs.items()):
+            if host is not None and key_host != host:
+                continue
+            if path is None or path.rstrip("/") == directory.rstrip("/"):
+                dropped += len(state.entries)
+                del self._dirs[(kind, key_host, directory)]
+            elif path in state.entries:
+                del state.entries[path]
+                state.listed_at = 0.0
+                dropped += 1
+        return dropped
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "directories": len(self._dirs),
+            "entries": sum(len(s.entries) for s in self._dirs.values()),
+            "listings": self.listings,
+            "fetched": self.fetched,
+            "unchanged": self.unchanged,
+            "hits": self.hits,
+        }
+
+    async def _fresh(self, key: tuple, refresh: bool, refresh_fn) -> _Directory:
+        state = self._dirs.get(key)
+        if state is not None and not refresh and time.monotonic() - state.listed_at < self.ttl:
+            self.hits += 1
+            return state
+        # Requêtes concurrentes pour le même répertoire: un seul listing
+        await self._inflight.do(key, lambda: refresh_fn(key))
+        return self._dirs[key]
+
+    async def _sync(self, key: tuple, host: str | None, listed: dict[str, tuple[int, int]]) -> None:
+        """Fetch new or changed files, drop deleted ones."""
+        state = self._dirs.setdefault(key, _Directory())
+        kind = key[0]
+        changed = []
+        for path, (size, mtime) in listed.items():
+            entry = state.entries.get(path)
+            if entry is not None and (entry.size, entry.mtime) == (size, mtime):
+                self.unchanged += 1
+            else:
+                changed.append(path)
+
+        results = await execute_commands([["cat", path] for path in changed], host)
+        for path, (returncode, stdout, stderr) in zip(changed, results, strict=True):
+            self.fetched += 1
+            size, mtime = listed[path]
+            entry = CatalogEntry(path, size, mtime, hashlib.sha256(stdout.encode()).hexdigest())
+            if returncode != 0:
+                entry.error = stderr.strip() or f"cat exited with {returncode}"
+            else:
+                try:
+                    if kind == "playbooks":
+                        entry.plays, entry.imports = parse_playbook(stdout)
+                    else:
+                        entry.groups = parse_inventory(stdout)
+                except ParseError as e:
+                    entry.error = str(e)
+            state.entries[path] = entry
+
+        for path in set(state.entries) - set(listed):
+            del state.entries[path]
+        state.listed_at = time.monotonic()
+        state.refreshed_at = datetime.now()
+
+    async def _refresh_playbooks(self, key: tuple) -> None:
+        _, host, directory = key
+        self.listings += 1
+        returncode, stdout, stderr = await execute_command(
+            ["ls", "-ln", "--time-style=+%s", directory], host
+        )
+        if returncode != 0:
+            raise ParseError(f"cannot list {directory}: {stderr.strip()}")
+        base = directory.rstrip("/")
+        listed = {
+            f"{base}/{name}": stat
+            for name, stat in parse_ls(stdout).items()
+            if name.endswith(PLAYBOOK_SUFFIXES) and not any(c.isspace() for c in name)
+        }
+        await self._sync(key, host, listed)
+
+    async def _refresh_inventory(self, key: tuple) -> None:
+        _, host, path = key
+        self.listings += 1
+        hosts_file = f"{path.rstrip('/')}/hosts"
+        # -d: le chemin lui-même (fichier) et <chemin>/hosts (répertoire); l'un des deux échoue
+        _, stdout, stderr = await execute_command(
+            ["ls", "-lnd", "--time-style=+%s", path, hosts_file], host
+        )
+        files = parse_ls(stdout)
+        found = next((p for p in (hosts_file, path) if p in files), None)
+        if found is None:
+            raise ParseError(f"no inventory at {path}: {stderr.strip()}")
+        await self._sync(key, host, {found: files[found]})
+
+
+# Global instance
+_catalog: AnsibleCatalog | None = None
+
+
+def get_ansible_catalog() -> AnsibleCatalog:
+    """Get or create the Ansible catalog."""
+    global _catalog
+    if _catalog is None:
+        _catalog = AnsibleCatalog()
+    return _catalog
+
+
+@REGISTRY.register_collector
+def _catalog_metrics():
+    if _catalog is None:
+        return []
+    stats = _catalog.stats()
+    return [
+        snapshot(Gauge, "mcp_ansible_catalog_entries", "Cataloged playbook and inventory files", stats["entries"]),
+        snapshot(Counter, "mcp_ansible_catalog_listings_total", "Directory listings (SSH round-trips)", stats["listings"]),
+        snapshot(Counter, "mcp_ansible_catalog_fetched_total", "Files fetched because new or changed", stats["fetched"]),
+        snapshot(Counter, "mcp_ansible_catalog_unchanged_total", "Files kept on refresh (same mtime and size)", stats["unchanged"]),
+        snapshot(Counter, "mcp_ansible_catalog_hits_total", "Queries served without SSH", stats["hits"]),
+    ]
+
+
+# ============================================================================
+# RENDU
+# ============================================================================
+
+def _age(refreshed_at: datetime | None) -> str:
+    if refreshed_at is None:
+        return "never"
+    return f"{(datetime.now() - refreshed_at).total_seconds():.0f}s ago"
+
+
+def _playbook_record(fields: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {key: value for key, value in fields if key != "groups"}  # Inventaires seulement
+
+
+def render_playbooks(
+    entries: list[CatalogEntry],
+    title: str,
+    refreshed_at: datetime | None,
+    format: str = "markdown",
+) -> str:
+    if format == "json":
+        # Une liste d'enregistrements: une réponse trop grande perd des playbooks entiers
+        return to_json([
+            {"name": e.name, "targets": e.targets, **asdict(e, dict_factory=_playbook_record)} for e in entries
+        ])
+    rows = [
+        {
+            "name": e.name,
+            "size": e.size,
+            "modified": datetime.fromtimestamp(e.mtime).strftime("%Y-%m-%d %H:%M"),
+            "plays": len(e.plays),
+            "targets": ", ".join(e.targets + [f"import:{i}" for i in e.imports]) or "-",
+            "sha256": e.sha256[:12],
+            "error": e.error,
+        }
+        for e in entries
+    ]
+    return f"""## {title}
+
+_{len(entries)} playbooks, catalog refreshed {_age(refreshed_at)}_
+
+{markdown_table(rows)}
+"""
+
+
+def render_inventory(
+    entry: CatalogEntry, title: str, refreshed_at: datetime | None, format: str = "markdown"
+) -> str:
+    if format == "json":
+        groups = [{"group": group, "hosts": members} for group, members in entry.groups.items()]
+        return to_json({"path": entry.path, "sha256": entry.sha256, "error": entry.error, "groups": groups})
+    hosts = sorted({h for members in entry.groups.values() for h in members})
+    rows = [{"group": group, "hosts": len(members), "members": ", ".join(members) or "-"} for group, members in entry.groups.items()]
+    text = f"""## {title}
+
+_{entry.path}: {len(entry.groups)} groups, {len(hosts)} hosts, catalog refreshed {_age(refreshed_at)}_
+
+{markdown_table(rows)}
+"""
+    if entry.error:
+        text += f"\nError: {entry.error}\n"
+    return text
@@ -0,0 +1,183 @@
+"""
+Structured Ansible results (JSON stdout callback).
+
+The default callback prints every task for every host; a long playbook
+returns tens of KB of text where the interesting part is what changed,
+what failed and what was slow. With ``ANSIBLE_STDOUT_CALLBACK=json``
+ansible-playbook prints one JSON document instead: per-play, per-task,
+per-host results with task start/end times, and the final stats.
+
+``summarize_playbook`` turns it into a compact summary: stats per host,
+the slowest tasks, which tasks changed what, and the output of failed
+tasks only (the last ``FAILED_OUTPUT_MAX_CHARS`` characters of each).
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from ..diagnostics.parsers import ParseError, Record, markdown_table, to_json
+
+JSON_CALLBACK_ENV = "ANSIBLE_STDOUT_CALLBACK=json"
+SLOWEST_TASKS = 10
+# Sortie gardée par tâche en échec (le reste du document est résumé)
+FAILED_OUTPUT_FIELDS = ("msg", "rc", "stdout", "stderr", "module_stderr", "exception")
+# Fin gardée de chaque sortie texte d'une tâche en échec (l'erreur est en général à la fin)
+FAILED_OUTPUT_MAX_CHARS = 4000
+
+STAT_FIELDS = ("ok", "changed", "failures", "unreachable", "skipped", "rescued", "ignored")
+
+
+def uses_json_callback(command: str) -> bool:
+    """True if the command was built to print the JSON callback document."""
+    return JSON_CALLBACK_ENV in command.split(" ansible-playbook ", 1)[0].split()
+
+
+def _duration(duration: dict | None) -> float | None:
+    try:
+        start = datetime.fromisoformat(duration["start"])
+        end = datetime.fromisoformat(duration["end"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+def _failed(result: dict) -> bool:
+    return bool(result.get("failed") or result.get("unreachable")) and not result.get("ignore_errors")
+
+
+def _tail(value: Any) -> Any:
+    if not isinstance(value, str) or len(value) <= FAILED_OUTPUT_MAX_CHARS:
+        return value
+    return f"[... {len(value) - FAILED_OUTPUT_MAX_CHARS} chars cut] " + value[-FAILED_OUTPUT_MAX_CHARS:]
+
+
+def _failure_output(result: dict) -> Record:
+    output = {key: _tail(result[key]) for key in FAILED_OUTPUT_FIELDS if result.get(key) not in (None, "")}
+    # Boucles: seulement les éléments en échec
+    items = [
+        {"item": item.get("item"), **_failure_output(item)}
+        for item in result.get("results") or []
+        if isinstance(item, dict) and item.get("failed")
+    ]
+    if items:
+        output["failed_items"] = items
+    if result.get("unreachable"):
+        output["unreachable"] = True
+    return output
+
+
+def parse_playbook_json(text: str) -> dict[str, Any]:
+    """
+    Extract the JSON callback document from ansible-playbook stdout.
+
+    Raises:
+        ParseError: No JSON document in the output
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ParseError("no JSON document in ansible-playbook output")
+    try:
+        document, _ = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        raise ParseError(f"invalid JSON callback output: {e}") from e
+    if not isinstance(document, dict) or "plays" not in document:
+        raise ParseError("JSON output is not an ansible-playbook result (no 'plays')")
+    return document
+
+
+def summarize_playbook(document: dict[str, Any], slowest: int = SLOWEST_TASKS) -> Record:
+    """
+    Compact summary of a JSON callback document.
+
+    Returns:
+        {"ok", "duration_s", "tasks", "hosts": [per-host stats], "slowest": [...],
+         "changed": [...], "failed": [... with failure output (tail)]}
+    """
+    tasks: list[Record] = []
+    changed: list[Record] = []
+    failed: list[Record] = []
+    duration = 0.0
+
+    for play in document.get("plays") or []:
+        play_info = play.get("play") or {}
+        duration += _duration(play_info.get("duration")) or 0.0
+        for task in play.get("tasks") or []:
+            task_info = task.get("task") or {}
+            name = task_info.get("name") or "(unnamed)"
+            hosts = task.get("hosts") or {}
+            tasks.append({
+                "task": name,
+                "play": play_info.get("name"),
+                "duration_s": _duration(task_info.get("duration")),
+                "hosts": len(hosts),
+            })
+            for host, result in hosts.items():
+                if not isinstance(result, dict):
+                    continue
+                if _failed(result):
+                    failed.append({"host": host, "task": name, **_failure_output(result)})
+                elif result.get("changed"):
+                    changed.append({"host": host, "task": name})
+
+    stats = document.get("stats") or {}
+    hosts = [{"host": host, **{field: counts.get(field, 0) for field in STAT_FIELDS}} for host, counts in stats.items()]
+    timed = sorted((t for t in tasks if t["duration_s"] is not None), key=lambda t: t["duration_s"], reverse=True)
+
+    return {
+        "ok": not any(h["failures"] or h["unreachable"] for h in hosts) and not failed,
+        "duration_s": round(duration, 3),
+        "tasks": len(tasks),
+        "hosts": hosts,
+        "slowest": timed[:slowest],
+        "changed": changed,
+        "failed": failed,
+    }
+
+
+def _render_markdown(summary: Record, title: str) -> str:
+    icon = "✅" if summary["ok"] else "❌"
+    lines = [
+        f"{icon} {title}: {summary['tasks']} tasks in {summary['duration_s']:.1f}s",
+        "",
+        markdown_table(summary["hosts"]),
+    ]
+    if summary["slowest"]:
+        lines += ["", "Slowest tasks:", markdown_table(summary["slowest"])]
+    if summary["changed"]:
+        lines += ["", f"Changed ({len(summary['changed'])}):"]
+        lines += [f"- {c['host']}: {c['task']}" for c in summary["changed"]]
+    for failure in summary["failed"]:
+        details = {k: v for k, v in failure.items() if k not in ("host", "task")}
+        lines += [
+            "",
+            f"FAILED {failure['host']}: {failure['task']}",
+            "```",
+            json.dumps(details, indent=2, ensure_ascii=False),
+            "```",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def render_playbook_result(
+    stdout: str, stderr: str, returncode: int, title: str, format: str = "markdown"
+) -> str:
+    """
+    Summarize ansible-playbook JSON callback output.
+
+    Falls back to the raw stderr/stdout when the output is not a JSON
+    document (ansible-playbook failed before running, callback missing).
+    """
+    try:
+        summary = summarize_playbook(parse_playbook_json(stdout))
+    except ParseError as e:
+        message = f"Error parsing ansible-playbook output: {e} (exit code {returncode})"
+        if format == "json":
+            return to_json({"error": message, "stdout": stdout[-2000:], "stderr": stderr[-2000:]})
+        errors = "Errors:\n" + stderr if stderr else ""
+        return f"❌ {message}\n\nOutput:\n{stdout}\n\n{errors}\n"
+
+    summary["returncode"] = returncode
+    if format == "json":
+        return to_json(summary)
+    return _render_markdown(summary, title)
@@ -4,9 +4,13 @@ Ansible wrapper for simplified playbook execution
 Provides high-level tools for running Ansible playbooks via SSH.
 """
 
+import shlex
 from typing import Optional
 
-from .ssh_executor import execute_ssh_command, approve_command
+from ..diagnostics.parsers import OUTPUT_FORMATS, ParseError, check_format, render_error
+from .ansible_catalog import get_ansible_catalog, render_inventory, render_playbooks
+from .ansible_results import JSON_CALLBACK_ENV, render_playbook_result
+from .ssh_executor import CommandResult, execute_ssh_command, approve_command
 
 
 async def run_ansible_playbook(
@@ -15,7 +19,9 @@ async def run_ansible_playbook(
     inventory: str = "localhost,",
     check_mode: bool = True,
     extra_vars: Optional[dict] = None,
-    auto_approve: bool = False
+    auto_approve: bool = False,
+    background: bool = False,
+    format: str = "text"
 ) -> str:
     """
     Execute Ansible playbook on remote host
@@ -30,9 +36,15 @@ async def run_ansible_playbook(
         check_mode: Run in dry-run mode (default: True for safety)
         extra_vars: Extra variables for Ansible (dict)
         auto_approve: Skip approval for non-check mode execution (DANGEROUS!)
+        background: Start as a job and return its ID; output is streamed
+            (poll_job/tail_job/wait_job/cancel_job). Approved runs use
+            approve_command(approval_id, background=True)
+        format: "text" for the regular Ansible output, or "markdown"/"json"
+            for a compact summary from the JSON callback: stats per host,
+            slowest tasks, changed tasks, output (tail) of failed tasks only
 
     Returns:
-        Ansible execution output or approval request
+        Ansible execution output or summary, job ID or approval request
 
     Examples:
         # Dry-run (auto-approved)
@@ -50,6 +62,20 @@ async def run_ansible_playbook(
         )
         # Returns approval ID, then use approve_command(approval_id)
 
+        # Long dry-run, followed with poll_job/wait_job
+        result = await run_ansible_playbook(
+            host="coreos-11",
+            playbook_path="/opt/infra/playbooks/deploy-pihole-v6.yml",
+            background=True
+        )
+
+        # Compact summary (per-host stats, slowest tasks, failures)
+        result = await run_ansible_playbook(
+            host="coreos-11",
+            playbook_path="/opt/infra/playbooks/deploy-pihole-v6.yml",
+            format="markdown"
+        )
+
         # With extra variables
         result = await run_ansible_playbook(
             host="coreos-11",
@@ -59,12 +85,21 @@ async def run_ansible_playbook(
         )
     """
 
+    summary = format != "text"
+    if summary:
+        if format not in OUTPUT_FORMATS:
+            return f"Error: unknown format {format!r} (expected one of text, {', '.join(OUTPUT_FORMATS)})"
+        if background:
+            # Le document JSON n'arrive qu'à la fin: rien à suivre en flux
+            return "Error: format='text' is required with background=True"
+
     # Build ansible-playbook command
     cmd_parts = [
         "cd /opt/infra &&",
+        *([JSON_CALLBACK_ENV] if summary else []),
         "ansible-playbook",
-        playbook_path,
-        f"--inventory={inventory}",
+        shlex.quote(playbook_path),
+        f"--inventory={shlex.quote(inventory)}",
     ]
 
     # Add check mode flag
@@ -75,16 +110,27 @@ async def run_ansible_playbook(
     if extra_vars:
         # Convert dict to ansible format: key1=value1 key2=value2
         vars_str = " ".join(f"{k}={v}" for k, v in extra_vars.items())
-        cmd_parts.append(f'--extra-vars "{vars_str}"')
+        cmd_parts.append(f"--extra-vars {shlex.quote(vars_str)}")
 
     # Join command
     command = " ".join(cmd_parts)
 
     # Execute via authorization system
+    formatter = None
+    if summary:
+        title = f"Ansible playbook {playbook_path} on {host}" + (" (check mode)" if check_mode else "")
+
+        def summarize(result: CommandResult) -> str:
+            return render_playbook_result(result.stdout, result.stderr, result.returncode, title, format)
+
+        formatter = summarize
+
     return await execute_ssh_command(
         host=host,
         command=command,
-        auto_approve=auto_approve
+        auto_approve=auto_approve,
+        background=background,
+        formatter=formatter
     )
 
 
@@ -92,7 +138,8 @@ async def check_ansible_playbook(
     host: str,
     playbook_path: str,
     inventory: str = "localhost,",
-    extra_vars: Optional[dict] = None
+    extra_vars: Optional[dict] = None,
+    format: str = "text"
 ) -> str:
     """
     Run Ansible playbook in check mode (dry-run)
@@ -104,9 +151,10 @@ async def check_ansible_playbook(
         playbook_path: Path to playbook on remote host
         inventory: Ansible inventory
         extra_vars: Extra variables
+        format: "text", or "markdown"/"json" for a compact summary
 
     Returns:
-        Ansible check mode output
+        Ansible check mode output or summary
 
     Example:
         result = await check_ansible_playbook(
@@ -120,41 +168,98 @@ async def check_ansible_playbook(
         inventory=inventory,
         check_mode=True,
         extra_vars=extra_vars,
-        auto_approve=False  # Not needed for check mode, but explicit
+        auto_approve=False,  # Not needed for check mode, but explicit
+        format=format
     )
 
 
-async def list_ansible_playbooks(host: str, playbooks_dir: str = "/opt/infra/playbooks") -> str:
+async def list_ansible_playbooks(
+    host: str,
+    playbooks_dir: str = "/opt/infra/playbooks",
+    refresh: bool = False,
+    target: Optional[str] = None,
+    format: str = "markdown"
+) -> str:
     """
     List available Ansible playbooks on remote host
 
+    Served from the playbook catalog: name, size, mtime, SHA-256 and the
+    plays' ``hosts:`` targets. The directory is re-listed once the catalog
+    is older than ansible_catalog_ttl, and only new or modified files are
+    fetched again.
+
     Args:
         host: Target host
         playbooks_dir: Directory containing playbooks
+        refresh: Re-list the directory now (still fetches changed files only)
+        target: Only playbooks with a play targeting this host/group (or "all")
+        format: "markdown" table or "json" records (full hashes, plays)
 
     Returns:
-        List of playbook files
+        Playbook catalog
 
     Example:
-        result = await list_ansible_playbooks("coreos-11")
+        result = await list_ansible_playbooks("coreos-11", target="dns")
     """
-    command = f"ls -lh {playbooks_dir}/*.yml"
-    return await execute_ssh_command(host=host, command=command)
+    error = check_format(format)
+    if error:
+        return error
+    try:
+        entries, refreshed_at = await get_ansible_catalog().playbooks(host, playbooks_dir, refresh)
+    except ParseError as e:
+        return render_error(f"Error: {e}", format)
+
+    if target is not None:
+        entries = [e for e in entries if target in e.targets or "all" in e.targets]
+    title = f"Ansible playbooks in {playbooks_dir} on {host}" + (f" targeting {target}" if target else "")
+    return render_playbooks(entries, title, refreshed_at, format)
 
 
-async def show_ansible_inventory(host: str, inventory_path: str = "/opt/infra/inventory") -> str:
+async def show_ansible_inventory(
+    host: str,
+    inventory_path: str = "/opt/infra/inventory",
+    refresh: bool = False,
+    format: str = "markdown"
+) -> str:
     """
     Show Ansible inventory on remote host
 
+    Parsed into groups and hosts (INI or YAML, children expanded) and
+    cached like playbooks: re-read only when its mtime or size changes.
+
     Args:
         host: Target host
-        inventory_path: Path to inventory directory or file
+        inventory_path: Path to inventory directory (uses <path>/hosts) or file
+        refresh: Check the file now instead of serving the cached copy
+        format: "markdown" table or "json" (group -> hosts)
 
     Returns:
-        Inventory contents
+        Inventory groups and hosts
 
     Example:
         result = await show_ansible_inventory("coreos-11")
     """
-    command = f"cat {inventory_path}/hosts || cat {inventory_path}"
-    return await execute_ssh_command(host=host, command=command)
+    error = check_format(format)
+    if error:
+        return error
+    try:
+        entry, refreshed_at = await get_ansible_catalog().inventory(host, inventory_path, refresh)
+    except ParseError as e:
+        return render_error(f"Error: {e}", format)
+    return render_inventory(entry, f"Ansible inventory on {host}", refreshed_at, format)
+
+
+async def invalidate_ansible_catalog(host: Optional[str] = None, path: Optional[str] = None) -> str:
+    """
+    Forget cataloged playbooks/inventories so they are fetched again
+
+    Args:
+        host: Only this host (default: all hosts)
+        path: Only this playbook file, playbooks directory or inventory path
+
+    Returns:
+        Number of entries dropped
+    """
+    dropped = get_ansible_catalog().invalidate(host, path)
+    scope = " ".join(filter(None, [f"host {host}" if host else "all hosts", path]))
+    return f"✅ Ansible catalog invalidated ({scope}): {dropped} entries dropped"
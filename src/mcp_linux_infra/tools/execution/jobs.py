@@ -0,0 +1,454 @@
+"""
+Background jobs for long-running commands and Ansible playbooks.
+
+``execute_ssh_command`` waits for the command and returns its whole
+output at once: a 20-minute playbook shows nothing until it ends and its
+full output is held in memory. A job starts the command and returns
+immediately; stdout/stderr are read as they arrive into a bounded ring
+buffer (``job_buffer_lines`` / ``job_buffer_bytes``, oldest lines dropped
+first) that can be polled with a cursor, tailed, waited on (with MCP
+progress notifications) or cancelled.
+
+Jobs live in this process: a server restart interrupts them, like it
+closes their SSH channel.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from ...audit import EventType, Status, audit
+from ...config import CONFIG
+from ...connection.streaming import CHUNK_SIZE, ByteReader, RunningProcess
+from ...utils.metrics import REGISTRY, Counter, Gauge, snapshot
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE_BYTES = 64 * 1024  # Ligne sans fin coupée au-delà
+PROGRESS_INTERVAL = 0.5  # Secondes entre deux notifications de progression
+
+ProcessOpener = Callable[[], AbstractAsyncContextManager[RunningProcess]]
+ProgressReporter = Callable[[float, float | None, str], Awaitable[None]]
+
+
+class JobStatus(str, Enum):
+    """État d'un job."""
+
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class OutputLine:
+    seq: int  # Numéro de ligne depuis le début du job
+    stream: str  # "stdout" ou "stderr"
+    text: str
+    size: int
+
+
+class OutputRing:
+    """Dernières lignes de sortie, bornées en nombre et en octets."""
+
+    def __init__(self, max_lines: int, max_bytes: int):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._lines: deque[OutputLine] = deque()
+        self.bytes = 0
+        self.total = 0  # Lignes reçues (= numéro de la prochaine)
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def first_seq(self) -> int:
+        """Numéro de la plus ancienne ligne encore en mémoire."""
+        return self.total - len(self._lines)
+
+    def append(self, stream: str, raw: bytes) -> OutputLine:
+        line = OutputLine(self.total, stream, raw.decode("utf-8", errors="replace").rstrip("\r"), len(raw))
+        self._lines.append(line)
+        self.total += 1
+        self.bytes += line.size
+        while len(self._lines) > 1 and (len(self._lines) > self.max_lines or self.bytes > self.max_bytes):
+            self.bytes -= self._lines.popleft().size
+            self.dropped += 1
+        return line
+
+    def read(self, since: int = 0, limit: int | None = None) -> list[OutputLine]:
+        """Lignes numérotées ``since`` et suivantes encore en mémoire."""
+        start = max(since - self.first_seq, 0)
+        stop = None if limit is None else start + limit
+        return list(itertools.islice(self._lines, start, stop))
+
+    def tail(self, n: int) -> list[OutputLine]:
+        return self.read(self.total - n) if n > 0 else []
+
+
+@dataclass
+class Job:
+    """Une commande lancée en arrière-plan."""
+
+    id: str
+    host: str
+    command: str
+    ssh_user: str
+    output: OutputRing
+    status: JobStatus = JobStatus.RUNNING
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    returncode: int | None = None
+    error: str | None = None
+    tasks: int = 0  # En-têtes "TASK [...]" vus (Ansible)
+    phase: str | None = None  # Dernier en-tête PLAY/TASK
+    _task: asyncio.Task | None = field(default=None, repr=False)
+    _updated: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status != JobStatus.RUNNING
+
+    @property
+    def elapsed(self) -> float:
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+    @property
+    def progress(self) -> int:
+        """Tâches Ansible démarrées, sinon lignes de sortie."""
+        return self.tasks or self.output.total
+
+    def add_line(self, stream: str, raw: bytes) -> None:
+        line = self.output.append(stream, raw)
+        if stream == "stdout" and line.text.startswith(("PLAY [", "TASK [", "PLAY RECAP")):
+            if line.text.startswith("TASK ["):
+                self.tasks += 1
+            self.phase = line.text.rstrip("* ").strip()
+
+    def notify(self) -> None:
+        """Réveiller les appels en attente de nouvelle sortie."""
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def wait_for_update(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._updated.wait(), timeout)
+        except TimeoutError:
+            pass
+
+
+async def _pump(job: Job, reader: ByteReader, stream: str) -> None:
+    partial = b""
+    while chunk := await reader.read(CHUNK_SIZE):
+        partial += chunk
+        *lines, partial = partial.split(b"\n")
+        for line in lines:
+            job.add_line(stream, line)
+        if len(partial) > MAX_LINE_BYTES:
+            job.add_line(stream, partial)
+            partial = b""
+        job.notify()
+    if partial:
+        job.add_line(stream, partial)
+        job.notify()
+
+
+async def _run(job: Job, opener: ProcessOpener, on_finish: Callable[[Job], None] | None) -> None:
+    try:
+        async with opener() as process:
+            await asyncio.gather(
+                _pump(job, process.stdout, "stdout"), _pump(job, process.stderr, "stderr")
+            )
+            job.returncode = await process.wait()
+        job.status = JobStatus.SUCCEEDED if job.returncode == 0 else JobStatus.FAILED
+    except asyncio.CancelledError:
+        # La sortie du bloc a fermé le canal / tué le processus
+        job.status = JobStatus.CANCELLED
+    except Exception as e:
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.now()
+        job.notify()
+        audit.log_event(
+            EventType.SSH_COMMAND,
+            Status.SUCCESS if job.status == JobStatus.SUCCEEDED else Status.FAILURE,
+            {
+                "host": job.host,
+                "username": job.ssh_user,
+                "command": job.command,
+                "job_id": job.id,
+                "job_status": job.status.value,
+                "returncode": job.returncode,
+                "duration_ms": round(job.elapsed * 1000),
+                "output_lines": job.output.total,
+                "error": job.error,
+            },
+        )
+        if on_finish is not None:
+            try:
+                on_finish(job)
+            except Exception as e:
+                logger.warning(f"Job {job.id} completion hook failed: {e}")
+
+
+class JobManager:
+    """Jobs en cours et derniers jobs terminés."""
+
+    def __init__(
+        self,
+        max_retained: int | None = None,
+        buffer_lines: int | None = None,
+        buffer_bytes: int | None = None,
+    ):
+        self.max_retained = max_retained if max_retained is not None else CONFIG.job_max_retained
+        self.buffer_lines = buffer_lines or CONFIG.job_buffer_lines
+        self.buffer_bytes = buffer_bytes or CONFIG.job_buffer_bytes
+        self._jobs: dict[str, Job] = {}  # Ordre de démarrage
+        self.started = 0
+
+    def start(
+        self,
+        host: str,
+        command: str,
+        ssh_user: str,
+        opener: ProcessOpener,
+        on_finish: Callable[[Job], None] | None = None,
+    ) -> Job:
+        """
+        Start a job in the background.
+
+        Args:
+            opener: Context manager factory yielding the running process
+            on_finish: Called once the job has finished, failed or been cancelled
+        """
+        job = Job(
+            id=f"job_{uuid.uuid4().hex[:8]}",
+            host=host,
+            command=command,
+            ssh_user=ssh_user,
+            output=OutputRing(self.buffer_lines, self.buffer_bytes),
+        )
+        job._task = asyncio.create_task(_run(job, opener, on_finish), name=job.id)
+        self._jobs[job.id] = job
+        self.started += 1
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Cancel a running job and wait until its process is closed."""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.done and job._task is not None:
+            job._task.cancel()
+            await asyncio.wait([job._task])
+        return job
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(len(finished) - self.max_retained, 0)]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict[str, int]:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {**counts, "started": self.started}
+
+
+# Global instance
+_job_manager: JobManager | None = None
+
+
+def get_job_manager() -> JobManager:
+    """Get or create the job manager."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
+
+
+@REGISTRY.register_collector
+def _job_metrics():
+    if _job_manager is None:
+        return []
+    stats = _job_manager.stats()
+    return [
+        snapshot(Counter, "mcp_jobs_started_total", "Background jobs started", stats["started"]),
+        snapshot(
+            Gauge, "mcp_jobs", "Background jobs retained, by status",
+            {(status.value,): stats[status.value] for status in JobStatus}, labelnames=("status",),
+        ),
+    ]
+
+
+# ----------------------------------------------------------------------
+# Rendu (outils MCP)
+# ----------------------------------------------------------------------
+
+_ICONS = {
+    JobStatus.RUNNING: "🔄",
+    JobStatus.SUCCEEDED: "✅",
+    JobStatus.FAILED: "❌",
+    JobStatus.CANCELLED: "🛑",
+}
+
+
+def _header(job: Job) -> str:
+    output = job.output
+    lines = f"{output.total}" + (f" ({output.dropped} dropped from buffer)" if output.dropped else "")
+    header = f"""{_ICONS[job.status]} Job {job.id}: {job.status.value.upper()}
+
+Command: {job.command}
+Host: {job.host}
+User: {job.ssh_user}
+Elapsed: {job.elapsed:.1f}s | Output lines: {lines}"""
+    if job.tasks:
+        header += f" | Tasks: {job.tasks}"
+    if job.phase:
+        header += f"\nPhase: {job.phase}"
+    if job.returncode is not None:
+        header += f"\nExit code: {job.returncode}"
+    if job.error:
+        header += f"\nError: {job.error}"
+    return header
+
+
+def _format_lines(lines: list[OutputLine]) -> str:
+    return "\n".join(line.text if line.stream == "stdout" else f"[stderr] {line.text}" for line in lines)
+
+
+def job_started(job: Job) -> str:
+    return f"""🔄 Job started
+
+Job ID: {job.id}
+Command: {job.command}
+Host: {job.host}
+User: {job.ssh_user}
+
+Follow it with:
+  poll_job("{job.id}")       new output since a cursor
+  tail_job("{job.id}")       last lines
+  wait_job("{job.id}")       wait for completion (progress notifications)
+  cancel_job("{job.id}")
+"""
+
+
+def _unknown(job_id: str) -> str:
+    return f"❌ Unknown job ID: {job_id}\n\nUse list_jobs() to see current and recent jobs."
+
+
+async def poll_job(job_id: str, since: int = 0, limit: int = 200, wait: float = 0.0) -> str:
+    """
+    Output lines of a job from cursor ``since``.
+
+    Args:
+        job_id: Job ID
+        since: First line number to return (the previous call's "next" cursor)
+        limit: Maximum lines returned
+        wait: Seconds to wait for new output if there is none yet
+
+    Returns:
+        Job status, output lines and the cursor for the next call
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return _unknown(job_id)
+
+    deadline = time.monotonic() + wait
+    while not job.done and job.output.total <= since and (remaining := deadline - time.monotonic()) > 0:
+        await job.wait_for_update(remaining)
+
+    lines = job.output.read(since, limit)
+    next_since = lines[-1].seq + 1 if lines else max(since, job.output.total)
+    text = _header(job) + "\n"
+    if since < job.output.first_seq:
+        text += f"\n[... {job.output.first_seq - since} lines no longer in buffer ...]"
+    if lines:
+        text += f"\nOutput (lines {lines[0].seq}-{lines[-1].seq}):\n{_format_lines(lines)}\n"
+    else:
+        text += "\nNo new output.\n"
+    if not job.done or next_since < job.output.total:
+        text += f'\nNext: poll_job("{job.id}", since={next_since})\n'
+    return text
+
+
+async def tail_job(job_id: str, lines: int = 50) -> str:
+    """Last ``lines`` output lines of a job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return _unknown(job_id)
+    tail = job.output.tail(lines)
+    return f"{_header(job)}\n\nOutput (last {len(tail)} lines):\n{_format_lines(tail)}\n"
+
+
+async def wait_job(
+    job_id: str, timeout: float = 60.0, on_progress: ProgressReporter | None = None
+) -> str:
+    """
+    Wait until a job finishes (or ``timeout`` seconds), reporting progress.
+
+    Args:
+        on_progress: Awaited with (progress, total, message) at most every PROGRESS_INTERVAL seconds
+
+    Returns:
+        Job status and last output lines
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return _unknown(job_id)
+
+    deadline = time.monotonic() + timeout
+    last, last_sent = None, 0.0
+    while not job.done and (remaining := deadline - time.monotonic()) > 0:
+        await job.wait_for_update(min(remaining, PROGRESS_INTERVAL))
+        now = time.monotonic()
+        if on_progress is not None and (job.progress, job.phase) != last and now - last_sent >= PROGRESS_INTERVAL:
+            last, last_sent = (job.progress, job.phase), now
+            await on_progress(job.progress, None, job.phase or f"{job.output.total} lines")
+
+    text = await tail_job(job_id, 20)
+    if not job.done:
+        text += f'\nStill running after {timeout:.0f}s: wait_job("{job.id}") again or cancel_job("{job.id}")\n'
+    return text
+
+
+async def cancel_job(job_id: str) -> str:
+    """Cancel a running job (closes its channel, interrupting the remote process)."""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        return _unknown(job_id)
+    if job.done:
+        return f"❌ Job {job_id} already finished ({job.status.value})"
+    await manager.cancel(job_id)
+    return _header(job) + "\n"
+
+
+async def list_jobs() -> str:
+    """Running and recently finished jobs."""
+    jobs = get_job_manager().jobs()
+    if not jobs:
+        return "No background jobs."
+    output = "| Job | Status | Host | Elapsed | Lines | Command |\n|-----|--------|------|---------|-------|---------|\n"
+    for job in reversed(jobs):
+        command = job.command if len(job.command) <= 60 else job.command[:57] + "..."
+        output += (
+            f"| {job.id} | {_ICONS[job.status]} {job.status.value} | {job.host} "
+            f"| {job.elapsed:.0f}s | {job.output.total} | `{command}` |\n"
+        )
+    return output
@@ -4,15 +4,19 @@ SSH command execution with authorization system
 Provides tools for executing SSH commands with AUTO/MANUAL/BLOCKED authorization.
 """
 
-from typing import Optional
+from typing import Callable, Optional
 from dataclasses import dataclass
 
 from ...authorization import (
+    ApprovalStatus,
     AuthorizationEngine,
     COMMAND_WHITELIST,
     AuthLevel,
 )
+from ...connection.fanout import gather_hosts, resolve_hosts
 from ...connection.smart_ssh import get_smart_ssh_manager
+from .ansible_results import render_playbook_result, uses_json_callback
+from .jobs import Job, get_job_manager, job_started
 
 
 # Global authorization engine (initialized once)
@@ -73,10 +77,35 @@ async def _execute_ssh_command_internal(
     return CommandResult(returncode=returncode, stdout=stdout, stderr=stderr)
 
 
+def _start_ssh_job(
+    host: str,
+    command: str,
+    ssh_user: str,
+    on_finish=None
+) -> Job:
+    """
+    Start an SSH command as a background job
+
+    Same user dispatch as _execute_ssh_command_internal, but the output is
+    streamed into the job's ring buffer instead of returned at the end.
+    """
+    if ssh_user not in ("mcp-reader", "exec-runner"):
+        raise ValueError(f"Invalid SSH user: {ssh_user}")
+
+    def opener():
+        return get_smart_ssh_manager().open_process(
+            host, command, username=ssh_user, exec=ssh_user == "exec-runner"
+        )
+
+    return get_job_manager().start(host, command, ssh_user, opener, on_finish)
+
+
 async def execute_ssh_command(
     host: str,
     command: str,
-    auto_approve: bool = False
+    auto_approve: bool = False,
+    background: bool = False,
+    formatter: Optional[Callable[[CommandResult], str]] = None
 ) -> str:
     """
     Execute SSH command with authorization check
@@ -85,9 +114,13 @@ async def execute_ssh_command(
         host: Target host (e.g., "coreos-11" or "192.168.1.11")
         command: Command to execute
         auto_approve: Skip approval for MANUAL commands (DANGEROUS!)
+        background: Start auto-approved commands as a job and return its ID
+            (output streamed, see poll_job/tail_job/wait_job/cancel_job)
+        formatter: Render the result of an auto-approved command instead of
+            returning its raw output
 
     Returns:
-        Command output or approval request message
+        Command output, job ID or approval request message
 
     Examples:
         # Auto-approved (read-only)
@@ -146,12 +179,16 @@ This command is blocked for security reasons.
 
     # AUTO - Execute immediately
     if auth.auth_level == AuthLevel.AUTO:
+        if background:
+            return job_started(_start_ssh_job(host, command, auth.ssh_user))
         try:
             result = await _execute_ssh_command_internal(
                 host=host,
                 command=command,
                 ssh_user=auth.ssh_user
             )
+            if formatter is not None:
+                return formatter(result)
             return f"""✅ Executed (auto-approved)
 
 Command: {command}
@@ -214,21 +251,103 @@ Approval ID: {auth.approval_id}
 
 To execute this command, use:
   approve_command("{auth.approval_id}")
+Long-running (streamed output, returns a job ID):
+  approve_command("{auth.approval_id}", background=True)
 
 To see all pending approvals:
   list_pending_approvals()
 """
 
 
-async def approve_command(approval_id: str) -> str:
+async def execute_fleet_command(
+    hosts: list[str] | str,
+    command: str,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Execute an auto-approved command on several hosts concurrently
+
+    Only AUTO (read-only) commands can be fanned out; MANUAL commands must
+    go through the per-host approval workflow.
+
+    Args:
+        hosts: Host list, comma-separated string or globs over allowed hosts
+        command: Command to execute
+        concurrency: Max hosts in flight (default: CONFIG.fleet_max_concurrency)
+        timeout: Per-host timeout in seconds (default: CONFIG.fleet_host_timeout)
+
+    Returns:
+        Per-host result table followed by each host's output
+
+    Example:
+        result = await execute_fleet_command("dns-*", "systemctl status unbound")
+    """
+    try:
+        targets = resolve_hosts(hosts)
+    except ValueError as e:
+        return f"❌ Invalid hosts: {e}"
+
+    engine = get_auth_engine()
+    # Pas de demande d'approbation: elle ne couvrirait qu'un seul hôte
+    auth = engine.check_command(targets[0], command, user="mcp-user", create_approval=False)
+
+    if auth.auth_level != AuthLevel.AUTO:
+        return f"""❌ FLEET EXECUTION REFUSED
+
+Command: {command}
+Authorization: {auth.auth_level.value.upper()}
+Reason: {auth.reason}
+
+Only auto-approved (read-only) commands can run on several hosts at once.
+Use execute_ssh_command() per host for commands that need approval.
+"""
+
+    async def run(host: str) -> CommandResult:
+        return await _execute_ssh_command_internal(
+            host=host,
+            command=command,
+            ssh_user=auth.ssh_user
+        )
+
+    results = await gather_hosts(targets, run, concurrency, timeout)
+    failed = sum(1 for r in results if not r.ok or not r.value.success)
+
+    output = f"""✅ Executed on {len(results)} hosts (auto-approved)
+
+Command: {command}
+User: {auth.ssh_user}
+Succeeded: {len(results) - failed} | Failed: {failed}
+
+| Host | Status | Exit | Duration |
+|------|--------|------|----------|
+"""
+    for r in results:
+        exit_code = r.value.returncode if r.ok else "-"
+        output += f"| {r.host} | {r.status} | {exit_code} | {r.duration_ms:.0f} ms |\n"
+
+    for r in results:
+        if r.ok:
+            body = r.value.stdout
+            if r.value.stderr:
+                body += f"\nErrors:\n{r.value.stderr}"
+        else:
+            body = f"Error: {r.error}"
+        output += f"\n### {r.host}\n```\n{body.rstrip()}\n```\n"
+
+    return output
+
+
+async def approve_command(approval_id: str, background: bool = False) -> str:
     """
     Approve and execute a pending command
 
     Args:
         approval_id: Approval request ID from execute_ssh_command
+        background: Start the command as a job and return its ID
 
     Returns:
-        Execution result or error message
+        Execution result, job ID or error message
 
     Example:
         result = await approve_command("cmd_abc12345")
@@ -236,8 +355,10 @@ async def approve_command(approval_id: str) -> str:
 
     engine = get_auth_engine()
 
-    # Get pending command
+    # Approve, then claim: only one concurrent call may execute
     pending = engine.approve_command(approval_id)
+    if pending:
+        pending = engine.claim_execution(approval_id)
 
     if not pending:
         return f"""❌ Approval not found
@@ -246,23 +367,45 @@ Approval ID: {approval_id}
 
 Possible reasons:
 - Invalid approval ID
-- Command already executed
+- Command already executed or being executed
 - Approval expired
 
 Use list_pending_approvals() to see pending approvals.
 """
 
+    if background:
+        def on_finish(job: Job):
+            # Connexion impossible: l'approbation reste valide; sinon ne pas la rejouer
+            if job.error and job.returncode is None and not job.output.total:
+                engine.release_execution(approval_id)
+            else:
+                engine.mark_executed(approval_id)
+
+        try:
+            job = _start_ssh_job(pending.host, pending.command, pending.ssh_user, on_finish)
+        except ValueError as e:
+            engine.release_execution(approval_id)
+            return f"❌ Execution failed\n\nCommand: {pending.command}\nHost: {pending.host}\nError: {e}\n"
+        return job_started(job)
+
     # Execute the approved command
     try:
-        result = await ssh_manager.execute_command(
+        result = await _execute_ssh_command_internal(
             host=pending.host,
             command=pending.command,
-            username=pending.ssh_user
+            ssh_user=pending.ssh_user
         )
 
         # Mark as executed
         engine.mark_executed(approval_id)
 
+        if uses_json_callback(pending.command):
+            # Playbook lancé en mode résumé (run_ansible_playbook(format=...))
+            return render_playbook_result(
+                result.stdout, result.stderr, result.returncode,
+                f"Ansible playbook on {pending.host} (approved)"
+            )
+
         return f"""✅ Executed (approved)
 
 Command: {pending.command}
@@ -276,6 +419,7 @@ Output:
 {f"Errors:\n{result.stderr}" if result.stderr else ""}
 """
     except Exception as e:
+        engine.release_execution(approval_id)
         return f"""❌ Execution failed
 
 Command: {pending.command}
@@ -311,7 +455,11 @@ All commands have been executed or there are no pending approval requests.
     output += "=" * 70 + "\n\n"
 
     for p in pending:
-        status = "✅ APPROVED" if p.approved else "⏳ WAITING"
+        status = {
+            ApprovalStatus.PENDING: "⏳ WAITING",
+            ApprovalStatus.APPROVED: "✅ APPROVED",
+            ApprovalStatus.EXECUTING: "🔄 EXECUTING",
+        }.get(p.status, p.status.value)
         output += f"""ID: {p.id}
 Status: {status}
 Command: {p.command}
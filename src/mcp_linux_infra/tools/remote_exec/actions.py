@@ -7,7 +7,9 @@ from enum import Enum
 
 
 from ...audit import EventType, Status, log_pra_action
-from ...connection import execute_remote_execution
+from ...config import CONFIG
+from ...connection import execute_remote_execution as run_remote_execution
+from ...state_store import get_state_store
 
 
 class ExecutionImpact(str, Enum):
@@ -27,6 +29,7 @@ class RemoteExecutionStatus(str, Enum):
     EXECUTING = "executing"
     COMPLETED = "completed"
     FAILED = "failed"
+    HALTED = "halted"  # Rollout arrêté par le seuil d'échecs
 
 
 @dataclass
@@ -46,9 +49,81 @@ class RemoteExecution:
     result: dict | None = None
     error: str | None = None
 
+    def to_record(self) -> dict:
+        """Forme JSON pour le state store."""
+        return {
+            "id": self.id,
+            "action": self.action,
+            "host": self.host,
+            "impact": self.impact.value,
+            "rationale": self.rationale,
+            "status": self.status.value,
+            "proposed_at": self.proposed_at.isoformat(),
+            "approved_by": self.approved_by,
+            "approved_at": self.approved_at.isoformat() if self.approved_at else None,
+            "executed_at": self.executed_at.isoformat() if self.executed_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "RemoteExecution":
+        def when(value: str | None) -> datetime | None:
+            return datetime.fromisoformat(value) if value else None
+
+        return cls(
+            id=record["id"],
+            action=record["action"],
+            host=record["host"],
+            impact=ExecutionImpact(record["impact"]),
+            rationale=record["rationale"],
+            status=RemoteExecutionStatus(record["status"]),
+            proposed_at=datetime.fromisoformat(record["proposed_at"]),
+            approved_by=record.get("approved_by"),
+            approved_at=when(record.get("approved_at")),
+            executed_at=when(record.get("executed_at")),
+            result=record.get("result"),
+            error=record.get("error"),
+        )
+
+
+# Actions Remote Execution persistées (state store, clé "remote_execution")
+KIND = "remote_execution"
+
+# Statuts affichés par list_pending_actions (les échecs restent visibles pour le debug)
+OPEN_STATUSES = (
+    RemoteExecutionStatus.PROPOSED,
+    RemoteExecutionStatus.APPROVED,
+    RemoteExecutionStatus.EXECUTING,
+    RemoteExecutionStatus.FAILED,
+)
+
+
+def _get(action_id: str) -> RemoteExecution | None:
+    record = get_state_store().get(KIND, action_id)
+    return RemoteExecution.from_record(record) if record else None
+
 
-# Registry des actions Remote Execution en attente de validation
-_pending_actions: dict[str, RemoteExecution] = {}
+def _transition(
+    action_id: str,
+    expected: RemoteExecutionStatus,
+    status: RemoteExecutionStatus,
+    **changes,
+) -> RemoteExecution | None:
+    """Changement d'état atomique (compare-and-set); None si l'action n'est plus dans ``expected``."""
+    for key, value in changes.items():
+        if isinstance(value, datetime):
+            changes[key] = value.isoformat()
+    record = get_state_store().transition(KIND, action_id, expected.value, status.value, **changes)
+    return RemoteExecution.from_record(record) if record else None
+
+
+def _state_error(action_id: str, expected: str) -> str:
+    """Message d'erreur après un échec de transition: action inconnue ou dans un autre état."""
+    current = _get(action_id)
+    if current is None:
+        return f"❌ Unknown action ID: {action_id}"
+    return f"❌ Action {action_id} is not {expected} (current: {current.status.value})"
 
 
 # Définition des actions Remote Execution disponibles
@@ -57,16 +132,19 @@ REMOTE_EXECUTION_CATALOG = {
         "description": "Restart Unbound DNS service",
         "impact": ExecutionImpact.LOW,
         "command": "restart_unbound",
+        "health_service": "unbound",
     },
     "reload_caddy": {
         "description": "Reload Caddy reverse proxy configuration",
         "impact": ExecutionImpact.LOW,
         "command": "reload_caddy",
+        "health_service": "caddy",
     },
     "flush_dns_cache": {
         "description": "Flush DNS cache (systemd-resolved)",
         "impact": ExecutionImpact.LOW,
         "command": "flush_dns_cache",
+        "health_service": "systemd-resolved",
     },
     "restart_container": {
         "description": "Restart a Podman container",
@@ -147,7 +225,7 @@ async def propose_remote_execution(
             rationale=rationale,
         )
 
-        _pending_actions[action_id] = pra_action
+        get_state_store().put(KIND, pra_action.to_record(), ttl=CONFIG.approval_ttl_hours * 3600)
 
         return f"""✅ **Remote Execution Action Auto-Approved** (LOW impact)
 
@@ -162,7 +240,7 @@ Call `execute_remote_execution(action_id="{action_id}")` to execute.
 """
 
     # Enregistrer pour validation humaine
-    _pending_actions[action_id] = pra_action
+    get_state_store().put(KIND, pra_action.to_record(), ttl=CONFIG.approval_ttl_hours * 3600)
 
     return f"""⏳ **Remote Execution Action Proposed - Awaiting Human Approval**
 
@@ -196,19 +274,18 @@ async def approve_remote_execution(
     Returns:
         Approval status message
     """
-    if action_id not in _pending_actions:
-        return f"❌ Unknown action ID: {action_id}"
-
-    pra_action = _pending_actions[action_id]
-
-    if pra_action.status != RemoteExecutionStatus.PROPOSED:
-        return f"❌ Action {action_id} is not in PROPOSED state (current: {pra_action.status.value})"
+    new_status = RemoteExecutionStatus.APPROVED if approved else RemoteExecutionStatus.REJECTED
+    pra_action = _transition(
+        action_id,
+        RemoteExecutionStatus.PROPOSED,
+        new_status,
+        approved_by=approver,
+        approved_at=datetime.now(),
+    )
+    if pra_action is None:
+        return _state_error(action_id, "in PROPOSED state")
 
     if approved:
-        pra_action.status = RemoteExecutionStatus.APPROVED
-        pra_action.approved_by = approver
-        pra_action.approved_at = datetime.now()
-
         log_pra_action(
             action=pra_action.action,
             host=pra_action.host,
@@ -229,10 +306,6 @@ async def approve_remote_execution(
 Call `execute_remote_execution(action_id="{action_id}")` to execute the action.
 """
     else:
-        pra_action.status = RemoteExecutionStatus.REJECTED
-        pra_action.approved_by = approver
-        pra_action.approved_at = datetime.now()
-
         log_pra_action(
             action=pra_action.action,
             host=pra_action.host,
@@ -242,9 +315,6 @@ Call `execute_remote_execution(action_id="{action_id}")` to execute the action.
             rationale=pra_action.rationale,
         )
 
-        # Cleanup
-        del _pending_actions[action_id]
-
         return f"""❌ **Remote Execution Action Rejected**
 
 **Action ID:** `{action_id}`
@@ -272,37 +342,41 @@ async def execute_remote_execution(
     Returns:
         Execution result
     """
-    if action_id not in _pending_actions:
-        return f"❌ Unknown action ID: {action_id}"
-
-    pra_action = _pending_actions[action_id]
-
-    if pra_action.status != RemoteExecutionStatus.APPROVED:
-        return f"❌ Action {action_id} is not APPROVED (current: {pra_action.status.value}). Cannot execute."
+    # Mark as executing: un seul appel concurrent obtient l'action
+    pra_action = _transition(
+        action_id,
+        RemoteExecutionStatus.APPROVED,
+        RemoteExecutionStatus.EXECUTING,
+        executed_at=datetime.now(),
+    )
+    if pra_action is None:
+        return f"{_state_error(action_id, 'APPROVED')}. Cannot execute."
 
     # Get action definition
     action_def = REMOTE_EXECUTION_CATALOG[pra_action.action]
     command = action_def["command"]
 
-    # Mark as executing
-    pra_action.status = RemoteExecutionStatus.EXECUTING
-    pra_action.executed_at = datetime.now()
-
     try:
         # Execute via exec-runner SSH
-        returncode, stdout, stderr = await execute_remote_execution(
+        returncode, stdout, stderr = await run_remote_execution(
             action=command,
             host=pra_action.host,
         )
 
+        result = {
+            "returncode": returncode,
+            "stdout": stdout,
+            "stderr": stderr,
+        }
+
         if returncode == 0:
             # Success
-            pra_action.status = RemoteExecutionStatus.COMPLETED
-            pra_action.result = {
-                "returncode": returncode,
-                "stdout": stdout,
-                "stderr": stderr,
-            }
+            pra_action = _transition(
+                action_id,
+                RemoteExecutionStatus.EXECUTING,
+                RemoteExecutionStatus.COMPLETED,
+                result=result,
+            ) or pra_action
 
             log_pra_action(
                 action=pra_action.action,
@@ -314,9 +388,6 @@ async def execute_remote_execution(
                 result=pra_action.result,
             )
 
-            # Cleanup
-            del _pending_actions[action_id]
-
             return f"""✅ **Remote Execution Action Executed Successfully**
 
 **Action ID:** `{action_id}`
@@ -336,13 +407,13 @@ async def execute_remote_execution(
 
         else:
             # Failure
-            pra_action.status = RemoteExecutionStatus.FAILED
-            pra_action.error = stderr or "Non-zero exit code"
-            pra_action.result = {
-                "returncode": returncode,
-                "stdout": stdout,
-                "stderr": stderr,
-            }
+            pra_action = _transition(
+                action_id,
+                RemoteExecutionStatus.EXECUTING,
+                RemoteExecutionStatus.FAILED,
+                result=result,
+                error=stderr or "Non-zero exit code",
+            ) or pra_action
 
             log_pra_action(
                 action=pra_action.action,
@@ -377,8 +448,12 @@ async def execute_remote_execution(
 """
 
     except Exception as e:
-        pra_action.status = RemoteExecutionStatus.FAILED
-        pra_action.error = str(e)
+        pra_action = _transition(
+            action_id,
+            RemoteExecutionStatus.EXECUTING,
+            RemoteExecutionStatus.FAILED,
+            error=str(e),
+        ) or pra_action
 
         log_pra_action(
             action=pra_action.action,
@@ -408,13 +483,14 @@ async def list_pending_actions() -> str:
     Returns:
         Summary of pending actions
     """
-    if not _pending_actions:
+    records = get_state_store().select(KIND, statuses=[s.value for s in OPEN_STATUSES])
+    if not records:
         return "No pending remote executions."
 
     lines = ["## Pending Remote Execution Actions\n"]
 
-    for action_id, pra_action in _pending_actions.items():
-        lines.append(f"### Action ID: `{action_id}`")
+    for pra_action in map(RemoteExecution.from_record, records):
+        lines.append(f"### Action ID: `{pra_action.id}`")
         lines.append(f"- **Status:** {pra_action.status.value}")
         lines.append(f"- **Action:** {pra_action.action}")
         lines.append(f"- **Host:** {pra_action.host}")
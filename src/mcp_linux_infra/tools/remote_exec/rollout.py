@@ -0,0 +1,457 @@
+"""
+Rollout: one remote execution across many hosts, in waves.
+
+Same human validation as single-host actions, but one approval covers
+the whole host set:
+
+1. ``propose_rollout(action, hosts, rationale, ...)`` resolves the host
+   set (globs allowed) and records the plan
+2. ``approve_rollout(rollout_id, approved=True)``
+3. ``execute_rollout(rollout_id)`` runs waves of ``wave_size`` hosts, at
+   most ``max_parallel`` at a time. After each wave, the action's service
+   is health-checked (``check_service_health``) on the hosts just changed.
+   Once more than ``max_failures`` hosts failed (error, non-zero exit or
+   unhealthy), the rollout halts and the remaining hosts are skipped.
+
+Per-host progress is saved in the state store as each host completes
+(``get_rollout_status``), and forwarded as MCP progress notifications.
+"""
+
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from ...audit import EventType, Status, log_pra_action
+from ...config import CONFIG
+from ...connection import HostResult, current_progress, gather_hosts, resolve_hosts
+from ...state_store import get_state_store
+from ..diagnostics.parsers import check_format, markdown_table, to_json
+from ..diagnostics.services import check_service_health
+from . import actions
+from .actions import REMOTE_EXECUTION_CATALOG, RemoteExecutionStatus
+
+KIND = "rollout"
+
+# États par hôte
+PENDING, OK, FAILED, UNHEALTHY, SKIPPED = "pending", "ok", "failed", "unhealthy", "skipped"
+
+
+@dataclass
+class Rollout:
+    """Une action Remote Execution sur un ensemble d'hôtes."""
+
+    id: str
+    action: str
+    target: str  # Hôtes tels que demandés (ex: "dns-*")
+    hosts: list[str]
+    rationale: str
+    status: RemoteExecutionStatus
+    proposed_at: datetime
+    wave_size: int
+    max_parallel: int
+    max_failures: int
+    health_service: str | None = None
+    approved_by: str | None = None
+    approved_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    halted_reason: str | None = None
+    # hôte -> {"status", "wave", "returncode", "duration_ms", "detail"}
+    host_states: dict[str, dict] = field(default_factory=dict)
+
+    def waves(self) -> list[list[str]]:
+        return [self.hosts[i:i + self.wave_size] for i in range(0, len(self.hosts), self.wave_size)]
+
+    @property
+    def failures(self) -> int:
+        return sum(s["status"] in (FAILED, UNHEALTHY) for s in self.host_states.values())
+
+    def to_record(self) -> dict:
+        """Forme JSON pour le state store."""
+        record = {
+            "id": self.id,
+            "host": self.target,
+            "action": self.action,
+            "hosts": self.hosts,
+            "rationale": self.rationale,
+            "status": self.status.value,
+            "wave_size": self.wave_size,
+            "max_parallel": self.max_parallel,
+            "max_failures": self.max_failures,
+            "health_service": self.health_service,
+            "approved_by": self.approved_by,
+            "halted_reason": self.halted_reason,
+            "host_states": self.host_states,
+        }
+        for key in ("proposed_at", "approved_at", "started_at", "finished_at"):
+            value = getattr(self, key)
+            record[key] = value.isoformat() if value else None
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Rollout":
+        def when(key: str) -> datetime | None:
+            return datetime.fromisoformat(record[key]) if record.get(key) else None
+
+        return cls(
+            id=record["id"],
+            action=record["action"],
+            target=record["host"],
+            hosts=record["hosts"],
+            rationale=record["rationale"],
+            status=RemoteExecutionStatus(record["status"]),
+            proposed_at=when("proposed_at"),
+            wave_size=record["wave_size"],
+            max_parallel=record["max_parallel"],
+            max_failures=record["max_failures"],
+            health_service=record.get("health_service"),
+            approved_by=record.get("approved_by"),
+            approved_at=when("approved_at"),
+            started_at=when("started_at"),
+            finished_at=when("finished_at"),
+            halted_reason=record.get("halted_reason"),
+            host_states=record.get("host_states") or {},
+        )
+
+
+def _get(rollout_id: str) -> Rollout | None:
+    record = get_state_store().get(KIND, rollout_id)
+    return Rollout.from_record(record) if record else None
+
+
+def _transition(
+    rollout_id: str,
+    expected: RemoteExecutionStatus,
+    status: RemoteExecutionStatus,
+    **changes,
+) -> Rollout | None:
+    """Changement d'état atomique (compare-and-set); None si le rollout n'est plus dans ``expected``."""
+    for key, value in changes.items():
+        if isinstance(value, datetime):
+            changes[key] = value.isoformat()
+    record = get_state_store().transition(KIND, rollout_id, expected.value, status.value, **changes)
+    return Rollout.from_record(record) if record else None
+
+
+def _state_error(rollout_id: str, expected: str) -> str:
+    current = _get(rollout_id)
+    if current is None:
+        return f"❌ Unknown rollout ID: {rollout_id}"
+    return f"❌ Rollout {rollout_id} is not {expected} (current: {current.status.value})"
+
+
+def _summary(rollout: Rollout) -> str:
+    waves = rollout.waves()
+    health = rollout.health_service or "none"
+    return (
+        f"**Action:** {rollout.action} ({REMOTE_EXECUTION_CATALOG[rollout.action]['description']})\n"
+        f"**Hosts:** {len(rollout.hosts)} ({rollout.target})\n"
+        f"**Waves:** {len(waves)} of up to {rollout.wave_size} hosts, "
+        f"{rollout.max_parallel} in parallel\n"
+        f"**Halt after:** more than {rollout.max_failures} failed host(s)\n"
+        f"**Health probe between waves:** {health}\n"
+        f"**Rationale:** {rollout.rationale}"
+    )
+
+
+async def propose_rollout(
+    action: str,
+    hosts: list[str] | str,
+    rationale: str,
+    wave_size: int = 5,
+    max_parallel: int | None = None,
+    max_failures: int = 0,
+    health_service: str | None = None,
+) -> str:
+    """
+    Propose one remote execution across a host set, executed in waves.
+
+    Args:
+        action: Action name from REMOTE_EXECUTION_CATALOG
+        hosts: Host list, comma-separated string or globs (against allowed hosts)
+        rationale: Why this action is needed
+        wave_size: Hosts per wave
+        max_parallel: Hosts in flight within a wave (default: wave_size, capped by fleet_max_concurrency)
+        max_failures: Failed hosts tolerated before the rollout halts
+        health_service: Service checked after each wave (default: the action's service, if any)
+
+    Returns:
+        Rollout ID and plan, awaiting approval
+    """
+    if action not in REMOTE_EXECUTION_CATALOG:
+        available = ", ".join(REMOTE_EXECUTION_CATALOG.keys())
+        return f"❌ Unknown remote execution '{action}'. Available: {available}"
+    if wave_size < 1 or (max_parallel is not None and max_parallel < 1) or max_failures < 0:
+        return "❌ wave_size and max_parallel must be >= 1, max_failures >= 0"
+
+    try:
+        resolved = resolve_hosts(hosts)
+    except ValueError as e:
+        return f"❌ {e}"
+    denied = [h for h in resolved if not CONFIG.is_host_allowed(h)]
+    if denied:
+        return f"❌ Hosts not in allowed list: {', '.join(denied)}"
+
+    action_def = REMOTE_EXECUTION_CATALOG[action]
+    rollout = Rollout(
+        id=f"ro_{uuid.uuid4().hex[:8]}",
+        action=action,
+        target=hosts if isinstance(hosts, str) else ",".join(hosts),
+        hosts=resolved,
+        rationale=rationale,
+        status=RemoteExecutionStatus.PROPOSED,
+        proposed_at=datetime.now(),
+        wave_size=wave_size,
+        max_parallel=min(max_parallel or wave_size, CONFIG.fleet_max_concurrency),
+        max_failures=max_failures,
+        health_service=health_service or action_def.get("health_service"),
+        host_states={h: {"status": PENDING} for h in resolved},
+    )
+    get_state_store().put(KIND, rollout.to_record(), ttl=CONFIG.approval_ttl_hours * 3600)
+
+    log_pra_action(
+        action=action,
+        host=rollout.target,
+        event_type=EventType.PRA_PROPOSED,
+        status=Status.PENDING,
+        rationale=f"[rollout {rollout.id}, {len(resolved)} hosts] {rationale}",
+    )
+
+    return f"""⏳ **Rollout Proposed - Awaiting Human Approval**
+
+**Rollout ID:** `{rollout.id}`
+**Impact:** {action_def['impact'].value.upper()}
+{_summary(rollout)}
+
+**Next Steps:**
+1. Human reviews and calls `approve_rollout(rollout_id="{rollout.id}", approved=True)`
+2. Once approved, call `execute_rollout(rollout_id="{rollout.id}")`
+"""
+
+
+async def approve_rollout(rollout_id: str, approved: bool, approver: str = "human") -> str:
+    """
+    Approve or reject a proposed rollout (one approval for every host).
+
+    Args:
+        rollout_id: Rollout ID from propose_rollout
+        approved: True to approve, False to reject
+        approver: Identifier of the person approving
+    """
+    rollout = _transition(
+        rollout_id,
+        RemoteExecutionStatus.PROPOSED,
+        RemoteExecutionStatus.APPROVED if approved else RemoteExecutionStatus.REJECTED,
+        approved_by=approver,
+        approved_at=datetime.now(),
+    )
+    if rollout is None:
+        return _state_error(rollout_id, "in PROPOSED state")
+
+    log_pra_action(
+        action=rollout.action,
+        host=rollout.target,
+        event_type=EventType.PRA_APPROVED if approved else EventType.PRA_REJECTED,
+        status=Status.SUCCESS if approved else Status.DENIED,
+        approver=approver,
+        rationale=f"[rollout {rollout.id}, {len(rollout.hosts)} hosts] {rollout.rationale}",
+    )
+
+    if not approved:
+        return f"❌ **Rollout Rejected**\n\n**Rollout ID:** `{rollout_id}`\n**Rejected by:** {approver}\n"
+    return f"""✅ **Rollout Approved**
+
+**Rollout ID:** `{rollout_id}`
+**Approved by:** {approver}
+{_summary(rollout)}
+
+**Next Step:**
+Call `execute_rollout(rollout_id="{rollout_id}")` to start the first wave.
+"""
+
+
+async def execute_rollout(rollout_id: str) -> str:
+    """
+    Execute an approved rollout wave by wave.
+
+    Returns:
+        Final report (per-host status)
+    """
+    rollout = _transition(
+        rollout_id,
+        RemoteExecutionStatus.APPROVED,
+        RemoteExecutionStatus.EXECUTING,
+        started_at=datetime.now(),
+    )
+    if rollout is None:
+        return f"{_state_error(rollout_id, 'APPROVED')}. Cannot execute."
+
+    command = REMOTE_EXECUTION_CATALOG[rollout.action]["command"]
+    progress = current_progress()
+    total = len(rollout.hosts)
+    done = 0
+
+    def save(**changes):
+        _transition(
+            rollout_id,
+            RemoteExecutionStatus.EXECUTING,
+            RemoteExecutionStatus.EXECUTING,
+            host_states=rollout.host_states,
+            **changes,
+        )
+
+    async def run(host: str) -> tuple[int, str, str]:
+        return await actions.run_remote_execution(action=command, host=host)
+
+    async def probe(host: str) -> dict:
+        report = await check_service_health(
+            rollout.health_service, host, bypass_cache=True, format="json",
+            fields=["healthy", "active_state"],
+        )
+        return json.loads(report)
+
+    async def ignore(*_):
+        pass  # Sondes: pas de progression hôte par hôte
+
+    try:
+        for number, wave in enumerate(rollout.waves(), 1):
+
+            async def on_result(result: HostResult, _done: int, _total: int, number=number):
+                nonlocal done
+                done += 1
+                state = {"status": OK, "wave": number, "duration_ms": round(result.duration_ms)}
+                if result.ok:
+                    returncode, stdout, stderr = result.value
+                    state["returncode"] = returncode
+                    if returncode != 0:
+                        state["status"] = FAILED
+                        state["detail"] = (stderr or stdout or "Non-zero exit code").strip()[:200]
+                else:
+                    state["status"] = FAILED
+                    state["detail"] = result.error
+                rollout.host_states[result.host] = state
+                save()
+
+                log_pra_action(
+                    action=rollout.action,
+                    host=result.host,
+                    event_type=EventType.PRA_EXECUTED if state["status"] == OK else EventType.PRA_FAILED,
+                    status=Status.SUCCESS if state["status"] == OK else Status.FAILURE,
+                    approver=rollout.approved_by,
+                    rationale=f"[rollout {rollout.id}, wave {number}] {rollout.rationale}",
+                    result={"returncode": state.get("returncode")},
+                    error=state.get("detail"),
+                )
+                if progress is not None:
+                    await progress(result, done, total)
+
+            await gather_hosts(wave, run, concurrency=rollout.max_parallel, on_result=on_result)
+
+            changed = [h for h in wave if rollout.host_states[h]["status"] == OK]
+            if rollout.health_service and changed:
+                for result in await gather_hosts(
+                    changed, probe, concurrency=rollout.max_parallel, on_result=ignore
+                ):
+                    report = result.value if result.ok else {"error": result.error}
+                    if report.get("healthy") is not True:
+                        state = rollout.host_states[result.host]
+                        state["status"] = UNHEALTHY
+                        state["detail"] = (
+                            f"{rollout.health_service}: "
+                            f"{report.get('active_state') or report.get('error') or 'unhealthy'}"
+                        )
+                save()
+
+            if rollout.failures > rollout.max_failures:
+                remaining = rollout.hosts[sum(len(w) for w in rollout.waves()[:number]):]
+                for host in remaining:
+                    rollout.host_states[host] = {"status": SKIPPED}
+                reason = (
+                    f"{rollout.failures} failed host(s) after wave {number} "
+                    f"(max_failures={rollout.max_failures}); {len(remaining)} host(s) skipped"
+                )
+                return _finish(rollout, RemoteExecutionStatus.HALTED, reason)
+
+        return _finish(rollout, RemoteExecutionStatus.COMPLETED)
+
+    except BaseException as e:
+        # Annulation ou erreur interne: l'état persisté reflète l'arrêt
+        _finish(rollout, RemoteExecutionStatus.HALTED, f"interrupted: {type(e).__name__}: {e}")
+        raise
+
+
+def _finish(rollout: Rollout, status: RemoteExecutionStatus, reason: str | None = None) -> str:
+    finished = _transition(
+        rollout.id,
+        RemoteExecutionStatus.EXECUTING,
+        status,
+        host_states=rollout.host_states,
+        finished_at=datetime.now(),
+        halted_reason=reason,
+    )
+    if status == RemoteExecutionStatus.HALTED:
+        log_pra_action(
+            action=rollout.action,
+            host=rollout.target,
+            event_type=EventType.PRA_FAILED,
+            status=Status.FAILURE,
+            approver=rollout.approved_by,
+            rationale=f"[rollout {rollout.id}] {rollout.rationale}",
+            error=reason,
+        )
+    return render_rollout(finished or rollout)
+
+
+def render_rollout(rollout: Rollout, format: str = "markdown") -> str:
+    """Rollout plan and per-host progress."""
+    if format == "json":
+        return to_json(rollout.to_record())
+
+    icon = {
+        RemoteExecutionStatus.COMPLETED: "✅",
+        RemoteExecutionStatus.HALTED: "🛑",
+        RemoteExecutionStatus.EXECUTING: "🔄",
+        RemoteExecutionStatus.REJECTED: "❌",
+    }.get(rollout.status, "⏳")
+    counts: dict[str, int] = {}
+    for state in rollout.host_states.values():
+        counts[state["status"]] = counts.get(state["status"], 0) + 1
+
+    rows = [
+        {
+            "host": host,
+            "wave": state.get("wave"),
+            "status": state["status"],
+            "exit": state.get("returncode"),
+            "duration_ms": state.get("duration_ms"),
+            "detail": state.get("detail"),
+        }
+        for host, state in ((h, rollout.host_states.get(h, {"status": PENDING})) for h in rollout.hosts)
+    ]
+    lines = [
+        f"## {icon} Rollout `{rollout.id}`: {rollout.status.value.upper()}",
+        "",
+        _summary(rollout),
+        "**Progress:** " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())),
+    ]
+    if rollout.halted_reason:
+        lines.append(f"**Halted:** {rollout.halted_reason}")
+    lines += ["", markdown_table(rows), ""]
+    return "\n".join(lines)
+
+
+async def get_rollout_status(rollout_id: str, format: str = "markdown") -> str:
+    """
+    Show a rollout's plan and per-host progress.
+
+    Args:
+        rollout_id: Rollout ID from propose_rollout
+        format: "markdown" or "json"
+    """
+    if error := check_format(format):
+        return error
+    rollout = _get(rollout_id)
+    if rollout is None:
+        return f"❌ Unknown rollout ID: {rollout_id}"
+    return render_rollout(rollout, format)
@@ -0,0 +1,381 @@
+"""
+In-process metrics with a Prometheus text exposition.
+
+A small registry (standard library only) of counters, gauges and
+histograms, rendered in the Prometheus text format (version 0.0.4):
+
+- instruments updated on the hot path (tool latency, SSH connect/exec
+  time, pool wait, authorization checks) are defined here;
+- state already tracked elsewhere (pool occupancy, cache hits, audit
+  queue depth) is read at scrape time by collectors registered by the
+  owning module, so it costs nothing between scrapes.
+
+The exposition is served by the ``get_metrics`` MCP tool and, when
+``LINUX_MCP_METRICS_PORT`` is set, by a local HTTP endpoint (``/metrics``).
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+logger = logging.getLogger(__name__)  # stderr: stdout est le transport MCP (stdio)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Secondes: de la milliseconde (cache, pool) à la minute (commandes longues)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Décisions locales: de la microseconde à la dizaine de millisecondes
+FAST_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01)
+
+Collector = Callable[[], Iterable["Metric"]]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Metric:
+    """A metric family: one value (or histogram) per label combination."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        """(sample name, labels, value) in exposition order."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key, strict=True)), value
+
+    def render(self) -> list[str]:
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [
+            f"# HELP {self.name} {documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines += [
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+            for name, labels, value in self.samples()
+        ]
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    """Monotonic total (name it ``..._total``)."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Metric):
+    """Value that goes up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative ``le`` buckets, with sum and count."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(b for b in buckets if b != math.inf))
+        if "le" in self.labelnames:
+            raise ValueError("'le' is reserved for histogram buckets")
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # len(buckets) = +Inf
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [compte par bucket (non cumulé), somme, nombre]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block (also usable as a decorator)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def sum(self, **labels: Any) -> float:
+        state = self._values.get(self._key(labels))
+        return state[1] if state else 0.0
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._values.items())
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += n
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+def snapshot(
+    cls: type[Counter] | type[Gauge],
+    name: str,
+    documentation: str,
+    values: float | dict[tuple[str, ...], float],
+    labelnames: Iterable[str] = (),
+) -> Metric:
+    """
+    Build a metric from current state, for collectors.
+
+    Args:
+        values: A single value, or {label values: value} when ``labelnames`` is set
+    """
+    metric = cls(name, documentation, labelnames)
+    if not isinstance(values, dict):
+        values = {(): values}
+    for key, value in values.items():
+        metric._values[tuple(str(v) for v in key)] = float(value)
+    return metric
+
+
+class Registry:
+    """Named metrics plus collectors evaluated at scrape time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def register_collector(self, collector: Collector) -> Collector:
+        """Add a callable returning metrics built from current state (usable as a decorator)."""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def collect(self) -> list[Metric]:
+        """Registered metrics, then collector output (a failing collector is skipped)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return metrics
+
+    def render(self, match: str | None = None) -> str:
+        """Prometheus text exposition; ``match`` keeps families whose name contains it."""
+        lines: list[str] = []
+        for metric in self.collect():
+            if match is None or match in metric.name:
+                lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ----------------------------------------------------------------------
+# Instruments
+# ----------------------------------------------------------------------
+
+TOOL_DURATION = REGISTRY.histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency", ("tool", "status")
+)
+SSH_CONNECT_DURATION = REGISTRY.histogram(
+    "mcp_ssh_connect_seconds", "Time to open an SSH connection", ("kind", "host")
+)
+SSH_EXEC_DURATION = REGISTRY.histogram(
+    "mcp_ssh_exec_seconds", "Remote command execution time on a pooled connection", ("kind", "host")
+)
+SSH_POOL_WAIT = REGISTRY.histogram(
+    "mcp_ssh_pool_wait_seconds", "Time to obtain an SSH session from the pool (includes connects)", ("pool",)
+)
+AUTHORIZATION_CHECK_DURATION = REGISTRY.histogram(
+    "mcp_authorization_check_seconds", "Whitelist authorization decision time", ("decision",),
+    buckets=FAST_BUCKETS,
+)
+
+
+def instrument_tool(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator: time an async MCP tool and record the call in the audit trail.
+
+    A raised exception, or a returned string starting with ``Error`` or
+    ``❌`` (the tools' error convention), counts as an error.
+    """
+    from ..audit import Status, log_tool_call
+
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        result, error = None, None
+        try:
+            result = await fn(*args, **kwargs)
+            if isinstance(result, str) and result.startswith(("Error", "❌")):
+                error = result.splitlines()[0]
+            return result
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            TOOL_DURATION.observe(duration, tool=name, status="error" if error else "success")
+            parameters = {
+                key: value for key, value in kwargs.items()
+                if isinstance(value, (str, int, float, bool, list, dict, type(None)))
+            }  # Sans le Context MCP
+            log_tool_call(
+                name,
+                parameters,
+                Status.FAILURE if error else Status.SUCCESS,
+                result=None if error else result,
+                error=error,
+                duration_ms=round(duration * 1000, 3),
+            )
+
+    return wrapper
+
+
+# ----------------------------------------------------------------------
+# HTTP endpoint
+# ----------------------------------------------------------------------
+
+def start_http_server(
+    port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY
+) -> ThreadingHTTPServer:
+    """
+    Serve ``GET /metrics`` from a daemon thread.
+
+    Args:
+        port: TCP port (0 = pick a free one, see ``server.server_address``)
+        host: Bind address; keep it local unless the port is firewalled
+
+    Returns:
+        The running server (``shutdown()`` stops it)
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # stdout/stderr réservés au transport MCP et à l'audit
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
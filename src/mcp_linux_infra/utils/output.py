@@ -0,0 +1,276 @@
+"""
+Output size limits for tool responses.
+
+``OutputLimiter`` is fed line by line (or chunk by chunk) and only ever
+keeps the head and a rolling tail of the output in memory, so it can sit
+directly behind a streamed command as well as post-process a tool result.
+
+- byte and line budgets, split between head and tail
+- elision marker with the number of omitted lines/bytes
+- runs of identical lines collapsed with a repeat count
+- overlong single lines clipped
+
+JSON results (``format="json"``) are one line and must stay parseable:
+``limit_json`` drops whole records instead, see below.
+"""
+
+import functools
+import json
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..config import CONFIG
+
+OMITTED_MARKER = "[... {lines} lines ({bytes} bytes) omitted ...]"
+REPEAT_MARKER = "[... previous line repeated {count} more times]"
+CLIPPED_MARKER = " [... {chars} chars cut]"
+CUT_PREFIX = "[... {chars} chars cut] "
+
+# Une série de lignes identiques n'est repliée qu'à partir de cette longueur
+MIN_REPEAT_RUN = 3
+
+
+class OutputLimiter:
+    """Incremental head/tail truncation with repeated-line collapsing."""
+
+    def __init__(self, max_bytes: int | None = None, max_lines: int | None = None):
+        self.max_bytes = max(2, max_bytes if max_bytes is not None else CONFIG.tool_output_max_bytes)
+        self.max_lines = max(2, max_lines if max_lines is not None else CONFIG.tool_output_max_lines)
+
+        self._head_lines = self.max_lines // 2
+        self._head_bytes = self.max_bytes // 2
+        self._tail_lines = self.max_lines - self._head_lines
+        self._tail_bytes = self.max_bytes - self._head_bytes
+        self._max_line_chars = max(80, self._tail_bytes // 4)
+
+        self._head: list[str] = []
+        self._head_size = 0
+        self._head_full = False
+        self._tail: deque[tuple[str, int]] = deque()
+        self._tail_size = 0
+
+        self._pending = ""
+        self._pending_cut = 0
+        self._ends_with_newline = False
+        self._last: str | None = None
+        self._repeats = 0
+
+        # Statistiques
+        self.omitted_lines = 0
+        self.omitted_bytes = 0
+        self.collapsed_lines = 0
+        self.clipped_lines = 0
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.omitted_lines or self.collapsed_lines or self.clipped_lines)
+
+    def feed(self, text: str) -> None:
+        """Add an arbitrary chunk of text (lines may span chunks)."""
+        if not text:
+            return
+        lines = text.split("\n")
+        rest = lines.pop()
+        self._ends_with_newline = not rest
+
+        for line in lines:
+            if self._pending:
+                line, self._pending = self._pending + line, ""
+            self.add_line(line)
+
+        # Ligne incomplète: n'en garder que ce qui peut être affiché
+        self._pending += rest
+        overflow = len(self._pending) - (self._max_line_chars + 1)
+        if overflow > 0:
+            self._pending = self._pending[: self._max_line_chars + 1]
+            self._pending_cut += overflow
+
+    def add_line(self, line: str) -> None:
+        """Add one complete line (without its trailing newline)."""
+        if line == self._last and line.strip():
+            self._repeats += 1
+            return
+
+        self._flush_repeats()
+        self._last = line
+        self._emit(line)
+
+    def result(self) -> str:
+        """Limited output (call once everything has been fed)."""
+        if self._pending:
+            self.add_line(self._pending)
+            self._pending = ""
+        self._flush_repeats()
+
+        parts = list(self._head)
+        if self.omitted_lines:
+            parts.append(OMITTED_MARKER.format(lines=self.omitted_lines, bytes=self.omitted_bytes))
+        parts.extend(line for line, _ in self._tail)
+
+        output = "\n".join(parts)
+        return output + "\n" if self._ends_with_newline and parts else output
+
+    def _flush_repeats(self) -> None:
+        if not self._repeats:
+            return
+        if self._repeats + 1 >= MIN_REPEAT_RUN:
+            self.collapsed_lines += self._repeats
+            self._emit(REPEAT_MARKER.format(count=self._repeats))
+        else:
+            for _ in range(self._repeats):
+                self._emit(self._last)
+        self._repeats = 0
+
+    def _emit(self, line: str) -> None:
+        if len(line) > self._max_line_chars:
+            cut = len(line) - self._max_line_chars + self._pending_cut
+            line = line[: self._max_line_chars] + CLIPPED_MARKER.format(chars=cut)
+            self.clipped_lines += 1
+        self._pending_cut = 0
+
+        size = len(line.encode("utf-8", errors="replace")) + 1
+
+        if not self._head_full:
+            if len(self._head) < self._head_lines and self._head_size + size <= self._head_bytes:
+                self._head.append(line)
+                self._head_size += size
+                return
+            self._head_full = True
+
+        self._tail.append((line, size))
+        self._tail_size += size
+        while len(self._tail) > self._tail_lines or self._tail_size > self._tail_bytes:
+            _, dropped = self._tail.popleft()
+            self._tail_size -= dropped
+            self.omitted_lines += 1
+            self.omitted_bytes += dropped
+
+
+def limit_output(
+    text: str, max_bytes: int | None = None, max_lines: int | None = None
+) -> str:
+    """Apply head/tail truncation and repeat collapsing to a complete string."""
+    limiter = OutputLimiter(max_bytes, max_lines)
+    limiter.feed(text)
+    return limiter.result()
+
+
+def _dumps(data: Any) -> str:
+    # Même sérialisation que parsers.to_json
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _size(data: Any) -> int:
+    return len(_dumps(data).encode("utf-8", errors="replace"))
+
+
+def _lists(node: Any):
+    """(owner dict, key, list) for every non-empty list held by a dict."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, list) and value:
+                yield node, key, value
+            yield from _lists(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _lists(item)
+
+
+def _strings(node: Any):
+    """(container, key, string) for every string value."""
+    items = node.items() if isinstance(node, dict) else enumerate(node) if isinstance(node, list) else ()
+    for key, value in items:
+        if isinstance(value, str):
+            yield node, key, value
+        else:
+            yield from _strings(value)
+
+
+def _keep(records: list, count: int, keep_last: bool) -> list:
+    return records[len(records) - count:] if keep_last else records[:count]
+
+
+def _drop_records(data: Any, max_bytes: int, keep_last: bool = False) -> None:
+    """Shorten the largest lists (trailing records first) until ``data`` fits."""
+    while _size(data) > max_bytes:
+        candidates = list(_lists(data))
+        if not candidates:
+            return
+        owner, key, records = max(candidates, key=lambda c: _size(c[2]))
+        # Recherche dichotomique du nombre d'enregistrements gardés
+        low, high = 0, len(records) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            owner[key] = _keep(records, middle, keep_last)
+            if _size(data) <= max_bytes:
+                low = middle
+            else:
+                high = middle - 1
+        owner[key] = _keep(records, low, keep_last)
+        owner["truncated"] = owner.get("truncated", 0) + len(records) - low
+
+
+def _cut_strings(data: Any, max_bytes: int, min_length: int) -> None:
+    """Keep the end of strings longer than ``min_length`` until ``data`` fits."""
+    strings = list(_strings(data))
+    limit = max((len(text) for _, _, text in strings), default=0)
+    while _size(data) > max_bytes and limit > min_length:
+        limit = max(limit // 2, min_length)
+        for container, key, text in strings:
+            if len(text) > limit:
+                container[key] = CUT_PREFIX.format(chars=len(text) - limit) + text[-limit:]
+
+
+def _limit_data(data: Any, max_bytes: int, keep_last: bool = False) -> str:
+    if _size(data) <= max_bytes:
+        return _dumps(data)
+    if isinstance(data, list):
+        data = {"records": data}
+    # Une valeur isolée énorme (sortie d'une tâche) ne doit pas évincer les enregistrements
+    _cut_strings(data, max_bytes, max_bytes // 8)
+    _drop_records(data, max_bytes, keep_last)
+    _cut_strings(data, max_bytes, 80)
+    return _dumps(data)
+
+
+def limit_json(text: str, max_bytes: int | None = None, keep_last: bool = False) -> str:
+    """
+    Bound a JSON document without breaking it.
+
+    Strings longer than 1/8 of the budget are cut first (keeping their
+    end), then whole records are dropped from the end of the largest
+    lists: the dict holding a shortened list gets ``"truncated": <records
+    dropped>`` (a top-level list becomes ``{"records": [...], "truncated": N}``).
+    ``keep_last=True`` drops leading records instead (chronological lists
+    where the latest entries matter).
+    """
+    max_bytes = max_bytes if max_bytes is not None else CONFIG.tool_output_max_bytes
+    if len(text.encode("utf-8", errors="replace")) <= max_bytes:
+        return text
+    return _limit_data(json.loads(text), max_bytes, keep_last)
+
+
+def limit_result(text: str) -> str:
+    """``limit_json`` for JSON documents (never clipped mid-line), ``limit_output`` for text."""
+    if text.startswith(("{", "[")):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            pass
+        else:
+            if len(text.encode("utf-8", errors="replace")) <= CONFIG.tool_output_max_bytes:
+                return text
+            return _limit_data(data, CONFIG.tool_output_max_bytes)
+    return limit_output(text)
+
+
+def limited(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Decorator: apply ``limit_result`` to the string result of an async tool."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await fn(*args, **kwargs)
+        return limit_result(result) if isinstance(result, str) else result
+
+    return wrapper
@@ -0,0 +1,160 @@
+"""Tests for the Ansible playbook / inventory catalog."""
+
+import json
+import os
+
+import pytest
+
+from mcp_linux_infra.tools.execution import ansible_catalog, ansible_wrapper
+from mcp_linux_infra.tools.execution.ansible_catalog import (
+    AnsibleCatalog,
+    parse_inventory,
+    parse_playbook,
+)
+from mcp_linux_infra.utils.output import limit_json
+
+SITE = """\
+- import_playbook: dns.yml
+- name: Base
+  hosts: all
+  tasks: []
+"""
+
+DNS = """\
+- name: Unbound
+  hosts: dns, resolvers
+  vars:
+    secret: !vault |
+      $ANSIBLE_VAULT;1.1;AES256
+      6162
+  tasks: []
+"""
+
+INVENTORY = """\
+[dns]
+dns-1 ansible_host=10.0.0.1
+dns-2
+
+[web]
+web-1
+
+[prod:children]
+dns
+web
+
+[prod:vars]
+env=prod
+"""
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalog = AnsibleCatalog(ttl=300)
+    monkeypatch.setattr(ansible_catalog, "_catalog", catalog)
+    return catalog
+
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Commandes envoyées (en local: host=None)."""
+    sent = []
+    execute_command, execute_commands = ansible_catalog.execute_command, ansible_catalog.execute_commands
+
+    async def counting_command(command, host=None):
+        sent.append(command)
+        return await execute_command(command, host)
+
+    async def counting_commands(batch, host=None):
+        sent.extend(batch)
+        return await execute_commands(batch, host)
+
+    monkeypatch.setattr(ansible_catalog, "execute_command", counting_command)
+    monkeypatch.setattr(ansible_catalog, "execute_commands", counting_commands)
+    return sent
+
+
+@pytest.fixture
+def playbooks(tmp_path):
+    (tmp_path / "site.yml").write_text(SITE)
+    (tmp_path / "dns.yml").write_text(DNS)
+    (tmp_path / "README.md").write_text("not a playbook")
+    (tmp_path / "roles").mkdir()
+    return tmp_path
+
+
+def test_parse_playbook_plays_and_imports():
+    plays, imports = parse_playbook(DNS)
+    assert plays == [{"name": "Unbound", "hosts": ["dns", "resolvers"]}] and imports == []
+    plays, imports = parse_playbook(SITE)
+    assert plays == [{"name": "Base", "hosts": ["all"]}] and imports == ["dns.yml"]
+
+
+def test_parse_inventory_ini_and_yaml():
+    groups = parse_inventory(INVENTORY)
+    assert groups == {"dns": ["dns-1", "dns-2"], "prod": ["dns-1", "dns-2", "web-1"], "web": ["web-1"]}
+
+    yaml_inventory = "all:\n  children:\n    dns:\n      hosts:\n        dns-1:\n        dns-2:\n"
+    assert parse_inventory(yaml_inventory) == {"all": ["dns-1", "dns-2"], "dns": ["dns-1", "dns-2"]}
+
+
+async def test_refresh_fetches_only_changed_files(catalog, commands, playbooks):
+    entries, _ = await catalog.playbooks(None, str(playbooks))
+    assert [e.name for e in entries] == ["dns.yml", "site.yml"]
+    assert sorted(c[0] for c in commands) == ["cat", "cat", "ls"]
+
+    # Dans le TTL: aucune commande
+    commands.clear()
+    await catalog.playbooks(None, str(playbooks))
+    assert commands == [] and catalog.hits == 1
+
+    # Rafraîchissement: un listing, seul le fichier modifié est relu
+    (playbooks / "dns.yml").write_text(DNS.replace("Unbound", "Bind"))
+    os.utime(playbooks / "dns.yml", (1, 1))
+    (playbooks / "site.yml").unlink()
+    entries, _ = await catalog.playbooks(None, str(playbooks), refresh=True)
+    assert commands[1:] == [["cat", f"{playbooks}/dns.yml"]]
+    assert [e.name for e in entries] == ["dns.yml"] and entries[0].plays[0]["name"] == "Bind"
+
+
+async def test_invalidate_forgets_a_file(catalog, commands, playbooks):
+    await catalog.playbooks(None, str(playbooks))
+    assert catalog.invalidate(host="other") == 0
+    assert catalog.invalidate(path=f"{playbooks}/site.yml") == 1
+
+    commands.clear()
+    await catalog.playbooks(None, str(playbooks))
+    assert commands[1:] == [["cat", f"{playbooks}/site.yml"]]
+
+    assert catalog.invalidate() == 2
+    assert catalog.stats()["entries"] == 0
+
+
+async def test_list_playbooks_target_filter(catalog, playbooks):
+    report = await ansible_wrapper.list_ansible_playbooks(None, str(playbooks), target="web")
+    assert "| site.yml |" in report and "| dns.yml |" not in report
+
+    data = json.loads(await ansible_wrapper.list_ansible_playbooks(None, str(playbooks), format="json"))
+    dns = next(p for p in data if p["name"] == "dns.yml")
+    assert dns["targets"] == ["dns", "resolvers"] and len(dns["sha256"]) == 64
+
+    report = await ansible_wrapper.list_ansible_playbooks(None, str(playbooks / "missing"))
+    assert report.startswith("Error: cannot list")
+
+
+async def test_show_inventory_directory_or_file(catalog, tmp_path):
+    (tmp_path / "hosts").write_text(INVENTORY)
+    report = await ansible_wrapper.show_ansible_inventory(None, str(tmp_path))
+    assert "3 groups, 3 hosts" in report and "| prod |" in report
+
+    data = json.loads(await ansible_wrapper.show_ansible_inventory(None, str(tmp_path / "hosts"), format="json"))
+    assert {"group": "web", "hosts": ["web-1"]} in data["groups"]
+
+
+async def test_json_catalog_truncates_whole_playbooks(catalog, tmp_path):
+    for i in range(200):
+        (tmp_path / f"play-{i:03d}.yml").write_text(DNS)
+    text = await ansible_wrapper.list_ansible_playbooks(None, str(tmp_path), format="json")
+
+    data = json.loads(limit_json(text, max_bytes=8192))
+    assert data["truncated"] == 200 - len(data["records"]) > 0
+    assert all(p["targets"] == ["dns", "resolvers"] and "groups" not in p for p in data["records"])
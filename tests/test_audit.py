@@ -0,0 +1,172 @@
+"""Tests for the queued audit logging pipeline."""
+
+import json
+import logging
+import threading
+import time
+import uuid
+
+import pytest
+
+from mcp_linux_infra.audit import AuditLogger, EventType, LogLevel, Status
+
+
+class ListHandler(logging.Handler):
+    """Collects audit events; can be paused to fill the queue."""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def emit(self, record):
+        self.gate.wait(5)
+        try:
+            self.events.append(json.loads(record.getMessage()))
+        except json.JSONDecodeError:
+            self.events.append({"message": record.getMessage()})
+
+
+@pytest.fixture
+def audit():
+    logger = AuditLogger(name=f"test.audit.{uuid.uuid4().hex}", queue_size=3, rollup_interval=0)
+    logger.logger.handlers.clear()
+    logger.logger.propagate = False
+    handler = ListHandler()
+    logger.logger.addHandler(handler)
+    yield logger, handler
+    handler.gate.set()
+    logger.close()
+
+
+def test_events_written_in_order_after_flush(audit):
+    logger, handler = audit
+    for i in range(3):
+        logger.log_event(EventType.SSH_COMMAND, Status.SUCCESS, {"n": i, "password": "x"})
+
+    assert logger.flush()
+    assert [e["details"]["n"] for e in handler.events] == [0, 1, 2]
+    assert handler.events[0]["details"]["password"] == "***REDACTED***"
+    assert handler.events[0]["event_type"] == "ssh_command"
+
+
+def test_bad_event_does_not_stop_the_writer(audit):
+    logger, handler = audit
+    logger.log_event(EventType.SSH_COMMAND, Status.SUCCESS, {"x": {1, 2}, "nested": {(1, 2): "tuple key"}})
+    logger.log_event(EventType.SSH_COMMAND, Status.SUCCESS, None)  # details invalides
+    logger.log_event(EventType.SECURITY_VIOLATION, Status.DENIED, {"n": "violation"}, level=LogLevel.CRITICAL)
+
+    assert logger.flush()
+    assert handler.events[0]["details"] == {"x": "{1, 2}", "nested": {"(1, 2)": "tuple key"}}
+    assert "could not be written" in handler.events[1]["message"]
+    assert handler.events[2]["details"]["n"] == "violation"
+    assert logger.stats()["failed"] == 1
+
+
+def test_full_queue_drops_routine_events_only(audit):
+    logger, handler = audit
+    handler.gate.clear()
+    logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"n": "blocking"})
+    while logger.stats()["queued"]:
+        pass  # Le writer a pris le premier événement et attend
+
+    for i in range(5):
+        logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"n": i})
+    logger.log_event(EventType.SECURITY_VIOLATION, Status.DENIED, {"n": "violation"}, level=LogLevel.CRITICAL)
+
+    assert logger.stats()["dropped"] == 2
+    handler.gate.set()
+    assert logger.flush()
+
+    messages = [e.get("details", e).get("n", e.get("message")) for e in handler.events]
+    # Les pertes sont signalées avant l'événement suivant
+    assert messages[0] == "blocking"
+    assert "2 routine events dropped" in messages[1]
+    assert messages[2:] == [0, 1, 2, "violation"]
+
+
+def test_zero_queue_size_is_unbounded():
+    logger = AuditLogger(name=f"test.audit.{uuid.uuid4().hex}", queue_size=0, rollup_interval=0)
+    logger.logger.handlers.clear()
+    logger.logger.propagate = False
+    handler = ListHandler()
+    logger.logger.addHandler(handler)
+    handler.gate.clear()
+    try:
+        for i in range(20):
+            logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"n": i})
+        assert logger.stats()["dropped"] == 0
+        handler.gate.set()
+        assert logger.flush()
+        assert [e["details"]["n"] for e in handler.events] == list(range(20))
+    finally:
+        handler.gate.set()
+        logger.close()
+
+
+def test_close_drains_then_writes_synchronously(audit):
+    logger, handler = audit
+    logger.log_event(EventType.TOOL_CALL, Status.SUCCESS, {"n": 1})
+    logger.close()
+    assert len(handler.events) == 1
+
+    logger.log_event(EventType.TOOL_CALL, Status.SUCCESS, {"n": 2})
+    assert len(handler.events) == 2
+
+
+def test_disabled_level_is_not_queued(audit):
+    logger, handler = audit
+    logger.logger.setLevel(logging.WARNING)
+    logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {})
+    assert logger.stats()["queued"] == 0
+    assert logger.flush()
+    assert handler.events == []
+
+
+@pytest.fixture
+def rolling():
+    logger = AuditLogger(name=f"test.audit.{uuid.uuid4().hex}", rollup_interval=60)
+    logger.logger.handlers.clear()
+    logger.logger.propagate = False
+    handler = ListHandler()
+    logger.logger.addHandler(handler)
+    yield logger, handler
+    logger.close()
+
+
+def test_reused_connections_are_rolled_up(rolling):
+    logger, handler = rolling
+    for host in ["web-01"] * 5 + ["web-02"] * 2:
+        logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"host": host, "username": "mcp", "reused": True})
+    logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"host": "web-01", "username": "mcp", "reused": False})
+    assert logger.flush()
+
+    verbatim = [e for e in handler.events if "rollup" not in e["details"]]
+    rollups = {e["details"]["host"]: e["details"]["rollup"]["count"] for e in handler.events if "rollup" in e["details"]}
+    assert len(verbatim) == 3  # Premier de chaque fenêtre + nouvelle connexion
+    assert rollups == {"web-01": 4, "web-02": 1}
+    assert logger.stats()["rolled_up"] == 5
+
+
+def test_security_events_never_rolled_up(rolling):
+    logger, handler = rolling
+    for _ in range(3):
+        logger.log_event(EventType.SECURITY_VIOLATION, Status.DENIED, {"host": "web-01"}, level=LogLevel.CRITICAL)
+    assert logger.flush()
+    assert len(handler.events) == 3
+
+    with pytest.raises(ValueError):
+        AuditLogger(name=f"test.audit.{uuid.uuid4().hex}", rollup_interval=60, rollup_events=["pra_executed"]).close()
+
+
+def test_rollup_window_closes_on_interval(rolling):
+    logger, handler = rolling
+    logger.rollups = {EventType.SSH_CONNECT: 0.2}
+    for _ in range(3):
+        logger.log_event(EventType.SSH_CONNECT, Status.SUCCESS, {"host": "web-01", "username": "mcp", "reused": True})
+
+    deadline = time.monotonic() + 5
+    while len(handler.events) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert handler.events[-1]["details"]["rollup"]["count"] == 2
@@ -0,0 +1,126 @@
+"""Tests for the indexed audit trail query engine."""
+
+import json
+import logging
+import random
+import time
+from datetime import datetime
+
+import pytest
+
+from mcp_linux_infra.audit_query import AuditFilter, AuditTrail
+from mcp_linux_infra.audit_segments import AuditFileHandler
+
+
+def event(created, host="web-01", event_type="ssh_command", status="success", command="uptime"):
+    return {
+        "timestamp": datetime.fromtimestamp(created).isoformat(),
+        "event_type": event_type,
+        "status": status,
+        "details": {"host": host, "command": command},
+    }
+
+
+def write(handler, ev):
+    rec = logging.LogRecord("audit", logging.INFO, "(audit)", 0, json.dumps(ev), None, None)
+    rec.created = datetime.fromisoformat(ev["timestamp"]).timestamp()
+    rec.audit_event = ev
+    handler.emit(rec)
+
+
+@pytest.fixture
+def events():
+    rng = random.Random(7)
+    start = time.time() - 3600
+    return [
+        event(
+            start + i * 0.5,
+            host=rng.choice(["web-01", "web-02", "db-01"]),
+            event_type=rng.choice(["ssh_command", "ssh_connect", "tool_success"]),
+            status=rng.choice(["success", "failure"]),
+            command=f"cmd-{i}",
+        )
+        for i in range(3000)
+    ]
+
+
+@pytest.fixture
+def trail(tmp_path, events):
+    handler = AuditFileHandler(tmp_path, max_bytes=50_000)
+    for ev in events:
+        write(handler, ev)
+    handler.close()
+    return AuditTrail(tmp_path)
+
+
+def expected(events, query):
+    return [
+        ev for ev in events
+        if query.matches(ev, datetime.fromisoformat(ev["timestamp"]).timestamp())
+    ]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"host": "db-01"},
+    {"event_type": "ssh_command", "status": "failure"},
+    {"since": -600},
+    {"since": -900, "until": -300, "host": "web-02"},
+    {"contains": "cmd-42"},
+])
+def test_query_matches_full_scan(trail, events, filters):
+    now = time.time()
+    for bound in ("since", "until"):
+        if bound in filters:
+            filters[bound] = now + filters[bound]
+    query = AuditFilter(**filters)
+
+    assert list(trail.query(query)) == expected(events, query)
+
+
+def test_segments_pruned_by_index(trail):
+    assert len(trail.files()) > 5
+    recent = trail.segments(AuditFilter(since=time.time() - 60))
+    assert len(recent) < len(trail.files())
+    assert trail.segments(AuditFilter(host="unknown-host")) == []
+
+
+def test_active_file_index_is_incremental(tmp_path):
+    active = tmp_path / f"mcp-audit-{datetime.now():%Y%m%d}.json"
+    now = time.time()
+    active.write_text(json.dumps(event(now, host="a")) + "\n" + json.dumps(event(now, host="b"))[:20])
+    trail = AuditTrail(tmp_path)
+
+    assert trail.index(active)["hosts"] == ["a"]
+
+    # Fin de la ligne partielle, puis une nouvelle ligne
+    line_b = json.dumps(event(now, host="b"))
+    with open(active, "a") as f:
+        f.write(line_b[20:] + "\n" + json.dumps(event(now, host="c")) + "\n")
+
+    index = trail.index(active)
+    assert index["hosts"] == ["a", "b", "c"]
+    assert index["events"] == 3
+    assert [e["details"]["host"] for e in trail.query(AuditFilter(since=now - 5))] == ["a", "b", "c"]
+
+
+async def test_query_audit_log_tool(trail, monkeypatch):
+    from mcp_linux_infra import server
+    from mcp_linux_infra.config import CONFIG
+
+    monkeypatch.setattr(CONFIG, "log_dir", trail.directory)
+
+    records = json.loads(await server.query_audit_log(host="db-01", limit=5, format="json"))
+    assert len(records) == 5
+    assert all(r["host"] == "db-01" for r in records)
+    assert records[-1]["timestamp"] >= records[0]["timestamp"]
+
+    table = await server.query_audit_log(event_type="ssh_command", since_minutes=10)
+    assert table.startswith("## Audit Trail")
+
+    # Réponse JSON trop grande: les événements les plus récents sont gardés
+    monkeypatch.setattr(CONFIG, "tool_output_max_bytes", 4096)
+    latest = json.loads(await server.query_audit_log(since_minutes=None, limit=1000, format="json"))
+    newest = list(trail.query(AuditFilter()))[-1]
+    assert latest["truncated"] == 1000 - len(latest["records"]) > 0
+    assert latest["records"][-1]["timestamp"] == newest["timestamp"]
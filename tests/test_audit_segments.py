@@ -0,0 +1,101 @@
+"""Tests for rotating, compressed audit log segments."""
+
+import gzip
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from mcp_linux_infra.audit_segments import AuditFileHandler, iter_segments, read_indexes
+
+
+def record(event_type="ssh_command", host="web-01", created=None):
+    event = {
+        "timestamp": datetime.fromtimestamp(created or time.time()).isoformat(),
+        "event_type": event_type,
+        "status": "success",
+        "details": {"host": host, "command": "uptime"},
+    }
+    rec = logging.LogRecord("audit", logging.INFO, "(audit)", 0, json.dumps(event), None, None)
+    if created is not None:
+        rec.created = created
+    rec.audit_event = event
+    return rec
+
+
+def read_segment(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = AuditFileHandler(tmp_path, max_bytes=1000, retention_days=7)
+    yield handler
+    handler.close()
+
+
+def test_size_rotation_writes_index_and_compresses(handler, tmp_path):
+    for i in range(20):
+        handler.emit(record(host=f"web-{i % 3}"))
+    handler.close()
+
+    segments = list(iter_segments(tmp_path))
+    assert segments and all(path.suffix == ".gz" for _, _, path in segments)
+
+    indexes = read_indexes(tmp_path)
+    assert [index["segment"] for index in indexes] == [path.name for _, _, path in segments]
+    for index, (_, _, path) in zip(indexes, segments, strict=True):
+        assert index["events"] == len(read_segment(path))
+        assert index["first_ts"] <= index["last_ts"]
+        assert index["event_types"] == {"ssh_command": index["events"]}
+
+    active = tmp_path / f"mcp-audit-{datetime.now():%Y%m%d}.json"
+    total = sum(index["events"] for index in indexes) + len(read_segment(active))
+    assert total == 20
+
+
+def test_day_change_rotates(handler, tmp_path):
+    handler.max_bytes = 0
+    handler.emit(record())
+    tomorrow = (datetime.now() + timedelta(days=1)).timestamp()
+    handler.emit(record(created=tomorrow))
+    # Un événement en retard reste dans le segment courant
+    handler.emit(record(created=time.time()))
+    handler.close()
+
+    [(day, seq, path)] = list(iter_segments(tmp_path))
+    assert (day, seq) == (f"{datetime.now():%Y%m%d}", 1)
+    assert len(read_segment(path)) == 1
+    next_day = tmp_path / f"mcp-audit-{datetime.fromtimestamp(tomorrow):%Y%m%d}.json"
+    assert len(read_segment(next_day)) == 2
+
+
+def test_restart_recovers_stale_active_file(tmp_path):
+    stale = tmp_path / "mcp-audit-20200101.json"
+    stale.write_text(json.dumps({"timestamp": "2020-01-01T10:00:00", "event_type": "tool_call"}) + "\n")
+
+    handler = AuditFileHandler(tmp_path, compress=False)
+    handler.close()
+
+    [index] = read_indexes(tmp_path)
+    assert index["segment"] == "mcp-audit-20200101.001.json"
+    assert index["events"] == 1
+    assert not stale.exists()
+
+
+def test_retention_prunes_old_segments(tmp_path):
+    old = (datetime.now() - timedelta(days=10)).strftime("%Y%m%d")
+    recent = (datetime.now() - timedelta(days=2)).strftime("%Y%m%d")
+    for day in (old, recent):
+        (tmp_path / f"mcp-audit-{day}.001.json.gz").write_bytes(gzip.compress(b""))
+        (tmp_path / f"mcp-audit-{day}.001.index.json").write_text("{}")
+
+    handler = AuditFileHandler(tmp_path, retention_days=7)
+    handler.close()
+
+    assert [day for day, _, _ in iter_segments(tmp_path)] == [recent]
+    assert not (tmp_path / f"mcp-audit-{old}.001.index.json").exists()
@@ -0,0 +1,113 @@
+"""Tests for the compiled, token-indexed whitelist matcher."""
+
+import random
+import re
+
+import pytest
+
+from mcp_linux_infra.authorization import (
+    COMMAND_WHITELIST,
+    AuthLevel,
+    AuthorizationEngine,
+    CommandRule,
+)
+from mcp_linux_infra.authorization.matcher import PatternSet, RuleMatcher, leading_token
+from mcp_linux_infra.state_store import StateStore
+
+
+def rule(pattern: str, level: AuthLevel = AuthLevel.AUTO) -> CommandRule:
+    return CommandRule(pattern=pattern, auth_level=level, description=pattern, ssh_user="mcp-reader", rationale="test")
+
+
+def linear_match(rules, command):
+    """Reference behaviour: linear re.match scan, first match wins."""
+    return next((r for r in rules if re.match(r.pattern, command)), None)
+
+
+@pytest.mark.parametrize(
+    "pattern, token",
+    [
+        (r"^systemctl status\s+", "systemctl"),
+        (r"^journalctl\s+", "journalctl"),
+        (r"^ss\s+-[lntup]+", "ss"),
+        (r"^uptime$", "uptime"),
+        (r"^cat /etc/os-release", "cat"),
+        (r"^apt\-get install ", "apt-get"),
+        (r"^systemctl (start|stop) ", "systemctl"),
+        (r"^uptime", None),  # also matches "uptimes"
+        (r".*rm\s+-rf", None),
+        (r"^(cat|less) ", None),
+        (r"^cat |^less ", None),
+        (r"(?i)^reboot$", None),
+        (r"^rebooty?$", None),
+        (r"^ls\s*-l", None),
+        (r"^\w+ --help", None),
+        (r"^ls [|] ", "ls"),
+    ],
+)
+def test_leading_token(pattern, token):
+    assert leading_token(pattern) == token
+
+
+def test_first_match_wins_across_buckets():
+    rules = [
+        rule(r"^systemctl status nginx", AuthLevel.MANUAL),
+        rule(r".*--force", AuthLevel.BLOCKED),
+        rule(r"^systemctl status\s+"),
+    ]
+    matcher = RuleMatcher(rules)
+
+    assert matcher.match("systemctl status nginx --force") is rules[0]
+    assert matcher.match("systemctl status sshd --force") is rules[1]
+    assert matcher.match("systemctl status sshd") is rules[2]
+    assert matcher.match("reboot") is None
+    assert matcher.match("") is None
+
+
+def test_differential_against_linear_scan():
+    words = ["systemctl", "journalctl", "cat", "ls", "rm", "uptime", "podman", "-rf", "status", "/", "x"]
+    templates = [
+        r"^{a}\s+{b}", r"^{a} {b}", r"^{a}$", r"^{a}", r".*{a}\s+{b}", r"^({a}|{b}) ",
+        r"^{a}\s*{b}", r"^{a}\s+", r"{a}", r"^{a}\ {b}",
+    ]
+    rng = random.Random(1234)
+    rules = [
+        rule(rng.choice(templates).format(a=re.escape(rng.choice(words)), b=re.escape(rng.choice(words))))
+        for _ in range(300)
+    ]
+    matcher = RuleMatcher(rules)
+
+    for _ in range(3000):
+        command = rng.choice([" ", "  ", "\t"]).join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+        assert matcher.match(command) is linear_match(rules, command), command
+
+
+def test_engine_uses_default_whitelist_order():
+    engine = AuthorizationEngine(COMMAND_WHITELIST, store=StateStore(":memory:"))
+
+    for command in ["systemctl status nginx", "rm -rf /", "df -h", "systemctl restart nginx", "reboot"]:
+        expected = linear_match(COMMAND_WHITELIST, command)
+        assert engine.check_command("h", command).rule is expected
+
+
+def test_invalid_pattern_fails_at_load():
+    with pytest.raises(re.error):
+        AuthorizationEngine([rule(r"^cat ([")])
+
+
+def test_pattern_set_first_match_and_flags():
+    patterns = PatternSet([r".*rm\s+-rf", r"^(ls|cat)\s+", r"reboot"], flags=[re.IGNORECASE, 0, re.IGNORECASE])
+    assert patterns.combined
+    assert patterns.first_match("RM -rf /tmp") == 0
+    assert patterns.first_match("ls -rf; rm -rf /") == 0
+    assert patterns.first_match("ls -l") == 1
+    assert patterns.first_match("LS -l") is None
+    assert patterns.first_match("REBOOT") == 2
+
+
+def test_pattern_set_falls_back_to_loop():
+    patterns = PatternSet([r"^(a+)-\1$", r"(?i)^x"])
+    assert not patterns.combined
+    assert patterns.first_match("aa-aa") == 0
+    assert patterns.first_match("aa-a") is None
+    assert patterns.first_match("X") == 1
@@ -1,5 +1,6 @@
 """Tests for auto-learning system."""
 
+import os
 import pytest
 import tempfile
 from pathlib import Path
@@ -19,12 +20,15 @@ def temp_stats_file():
         yield Path(f.name)
     # Cleanup
     Path(f.name).unlink(missing_ok=True)
+    Path(f.name).with_suffix('.jsonl').unlink(missing_ok=True)
 
 
 @pytest.fixture
 def learning_engine(temp_stats_file):
     """Create a learning engine with temp file."""
-    return AutoLearningEngine(stats_file=temp_stats_file)
+    engine = AutoLearningEngine(stats_file=temp_stats_file)
+    yield engine
+    engine.close()
 
 
 def test_record_blocked_command(learning_engine):
@@ -151,6 +155,7 @@ def test_persistence(temp_stats_file):
     # Create engine and record
     engine1 = AutoLearningEngine(stats_file=temp_stats_file)
     engine1.record_blocked_command("htop", user="alice", host="server1")
+    engine1.flush()
 
     # Create new engine with same file
     engine2 = AutoLearningEngine(stats_file=temp_stats_file)
@@ -182,3 +187,101 @@ def test_suggestions_sorted_by_count(learning_engine):
     assert suggestions[1]['count'] == 5
     assert suggestions[2]['command'] == "htop"
     assert suggestions[2]['count'] == 3
+
+
+def test_record_does_not_rewrite_snapshot(temp_stats_file):
+    """Recording only appends to the event log; the snapshot is left alone."""
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60)
+    for user in ("alice", "bob", "alice"):
+        engine.record_blocked_command("htop", user=user, host="server1")
+    engine.flush()
+
+    assert temp_stats_file.read_text() == ""
+    assert len(engine.log_file.read_text().splitlines()) == 3
+
+    engine2 = AutoLearningEngine(stats_file=temp_stats_file)
+    stats = engine2.get_command_stats("htop")
+    assert stats.count == 3
+    assert stats.users == ["alice", "bob"]
+    engine.close()
+    engine2.close()
+
+
+def test_close_without_events_leaves_snapshot_alone(temp_stats_file):
+    """Opening and closing the engine does not rewrite an unchanged snapshot."""
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60)
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.close()
+    snapshot = temp_stats_file.read_text()
+    os.utime(temp_stats_file, (1, 1))
+
+    AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60).close()
+    assert temp_stats_file.stat().st_mtime == 1
+    assert temp_stats_file.read_text() == snapshot
+
+
+def test_compaction_skips_events_already_in_snapshot(temp_stats_file):
+    """A crash between snapshot and log truncation does not double count."""
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60)
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.record_blocked_command("htop", user="bob", host="server1")
+    engine.flush()
+    log = engine.log_file.read_text()
+
+    engine.flush(compact=True)
+    assert not engine.log_file.exists()
+    engine.log_file.write_text(log)  # Log non tronqué
+
+    engine2 = AutoLearningEngine(stats_file=temp_stats_file)
+    assert engine2.get_command_stats("htop").count == 2
+    engine2.record_blocked_command("htop", user="carol", host="server1")
+    engine2.flush()
+
+    engine3 = AutoLearningEngine(stats_file=temp_stats_file)
+    assert engine3.get_command_stats("htop").count == 3
+    for e in (engine, engine2, engine3):
+        e.close()
+
+
+def test_torn_last_line_is_ignored(temp_stats_file):
+    """A partially written event is dropped on load."""
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60)
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.flush()
+    with open(engine.log_file, 'a') as f:
+        f.write('{"command":"iot')
+
+    engine2 = AutoLearningEngine(stats_file=temp_stats_file)
+    assert engine2.get_command_stats("htop").count == 1
+    assert engine2.get_command_stats("iot") is None
+    engine.close()
+    engine2.close()
+
+
+def test_clear_is_replayed(temp_stats_file):
+    """Clearing stats is an event too."""
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=60)
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.record_blocked_command("iotop", user="alice", host="server1")
+    engine.clear_stats("htop")
+    engine.flush()
+
+    engine2 = AutoLearningEngine(stats_file=temp_stats_file)
+    assert engine2.get_command_stats("htop") is None
+    assert engine2.get_command_stats("iotop") is not None
+    engine.close()
+    engine2.close()
+
+
+def test_background_flush(temp_stats_file):
+    """Pending events reach the log within the flush interval."""
+    import time
+
+    engine = AutoLearningEngine(stats_file=temp_stats_file, flush_interval=0.05)
+    engine.record_blocked_command("htop", user="alice", host="server1")
+
+    deadline = time.monotonic() + 2
+    while not engine.log_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine.log_file.exists()
+    engine.close()
@@ -136,3 +136,130 @@ def test_whitelisted_command():
 
     assert analysis.recommended_action == "ALREADY_WHITELISTED"
     assert analysis.can_auto_add is False
+
+
+def _loop_risk_pattern(command):
+    """Reference: the historical tier-by-tier re.match loops."""
+    import re
+    from mcp_linux_infra.analysis.command_analysis import (
+        DANGEROUS_PATTERNS,
+        MEDIUM_RISK_PATTERNS,
+        READONLY_PATTERNS,
+    )
+
+    for pattern, reason in DANGEROUS_PATTERNS:
+        if re.match(pattern, command, re.IGNORECASE):
+            return RiskLevel.CRITICAL, pattern, reason
+    for pattern, reason in MEDIUM_RISK_PATTERNS:
+        if re.match(pattern, command, re.IGNORECASE):
+            return RiskLevel.MEDIUM, pattern, reason
+    for pattern in READONLY_PATTERNS:
+        if re.match(pattern, command):
+            return RiskLevel.LOW, pattern, None
+    return None
+
+
+def test_risk_tiers_match_loop_implementation():
+    """The combined alternation classifies exactly like the per-tier loops."""
+    import random
+    from mcp_linux_infra.analysis.command_analysis import RISK_TIERS, match_risk_pattern
+
+    assert RISK_TIERS.combined
+
+    words = [
+        "rm", "-rf", "/", "/tmp", "dd", "if=/dev/zero", "of=/dev/sda", "mkfs.ext4", "fdisk", "parted",
+        "wipefs", ":(){", ":|:&", "};:", ">", "/dev/sdb", "chown", "chmod", "-R", "777", "root",
+        "systemctl", "restart", "RESTART", "status", "enable", "disable", "podman", "docker", "stop",
+        "reboot", "Shutdown", "htop", "ls", "cat", "ps", "df", "ss", "ip", "addr", "journalctl",
+        "ansible-playbook", "site.yml", "--check", "inspect", "-la", "nginx",
+    ]
+    rng = random.Random(7)
+    commands = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 5))) for _ in range(5000)]
+    commands += ["", "rm -rf /", "echo ok; rm -rf /", "ls", "ls ", "htop", "Systemctl Stop x"]
+
+    for command in commands:
+        assert match_risk_pattern(command) == _loop_risk_pattern(command), command
+
+
+def test_assess_reports_fired_pattern():
+    """assess_command_risk tells which pattern classified the command."""
+    result = assess_command_risk("dd if=/dev/zero of=/dev/sda")
+    assert result["pattern"] == r'.*dd\s+.*of=/dev/'
+
+
+def test_analysis_is_memoized_by_normalized_command():
+    """Repeated analyses (modulo whitespace) are served from the cache."""
+    from mcp_linux_infra.analysis.command_analysis import get_analysis_cache
+    from mcp_linux_infra.analysis.plugins import get_plugin_registry
+
+    get_plugin_registry()  # Loading plugins invalidates the cache
+    cache = get_analysis_cache()
+    cache.invalidate()
+    hits, misses = cache.hits, cache.misses
+
+    first = analyze_command_safety("ip  route   show")
+    second = analyze_command_safety(" ip route show")
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
+    assert second.command == " ip route show"
+    assert first.risk_level == second.risk_level
+
+    # Returned objects are copies: mutating one does not leak into the cache
+    first.similar_commands.append("tampered")
+    assert "tampered" not in analyze_command_safety("ip route show").similar_commands
+
+
+def test_analysis_cache_invalidated_on_registry_and_whitelist_change():
+    """Plugin registration and whitelist updates bump the version stamp."""
+    from mcp_linux_infra.analysis.command_analysis import get_analysis_cache
+    from mcp_linux_infra.analysis.plugins import CommandPlugin, CommandSpec, get_plugin_registry
+    from mcp_linux_infra.authorization import COMMAND_WHITELIST, AuthorizationEngine
+
+    cache = get_analysis_cache()
+    assert analyze_command_safety("frobnicate --all").risk_level == RiskLevel.UNKNOWN
+    version = cache.version
+
+    class FrobPlugin(CommandPlugin):
+        name = "frob-test"
+        category = "test"
+        description = "Test plugin"
+        commands = {
+            "frobnicate": CommandSpec(
+                pattern=r"^frobnicate(\s+.*)?$",
+                risk=RiskLevel.LOW,
+                level=AuthLevel.AUTO,
+                ssh_user="mcp-reader",
+                description="Frobnicate",
+                rationale="Test",
+            )
+        }
+
+    registry = get_plugin_registry()
+    registry.register(FrobPlugin())
+    try:
+        assert cache.version > version
+        assert analyze_command_safety("frobnicate --all").risk_level == RiskLevel.LOW
+    finally:
+        registry.unregister("frob-test")
+
+    version = cache.version
+    AuthorizationEngine(COMMAND_WHITELIST)
+    assert cache.version > version
+
+
+def test_analysis_cache_is_bounded():
+    from mcp_linux_infra.analysis.command_analysis import AnalysisCache, CommandAnalysis
+
+    cache = AnalysisCache(max_entries=2)
+    analysis = CommandAnalysis("x", RiskLevel.LOW, "c", True, None, "u", "r", [], True, "ADD_AUTO")
+    for key in ("a", "b", "c"):
+        cache.put(key, analysis, cache.version)
+
+    assert cache.get("a") is None
+    assert cache.get("c") is analysis
+    assert cache.stats()["evictions"] == 1
+
+    # A result computed before an invalidation is not stored
+    stale = cache.version
+    cache.invalidate()
+    cache.put("d", analysis, stale)
+    assert cache.get("d") is None
@@ -0,0 +1,113 @@
+"""Tests for fleet fan-out execution."""
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_linux_infra.authorization import COMMAND_WHITELIST, AuthorizationEngine
+from mcp_linux_infra.config import CONFIG
+from mcp_linux_infra.connection.fanout import fan_out, gather_hosts, resolve_hosts
+from mcp_linux_infra.state_store import StateStore
+from mcp_linux_infra.tools.diagnostics.fleet import run_on_fleet
+from mcp_linux_infra.tools.execution import ssh_executor
+
+
+@pytest.fixture
+def allowed_hosts(monkeypatch):
+    monkeypatch.setattr(CONFIG, "allowed_hosts", ["dns-1", "dns-2", "web-1", "web-2"])
+
+
+def test_resolve_hosts_list_and_string():
+    assert resolve_hosts(["a", "b", "a"]) == ["a", "b"]
+    assert resolve_hosts("a, b ,c") == ["a", "b", "c"]
+
+
+def test_resolve_hosts_glob(allowed_hosts):
+    assert resolve_hosts(["dns-*"]) == ["dns-1", "dns-2"]
+    assert resolve_hosts("web-?,dns-1") == ["web-1", "web-2", "dns-1"]
+
+
+def test_resolve_hosts_glob_requires_whitelist(monkeypatch):
+    monkeypatch.setattr(CONFIG, "allowed_hosts", None)
+    with pytest.raises(ValueError):
+        resolve_hosts(["dns-*"])
+
+
+def test_resolve_hosts_no_match(allowed_hosts):
+    with pytest.raises(ValueError):
+        resolve_hosts(["db-*"])
+
+
+async def test_fan_out_yields_in_completion_order():
+    delays = {"slow": 0.05, "fast": 0.0}
+
+    async def operation(host):
+        await asyncio.sleep(delays[host])
+        return host.upper()
+
+    order = [r.host async for r in fan_out(["slow", "fast"], operation, concurrency=2)]
+    assert order == ["fast", "slow"]
+
+
+async def test_fan_out_bounded_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def operation(host):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return host
+
+    results = await gather_hosts([f"h{i}" for i in range(10)], operation, concurrency=3)
+    assert peak == 3
+    assert [r.host for r in results] == [f"h{i}" for i in range(10)]
+
+
+async def test_gather_hosts_captures_errors_and_timeouts():
+    async def operation(host):
+        if host == "broken":
+            raise RuntimeError("connection refused")
+        if host == "hung":
+            await asyncio.sleep(1)
+        return "ok"
+
+    progress = []
+
+    async def on_result(result, done, total):
+        progress.append((result.host, done, total))
+
+    results = await gather_hosts(
+        ["good", "broken", "hung"], operation, timeout=0.05, on_result=on_result
+    )
+
+    by_host = {r.host: r for r in results}
+    assert by_host["good"].status == "ok"
+    assert by_host["broken"].status == "error"
+    assert "connection refused" in by_host["broken"].error
+    assert by_host["hung"].status == "timeout"
+    assert [p[1] for p in progress] == [1, 2, 3]
+
+
+async def test_error_reports_count_as_failed_hosts():
+    async def operation(host):
+        return "Error reading journal logs: permission denied" if host == "bad" else "# Report\nall good"
+
+    report = await run_on_fleet("Logs", ["good", "bad"], operation)
+    assert "(2 hosts, 1 ok, 1 failed)" in report
+    assert "| bad | error |" in report and "Error: Error" not in report
+
+    data = json.loads(await run_on_fleet("Logs", ["good", "bad"], operation, format="json"))
+    assert data["hosts"]["bad"] == {"error": "Error reading journal logs: permission denied"}
+
+
+async def test_fleet_refuses_manual_command_without_approval(monkeypatch):
+    engine = AuthorizationEngine(COMMAND_WHITELIST, store=StateStore(":memory:"))
+    monkeypatch.setattr(ssh_executor, "get_auth_engine", lambda: engine)
+
+    report = await ssh_executor.execute_fleet_command(["web-1", "web-2"], "systemctl restart nginx")
+    assert "FLEET EXECUTION REFUSED" in report and "MANUAL" in report
+    assert engine.get_all_pending() == []
@@ -0,0 +1,125 @@
+"""Tests for background jobs (streamed output, ring buffer, cancellation)."""
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from mcp_linux_infra.authorization import COMMAND_WHITELIST, ApprovalStatus, AuthorizationEngine
+from mcp_linux_infra.connection import local_process
+from mcp_linux_infra.state_store import StateStore
+from mcp_linux_infra.tools.execution import jobs, ssh_executor
+from mcp_linux_infra.tools.execution.jobs import JobManager, JobStatus, OutputRing
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = JobManager(max_retained=3, buffer_lines=100, buffer_bytes=64 * 1024)
+    monkeypatch.setattr(jobs, "_job_manager", manager)
+    return manager
+
+
+def start(manager, script, **kwargs):
+    return manager.start("local", script, "mcp-reader", lambda: local_process(["sh", "-c", script]), **kwargs)
+
+
+def output(report):
+    """Partie sortie d'un rapport (l'en-tête répète la commande)."""
+    return report.split("\nOutput (", 1)[-1] if "\nOutput (" in report else ""
+
+
+def test_output_ring_bounds_lines_and_bytes():
+    ring = OutputRing(max_lines=3, max_bytes=10)
+    for i in range(5):
+        ring.append("stdout", f"l{i}".encode())
+    assert [line.text for line in ring.read()] == ["l2", "l3", "l4"]
+    assert ring.first_seq == 2 and ring.dropped == 2
+    assert [line.seq for line in ring.read(since=3, limit=1)] == [3]
+
+    ring.append("stderr", b"x" * 9)
+    assert [line.text for line in ring.read()] == ["x" * 9] and ring.bytes == 9
+    assert [line.seq for line in ring.tail(2)] == [5]
+
+
+async def test_output_is_readable_before_the_job_ends(manager):
+    job = start(manager, "echo first; echo oops >&2; sleep 0.3; echo second")
+
+    while job.output.total < 2:
+        await jobs.poll_job(job.id, since=job.output.total, wait=5)
+    report = await jobs.poll_job(job.id)
+    assert "RUNNING" in report
+    assert output(report).splitlines()[1:3] == ["first", "[stderr] oops"]
+
+    report = await jobs.wait_job(job.id, timeout=5)
+    assert job.status == JobStatus.SUCCEEDED and job.returncode == 0
+    assert "SUCCEEDED" in report and "second" in output(report)
+
+    # Curseur: seulement les nouvelles lignes
+    assert output(await jobs.poll_job(job.id, since=2)).splitlines()[1:2] == ["second"]
+
+
+async def test_cancel_interrupts_the_process(manager):
+    job = start(manager, "echo started; sleep 30")
+    await jobs.poll_job(job.id, wait=5)
+
+    began = time.monotonic()
+    assert "CANCELLED" in await jobs.cancel_job(job.id)
+    assert time.monotonic() - began < 5
+    assert job.status == JobStatus.CANCELLED
+    assert "already finished" in await jobs.cancel_job(job.id)
+
+
+async def test_large_output_stays_bounded(manager):
+    job = start(manager, "seq 1 20000")
+    await jobs.wait_job(job.id, timeout=10)
+
+    assert job.output.total == 20000 and len(job.output) == 100
+    report = await jobs.poll_job(job.id, since=0, limit=5)
+    assert "19900 lines no longer in buffer" in report and "\n19901\n" in report
+    assert "20000" in await jobs.tail_job(job.id, 1)
+
+
+async def test_wait_reports_ansible_progress(manager):
+    script = (
+        "echo 'PLAY [all] ****'; for t in one two three; do "
+        "echo \"TASK [$t] ****\"; echo ok; sleep 0.3; done; echo 'PLAY RECAP ****'"
+    )
+    job = start(manager, script)
+    notes = []
+
+    async def on_progress(progress, total, message):
+        notes.append((progress, message))
+
+    await jobs.wait_job(job.id, timeout=10, on_progress=on_progress)
+    assert job.tasks == 3 and job.phase == "PLAY RECAP"
+    assert notes and all(b[0] >= a[0] for a, b in itertools.pairwise(notes))
+    assert any(message.startswith("TASK [") for _, message in notes)
+
+
+async def test_finished_jobs_are_pruned(manager):
+    finished = [start(manager, "true") for _ in range(4)]
+    await asyncio.gather(*(jobs.wait_job(j.id, timeout=5) for j in finished))
+    await jobs.wait_job(start(manager, "true").id, timeout=5)
+    assert finished[0].id not in [j.id for j in manager.jobs()]
+    assert "Unknown job ID" in await jobs.tail_job(finished[0].id)
+
+
+async def test_approved_command_runs_as_job(manager, monkeypatch):
+    engine = AuthorizationEngine(COMMAND_WHITELIST, store=StateStore(":memory:"))
+    monkeypatch.setattr(ssh_executor, "_auth_engine", engine)
+
+    class LocalSSH:
+        def open_process(self, host, command, username=None, exec=False):
+            return local_process(["sh", "-c", "echo restarted"])
+
+    monkeypatch.setattr(ssh_executor, "get_smart_ssh_manager", lambda: LocalSSH())
+
+    auth = engine.check_command("web-01", "systemctl restart nginx")
+    report = await ssh_executor.approve_command(auth.approval_id, background=True)
+    assert "Job started" in report
+
+    [job] = manager.jobs()
+    await jobs.wait_job(job.id, timeout=5)
+    assert "restarted" in await jobs.tail_job(job.id)
+    assert engine.get_pending(auth.approval_id).status == ApprovalStatus.EXECUTED
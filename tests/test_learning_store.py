@@ -0,0 +1,109 @@
+"""Tests for the SQLite learning store and the engine's sqlite backend."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from mcp_linux_infra.analysis.auto_learning import AutoLearningEngine
+from mcp_linux_infra.analysis.learning_store import SQLiteLearningStore
+
+
+def block(command, user="alice", host="server1", at=None, risk_level="low", category="monitoring"):
+    return {
+        'command': command,
+        'user': user,
+        'host': host,
+        'at': at or datetime.now().isoformat(),
+        'risk_level': risk_level,
+        'category': category,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteLearningStore(tmp_path / "stats.db")
+    yield store
+    store.close()
+
+
+def test_apply_and_get(store):
+    store.apply([
+        block("htop", at="2024-01-01T10:05:00"),
+        block("htop", user="bob", at="2024-01-01T10:30:00"),
+        block("htop", host="server2", at="2024-01-01T11:00:00"),
+    ])
+
+    data = store.get("htop")
+    assert data['count'] == 3
+    assert data['first_seen'] == "2024-01-01T10:05:00"
+    assert data['last_seen'] == "2024-01-01T11:00:00"
+    assert data['users'] == {"alice", "bob"}
+    assert data['hosts'] == {"server1", "server2"}
+    assert store.member_counts("htop", "user") == {"alice": 2, "bob": 1}
+    assert store.timeline("htop") == {"2024-01-01T10": 2, "2024-01-01T11": 1}
+    assert store.get("iotop") is None
+
+
+def test_top_candidates_and_breakdown(store):
+    old = (datetime.now() - timedelta(days=2)).isoformat()
+    store.apply(
+        [block("htop", at=old)] * 5
+        + [block("iotop", at=old, risk_level="medium", category="system")] * 7
+        + [block("top")] * 6
+    )
+
+    assert [d['command'] for d in store.top(2)] == ["iotop", "top"]
+    cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
+    assert [d['command'] for d in store.candidates(5, cutoff)] == ["iotop", "htop"]
+    assert [d['command'] for d in store.candidates(5, cutoff, "low")] == ["htop"]
+    assert store.totals() == (3, 18)
+    assert store.breakdown('risk_level') == {"low": 2, "medium": 1}
+    with pytest.raises(ValueError):
+        store.breakdown('command; DROP TABLE commands')
+
+
+def test_clear_cascades(store):
+    store.apply([block("htop"), block("iotop"), {'op': 'clear', 'command': 'htop'}])
+    assert store.known_commands() == {"iotop"}
+    assert store.member_counts("htop", "user") == {}
+
+    store.apply([{'op': 'clear'}])
+    assert store.totals() == (0, 0)
+
+
+def test_engine_sqlite_backend(tmp_path):
+    stats_file = tmp_path / "command_stats.json"
+    engine = AutoLearningEngine(stats_file=stats_file, backend="sqlite", flush_interval=60)
+    engine.record_blocked_command("htop", user="bob", host="server1")
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.record_blocked_command("iotop", user="alice", host="server2")
+
+    # Lecture immédiate: les événements en attente sont appliqués avant la requête
+    stats = engine.get_command_stats("htop")
+    assert stats.count == 2
+    assert stats.users == ["alice", "bob"]
+    assert [s.command for s in engine.get_top_blocked_commands(limit=1)] == ["htop"]
+    assert engine.get_stats_summary()['total_block_attempts'] == 3
+
+    engine.clear_stats("iotop")
+    engine.close()
+    assert not stats_file.exists()
+
+    engine2 = AutoLearningEngine(stats_file=stats_file, backend="sqlite")
+    assert engine2.get_command_stats("iotop") is None
+    assert engine2.get_command_stats("htop").count == 2
+    engine2.close()
+
+
+def test_engine_migrates_json_stats(tmp_path):
+    stats_file = tmp_path / "command_stats.json"
+    engine = AutoLearningEngine(stats_file=stats_file, backend="json")
+    engine.record_blocked_command("htop", user="alice", host="server1")
+    engine.record_blocked_command("htop", user="bob", host="server1")
+    engine.close()
+
+    engine2 = AutoLearningEngine(stats_file=stats_file, backend="sqlite")
+    stats = engine2.get_command_stats("htop")
+    assert stats.count == 2
+    assert stats.users == ["alice", "bob"]
+    engine2.close()
@@ -0,0 +1,140 @@
+"""Tests for the metrics registry, exposition and tool instrumentation."""
+
+import urllib.request
+
+import pytest
+
+from mcp_linux_infra.utils.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Gauge,
+    Registry,
+    instrument_tool,
+    snapshot,
+    start_http_server,
+)
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_histogram_exposition(registry):
+    latency = registry.histogram("op_seconds", "Operation latency", ("host",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, host="web-01")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP op_seconds Operation latency", "# TYPE op_seconds histogram"]
+    assert lines[2:] == [
+        'op_seconds_bucket{host="web-01",le="0.1"} 1.0',
+        'op_seconds_bucket{host="web-01",le="1.0"} 3.0',
+        'op_seconds_bucket{host="web-01",le="+Inf"} 4.0',
+        'op_seconds_sum{host="web-01"} 4.05',
+        'op_seconds_count{host="web-01"} 4.0',
+    ]
+
+
+def test_labels_are_escaped_and_checked(registry):
+    requests = registry.counter("requests_total", "Requests", ("path",))
+    requests.inc(path='a"b\\c')
+    assert 'requests_total{path="a\\"b\\\\c"} 1.0' in registry.render()
+
+    with pytest.raises(ValueError):
+        requests.inc(host="x")
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Same name, other type")
+
+
+def test_collectors_evaluated_at_scrape(registry):
+    state = {"depth": 3}
+    registry.register_collector(lambda: [snapshot(Gauge, "queue_depth", "Queue depth", state["depth"])])
+
+    @registry.register_collector
+    def broken():
+        raise RuntimeError("boom")
+
+    assert "queue_depth 3.0" in registry.render()
+    state["depth"] = 7
+    assert "queue_depth 7.0" in registry.render()
+    assert registry.render(match="nothing") == "\n"
+
+
+def test_failing_collector_logs_to_stderr(registry, capsys, caplog):
+    @registry.register_collector
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.gauge("up", "Up").set(1)
+    assert "up 1" in registry.render()
+    assert capsys.readouterr().out == ""  # stdout: transport MCP
+    assert "broken failed: boom" in caplog.text
+
+
+def test_snapshot_with_labels():
+    metric = snapshot(Counter, "connects_total", "Connects", {("read:u@a",): 2, ("exec:u@b",): 5}, ("pool",))
+    assert metric.render()[2:] == ['connects_total{pool="exec:u@b"} 5.0', 'connects_total{pool="read:u@a"} 2.0']
+
+
+async def test_instrument_tool_times_and_audits(monkeypatch):
+    from mcp_linux_infra import audit
+    from mcp_linux_infra.utils import metrics
+
+    calls = []
+    monkeypatch.setattr(audit, "log_tool_call", lambda *args, **kwargs: calls.append((args, kwargs)))
+
+    @instrument_tool
+    async def sample_tool(host: str, ctx=None) -> str:
+        return "Error: unreachable" if host == "down" else f"ok {host}"
+
+    before = metrics.TOOL_DURATION.count(tool="sample_tool", status="success")
+    assert await sample_tool(host="web-01", ctx=object()) == "ok web-01"
+    assert await sample_tool(host="down") == "Error: unreachable"
+
+    assert metrics.TOOL_DURATION.count(tool="sample_tool", status="success") == before + 1
+    assert metrics.TOOL_DURATION.count(tool="sample_tool", status="error") >= 1
+
+    (name, parameters, status), kwargs = calls[0]
+    assert (name, parameters, status.value) == ("sample_tool", {"host": "web-01"}, "success")
+    assert kwargs["duration_ms"] >= 0
+    assert calls[1][0][2].value == "failure" and calls[1][1]["error"] == "Error: unreachable"
+
+
+async def test_server_tools_are_instrumented():
+    from mcp_linux_infra import server
+    from mcp_linux_infra.authorization.engine import AuthorizationEngine
+    from mcp_linux_infra.authorization.whitelist import COMMAND_WHITELIST
+    from mcp_linux_infra.utils.metrics import AUTHORIZATION_CHECK_DURATION
+
+    AuthorizationEngine(COMMAND_WHITELIST).check_command("web-01", "uptime")
+    assert AUTHORIZATION_CHECK_DURATION.count(decision="auto") >= 1
+
+    await server.get_result_cache_stats()
+    text = await server.get_metrics()
+    assert 'mcp_tool_duration_seconds_count{tool="get_result_cache_stats",status="success"}' in text
+    for family in ("mcp_audit_queue_depth", "mcp_analysis_cache_hit_ratio", "mcp_authorization_check_seconds"):
+        assert f"# TYPE {family} " in text
+
+
+async def test_get_metrics_is_not_truncated(monkeypatch):
+    from mcp_linux_infra import server
+    from mcp_linux_infra.config import CONFIG
+
+    monkeypatch.setattr(CONFIG, "tool_output_max_bytes", 1024)
+    monkeypatch.setattr(CONFIG, "tool_output_max_lines", 10)
+    text = await server.get_metrics()
+    assert len(text.encode()) > 1024 and "omitted ...]" not in text and "repeated" not in text
+
+
+def test_http_endpoint(registry):
+    registry.counter("hits_total", "Hits").inc()
+    server = start_http_server(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "hits_total 1.0" in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
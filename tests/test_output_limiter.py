@@ -0,0 +1,100 @@
+"""Tests for tool response truncation (head/tail + repeat collapsing)."""
+
+import json
+
+from mcp_linux_infra.utils.output import OutputLimiter, limit_json, limit_output, limited
+
+
+def test_small_output_unchanged():
+    text = "## Title\n\nline 1\nline 2\n\n\nend\n"
+    assert limit_output(text, max_bytes=1000, max_lines=100) == text
+
+
+def test_keeps_head_and_tail_with_marker():
+    text = "\n".join(f"line {i}" for i in range(100))
+    lines = limit_output(text, max_bytes=10_000, max_lines=10).splitlines()
+
+    assert lines[:5] == [f"line {i}" for i in range(5)]
+    assert lines[5] == "[... 90 lines (715 bytes) omitted ...]"
+    assert lines[6:] == [f"line {i}" for i in range(95, 100)]
+
+
+def test_byte_budget():
+    text = "".join(f"{i:03d}" + "x" * 96 + "\n" for i in range(100))
+    output = limit_output(text, max_bytes=1000, max_lines=10_000)
+
+    assert len(output.encode()) <= 1000 + 100
+    assert "omitted" in output
+
+
+def test_repeated_lines_collapsed():
+    text = "start\n" + "same error\n" * 50 + "end\n"
+    assert limit_output(text) == "start\nsame error\n[... previous line repeated 49 more times]\nend\n"
+
+
+def test_short_runs_and_blank_lines_kept():
+    text = "a\na\nb\n\n\n\nc\n"
+    assert limit_output(text) == text
+
+
+def test_long_line_clipped():
+    output = limit_output("y" * 10_000, max_bytes=1000, max_lines=10)
+    assert output.startswith("y" * 125)
+    assert output.endswith("[... 9875 chars cut]")
+
+
+def test_incremental_feed_matches_one_shot():
+    text = "".join(f"entry {i % 7}\n" * (i % 4 + 1) for i in range(3000))
+    limiter = OutputLimiter(max_bytes=4096, max_lines=50)
+    for start in range(0, len(text), 37):
+        limiter.feed(text[start : start + 37])
+
+    assert limiter.result() == limit_output(text, max_bytes=4096, max_lines=50)
+    assert limiter.truncated
+
+
+async def test_limited_decorator_only_touches_strings():
+    @limited
+    async def big_tool() -> str:
+        return "\n".join(str(i) for i in range(5000))
+
+    @limited
+    async def dict_tool() -> dict:
+        return {"a": 1}
+
+    assert "omitted" in await big_tool()
+    assert await dict_tool() == {"a": 1}
+    assert big_tool.__name__ == "big_tool"
+
+
+async def test_limited_keeps_json_parseable():
+    records = [{"local": f"0.0.0.0:{port}", "process": "x" * 80} for port in range(150)]
+
+    @limited
+    async def ports_tool() -> str:
+        return json.dumps(records, separators=(",", ":"))
+
+    data = json.loads(await ports_tool())
+    assert data == records  # Une seule ligne longue: ni coupée ni repliée
+
+
+def test_limit_json_drops_whole_records():
+    records = [{"port": port, "process": "x" * 80} for port in range(1000)]
+    text = json.dumps({"host": "web-01", "ports": records})
+
+    data = json.loads(limit_json(text, max_bytes=8192))
+    assert data["host"] == "web-01" and data["ports"] == records[: len(data["ports"])]
+    assert data["truncated"] == 1000 - len(data["ports"]) > 0
+
+    data = json.loads(limit_json(json.dumps(records), max_bytes=8192))
+    assert data["records"] == records[: len(data["records"])] and data["truncated"] > 0
+
+
+def test_limit_json_cuts_huge_values_before_records():
+    failed = [{"task": "build", "stdout": "a" * 20_000 + "the error"}]
+    text = json.dumps({"ok": False, "failed": failed})
+
+    output = limit_json(text, max_bytes=8192)
+    data = json.loads(output)
+    assert len(output) <= 8192 and data["failed"][0]["task"] == "build"
+    assert data["failed"][0]["stdout"].startswith("[... ") and data["failed"][0]["stdout"].endswith("the error")
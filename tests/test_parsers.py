@@ -0,0 +1,153 @@
+"""Tests for structured diagnostic parsers and JSON output."""
+
+import json
+
+import pytest
+
+from mcp_linux_infra.tools.diagnostics import network, parsers, system
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         1000000 kB
+MemAvailable:    5000000 kB
+Buffers:          200000 kB
+Cached:          3000000 kB
+Shmem:            100000 kB
+SReclaimable:     300000 kB
+SwapTotal:       2000000 kB
+SwapFree:        1500000 kB
+HugePages_Total:       0
+"""
+
+DF = """Filesystem     1024-blocks     Used Available Capacity Mounted on
+/dev/vda1        264212084 18617392  83678736      19% /
+/dev/vdb            459936   370908     53408      88% /mnt/my data
+"""
+
+SS = """tcp LISTEN 0      128        0.0.0.0:22    0.0.0.0:* users:(("sshd",pid=812,fd=3))
+tcp LISTEN 0      128           [::]:22       [::]:* users:(("sshd",pid=812,fd=4),("sshd",pid=900,fd=4))
+udp UNCONN 0      0      127.0.0.53%lo:53    0.0.0.0:*
+"""
+
+ROUTES = """[{"dst":"default","gateway":"192.0.2.1","dev":"eth0","protocol":"dhcp","metric":100,"flags":[]},
+{"dst":"192.0.2.0/24","dev":"eth0","protocol":"kernel","scope":"link","prefsrc":"192.0.2.2","flags":[]}]"""
+
+
+def test_parse_meminfo():
+    mem = parsers.parse_meminfo(MEMINFO)
+
+    assert mem["total"] == 8_000_000 * 1024
+    assert mem["available"] == 5_000_000 * 1024
+    assert mem["used"] == 3_000_000 * 1024
+    assert mem["cached"] == 3_300_000 * 1024
+    assert mem["swap_used"] == 500_000 * 1024
+
+
+def test_parse_meminfo_rejects_garbage():
+    with pytest.raises(parsers.ParseError):
+        parsers.parse_meminfo("not meminfo")
+
+
+def test_parse_df_keeps_mount_points_with_spaces():
+    disks = parsers.parse_df(DF)
+
+    assert disks[0] == {
+        "filesystem": "/dev/vda1",
+        "mount": "/",
+        "size": 264212084 * 1024,
+        "used": 18617392 * 1024,
+        "available": 83678736 * 1024,
+        "use_percent": 19,
+    }
+    assert disks[1]["mount"] == "/mnt/my data"
+
+
+def test_parse_ss():
+    sockets = parsers.parse_ss(SS)
+
+    assert sockets[0] == {
+        "proto": "tcp",
+        "state": "LISTEN",
+        "address": "0.0.0.0",
+        "port": 22,
+        "processes": [{"name": "sshd", "pid": 812}],
+    }
+    assert sockets[1]["address"] == "::"
+    assert [p["pid"] for p in sockets[1]["processes"]] == [812, 900]
+    assert sockets[2]["address"] == "127.0.0.53%lo"
+    assert sockets[2]["processes"] == []
+
+
+def test_parse_ip_route_drops_noise():
+    routes = parsers.parse_ip_route(ROUTES)
+
+    assert routes[0] == {
+        "dst": "default", "gateway": "192.0.2.1", "dev": "eth0", "protocol": "dhcp", "metric": 100,
+    }
+    assert "flags" not in routes[1]
+
+
+def test_service_state():
+    props = parsers.parse_systemctl_show(
+        "ActiveState=active\nSubState=running\nExecMainPID=0\nMemoryCurrent=[not set]\nLoadState=loaded\n"
+    )
+    assert parsers.service_state(props) == {
+        "load_state": "loaded",
+        "active_state": "active",
+        "sub_state": "running",
+        "pid": None,
+        "memory": None,
+    }
+
+
+def test_select_fields():
+    disks = parsers.parse_df(DF)
+    assert parsers.select_fields(disks, ["mount", "use_percent"]) == [
+        {"mount": "/", "use_percent": 19},
+        {"mount": "/mnt/my data", "use_percent": 88},
+    ]
+    with pytest.raises(parsers.ParseError, match="unknown fields"):
+        parsers.select_fields(disks, ["nope"])
+
+
+@pytest.fixture
+def outputs(monkeypatch):
+    """Fake cached_execute_command answering from canned outputs."""
+    canned = {
+        "cat /proc/meminfo": MEMINFO,
+        "df -P -x tmpfs -x devtmpfs": DF,
+        "ss -H -lntup": SS,
+        "ip -j route show": ROUTES,
+    }
+
+    async def fake(command, host=None, username=None, bypass_cache=False):
+        return 0, canned[" ".join(command)], ""
+
+    monkeypatch.setattr(system, "cached_execute_command", fake)
+    monkeypatch.setattr(network, "cached_execute_command", fake)
+
+
+async def test_tools_json_format(outputs):
+    mem = json.loads(await system.get_memory_info(format="json", fields=["available"]))
+    assert mem == {"available": 5_000_000 * 1024}
+
+    ports = json.loads(await network.get_listening_ports(format="json", fields=["port"]))
+    assert ports == [{"port": 22}, {"port": 22}, {"port": 53}]
+
+    routes = json.loads(await network.get_routing_table(format="json"))
+    assert routes[0]["gateway"] == "192.0.2.1"
+
+
+async def test_tools_markdown_format(outputs):
+    disks = await system.get_disk_usage()
+
+    assert disks.startswith("## Disk Usage")
+    assert "| /dev/vda1 | / | 252.0 GiB | 17.8 GiB | 79.8 GiB | 19% |" in disks
+
+
+async def test_unknown_format_and_fields():
+    assert (await system.get_memory_info(format="xml")).startswith("Error: unknown format")
+
+
+async def test_unknown_fields_reported_as_json(outputs):
+    error = json.loads(await system.get_disk_usage(format="json", fields=["bogus"]))
+    assert "unknown fields ['bogus']" in error["error"]
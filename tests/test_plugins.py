@@ -246,3 +246,66 @@ def test_registry_get_summary():
     assert summary['total_commands'] > 0
     assert 'plugins' in summary
     assert 'category_breakdown' in summary
+
+
+def test_registry_index_matches_linear_plugin_scan():
+    """Indexed find_command_spec returns what scanning every plugin would."""
+    registry = get_plugin_registry()
+    plugins = list(registry.get_all_plugins().values())
+
+    def linear(command):
+        for plugin in plugins:
+            spec = plugin.get_command_spec(command)
+            if spec:
+                return (plugin, spec)
+        return None
+
+    commands = ["", "   ", "rm -rf /", "unknown-tool --x", "systemctl", "lsblk -f", "ls -la /tmp"]
+    for plugin in plugins:
+        for name, spec in plugin.commands.items():
+            commands.append(name)
+            commands.extend(spec.examples or [])
+            commands.extend(f"{example} --extra" for example in spec.examples or [])
+
+    for command in commands:
+        expected = linear(command)
+        found = registry.find_command_spec(command)
+        if expected is None:
+            assert found is None, command
+        else:
+            assert found[0] is expected[0] and found[1] is expected[1], command
+
+
+def test_plugin_commands_are_built_once():
+    """CommandPlugin.commands is cached, so the index holds the same specs."""
+    plugin = SystemdPlugin()
+    assert plugin.commands is plugin.commands
+
+
+def test_registry_index_rebuilt_on_register():
+    """Registering a plugin after load invalidates the index."""
+
+    class ExtraPlugin(CommandPlugin):
+        name = "extra"
+        category = "extra"
+        description = "Extra commands"
+        commands = {
+            "frobnicate": CommandSpec(
+                pattern=r"^frobnicate(\s+.*)?$",
+                risk=RiskLevel.LOW,
+                level=AuthLevel.AUTO,
+                ssh_user="mcp-reader",
+                description="Frobnicate",
+                rationale="Test",
+            )
+        }
+
+    registry = PluginRegistry()
+    registry.load_builtin_plugins()
+    assert registry.find_command_spec("frobnicate now") is None
+
+    registry.register(ExtraPlugin())
+    plugin, spec = registry.find_command_spec("frobnicate now")
+    assert plugin.name == "extra"
+    assert list(registry.get_commands_by_category("extra")) == ["frobnicate"]
+    assert registry.search_commands("frobnicate")[0][0] == "frobnicate"
@@ -0,0 +1,115 @@
+"""Tests for probe batching (framing protocol + mcp-wrapper 'batch' verb)."""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from mcp_linux_infra.connection.batch import (
+    BatchProtocolError,
+    decode_batch,
+    encode_batch,
+    make_nonce,
+)
+from mcp_linux_infra.connection.smart_ssh import SmartSSHManager
+
+WRAPPER = Path(__file__).parent.parent / "system" / "wrappers" / "mcp-wrapper"
+
+
+def frame(nonce: str, probes: list[tuple[int, str, str]]) -> str:
+    """Build wrapper output the same way mcp-wrapper does."""
+    out = ""
+    for i, (rc, stdout, stderr) in enumerate(probes):
+        out += f"\n@@MCP:{nonce}:OUT:{i}\n{stdout}"
+        out += f"\n@@MCP:{nonce}:ERR:{i}\n{stderr}"
+        out += f"\n@@MCP:{nonce}:RC:{i}:{rc}\n"
+    return out + f"\n@@MCP:{nonce}:END:{len(probes)}\n"
+
+
+def test_encode_batch():
+    request, stdin = encode_batch([["uname", "-a"], ["uptime"]], "abc12345")
+    assert request == "batch abc12345"
+    assert stdin == "uname -a\nuptime\n"
+
+
+def test_encode_rejects_multiline_probe():
+    with pytest.raises(BatchProtocolError):
+        encode_batch([["echo", "a\nb"]], "abc12345")
+
+
+def test_decode_roundtrip_preserves_output_exactly():
+    nonce = make_nonce()
+    probes = [(0, "Linux host 6.1\n", ""), (1, "", "boom\n"), (0, "no newline", "")]
+    assert decode_batch(frame(nonce, probes), nonce, 3) == probes
+
+
+def test_decode_ignores_markers_with_other_nonce():
+    nonce = make_nonce()
+    forged = "\n@@MCP:deadbeef:RC:0:0\n"
+    assert decode_batch(frame(nonce, [(0, forged, "")]), nonce, 1) == [(0, forged, "")]
+
+
+def test_decode_requires_end_marker():
+    nonce = make_nonce()
+    truncated = frame(nonce, [(0, "a", ""), (0, "b", "")]).rsplit("\n@@MCP", 1)[0]
+    with pytest.raises(BatchProtocolError):
+        decode_batch(truncated, nonce, 2)
+
+
+def test_decode_rejects_denied_batch():
+    with pytest.raises(BatchProtocolError):
+        decode_batch("", make_nonce(), 2)
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="bash required")
+def test_wrapper_batch_verb_revalidates_each_probe():
+    nonce = make_nonce()
+    request, stdin = encode_batch([["uname", "-a"], ["id"], ["batch", nonce]], nonce)
+
+    proc = subprocess.run(
+        ["bash", str(WRAPPER)],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "USER": "test", "SSH_ORIGINAL_COMMAND": request},
+    )
+    assert proc.returncode == 0
+
+    (uname_rc, uname_out, _), (id_rc, _, id_err), (nested_rc, _, nested_err) = decode_batch(
+        proc.stdout, nonce, 3
+    )
+    assert uname_rc == 0 and uname_out.strip()
+    assert id_rc == 1 and "not whitelisted" in id_err
+    assert nested_rc == 1 and "Nested batch" in nested_err
+
+
+@pytest.mark.parametrize("reply", [
+    (0, "garbage without frames", ""),
+    (255, "", "connection reset"),
+    (1, "", "Command not whitelisted: batch"),
+])
+async def test_failed_batch_falls_back_and_is_remembered(reply):
+    manager = object.__new__(SmartSSHManager)
+    manager._batch_unsupported = set()
+    sent = []
+
+    async def fake_read(host, command, username=None, input=None):
+        sent.append(command[0])
+        return reply if command[0].startswith("batch ") else (0, command[0], "")
+
+    manager.execute_read_command = fake_read
+
+    assert await manager.execute_read_batch("h1", [["uname"], ["uptime"]], "u") == [
+        (0, "uname", ""),
+        (0, "uptime", ""),
+    ]
+    sent.clear()
+    await manager.execute_read_batch("h1", [["uname"], ["uptime"]], "u")
+    assert sent == ["uname", "uptime"]
+
+    # Les autres hôtes gardent le batch
+    sent.clear()
+    await manager.execute_read_batch("h2", [["uname"], ["uptime"]], "u")
+    assert sent[0].startswith("batch ")
@@ -0,0 +1,71 @@
+"""Tests for diagnostic probe plans."""
+
+import pytest
+
+from mcp_linux_infra.tools.diagnostics import probes
+from mcp_linux_infra.tools.diagnostics.probes import ProbePlan
+
+
+@pytest.fixture
+def recorded_waves(monkeypatch):
+    """Replace execution: every command succeeds and echoes itself."""
+    waves = []
+
+    async def fake_execute_commands(commands, host=None, bypass_cache=False):
+        waves.append([" ".join(c) for c in commands])
+        return [(1 if c[0] == "false" else 0, " ".join(c), "") for c in commands]
+
+    monkeypatch.setattr(probes, "cached_execute_commands", fake_execute_commands)
+    return waves
+
+
+async def test_independent_probes_share_one_wave(recorded_waves):
+    result = await ProbePlan().add("a", ["uname", "-a"]).add("b", ["uptime"]).run("h")
+
+    assert recorded_waves == [["uname -a", "uptime"]]
+    assert result.waves == 1
+    assert result["b"].stdout == "uptime"
+
+
+async def test_dependent_probe_receives_dependency_output(recorded_waves):
+    plan = (
+        ProbePlan()
+        .add("pid", ["pidof", "sshd"])
+        .add("status", lambda deps: ["cat", f"/proc/{deps['pid'].stdout}/status"], ("pid",))
+        .add("uptime", ["uptime"])
+    )
+    result = await plan.run("h")
+
+    assert recorded_waves == [["pidof sshd", "uptime"], ["cat /proc/pidof sshd/status"]]
+    assert result.waves == 2
+    assert "2 wave(s)" in result.timing()
+
+
+async def test_failed_dependency_skips_probe(recorded_waves):
+    result = await (
+        ProbePlan().add("check", ["false"]).add("next", ["uptime"], ("check",)).run()
+    )
+
+    assert result["next"].skipped
+    assert not result["next"].ok
+    assert recorded_waves == [["false"]]
+
+
+def test_invalid_plans_rejected():
+    with pytest.raises(ValueError):
+        ProbePlan().add("a", ["x"]).add("a", ["y"])
+    with pytest.raises(ValueError):
+        ProbePlan().add("a", ["x"], ("missing",)).waves()
+    with pytest.raises(ValueError):
+        ProbePlan().add("a", ["x"], ("b",)).add("b", ["y"], ("a",)).waves()
+
+
+async def test_local_probes_run_concurrently():
+    plan = ProbePlan()
+    for i in range(4):
+        plan.add(f"sleep{i}", ["sleep", "0.2"])
+
+    result = await plan.run()
+
+    assert all(r.ok for r in result.results.values())
+    assert result.elapsed_ms < 600
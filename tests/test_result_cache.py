@@ -0,0 +1,130 @@
+"""Tests for the read-only diagnostics result cache."""
+
+import asyncio
+import gc
+
+import pytest
+
+from mcp_linux_infra.connection import result_cache
+from mcp_linux_infra.connection.result_cache import ResultCache, cached_execute_commands
+
+UPTIME = ["uptime"]
+OS_RELEASE = ["cat", "/etc/os-release"]
+
+
+@pytest.fixture
+def executions(monkeypatch):
+    """Fresh cache + fake executor recording each batch it runs."""
+    batches = []
+
+    async def fake_execute_commands(commands, host=None, username=None):
+        batches.append([" ".join(c) for c in commands])
+        await asyncio.sleep(0.01)
+        return [(0, f"{host}:{' '.join(c)}", "") for c in commands]
+
+    monkeypatch.setattr(result_cache, "execute_commands", fake_execute_commands)
+    monkeypatch.setattr(result_cache, "_result_cache", ResultCache(1024 * 1024))
+    return batches
+
+
+def test_ttl_policy_longest_prefix_wins():
+    cache = ResultCache(1024, {("cat",): 1, ("cat", "/etc/os-release"): 3600})
+    assert cache.ttl_for(OS_RELEASE) == 3600
+    assert cache.ttl_for(["cat", "/proc/loadavg"]) == 1
+    assert cache.ttl_for(["journalctl", "-n", "10"]) == 0
+
+
+def test_lru_bounded_by_bytes():
+    cache = ResultCache(max_bytes=10)
+    cache.put(("h", "u", ("a",)), (0, "12345", ""), ttl=60)
+    cache.put(("h", "u", ("b",)), (0, "12345", ""), ttl=60)
+    assert cache.get(("h", "u", ("a",))) is not None  # a devient le plus récent
+
+    cache.put(("h", "u", ("c",)), (0, "12345", ""), ttl=60)
+
+    assert cache.get(("h", "u", ("b",))) is None
+    assert cache.get(("h", "u", ("a",))) is not None
+    assert cache.stats()["bytes"] == 10
+    assert cache.evictions == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResultCache(1024)
+    key = ("h", "u", ("uptime",))
+    cache.put(key, (0, "up", ""), ttl=60)
+    cache._entries[key].expires_at = 0
+
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+async def test_hit_after_first_execution(executions):
+    first = await cached_execute_commands([OS_RELEASE, UPTIME], "h1")
+    second = await cached_execute_commands([OS_RELEASE, UPTIME], "h1")
+
+    assert first == second
+    assert executions == [["cat /etc/os-release", "uptime"]]
+    stats = result_cache.get_result_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+
+async def test_uncacheable_commands_always_run(executions):
+    await cached_execute_commands([["journalctl", "-n", "5"]], "h1")
+    await cached_execute_commands([["journalctl", "-n", "5"]], "h1")
+    assert len(executions) == 2
+
+
+async def test_concurrent_identical_requests_coalesced(executions):
+    results = await asyncio.gather(
+        *(cached_execute_commands([OS_RELEASE], "h1") for _ in range(5))
+    )
+
+    assert len(executions) == 1
+    assert all(r == results[0] for r in results)
+    assert result_cache.get_result_cache().stats()["coalesced"] == 4
+
+
+async def test_bypass_reexecutes_and_refreshes(executions):
+    await cached_execute_commands([OS_RELEASE], "h1")
+    await cached_execute_commands([OS_RELEASE], "h1", bypass_cache=True)
+    await cached_execute_commands([OS_RELEASE], "h1")
+
+    assert len(executions) == 2
+
+
+async def test_invalidate_host(executions):
+    await cached_execute_commands([OS_RELEASE], "h1")
+    await cached_execute_commands([OS_RELEASE], "h2")
+
+    assert result_cache.get_result_cache().invalidate_host("h1") == 1
+    await cached_execute_commands([OS_RELEASE], "h1")
+    await cached_execute_commands([OS_RELEASE], "h2")
+
+    assert executions == [["cat /etc/os-release"]] * 3
+
+
+async def test_failed_batch_is_retrieved_by_every_waiter(monkeypatch):
+    async def failing_execute_commands(commands, host=None, username=None):
+        await asyncio.sleep(0.01)
+        raise ConnectionError("batch failed")
+
+    monkeypatch.setattr(result_cache, "execute_commands", failing_execute_commands)
+    monkeypatch.setattr(result_cache, "_result_cache", ResultCache(1024 * 1024))
+    unretrieved = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _, context: unretrieved.append(context["message"]))
+
+    # Pas de pytest.raises: la traceback conservée garderait les futures en vie
+    try:
+        await cached_execute_commands([OS_RELEASE, ["cat", "/proc/loadavg"], UPTIME], "h1")
+    except ConnectionError:
+        pass
+    else:
+        pytest.fail("batch error not raised")
+    await asyncio.sleep(0.02)
+    gc.collect()
+    await asyncio.sleep(0)
+
+    assert unretrieved == []
+    cache = result_cache.get_result_cache()
+    assert not any(cache.make_key(c, "h1", None) in cache.inflight for c in (OS_RELEASE, UPTIME))
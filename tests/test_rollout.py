@@ -0,0 +1,108 @@
+"""Tests for multi-host rollouts (waves, health probes, halt on failures)."""
+
+import json
+
+import pytest
+
+from mcp_linux_infra.config import CONFIG
+from mcp_linux_infra.connection import report_progress_to
+from mcp_linux_infra.state_store import StateStore
+from mcp_linux_infra.tools.remote_exec import actions, rollout
+
+HOSTS = [f"dns-{i}" for i in range(1, 8)]
+
+
+@pytest.fixture
+def fleet(tmp_path, monkeypatch):
+    store = StateStore(tmp_path / "state.db")
+    monkeypatch.setattr(rollout, "get_state_store", lambda: store)
+    monkeypatch.setattr(CONFIG, "allowed_hosts", HOSTS)
+
+    calls = {"runs": [], "probes": [], "failing": set(), "unhealthy": set()}
+
+    async def fake_execute(action, host):
+        calls["runs"].append(host)
+        if host in calls["failing"]:
+            return 1, "", "unit failed"
+        return 0, "ok", ""
+
+    async def fake_health(service, host, bypass_cache=False, format="markdown", fields=None):
+        calls["probes"].append(host)
+        healthy = host not in calls["unhealthy"]
+        return json.dumps({"healthy": healthy, "active_state": "active" if healthy else "failed"})
+
+    monkeypatch.setattr(actions, "run_remote_execution", fake_execute)
+    monkeypatch.setattr(rollout, "check_service_health", fake_health)
+    yield calls, store
+    store.close()
+
+
+async def start(store, **kwargs) -> str:
+    report = await rollout.propose_rollout("restart_unbound", "dns-*", "stale zones", **kwargs)
+    assert "Rollout Proposed" in report
+    [record] = store.select(rollout.KIND)
+    assert "Approved" in await rollout.approve_rollout(record["id"], True, approver="alice")
+    return record["id"]
+
+
+async def test_rollout_runs_in_waves_with_health_probe(fleet):
+    calls, store = fleet
+    rollout_id = await start(store, wave_size=3)
+
+    report = await rollout.execute_rollout(rollout_id)
+    assert "COMPLETED" in report
+    assert sorted(calls["runs"]) == HOSTS and sorted(calls["probes"]) == HOSTS
+
+    record = store.get(rollout.KIND, rollout_id)
+    assert record["status"] == "completed"
+    assert [record["host_states"][h]["wave"] for h in HOSTS] == [1, 1, 1, 2, 2, 2, 3]
+    assert {s["status"] for s in record["host_states"].values()} == {"ok"}
+    assert "Cannot execute" in await rollout.execute_rollout(rollout_id)
+
+
+async def test_rollout_halts_after_failure_threshold(fleet):
+    calls, store = fleet
+    calls["failing"].add("dns-2")
+    calls["unhealthy"].add("dns-4")
+    rollout_id = await start(store, wave_size=2, max_failures=1)
+
+    report = await rollout.execute_rollout(rollout_id)
+    assert "HALTED" in report and "after wave 2" in report
+
+    # Wave 3+ never started
+    assert sorted(calls["runs"]) == ["dns-1", "dns-2", "dns-3", "dns-4"]
+    states = store.get(rollout.KIND, rollout_id)["host_states"]
+    assert states["dns-2"]["status"] == "failed" and states["dns-2"]["returncode"] == 1
+    assert states["dns-4"]["status"] == "unhealthy"
+    assert [states[h]["status"] for h in ("dns-5", "dns-6", "dns-7")] == ["skipped"] * 3
+
+    status = json.loads(await rollout.get_rollout_status(rollout_id, format="json"))
+    assert status["status"] == "halted" and "3 host(s) skipped" in status["halted_reason"]
+
+
+async def test_rollout_progress_is_reported_and_persisted(fleet):
+    calls, store = fleet
+    rollout_id = await start(store, wave_size=4, max_parallel=2)
+    seen = []
+
+    class Ctx:
+        async def report_progress(self, progress, total, message=None):
+            # Chaque hôte terminé est déjà enregistré
+            states = store.get(rollout.KIND, rollout_id)["host_states"].values()
+            seen.append((progress, total, sum(s["status"] != "pending" for s in states)))
+
+    with report_progress_to(Ctx()):
+        await rollout.execute_rollout(rollout_id)
+
+    assert seen == [(i, len(HOSTS), i) for i in range(1, len(HOSTS) + 1)]
+
+
+async def test_rollout_requires_approval_and_allowed_hosts(fleet):
+    calls, store = fleet
+    assert "not in allowed list" in await rollout.propose_rollout("restart_unbound", ["db-1"], "x")
+    assert "Unknown remote execution" in await rollout.propose_rollout("rm_rf", HOSTS, "x")
+
+    await rollout.propose_rollout("restart_unbound", HOSTS, "x")
+    [record] = store.select(rollout.KIND)
+    assert "APPROVED" in await rollout.execute_rollout(record["id"])
+    assert calls["runs"] == []
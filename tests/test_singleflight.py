@@ -0,0 +1,93 @@
+"""Tests for single-flight coalescing of identical remote commands."""
+
+import asyncio
+
+import pytest
+
+from mcp_linux_infra.connection.singleflight import SingleFlight
+from mcp_linux_infra.connection.smart_ssh import SmartSSHManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """SmartSSHManager without SSH: _run_read_command is counted and slowed down."""
+    mgr = object.__new__(SmartSSHManager)
+    mgr._inflight = SingleFlight()
+    mgr.runs = []
+
+    async def fake_run(host, command, username, input):
+        mgr.runs.append((host, " ".join(command)))
+        await asyncio.sleep(0.02)
+        return 0, f"{host}: {' '.join(command)}", ""
+
+    monkeypatch.setattr(mgr, "_run_read_command", fake_run, raising=False)
+    return mgr
+
+
+async def test_identical_concurrent_commands_share_one_execution(manager):
+    command = ["journalctl", "-p", "err", "--since", "1h"]
+    results = await asyncio.gather(
+        *(manager.execute_read_command("h1", command) for _ in range(5))
+    )
+
+    assert len(manager.runs) == 1
+    assert len(set(results)) == 1
+    assert manager.get_coalescing_stats() == {
+        "executions": 1,
+        "saved_executions": 4,
+        "in_flight": 0,
+    }
+
+
+async def test_key_is_exact_and_separates_hosts(manager):
+    await asyncio.gather(
+        manager.execute_read_command("h1", ["grep", "'a  b'", "/etc/hosts"]),
+        manager.execute_read_command("h1", ["grep", "'a b'", "/etc/hosts"]),
+        manager.execute_read_command("h1", ["grep", "'a b'", "/etc/hosts"]),
+        manager.execute_read_command("h2", ["grep", "'a b'", "/etc/hosts"]),
+    )
+    assert sorted(manager.runs) == [
+        ("h1", "grep 'a  b' /etc/hosts"),
+        ("h1", "grep 'a b' /etc/hosts"),
+        ("h2", "grep 'a b' /etc/hosts"),
+    ]
+
+
+async def test_sequential_calls_are_not_coalesced(manager):
+    await manager.execute_read_command("h1", ["uptime"])
+    await manager.execute_read_command("h1", ["uptime"])
+    assert len(manager.runs) == 2
+
+
+async def test_error_is_shared_with_waiters():
+    flight = SingleFlight()
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("channel closed")
+
+    results = await asyncio.gather(
+        flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert "k" not in flight
+
+
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ("done", True)
@@ -0,0 +1,140 @@
+"""Tests for the per-host SSH connection pool."""
+
+import asyncio
+
+import pytest
+
+from mcp_linux_infra.connection.pool import (
+    ConnectionBudget,
+    PoolExhaustedError,
+    SSHConnectionPool,
+)
+
+
+class FakeConnection:
+    """Minimal stand-in for asyncssh.SSHClientConnection."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def make_connect(name: str, delay: float = 0.0, opened: list | None = None):
+    async def connect():
+        if delay:
+            await asyncio.sleep(delay)
+        conn = FakeConnection(name)
+        if opened is not None:
+            opened.append(conn)
+        return conn
+
+    return connect
+
+
+def make_pool(limit: int = 10, **options) -> SSHConnectionPool:
+    options.setdefault("acquire_timeout", 1.0)
+    return SSHConnectionPool(ConnectionBudget(limit), **options)
+
+
+async def test_connection_reused_across_sessions():
+    pool = make_pool()
+    opened = []
+    connect = make_connect("a", opened=opened)
+
+    async with pool.session("read:u@a", connect) as (conn1, reused1):
+        pass
+    async with pool.session("read:u@a", connect) as (conn2, reused2):
+        pass
+
+    assert conn1 is conn2
+    assert (reused1, reused2) == (False, True)
+    assert len(opened) == 1
+
+
+async def test_channels_multiplexed_up_to_session_cap():
+    pool = make_pool(max_size=2, max_sessions=2)
+    opened = []
+    connect = make_connect("a", opened=opened)
+    host_pool = pool.host_pool("read:u@a", connect)
+
+    held = [await host_pool.acquire() for _ in range(3)]
+
+    # 2 channels on the first connection, the third opens a second one
+    assert len(opened) == 2
+    assert host_pool.stats()["in_use"] == 3
+
+    for pooled, _ in held:
+        host_pool.release(pooled)
+    assert host_pool.stats()["in_use"] == 0
+
+
+async def test_sessions_wait_when_host_saturated():
+    pool = make_pool(max_size=1, max_sessions=1, acquire_timeout=0.05)
+    host_pool = pool.host_pool("read:u@a", make_connect("a"))
+
+    pooled, _ = await host_pool.acquire()
+    with pytest.raises(PoolExhaustedError):
+        await host_pool.acquire()
+
+    host_pool.release(pooled)
+    again, reused = await host_pool.acquire()
+    assert again is pooled and reused
+
+
+async def test_slow_host_does_not_block_other_hosts():
+    pool = make_pool()
+    slow = asyncio.create_task(
+        pool.host_pool("read:u@slow", make_connect("slow", delay=0.5)).acquire()
+    )
+    await asyncio.sleep(0)
+
+    fast_pool = pool.host_pool("read:u@fast", make_connect("fast"))
+    pooled, _ = await asyncio.wait_for(fast_pool.acquire(), timeout=0.1)
+    assert pooled.conn.name == "fast"
+
+    slow.cancel()
+
+
+async def test_global_budget_evicts_idle_connection_of_other_host():
+    pool = make_pool(limit=1)
+    a_pool = pool.host_pool("read:u@a", make_connect("a"))
+    b_pool = pool.host_pool("read:u@b", make_connect("b"))
+
+    a_conn, _ = await a_pool.acquire()
+    a_pool.release(a_conn)
+
+    b_conn, _ = await b_pool.acquire()
+    assert a_conn.conn.closed
+    assert a_pool.size == 0
+    assert b_conn.conn.name == "b"
+
+
+async def test_global_budget_enforced_when_nothing_idle():
+    pool = make_pool(limit=1, acquire_timeout=0.05)
+    a_pool = pool.host_pool("read:u@a", make_connect("a"))
+    b_pool = pool.host_pool("read:u@b", make_connect("b"))
+
+    await a_pool.acquire()
+    with pytest.raises(PoolExhaustedError):
+        await b_pool.acquire()
+
+
+async def test_closed_connection_is_replaced():
+    pool = make_pool()
+    opened = []
+    host_pool = pool.host_pool("read:u@a", make_connect("a", opened=opened))
+
+    pooled, _ = await host_pool.acquire()
+    host_pool.release(pooled)
+    pooled.conn.close()
+
+    fresh, reused = await host_pool.acquire()
+    assert not reused
+    assert fresh is not pooled
+    assert len(opened) == 2
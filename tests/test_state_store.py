@@ -0,0 +1,162 @@
+"""Tests for the durable approval / remote execution state store."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_linux_infra.authorization import COMMAND_WHITELIST, ApprovalStatus, AuthorizationEngine
+from mcp_linux_infra.state_store import StateStore
+from mcp_linux_infra.tools.remote_exec import actions
+
+
+def record(record_id, host="web-01", status="pending"):
+    return {"id": record_id, "host": host, "status": status, "command": "systemctl restart x"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    yield store
+    store.close()
+
+
+def test_select_by_status_and_host(store):
+    for i in range(6):
+        store.put("approval", record(f"a{i}", host=f"web-{i % 2}", status="pending" if i < 4 else "executed"), ttl=60)
+    store.put("other", record("a0"), ttl=60)
+
+    assert [r["id"] for r in store.select("approval", statuses=["pending"])] == ["a0", "a1", "a2", "a3"]
+    assert [r["id"] for r in store.select("approval", statuses=["pending"], host="web-1")] == ["a1", "a3"]
+    assert store.counts("approval") == {"pending": 4, "executed": 2}
+
+
+def test_transition_is_compare_and_set(store):
+    store.put("approval", record("a1"), ttl=60)
+
+    updated = store.transition("approval", "a1", "pending", "approved", approved_by="alice")
+    assert updated["status"] == "approved" and updated["approved_by"] == "alice"
+    assert store.transition("approval", "a1", "pending", "approved") is None
+    assert store.transition("approval", "missing", "pending", "approved") is None
+    assert store.get("approval", "a1")["approved_by"] == "alice"
+
+
+def test_concurrent_claims_have_one_winner(tmp_path):
+    path = tmp_path / "state.db"
+    setup = StateStore(path)
+    setup.put("remote_execution", record("x1", status="approved"), ttl=60)
+    setup.close()
+
+    # Deux connexions (comme deux processus serveur) et plusieurs threads
+    stores = [StateStore(path), StateStore(path)]
+    barrier = threading.Barrier(8)
+    wins = []
+
+    def claim(store):
+        barrier.wait()
+        if store.transition("remote_execution", "x1", "approved", "executing"):
+            wins.append(store)
+
+    threads = [threading.Thread(target=claim, args=(stores[i % 2],)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for s in stores:
+        s.close()
+
+    assert len(wins) == 1
+
+
+def test_records_survive_reopen_and_expire(tmp_path):
+    path = tmp_path / "state.db"
+    store = StateStore(path)
+    store.put("approval", record("old"), ttl=1)
+    store.put("approval", record("new"), ttl=3600)
+    store.close()
+
+    store = StateStore(path)
+    assert store.get("approval", "old") is not None
+    assert store.sweep(now=time.time() + 10) == 1
+    assert [r["id"] for r in store.select("approval")] == ["new"]
+    store.close()
+
+
+def test_sweep_keeps_executing_records(store):
+    store.put("remote_execution", record("r1", status="approved"), ttl=1)
+    store.put("remote_execution", record("r2", status="approved"), ttl=1)
+    store.transition("remote_execution", "r1", "approved", "executing")
+
+    assert store.sweep(now=time.time() + 10) == 1
+    assert store.get("remote_execution", "r2") is None
+    # L'exécution peut se conclure, puis l'enregistrement expire normalement
+    assert store.transition("remote_execution", "r1", "executing", "completed") is not None
+    assert store.sweep(now=time.time() + 10) == 1
+
+
+def test_background_sweeper(tmp_path):
+    store = StateStore(tmp_path / "state.db", sweep_interval=0.05)
+    store.put("approval", record("a1"), ttl=0)
+    deadline = time.time() + 5
+    while store.get("approval", "a1") is not None and time.time() < deadline:
+        time.sleep(0.02)
+    assert store.get("approval", "a1") is None
+    store.close()
+
+
+def test_engine_approval_lifecycle(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    engine = AuthorizationEngine(COMMAND_WHITELIST, store=store)
+    auth = engine.check_command("web-01", "systemctl restart nginx")
+    assert auth.needs_approval
+
+    # Un redémarrage du serveur ne perd pas la demande
+    engine = AuthorizationEngine(COMMAND_WHITELIST, store=StateStore(store.db_file))
+    [pending] = engine.get_all_pending()
+    assert pending.id == auth.approval_id and pending.status == ApprovalStatus.PENDING
+    assert pending.rule.description == auth.rule.description
+
+    assert engine.approve_command(auth.approval_id).approved
+    assert engine.claim_execution(auth.approval_id).status == ApprovalStatus.EXECUTING
+    assert engine.claim_execution(auth.approval_id) is None
+    assert engine.approve_command(auth.approval_id) is None
+    assert engine.mark_executed(auth.approval_id)
+    assert engine.get_all_pending() == []
+    assert engine.get_pending(auth.approval_id).executed
+
+
+@pytest.fixture
+def action_store(tmp_path, monkeypatch):
+    store = StateStore(tmp_path / "state.db")
+    monkeypatch.setattr(actions, "get_state_store", lambda: store)
+    yield store
+    store.close()
+
+
+async def test_remote_execution_runs_once_under_concurrency(action_store, monkeypatch):
+    runs = []
+
+    async def fake_execute(action, host):
+        runs.append((action, host))
+        await asyncio.sleep(0.01)
+        return 0, "ok", ""
+
+    monkeypatch.setattr(actions, "run_remote_execution", fake_execute)
+
+    await actions.propose_remote_execution("flush_dns_cache", "web-01", "stale records")
+    [proposed] = action_store.select(actions.KIND)
+    action_id = proposed["id"]
+
+    assert "Approved" in await actions.approve_remote_execution(action_id, True, approver="alice")
+    assert "not in PROPOSED state" in await actions.approve_remote_execution(action_id, True)
+
+    results = await asyncio.gather(*(actions.execute_remote_execution(action_id) for _ in range(5)))
+    assert len(runs) == 1
+    assert sum("Executed Successfully" in r for r in results) == 1
+    assert all("Cannot execute" in r for r in results if "Executed Successfully" not in r)
+
+    stored = action_store.get(actions.KIND, action_id)
+    assert stored["status"] == "completed" and stored["result"]["stdout"] == "ok"
+    assert await actions.list_pending_actions() == "No pending remote executions."
+    assert "Unknown action ID" in await actions.execute_remote_execution("nope")
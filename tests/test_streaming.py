@@ -0,0 +1,67 @@
+"""Tests for streamed command output with byte/line budgets."""
+
+import asyncio
+
+from mcp_linux_infra.connection.streaming import read_command_output, stream_local_command
+
+
+async def test_complete_output_is_not_truncated():
+    output = await read_command_output(["printf", "a\nb\nlast"])
+
+    assert output.stdout == "a\nb\nlast"
+    assert output.returncode == 0
+    assert not output.truncated
+    assert output.text() == output.stdout
+
+
+async def test_line_budget_stops_infinite_command():
+    # `yes` never ends on its own: the budget must interrupt it
+    async with stream_local_command(["yes"], max_lines=5) as stream:
+        stdout = await asyncio.wait_for(stream.read_all(), timeout=5)
+
+    assert stdout == "y\n" * 5
+    assert stream.truncated
+    assert stream.marker() == "[... output truncated after 5 lines / 10 bytes ...]"
+
+
+async def test_collected_output_goes_through_limiter():
+    output = await asyncio.wait_for(read_command_output(["yes"], max_lines=500), timeout=5)
+
+    assert output.stdout == "y\n[... previous line repeated 499 more times]\n"
+    assert output.ok
+    assert output.text().endswith("[... output truncated after 500 lines / 1000 bytes ...]\n")
+
+
+async def test_byte_budget_keeps_whole_lines():
+    output = await read_command_output(["seq", "1", "100000"], max_bytes=20)
+
+    assert output.stdout == "1\n2\n3\n4\n5\n6\n7\n8\n9\n"
+    assert output.truncated
+
+
+async def test_incremental_consumption():
+    seen = []
+    async with stream_local_command(["seq", "1", "100000"]) as stream:
+        async for line in stream:
+            seen.append(int(line))
+            if len(seen) == 3:
+                break
+
+    assert seen == [1, 2, 3]
+    assert stream.lines_read == 3
+
+
+async def test_stderr_and_returncode_collected():
+    output = await read_command_output(["sh", "-c", "echo out; echo oops >&2; exit 3"])
+
+    assert output.stdout == "out\n"
+    assert output.stderr == "oops\n"
+    assert output.returncode == 3
+    assert not output.ok
+
+
+async def test_unterminated_line_over_budget():
+    output = await read_command_output(["sh", "-c", "head -c 200000 /dev/zero | tr '\\0' x"], max_bytes=1000)
+
+    assert output.stdout == ""
+    assert output.truncated